@@ -20,6 +20,14 @@
 NOAH Scripts - Cluster Creation Utilities
 """
 
-from .status_utils import show_cluster_status
+import importlib
 
 __all__ = ['show_cluster_status']
+
+
+def __getattr__(name):
+    # Lazy re-export: importing Scripts.cluster_create.flux_utils must not drag
+    # the status/cluster-manager chain in through this package.
+    if name == 'show_cluster_status':
+        return importlib.import_module('.status_utils', __name__).show_cluster_status
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -45,7 +45,21 @@ def _require_flux() -> None:
         )
 
 
-def _require_kubeconfig() -> None:
+def _require_kubeconfig(cluster: str | None = None) -> None:
+    """Point KUBECONFIG at the cluster to act on, or raise.
+
+    A named *cluster* (`noah --cluster`) is reached through Kube/<cluster>.yaml
+    and nothing else: falling back on KUBECONFIG or ~/.kube/config could hand
+    one cluster's secrets to another.
+    """
+    if cluster is not None:
+        path = NOAH_PATHS["root_dir"] / "Kube" / f"{cluster}.yaml"
+        if not path.exists():
+            raise click.ClickException(
+                f"No kubeconfig for cluster {cluster!r}: expected {path}."
+            )
+        os.environ["KUBECONFIG"] = str(path)
+        return
     candidates = [
         os.environ.get("KUBECONFIG"),
         str(Path.home() / ".kube" / "config"),
@@ -20,14 +20,18 @@
 Core Helm and Kubernetes management utilities
 """
 
-from .authentik_credentials import (
-    get_admin_credentials,
-    get_authentik_credentials,
-    regenerate_authentik_password,
-)
+import importlib
 
 __all__ = [
     'get_admin_credentials',
     'get_authentik_credentials',
     'regenerate_authentik_password',
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # Lazy re-export: importing Scripts.core_helm.cluster_manager must not drag
+    # the canonical store in through this package.
+    if name in __all__:
+        return getattr(importlib.import_module('.authentik_credentials', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -74,7 +74,7 @@ def get_admin_credentials(domain: str | None = None) -> tuple[list[dict[str, Any
     """
     try:
         from Scripts.security.canonical_store import get_canonical_store  # type: ignore
-        store = get_canonical_store()
+        store = get_canonical_store(readonly=True)
         services = store.data.get('services', {})
         domain = domain or store.get_cluster_domain()
         external_ip, resolution_status = _resolve_node_ip()
@@ -118,7 +118,7 @@ def get_authentik_credentials(domain: str | None = None) -> tuple[dict[str, Any]
     """
     try:
         from Scripts.security.canonical_store import get_canonical_store  # type: ignore
-        store = get_canonical_store()
+        store = get_canonical_store(readonly=True)
         svc = store.data.get('services', {}).get('authentik', {})
         entry = svc.get('bootstrap_password')
         password = entry.get('value') if isinstance(entry, dict) else entry
@@ -179,7 +179,7 @@ def regenerate_authentik_password():
         return ({
             'old_password': old_password,
             'new_password': new_password,
-            'updated_file': str(store._active_path())
+            'updated_file': str(store.file_for('authentik'))
         }, None)
     except InsecureStoreError:
         raise
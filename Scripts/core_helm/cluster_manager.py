@@ -28,20 +28,14 @@ from typing import Any
 # gitops/apps and gitops/apps-extra, plus kube-system for the CNI and Headlamp.
 MONITORED_NAMESPACES = ('authentik', 'headlamp', 'nextcloud', 'stalwart', 'kube-system')
 
-# Optional imports with graceful fallbacks
+# Optional imports with graceful fallbacks. Resolved by _initialize_kubernetes()
+# rather than at import: the kubernetes package (and the requests stack under
+# it) costs a few hundred milliseconds, which every noah.py command paid even
+# when it never touched the cluster.
 client: Any | None = None
 config: Any | None = None
 ApiException: Any | None = None
 
-try:
-    from kubernetes import client, config  # type: ignore
-    from kubernetes.client.rest import ApiException  # type: ignore
-except ImportError:
-    # Attempt late import after adding virtualenv site-packages in _initialize_kubernetes
-    client = None  # type: ignore
-    config = None  # type: ignore
-    ApiException = None  # type: ignore
-
 class ClusterManager:
     def __init__(self, config_loader):
         self.config = config_loader
@@ -54,6 +48,14 @@ class ClusterManager:
         """Initialize Kubernetes clients"""
         global client, config, ApiException
 
+        if client is None or config is None:
+            try:
+                from kubernetes import client, config  # type: ignore
+                from kubernetes.client.rest import ApiException  # type: ignore
+            except ImportError:
+                # Attempt late import after adding virtualenv site-packages below
+                client = config = ApiException = None  # type: ignore
+
         if client is None or config is None:
             # Try to dynamically discover a local .venv if user forgot to activate it
             venv_candidates: list[Path] = []
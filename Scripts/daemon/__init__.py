@@ -0,0 +1,30 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+NOAH Scripts - Resident daemon
+
+`noah daemon start` keeps one warm NOAH process per checkout: configuration
+decrypted, implementation modules imported, canonical store loaded and the
+kubernetes client built. noah.py forwards its argv to it over a unix socket
+and the daemon forks a child per command, which inherits that state for free.
+
+client.py is imported by every noah.py start and must stay stdlib-only;
+server.py is only imported by the daemon itself.
+"""
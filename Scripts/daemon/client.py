@@ -0,0 +1,160 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Thin client for `noah daemon`.
+
+Imported before anything else in noah.py, so stdlib only: the whole point is
+to skip the interpreter re-exec, the Scripts imports and the sops decrypts.
+
+Protocol (one connection per request, newline-delimited JSON):
+  client -> daemon  4-byte big-endian length + JSON request; a "run" request
+                    carries the client's stdin/stdout/stderr as SCM_RIGHTS fds,
+                    so the command writes straight to the caller's terminal.
+  daemon -> client  {"started": pid} once the command is forked, then
+                    {"exit": code} when it finishes.
+  client -> daemon  {"signal": n} to forward a Ctrl-C to the running command.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import signal
+import socket
+import struct
+from pathlib import Path
+
+FRAME_HEADER = struct.Struct("!I")
+
+# How long forward() waits for {"started": pid}. Covers a warm-up after a
+# watched file changed; past it the daemon is taken as hung and the command
+# runs in-process.
+START_TIMEOUT = 15.0
+
+
+def socket_path(root: Path) -> Path | None:
+    """Socket of the daemon serving the checkout at *root*, or None.
+
+    Lives in $XDG_RUNTIME_DIR (per-user, 0700) like the session cache; without
+    it there is no private place for the socket and no daemon.
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if not base or not os.path.isdir(base):
+        return None
+    digest = hashlib.sha256(str(Path(root).resolve()).encode()).hexdigest()[:12]
+    return Path(base) / "noah" / f"daemon-{digest}.sock"
+
+
+def _connect(root: Path) -> socket.socket | None:
+    path = socket_path(root)
+    if path is None or not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        # Stale socket left by a killed daemon: behave as if none were running.
+        sock.close()
+        return None
+    return sock
+
+
+def _send(sock: socket.socket, request: dict, fds: list[int] | None = None) -> None:
+    payload = json.dumps(request).encode("utf-8")
+    data = FRAME_HEADER.pack(len(payload)) + payload
+    if fds:
+        socket.send_fds(sock, [data], fds)
+    else:
+        sock.sendall(data)
+
+
+class _Reader:
+    """Newline-delimited JSON reader that survives an interrupted recv()."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.buffer = b""
+
+    def next(self) -> dict | None:
+        while b"\n" not in self.buffer:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                return None
+            self.buffer += chunk
+        line, self.buffer = self.buffer.split(b"\n", 1)
+        return json.loads(line)
+
+
+def request(root: Path, op: str) -> dict | None:
+    """Send a control request ("status", "stop"); None when no daemon answers."""
+    sock = _connect(root)
+    if sock is None:
+        return None
+    with sock:
+        try:
+            _send(sock, {"op": op})
+            return _Reader(sock).next()
+        except OSError:
+            return None
+
+
+def forward(argv: list[str], root: Path) -> int | None:
+    """Run *argv* in the daemon serving *root* and return its exit status.
+
+    Returns None -- run in-process instead -- when no daemon is listening or
+    it hung up, or stayed silent for START_TIMEOUT, before starting the
+    command. Once the command has started,
+    falling back would run it twice, so a lost connection is reported as a
+    failure instead.
+    """
+    sock = _connect(root)
+    if sock is None:
+        return None
+    with sock:
+        try:
+            _send(sock, {"op": "run", "argv": argv, "cwd": os.getcwd(),
+                         "env": dict(os.environ)}, [0, 1, 2])
+        except OSError:
+            return None
+        sock.settimeout(START_TIMEOUT)
+        started = False
+        reader = _Reader(sock)
+        while True:
+            try:
+                message = reader.next()
+            except KeyboardInterrupt:
+                # The command runs in the daemon's session, out of reach of
+                # the terminal's SIGINT: relay it and keep waiting for the exit.
+                try:
+                    _send(sock, {"signal": int(signal.SIGINT)})
+                except OSError:
+                    return 130
+                continue
+            except OSError:
+                message = None
+            if message is None:
+                if not started:
+                    return None
+                os.write(2, b"noah: lost connection to the daemon\n")
+                return 1
+            if "started" in message:
+                started = True
+                sock.settimeout(None)  # the command may run for as long as it needs
+            elif "exit" in message:
+                return int(message["exit"])
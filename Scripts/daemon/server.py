@@ -0,0 +1,378 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""`noah daemon` server: a warm parent that forks one child per command.
+
+Forking rather than running commands in the daemon's own interpreter gives
+each command what a fresh `python3 noah.py` would: its own os.environ, cwd,
+sys.argv and exit status, and no way to leave state behind for the next one
+-- while inheriting everything warm_up() paid for.
+
+The state is rebuilt whenever one of the watched files (config.enc.yaml, the
+canonical store) changes on disk, so a command that rotated a secret never
+hands the next one a stale copy.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import selectors
+import signal
+import socket
+import struct
+import sys
+import time
+import traceback
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from Scripts.daemon.client import FRAME_HEADER
+
+logger = logging.getLogger(__name__)
+
+_PEERCRED = struct.Struct("3i")
+
+
+class DaemonError(RuntimeError):
+    """The daemon cannot start (already running, no runtime directory)."""
+
+
+def _signature(paths: Iterable[Path]) -> tuple:
+    sig = []
+    for path in paths:
+        try:
+            st = path.stat()
+            sig.append((str(path), st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((str(path), None, None))
+    return tuple(sig)
+
+
+def _recv_request(conn: socket.socket) -> tuple[dict, list[int]]:
+    data, fds, _flags, _addr = socket.recv_fds(conn, 65536, 3)
+    while len(data) < FRAME_HEADER.size:
+        chunk = conn.recv(65536)
+        if not chunk:
+            raise ConnectionError("truncated request")
+        data += chunk
+    (length,) = FRAME_HEADER.unpack_from(data)
+    payload = data[FRAME_HEADER.size:]
+    while len(payload) < length:
+        chunk = conn.recv(65536)
+        if not chunk:
+            raise ConnectionError("truncated request")
+        payload += chunk
+    return json.loads(payload), list(fds)
+
+
+def _reply(conn: socket.socket, message: dict) -> None:
+    try:
+        conn.sendall(json.dumps(message).encode("utf-8") + b"\n")
+    except OSError:
+        pass  # the client went away; nothing left to tell it
+
+
+def _hung_up(conn: socket.socket) -> bool:
+    try:
+        return conn.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+    except BlockingIOError:
+        return False
+    except OSError:
+        return True
+
+
+def _exit_code(run: Callable[[list[str]], None], argv: list[str]) -> int:
+    """Run the command the way the interpreter would and map SystemExit."""
+    try:
+        run(argv)
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException:  # noqa: BLE001 -- the child must always report
+        traceback.print_exc()
+        return 1
+
+
+class NoahDaemon:
+    """Serve noah commands on *sock_path*.
+
+    Parameters
+    ----------
+    sock_path:
+        Unix socket to listen on (see client.socket_path).
+    run:
+        Runs one command from its argv; called in the forked child.
+    warm_up:
+        Builds the warm state in the parent and returns the environment
+        variables it decrypted, which are laid over each client's environment.
+    watch:
+        Files whose change triggers a new warm_up() before the next command.
+    """
+
+    def __init__(
+        self,
+        sock_path: Path,
+        run: Callable[[list[str]], None],
+        warm_up: Callable[[], dict[str, str]],
+        watch: Iterable[Path] = (),
+    ) -> None:
+        self.sock_path = Path(sock_path)
+        self.run = run
+        self.warm_up = warm_up
+        self.watch = [Path(p) for p in watch]
+        self.overlay: dict[str, str] = {}
+        self.signature: tuple = ()
+        self.started_at = time.time()
+        self.served = 0
+        self._children: dict[int, socket.socket] = {}
+        self._wakeup: tuple[socket.socket, ...] = ()
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def bind(self) -> socket.socket:
+        """Create the listening socket, refusing to steal a live daemon's."""
+        self.sock_path.parent.mkdir(mode=0o700, exist_ok=True)
+        if self.sock_path.exists():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.sock_path))
+                raise DaemonError(f"A daemon is already listening on {self.sock_path}")
+            except OSError:
+                self.sock_path.unlink()  # stale, left by a killed daemon
+            finally:
+                probe.close()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Created 0600 from the start: connecting grants a warm store.
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(str(self.sock_path))
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        return server
+
+    def serve_forever(self, server: socket.socket | None = None) -> None:
+        server = server or self.bind()
+        self._refresh(force=True)
+        selector = selectors.DefaultSelector()
+        selector.register(server, selectors.EVENT_READ, None)
+        # SIGCHLD wakes select() through this pair, so an exit status reaches
+        # the client as soon as the command ends rather than at the next poll.
+        wake_r, wake_w = socket.socketpair()
+        wake_r.setblocking(False)
+        wake_w.setblocking(False)
+        selector.register(wake_r, selectors.EVENT_READ, 0)
+        signal.signal(signal.SIGCHLD, lambda *_: None)
+        previous_wakeup = signal.set_wakeup_fd(wake_w.fileno(), warn_on_full_buffer=False)
+        self._wakeup = (wake_r, wake_w)
+        self._running = True
+        try:
+            while self._running or self._children:
+                for key, _ in selector.select(timeout=1.0):
+                    if key.data is None:
+                        self._accept(server, selector)
+                    elif key.data == 0:
+                        try:
+                            wake_r.recv(4096)
+                        except BlockingIOError:
+                            pass
+                    else:
+                        self._relay_signal(key.fileobj, key.data, selector)
+                self._reap(selector)
+                if not self._running and server.fileno() != -1:
+                    # Stop accepting, but let running commands finish.
+                    selector.unregister(server)
+                    server.close()
+                    self.sock_path.unlink(missing_ok=True)
+        finally:
+            signal.set_wakeup_fd(previous_wakeup)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            selector.close()
+            wake_r.close()
+            wake_w.close()
+            server.close()
+            self.sock_path.unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------
+    # Request handling
+    # ------------------------------------------------------------------
+
+    def _refresh(self, force: bool = False) -> None:
+        signature = _signature(self.watch)
+        if force or signature != self.signature:
+            try:
+                self.overlay = self.warm_up()
+            except Exception:  # noqa: BLE001 -- must not take the daemon down
+                # A config file caught mid-rewrite, say: keep the previous
+                # overlay and try again before the next command.
+                logger.exception("Daemon warm-up failed; keeping the previous state")
+                return
+            self.signature = _signature(self.watch)
+
+    def _accept(self, server: socket.socket, selector: selectors.BaseSelector) -> None:
+        conn, _ = server.accept()
+        pid, uid, _gid = _PEERCRED.unpack(
+            conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _PEERCRED.size)
+        )
+        if uid != os.getuid():
+            logger.warning("Refusing daemon connection from uid %d (pid %d)", uid, pid)
+            conn.close()
+            return
+        try:
+            request, fds = _recv_request(conn)
+        except (OSError, ValueError) as e:
+            logger.warning("Malformed daemon request: %s", e)
+            conn.close()
+            return
+
+        op = request.get("op")
+        if op == "status":
+            _reply(conn, {"pid": os.getpid(), "started_at": self.started_at,
+                          "served": self.served, "running": len(self._children)})
+            conn.close()
+        elif op == "stop":
+            self._running = False
+            _reply(conn, {"stopped": os.getpid()})
+            conn.close()
+        elif op == "run" and len(fds) == 3:
+            self._fork_command(request, fds, conn, server, selector)
+        else:
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+
+    def _fork_command(self, request, fds, conn, server, selector) -> None:
+        self._refresh()
+        if _hung_up(conn):
+            # The client gave up waiting through a slow warm-up and runs the
+            # command itself: starting it here too would run it twice.
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+            return
+        pid = os.fork()
+        if pid == 0:
+            # Child: drop every daemon descriptor before running anything.
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            selector.close()
+            server.close()
+            for wake in self._wakeup:
+                wake.close()
+            for other in self._children.values():
+                other.close()
+            conn.close()
+            self._run_child(request, fds)  # never returns
+        # The child does the same first thing; doing it here as well closes
+        # the window where a hang-up's killpg() would find no such group.
+        try:
+            os.setpgid(pid, pid)
+        except OSError:
+            pass  # the child got there first
+        for fd in fds:
+            os.close(fd)
+        self.served += 1
+        self._children[pid] = conn
+        selector.register(conn, selectors.EVENT_READ, pid)
+        _reply(conn, {"started": pid})
+
+    def _run_child(self, request: dict, fds: list[int]) -> None:
+        code = 1
+        try:
+            os.setpgid(0, 0)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+                os.close(fd)
+            # Fresh stream objects: the daemon's were opened on its log file,
+            # so their buffering (and isatty) reflected that, not the client.
+            sys.stdin = open(0, closefd=False)
+            sys.stdout = open(1, "w", buffering=1 if os.isatty(1) else -1, closefd=False)
+            sys.stderr = open(2, "w", buffering=1, errors="backslashreplace", closefd=False)
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request["env"])
+            os.environ.update(self.overlay)
+            argv = list(request["argv"])
+            sys.argv = [sys.argv[0], *argv]
+            code = _exit_code(self.run, argv)
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                try:
+                    stream.flush()
+                except Exception:  # noqa: BLE001
+                    pass
+            os._exit(code)
+
+    def _relay_signal(self, conn: socket.socket, pid: int, selector) -> None:
+        try:
+            data = conn.recv(4096)
+        except OSError:
+            data = b""
+        if not data:
+            # Client gone (killed, terminal closed): the command has nobody
+            # left to report to.
+            selector.unregister(conn)
+            self._signal_child(pid, signal.SIGTERM)
+            return
+        # Control frames are tiny; each arrives whole in one recv().
+        while len(data) >= FRAME_HEADER.size:
+            (length,) = FRAME_HEADER.unpack_from(data)
+            frame, data = data[FRAME_HEADER.size:FRAME_HEADER.size + length], data[FRAME_HEADER.size + length:]
+            try:
+                message = json.loads(frame)
+            except ValueError:
+                break
+            if "signal" in message:
+                self._signal_child(pid, int(message["signal"]))
+
+    @staticmethod
+    def _signal_child(pid: int, signum: int) -> None:
+        try:
+            os.killpg(pid, signum)
+        except OSError:
+            pass
+
+    def _reap(self, selector: selectors.BaseSelector) -> None:
+        for pid, conn in list(self._children.items()):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, 0
+            if not done:
+                continue
+            del self._children[pid]
+            try:
+                selector.unregister(conn)
+            except (KeyError, ValueError):
+                pass
+            code = os.waitstatus_to_exitcode(status)
+            # Killed by a signal: report it the way a shell would (130 for ^C).
+            _reply(conn, {"exit": code if code >= 0 else 128 - code})
+            conn.close()
@@ -21,7 +21,6 @@ NOAH environment diagnosis utilities
 """
 
 import os
-import subprocess
 import sys
 from pathlib import Path
 
@@ -36,7 +35,7 @@ from Scripts.security.canonical_store import (
     resolve_age_key_file,
 )
 
-from .environment_initializer import check_command_exists
+from Scripts.utils import toolchain
 
 
 def print_status(message, status="INFO"):
@@ -86,48 +85,34 @@ def diagnose_noah_environment(ctx):
         print_status("✗ Requirements file missing", "ERROR")
         issues.append("Missing requirements.txt")
     
-    # Check external dependencies
+    # Check external dependencies (one shared, cached probe per binary)
     external_deps = ['kubectl', 'helm', 'ansible', 'age']
     for cmd in external_deps:
-        if check_command_exists(cmd):
+        if toolchain.which(cmd):
             print_status(f"✓ {cmd} available", "SUCCESS")
         else:
             print_status(f"✗ {cmd} missing", "WARNING")
             issues.append(f"Missing {cmd}")
     
     # Check SOPS version specifically
-    if check_command_exists('sops'):
-        try:
-            result = subprocess.run(['sops', '--version'], capture_output=True, text=True)
-            if result.returncode == 0:
-                # Extract version from output
-                version = "unknown"
-                for line in result.stdout.split('\n'):
-                    if 'sops' in line.lower():
-                        parts = line.split()
-                        for part in parts:
-                            if part.replace('.', '').replace('-', '').isdigit() or '.' in part:
-                                version = part
-                                break
-                        break
-                print_status(f"✓ SOPS version {version}", "SUCCESS")
-                # Check if version is recent (3.8+)
-                try:
-                    major, minor = map(int, version.split('.')[:2])
-                    if major < 3 or (major == 3 and minor < 8):
-                        print_status("⚠ SOPS version is outdated (consider updating)", "WARNING")
-                        issues.append("SOPS version outdated")
-                except Exception:
-                    pass
-            else:
-                print_status("✗ SOPS version check failed", "WARNING")
-                issues.append("SOPS version check failed")
-        except Exception:
-            print_status("✗ SOPS available but version check failed", "WARNING")
-            issues.append("SOPS version check failed")
-    else:
+    sops = toolchain.resolve('sops')
+    if sops.path is None:
         print_status("✗ SOPS missing", "ERROR")
         issues.append("Missing SOPS")
+    elif not sops.available:
+        print_status("✗ SOPS available but version check failed", "WARNING")
+        issues.append("SOPS version check failed")
+    else:
+        version = sops.version or "unknown"
+        print_status(f"✓ SOPS version {version}", "SUCCESS")
+        # Check if version is recent (3.8+)
+        try:
+            major, minor = map(int, version.split('.')[:2])
+            if major < 3 or (major == 3 and minor < 8):
+                print_status("⚠ SOPS version is outdated (consider updating)", "WARNING")
+                issues.append("SOPS version outdated")
+        except ValueError:
+            pass
     
     # Check NOAH files
     noah_files = ['noah.py', 'Scripts/', 'Ansible/', 'flux-repo/']
@@ -29,14 +29,55 @@ from pathlib import Path
 
 import click
 
+from Scripts.utils import toolchain
+
 
 def check_command_exists(command):
     """Check if a command exists in the system PATH"""
-    try:
-        subprocess.run(['which', command], check=True, capture_output=True)
-        return True
-    except subprocess.CalledProcessError:
-        return False
+    return toolchain.which(command) is not None
+
+
+# Longest shebang line the Linux kernel honours, newline excluded.
+_SHEBANG_MAX = 127
+
+_LAUNCHER_BODY = '''\
+# Generated by `python3 noah.py setup initialize`; rerun it rather than edit.
+# Starts noah.py directly under the venv interpreter, sparing every command
+# the second interpreter start noah.py's own re-exec would cost.
+import os
+import runpy
+import sys
+
+_NOAH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "noah.py")
+sys.argv[0] = _NOAH
+sys.path[0] = os.path.dirname(_NOAH)
+runpy.run_path(_NOAH, run_name="__main__")
+'''
+
+
+def write_launcher(venv_python: Path, project_root: Path | None = None) -> Path:
+    """Write the ``noah`` launcher at the project root and return its path.
+
+    The shebang names the venv interpreter itself. A path the kernel cannot
+    take on a shebang line (spaces, over 127 bytes) gets the /bin/sh
+    trampoline pip uses for its own console scripts instead.
+    """
+    root = Path(project_root or Path.cwd())
+    interpreter = str(Path(venv_python).absolute())
+    if " " in interpreter or len(interpreter) + 2 > _SHEBANG_MAX:
+        header = (
+            "#!/bin/sh\n"
+            f"'''exec' \"{interpreter}\" \"$0\" \"$@\"\n"
+            "' '''\n"
+        )
+    else:
+        header = f"#!{interpreter}\n"
+    launcher = root / "noah"
+    tmp = launcher.with_name(".noah.tmp")
+    tmp.write_text(header + _LAUNCHER_BODY, encoding="utf-8")
+    tmp.chmod(0o755)
+    os.replace(tmp, launcher)
+    return launcher
 
 
 def ensure_ssh_key(print_status):
@@ -105,11 +146,24 @@ def _wait_for_apt_lock(print_status=None, timeout: int = 120) -> None:
 
 def _is_apt_package_installed(package_name: str) -> bool:
     """Return True if the apt package is already installed at any version."""
+    return package_name in _installed_apt_packages([package_name])
+
+
+def _installed_apt_packages(package_names: list) -> set:
+    """Return the subset of package_names that is installed, in one dpkg-query."""
+    if not package_names:
+        return set()
     result = subprocess.run(
-        ['dpkg-query', '-W', '-f=${Status}', package_name],
+        ['dpkg-query', '-W', '-f=${Package} ${Status}\n', *package_names],
         capture_output=True, text=True
     )
-    return result.returncode == 0 and 'install ok installed' in result.stdout
+    # Exits 1 when any name is unknown, but still reports the others.
+    installed = set()
+    for line in result.stdout.splitlines():
+        name, _, status = line.partition(' ')
+        if status.endswith('install ok installed'):
+            installed.add(name.split(':')[0])
+    return installed
 
 
 def _sudo_apt_install(packages: list, print_status=None) -> bool:
@@ -314,22 +368,7 @@ def update_sops_version(print_status=None):
     try:
         print_status("[INFO] Checking current SOPS version...", "INFO")
 
-        current_version = None
-        try:
-            if check_command_exists('sops'):
-                result = subprocess.run(['sops', '--version'], capture_output=True, text=True)
-                if result.returncode == 0:
-                    output_lines = result.stdout.strip().split('\n')
-                    for line in output_lines:
-                        if 'sops' in line.lower():
-                            parts = line.split()
-                            for i, part in enumerate(parts):
-                                if part.lower() == 'sops' and i + 1 < len(parts):
-                                    current_version = parts[i + 1]
-                                    break
-                            break
-        except Exception:
-            pass
+        current_version = toolchain.resolve('sops').version
 
         if current_version:
             print_status(f"[INFO] Current SOPS version: {current_version}", "INFO")
@@ -730,7 +769,7 @@ def initialize_noah_environment(ctx, skip_deps=False, skip_tests=False, print_st
         _sudo_apt_update(print_status)
 
         # python-is-python3
-        if subprocess.run(['which', 'python'], capture_output=True).returncode != 0:
+        if not check_command_exists('python'):
             print_status("[INFO] Installing python-is-python3...", "INFO")
             _sudo_apt_install(['python-is-python3'], print_status)
             print_status("[SUCCESS] python-is-python3 installed", "SUCCESS")
@@ -739,9 +778,10 @@ def initialize_noah_environment(ctx, skip_deps=False, skip_tests=False, print_st
 
         # python3-venv and python3-pip for the running Python version
         python_minor = f"{sys.version_info.major}.{sys.version_info.minor}"
-        for venv_pkg in [f"python{python_minor}-venv", f"python{python_minor}-pip", "python3-pip"]:
-            already = subprocess.run(['dpkg', '-l', venv_pkg], capture_output=True).returncode == 0
-            if not already:
+        venv_pkgs = [f"python{python_minor}-venv", f"python{python_minor}-pip", "python3-pip"]
+        installed = _installed_apt_packages(venv_pkgs)
+        for venv_pkg in venv_pkgs:
+            if venv_pkg not in installed:
                 print_status(f"[INFO] Installing {venv_pkg}...", "INFO")
                 if _sudo_apt_install([venv_pkg], print_status):
                     print_status(f"[SUCCESS] {venv_pkg} installed", "SUCCESS")
@@ -749,7 +789,7 @@ def initialize_noah_environment(ctx, skip_deps=False, skip_tests=False, print_st
                 print_status(f"[SUCCESS] {venv_pkg} already available", "SUCCESS")
 
         # age encryption tool
-        if subprocess.run(['which', 'age'], capture_output=True).returncode != 0:
+        if not check_command_exists('age'):
             print_status("[INFO] Installing age encryption tool...", "INFO")
             _sudo_apt_install(['age'], print_status)
             print_status("[SUCCESS] age encryption tool installed", "SUCCESS")
@@ -767,7 +807,7 @@ def initialize_noah_environment(ctx, skip_deps=False, skip_tests=False, print_st
             print_status("[SUCCESS] Kernel headers installed", "SUCCESS")
 
         # clang / llvm for BPF compilation
-        if subprocess.run(['which', 'clang'], capture_output=True).returncode != 0:
+        if not check_command_exists('clang'):
             print_status("[INFO] Installing clang and llvm for BPF compilation...", "INFO")
             _sudo_apt_install(['clang', 'llvm'], print_status)
             print_status("[SUCCESS] clang and llvm installed", "SUCCESS")
@@ -776,8 +816,8 @@ def initialize_noah_environment(ctx, skip_deps=False, skip_tests=False, print_st
 
         # Essential Cilium runtime dependencies
         cilium_runtime_packages = ['iproute2', 'iptables', 'ipset', 'kmod', 'ca-certificates']
-        missing = [p for p in cilium_runtime_packages
-                   if subprocess.run(['dpkg', '-l', p], capture_output=True).returncode != 0]
+        installed = _installed_apt_packages(cilium_runtime_packages)
+        missing = [p for p in cilium_runtime_packages if p not in installed]
         if missing:
             print_status(f"[INFO] Installing missing packages: {', '.join(missing)}", "INFO")
             _sudo_apt_install(missing, print_status)
@@ -1005,6 +1045,12 @@ def initialize_noah_environment(ctx, skip_deps=False, skip_tests=False, print_st
     except Exception as e:
         print_status(f"[ERROR] CLI test failed: {e}", "ERROR")
         sys.exit(1)
+
+    try:
+        launcher = write_launcher(venv_python)
+        print_status(f"[SUCCESS] Launcher written: ./{launcher.name} (runs under .venv directly)", "SUCCESS")
+    except OSError as e:
+        print_status(f"[WARNING] Could not write the ./noah launcher: {e}", "WARNING")
     
     # Initialize security infrastructure
     print_status("[INFO] Setting up security infrastructure...", "INFO")
@@ -1049,10 +1095,10 @@ def initialize_noah_environment(ctx, skip_deps=False, skip_tests=False, print_st
     click.echo("=" * 25)
     click.echo("")
     click.echo("To use NOAH:")
-    click.echo("  python3 noah.py --help")
+    click.echo("  ./noah --help          (same as python3 noah.py, one interpreter start fewer)")
     click.echo("")
     click.echo("Quick start (GitOps):")
-    click.echo("  python3 noah.py cluster bootstrap --node <IP> --domain <domain> --flux-repo <url>")
-    click.echo("  python3 noah.py flux status")
+    click.echo("  ./noah cluster bootstrap --node <IP> --domain <domain> --flux-repo <url>")
+    click.echo("  ./noah flux status")
     click.echo("")
     print_status("[SUCCESS] Setup completed successfully!", "SUCCESS")
\ No newline at end of file
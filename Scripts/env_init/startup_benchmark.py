@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+NOAH startup benchmark
+
+Times a trivial command through each entry point, from the repository root:
+
+    python3 -m Scripts.env_init.startup_benchmark [--runs 20] [--command --version]
+
+  python3 noah.py   system interpreter, then noah.py's re-exec under .venv
+  .venv python3     the venv interpreter on noah.py directly (the floor)
+  ./noah            the launcher written by `setup initialize`
+
+The launcher should match the floor; the gap to `python3 noah.py` is one
+interpreter start. Rows whose entry point does not exist yet are skipped.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+def _time_runs(argv: list[str], runs: int) -> list[float]:
+    # One untimed run so the page cache and __pycache__ are warm for all rows.
+    subprocess.run(argv, capture_output=True)
+    env = {**os.environ, "NOAH_NO_DAEMON": "1"}
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, capture_output=True, env=env)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def entry_points(root: Path) -> list[tuple[str, list[str]]]:
+    """(label, argv prefix) of every entry point present under *root*."""
+    points = []
+    system_python = shutil.which("python3") or sys.executable
+    points.append(("python3 noah.py", [system_python, str(root / "noah.py")]))
+    venv_python = root / ".venv" / "bin" / "python3"
+    if venv_python.exists():
+        points.append((".venv python3 noah.py", [str(venv_python), str(root / "noah.py")]))
+    launcher = root / "noah"
+    if launcher.is_file() and os.access(launcher, os.X_OK):
+        points.append(("./noah", [str(launcher)]))
+    return points
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--command", nargs="+", default=["--version"],
+                        help="noah.py arguments to time (default: --version)")
+    args = parser.parse_args(argv)
+
+    root = Path.cwd()
+    if not (root / "noah.py").exists():
+        print("Run from the NOAH repository root.", file=sys.stderr)
+        return 1
+
+    print(f"{'entry point':<24} {'median':>9} {'min':>9}   ({args.runs} runs of {' '.join(args.command)})")
+    for label, prefix in entry_points(root):
+        samples = _time_runs(prefix + args.command, args.runs)
+        print(f"{label:<24} {statistics.median(samples):>7.1f}ms {min(samples):>7.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
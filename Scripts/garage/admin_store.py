@@ -188,7 +188,8 @@ class GarageAdminStore(CanonicalSecretsStore):
     """Secret domain 3 — same store machinery, second Age identity.
 
     Three overrides and nothing else: where the identity lives, where the file
-    lives, and which recipient it is encrypted to. Everything the canonical
+    lives (always a single one, never sharded nor journaled), and which recipient it is
+    encrypted to. Everything the canonical
     store does about atomicity, the plaintext lock and integrity is inherited
     verbatim.
     """
@@ -196,6 +197,9 @@ class GarageAdminStore(CanonicalSecretsStore):
     # This IS the domain the canonical store refuses to hold.
     _forbidden_services = frozenset()
     _forbidden_keys = frozenset()
+    # A handful of keys for one service: nothing to shard or journal.
+    _shard_dirname = None
+    _journal_dirname = None
 
     def _resolve_age_key_file(self) -> Path:
         return resolve_admin_age_key_file(self.project_root)
@@ -213,22 +217,25 @@ class GarageAdminStore(CanonicalSecretsStore):
             # plaintext dev/test store there is no recipient to confuse.
             require_admin_identity(self.project_root)
 
-    def _encrypt_in_place(self, path: Path) -> bool:
-        """Encrypt to the domain-3 recipient EXPLICITLY.
+    def _encrypt_bytes(self, plaintext: bytes, path: Path,
+                       previous: bytes | None = None) -> bytes | None:
+        """Encrypt to the domain-3 recipient EXPLICITLY, always in full.
 
         The repository's .sops.yaml has a single creation rule matching
         `.*\\.enc\\.yaml$` with the CLUSTER's Age recipient. Falling back on it
         here would file every administration secret under a key the compute
         node holds — acceptance criterion 2 fails by construction, and nothing
         in the output would say so. `--age` on the command line overrides the
-        creation rules, which is exactly what this store needs.
+        creation rules, which is exactly what this store needs. For the same
+        reason *previous* is ignored: a targeted update would carry over
+        whatever recipients the old file names instead of re-asserting this one.
 
-        Raises rather than returning False on failure: save() ignores a False
+        Raises rather than returning None on failure: save() ignores a False
         return in most call paths, which would lose an administration secret
         without a word.
         """
         if not self.encrypted:
-            return True
+            return plaintext
         recipient = _age_public_key(self.age_key_file)
         if not recipient:
             raise GarageAdminIdentityError(
@@ -237,15 +244,15 @@ class GarageAdminStore(CanonicalSecretsStore):
             )
         env = {**os.environ, "SOPS_AGE_KEY_FILE": str(self.age_key_file)}
         result = subprocess.run(
-            ["sops", "--encrypt", "--age", recipient, "--in-place", str(path)],
-            env=env, capture_output=True, text=True,
+            ["sops", "encrypt", "--age", recipient, "--filename-override", str(path)],
+            input=plaintext, env=env, capture_output=True,
         )
         if result.returncode != 0:
             raise SopsEncryptionError(
                 "SOPS encryption of the Garage administration store failed",
-                detail=result.stderr,
+                detail=result.stderr.decode("utf-8", "replace"),
             )
-        return True
+        return result.stdout
 
 
 _admin_store_instance: GarageAdminStore | None = None
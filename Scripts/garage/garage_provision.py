@@ -268,12 +268,14 @@ def run_provision(
         raise GarageDeployError("Pass --nodes or --from-infra.")
 
     # --- Generate and persist BEFORE touching Garage (G2) ------------------
+    from Scripts.security.canonical_store import get_canonical_store
     from Scripts.security.security_manager import NoahSecurityManager
     manager = NoahSecurityManager(project_root=project_root)
-    credentials = {
-        service: manager.generate_service_secrets(service)
-        for service in GARAGE_S3_SERVICES
-    }
+    with get_canonical_store(project_root).transaction():
+        credentials = {
+            service: manager.generate_service_secrets(service)
+            for service in GARAGE_S3_SERVICES
+        }
 
     admin_store = get_admin_store(project_root)
     admin = ensure_admin_secrets(admin_store)
@@ -37,6 +37,7 @@ from __future__ import annotations
 import base64
 import os
 import subprocess
+import tempfile
 from pathlib import Path
 
 # ---------------------------------------------------------------------------
@@ -151,24 +152,27 @@ def _dkim_txt_value(private_key_pem: str) -> str:
 
 
 def _get_or_generate_secrets(
-    project_root: Path, domain: str, previous_domain: str | None = None
+    project_root: Path, domain: str, previous_domain: str | None = None,
+    cluster: str | None = None,
 ) -> dict:
     """Return all secrets needed to fill the enc.yaml placeholders."""
     from Scripts.security.canonical_store import get_canonical_store
     from Scripts.security.security_manager import NoahSecurityManager
 
-    store = get_canonical_store(project_root)
-    manager = NoahSecurityManager(project_root=project_root)
-
-    for service in ("authentik", "headlamp", "cloudflare", "nextcloud", "stalwart"):
-        manager.generate_service_secrets(service)
+    store = get_canonical_store(project_root, cluster=cluster)
+    manager = NoahSecurityManager(project_root=project_root, cluster=cluster)
 
     # Garage S3 consumption keys. Generated by _service_generators() in the
     # Garage shape (§6.2) and IMPOSED on Garage afterwards by
     # `noah garage provision`, never the other way round.
     from Scripts.security.security_manager import GARAGE_S3_SERVICES
-    for service in GARAGE_S3_SERVICES:
-        manager.generate_service_secrets(service)
+
+    # One encrypted write for the whole batch, not one per service filled.
+    with store.transaction():
+        for service in ("authentik", "headlamp", "cloudflare", "nextcloud", "stalwart"):
+            manager.generate_service_secrets(service)
+        for service in GARAGE_S3_SERVICES:
+            manager.generate_service_secrets(service)
 
     cf = store.get_service_secrets("cloudflare")
     auth = store.get_service_secrets("authentik")
@@ -233,11 +237,14 @@ def _get_or_generate_secrets(
     return replacements
 
 
-def _fill_file(path: Path, replacements: dict) -> None:
-    text = path.read_text()
+def _fill_text(text: str, replacements: dict) -> str:
     for placeholder, value in replacements.items():
         text = text.replace(placeholder, value)
-    path.write_text(text)
+    return text
+
+
+def _fill_file(path: Path, replacements: dict) -> None:
+    path.write_text(_fill_text(path.read_text(), replacements))
 
 
 def _is_sops_encrypted(path: Path) -> bool:
@@ -507,34 +514,46 @@ stringData:
 
 
 def _is_unreachable_recipient_error(stderr: str) -> bool:
-    return "no identity matched any of the recipients" in stderr
+    # age's wording changed ("no identity matched ..." before sops 3.9,
+    # "identity did not match ..." since), and sops wraps it in a "| " box.
+    text = " ".join(stderr.replace("|", " ").split())
+    return (
+        "no identity matched any of the recipients" in text
+        or "identity did not match any of the recipients" in text
+    )
+
+
+def _sops_client(age_key_file: Path, sops_yaml: Path | None = None):
+    from Scripts.security.sops_client import SopsClient
+    return SopsClient(age_key_file, sops_config=sops_yaml)
 
 
 def _decrypt_or_regenerate(
     enc_file: Path,
+    decrypted,
     gitops_dir: Path,
     age_key_file: Path,
     print_status,
-) -> bool:
-    """Decrypt enc_file in place. If decryption fails because the file is
-    sealed to an age recipient we no longer have the private key for,
-    overwrite it with the plaintext template (so step 4 can re-substitute
-    placeholders and step 6 can re-encrypt under the current key).
-
-    Returns True if the file was regenerated from a template (meaning the
+) -> tuple[str, bool]:
+    """Return the plaintext of enc_file from its decrypt_many result (the
+    content, or the SopsError raised for it). If decryption failed because the
+    file is sealed to an age recipient we no longer have the private key for,
+    return the plaintext template instead (so step 4 can re-substitute
+    placeholders and step 6 can re-encrypt under the current key). Nothing is
+    written.
+
+    The flag is True if the text was regenerated from a template (meaning the
     original ciphertext is unrecoverable and must be re-encrypted fresh);
     False if it was decrypted normally (meaning the original ciphertext
     can be reused if the plaintext doesn't end up changing)."""
-    env = {**os.environ, "SOPS_AGE_KEY_FILE": str(age_key_file)}
-    result = subprocess.run(
-        ["sops", "--decrypt", "--in-place", str(enc_file)],
-        env=env, capture_output=True, text=True
-    )
-    if result.returncode == 0:
-        return False
+    from Scripts.security.sops_client import SopsError
 
-    if not _is_unreachable_recipient_error(result.stderr):
-        raise RuntimeError(f"SOPS decryption failed for {enc_file}:\n{result.stderr}")
+    if not isinstance(decrypted, SopsError):
+        return decrypted, False
+
+    stderr = decrypted.detail or str(decrypted)
+    if not _is_unreachable_recipient_error(stderr):
+        raise RuntimeError(f"SOPS decryption failed for {enc_file}:\n{stderr}")
 
     rel = str(enc_file.relative_to(gitops_dir))
     template = _DEFAULT_TEMPLATES.get(rel)
@@ -546,25 +565,40 @@ def _decrypt_or_regenerate(
             f"the original age private key, or add an entry for this path to "
             f"_DEFAULT_TEMPLATES in Scripts/gitops/gitops_init.py."
         )
-    enc_file.write_text(template)
     print_status(
         f"[INFO] {rel}: sealed to an unavailable age key; regenerated from template",
         "INFO",
     )
-    return True
+    return template, True
 
 
-def _sops_encrypt(path: Path, sops_yaml: Path, age_key_file: Path) -> None:
-    env = {**os.environ, "SOPS_AGE_KEY_FILE": str(age_key_file)}
-    result = subprocess.run(
-        ["sops", "--encrypt", "--in-place", str(path)],
-        env=env, capture_output=True, text=True
+def _sops_encrypt_many(contents: dict[Path, str], sops_yaml: Path, age_key_file: Path) -> dict:
+    """Encrypt every plaintext in memory, concurrently, each under its own
+    path's creation rule. Returns {path: ciphertext bytes or the
+    SopsEncryptionError for that file}."""
+    if not contents:
+        return {}
+    return _sops_client(age_key_file, sops_yaml).encrypt_bytes_many(
+        {path: text.encode("utf-8") for path, text in contents.items()}
     )
-    if result.returncode != 0:
-        raise RuntimeError(f"SOPS encryption failed for {path}:\n{result.stderr}")
 
 
-def render_app_secret_manifests(project_root: Path, domain: str) -> str:
+def _write_atomically(path: Path, data: bytes) -> None:
+    """Replace path with data in one rename, keeping its permission bits."""
+    mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+    fd, tmp_str = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    tmp = Path(tmp_str)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        tmp.chmod(mode)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def render_app_secret_manifests(project_root: Path, domain: str,
+                                cluster: str | None = None) -> str:
     """Render the application Secret manifests as a single plaintext, multi-document
     YAML stream, built from the canonical store using the same templates and
     placeholder substitution as the (now removed) gitops/*.enc.yaml files.
@@ -573,12 +607,14 @@ def render_app_secret_manifests(project_root: Path, domain: str) -> str:
     `app-secrets` Ansible role, which `kubectl apply`s it directly into the
     cluster. Secrets therefore never need to be committed to Git during a
     deployment. Reused for re-delivery after rotation.
+
+    *cluster* names the cluster whose store to render (default: NOAH_CLUSTER).
     """
     from Scripts.security.canonical_store import get_canonical_store
 
-    store = get_canonical_store(project_root)
+    store = get_canonical_store(project_root, cluster=cluster)
     previous_domain = store.get_cluster_domain()
-    replacements = _get_or_generate_secrets(project_root, domain, previous_domain)
+    replacements = _get_or_generate_secrets(project_root, domain, previous_domain, cluster)
     replacements["example.com"] = domain
     replacements["${DOMAIN}"] = domain
 
@@ -612,6 +648,7 @@ def apply_app_secrets(
     domain: str | None = None,
     project_root: Path | None = None,
     print_status=None,
+    cluster: str | None = None,
 ) -> None:
     """Render the application secrets and apply them directly to the running
     cluster via kubectl (out-of-band, no Git commit). This mirrors the
@@ -620,16 +657,19 @@ def apply_app_secrets(
 
     Requires kubectl access (KUBECONFIG env, ~/.kube/config, or
     Kube/noah-cluster.yaml). Idempotent: namespaces and Secrets are applied.
+    A named *cluster* (default: NOAH_CLUSTER) is reached through its own
+    Kube/<cluster>.yaml only -- see _require_kubeconfig().
     """
     # Reuses the kubeconfig resolution already used by `noah flux ...`.
     from Scripts.cluster_create.flux_utils import _require_kubeconfig
-    from Scripts.security.canonical_store import get_canonical_store
+    from Scripts.security.canonical_store import get_canonical_store, selected_cluster
     from Scripts.utils.paths import NOAH_PATHS
 
     if project_root is None:
         project_root = NOAH_PATHS["root_dir"]
 
-    store = get_canonical_store(project_root)
+    cluster = selected_cluster(cluster)
+    store = get_canonical_store(project_root, cluster=cluster)
     domain = domain or store.get_cluster_domain()
     if not domain:
         raise RuntimeError(
@@ -637,14 +677,14 @@ def apply_app_secrets(
             "Pass an explicit --domain."
         )
 
-    _require_kubeconfig()  # sets KUBECONFIG in env or raises
+    _require_kubeconfig(cluster)  # sets KUBECONFIG in env or raises
 
     ns_docs = "\n---\n".join(
         f"apiVersion: v1\nkind: Namespace\nmetadata:\n  name: {ns}"
         for ns in _SECRET_NAMESPACES
     )
     # Namespaces first so a single apply creates them before the namespaced Secrets.
-    manifest = ns_docs + "\n---\n" + render_app_secret_manifests(project_root, domain)
+    manifest = ns_docs + "\n---\n" + render_app_secret_manifests(project_root, domain, cluster)
 
     result = subprocess.run(
         ["kubectl", "apply", "-f", "-"],
@@ -693,7 +733,7 @@ def setup_gitops(
         )
 
     # Toggle the opt-in apps before touching any *.enc.yaml, so a broken
-    # gitops/ tree fails here rather than inside the plaintext window below.
+    # gitops/ tree fails here rather than after the secrets are generated.
     _set_stalwart_enabled(gitops_dir, with_stalwart, print_status)
 
     age_key_file = project_root / "Age" / "keys.txt"
@@ -721,94 +761,72 @@ def setup_gitops(
     replacements["${DOMAIN}"] = domain
     print_status("[SUCCESS] Secrets loaded", "SUCCESS")
 
-    # Steps 3–6 modify *.enc.yaml files in place. Between decrypt (step 3) and
-    # encrypt (step 6) they hold plaintext secrets on disk — if the process
-    # crashes there, the user could accidentally `git add` and commit secrets.
-    # The try/except below guarantees that no .enc.yaml is left in a plaintext
-    # state when this function exits, by restoring the original ciphertext
-    # (for files we successfully decrypted) or the placeholder template (for
-    # files that had to be regenerated because their key was rotated).
-    #
-    # Crash-recovery records — also reused by step 6 for idempotency.
-    original_ciphertext: dict[Path, bytes] = {}
-    regenerated_templates: dict[Path, str] = {}
-    completed: set[Path] = set()
-
-    try:
-        # 3. Decrypt or regenerate. SOPS uses a random IV per encryption, so
-        # re-encrypting the same plaintext yields different ciphertext and
-        # dirties git. To keep no-op re-runs clean, snapshot original ciphertext
-        # for files we can still decrypt; step 6 reuses it when plaintext is
-        # unchanged. For files sealed to an unreachable key, capture the
-        # template instead — that's the only safe rollback target.
-        for enc_file in gitops_dir.rglob("*.enc.yaml"):
-            if _is_sops_encrypted(enc_file):
-                snapshot = enc_file.read_bytes()
-                regenerated = _decrypt_or_regenerate(
-                    enc_file, gitops_dir, age_key_file, print_status
-                )
-                if regenerated:
-                    regenerated_templates[enc_file] = enc_file.read_text()
-                else:
-                    original_ciphertext[enc_file] = snapshot
-
-        plaintext_before_fill: dict[Path, bytes] = {
-            f: f.read_bytes() for f in original_ciphertext
-        }
-
-        # 4. Fill *.enc.yaml placeholders
-        for enc_file in gitops_dir.rglob("*.enc.yaml"):
-            _fill_file(enc_file, replacements)
-        print_status("[SUCCESS] Filled secret placeholders in *.enc.yaml files", "SUCCESS")
-
-        # 5. Write .sops.yaml
-        age_pub = _age_public_key(project_root)
-        _write_sops_yaml(gitops_dir, age_pub)
-        print_status("[SUCCESS] Generated .sops.yaml", "SUCCESS")
-
-        # 6. SOPS-encrypt each *.enc.yaml — but if the plaintext didn't change
-        # versus the previous run, restore the original ciphertext to avoid the
-        # spurious git diff that a fresh IV would cause.
-        sops_yaml = gitops_dir / ".sops.yaml"
-        unchanged = 0
-        for enc_file in gitops_dir.rglob("*.enc.yaml"):
-            if enc_file in original_ciphertext:
-                if enc_file.read_bytes() == plaintext_before_fill[enc_file]:
-                    enc_file.write_bytes(original_ciphertext[enc_file])
-                    completed.add(enc_file)
-                    unchanged += 1
-                    continue
-            _sops_encrypt(enc_file, sops_yaml, age_key_file)
-            completed.add(enc_file)
-            print_status(f"[SUCCESS] Encrypted {enc_file.relative_to(gitops_dir)}", "SUCCESS")
-        if unchanged:
-            print_status(
-                f"[INFO] {unchanged} file(s) unchanged — kept existing ciphertext (no git churn)",
-                "INFO",
-            )
-    except BaseException:
-        # Best-effort restoration so no plaintext .enc.yaml survives a crash
-        # or Ctrl-C. Snapshots return files to byte-identical pre-run state;
-        # templates leave regenerated files as plain placeholders (no secrets).
-        for f, blob in original_ciphertext.items():
-            if f in completed:
-                continue
-            try:
-                f.write_bytes(blob)
-            except OSError as restore_err:
-                print_status(f"[WARN] Failed to restore {f}: {restore_err}", "WARN")
-        for f, template in regenerated_templates.items():
-            if f in completed:
-                continue
-            try:
-                f.write_text(template)
-            except OSError as restore_err:
-                print_status(f"[WARN] Failed to restore {f}: {restore_err}", "WARN")
+    # Steps 3–6 never put plaintext secrets on disk: every *.enc.yaml is
+    # decrypted into memory, filled there, encrypted from memory (sops on
+    # stdin/stdout), and only then written back -- one atomic rename per file,
+    # and none at all unless every file encrypted cleanly. A crash or Ctrl-C
+    # at any point leaves each file either as it was or fully re-encrypted, so
+    # nothing a `git add` could pick up ever holds a secret in the clear.
+
+    # 3. Decrypt or regenerate. SOPS uses a random IV per encryption, so
+    # re-encrypting the same plaintext yields different ciphertext and dirties
+    # git. To keep no-op re-runs clean, remember the decrypted plaintext of
+    # files we can still decrypt; step 6 leaves them untouched when it is
+    # unchanged. Files sealed to an unreachable key are regenerated from their
+    # template and always re-encrypted. All files are decrypted concurrently.
+    enc_files = sorted(gitops_dir.rglob("*.enc.yaml"))
+    encrypted_files = [f for f in enc_files if _is_sops_encrypted(f)]
+    decrypted = (
+        _sops_client(age_key_file).decrypt_many(encrypted_files) if encrypted_files else {}
+    )
+    plaintext: dict[Path, str] = {}
+    reusable: dict[Path, str] = {}
+    for enc_file in enc_files:
+        if enc_file not in decrypted:
+            # A plaintext template that was never encrypted.
+            plaintext[enc_file] = enc_file.read_text()
+            continue
+        text, regenerated = _decrypt_or_regenerate(
+            enc_file, decrypted[enc_file], gitops_dir, age_key_file, print_status
+        )
+        plaintext[enc_file] = text
+        if not regenerated:
+            reusable[enc_file] = text
+
+    # 4. Fill *.enc.yaml placeholders (in memory)
+    for enc_file, text in plaintext.items():
+        plaintext[enc_file] = _fill_text(text, replacements)
+    print_status("[SUCCESS] Filled secret placeholders in *.enc.yaml files", "SUCCESS")
+
+    # 5. Write .sops.yaml
+    age_pub = _age_public_key(project_root)
+    _write_sops_yaml(gitops_dir, age_pub)
+    print_status("[SUCCESS] Generated .sops.yaml", "SUCCESS")
+
+    # 6. SOPS-encrypt each *.enc.yaml whose plaintext changed versus the
+    # previous run; the others keep their ciphertext (no spurious git diff
+    # from a fresh IV).
+    sops_yaml = gitops_dir / ".sops.yaml"
+    to_encrypt = {f: text for f, text in plaintext.items() if reusable.get(f) != text}
+    unchanged = len(plaintext) - len(to_encrypt)
+    ciphertext = _sops_encrypt_many(to_encrypt, sops_yaml, age_key_file)
+    failures = [
+        f"{enc_file}:\n{result.detail or result}"
+        for enc_file, result in ciphertext.items() if not isinstance(result, bytes)
+    ]
+    if failures:
+        print_status(
+            "[ERROR] setup_gitops failed; no *.enc.yaml file was modified", "ERROR",
+        )
+        raise RuntimeError("SOPS encryption failed for " + "\n".join(failures))
+    for enc_file, data in ciphertext.items():
+        _write_atomically(enc_file, data)
+        print_status(f"[SUCCESS] Encrypted {enc_file.relative_to(gitops_dir)}", "SUCCESS")
+    if unchanged:
         print_status(
-            "[ERROR] setup_gitops failed; .enc.yaml files restored to pre-run state",
-            "ERROR",
+            f"[INFO] {unchanged} file(s) unchanged — kept existing ciphertext (no git churn)",
+            "INFO",
         )
-        raise
 
     # Record the domain so the next run can rewrite files that were filled
     # with this value if --domain changes.
@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+"""Integrity digests of the canonical secrets store.
+
+Each service has a digest over its secrets, and the store's ``integrity`` is
+a hash over those digests, a Merkle tree of depth one:
+
+    digest(authentik) = H("authentik:bootstrap_password=...\nauthentik:secret_key=...")
+    integrity         = H("authentik:<digest>\nheadlamp:<digest>\n...")
+
+The digests are saved with the data they cover: under ``shards`` in the
+index of a sharded store, under ``digests`` in a single-file one. A save
+rehashes only the services that changed since they were read. A load checks
+the root against the saved digests. Each service's content is checked the
+first time it is read: on decryption for a shard, through
+get_service_secrets() for a single file.
+"""
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Mapping
+from typing import Any
+
+# Where a single-file document keeps its per-service digests.
+DIGESTS_KEY = "digests"
+
+
+def _lines(service: str, secrets_map: Mapping[str, Any] | None) -> list[str]:
+    lines = []
+    secrets_map = secrets_map or {}
+    for key in sorted(secrets_map):
+        entry = secrets_map[key]
+        val = entry.get("value") if isinstance(entry, dict) else entry
+        if val is None:
+            continue
+        lines.append(f"{service}:{key}={val}")
+    return lines
+
+
+def service_digest(service: str, secrets_map: Mapping[str, Any] | None) -> str:
+    """SHA-256 over one service's secrets.
+
+    One ``{service}:{key}={value}`` line per key, keys sorted, empty values
+    skipped.
+    """
+    return hashlib.sha256("\n".join(_lines(service, secrets_map)).encode("utf-8")).hexdigest()
+
+
+def root_digest(digests: Mapping[str, str]) -> str:
+    """Integrity of the whole store: a hash over the per-service digests."""
+    lines = [f"{service}:{digests[service]}" for service in sorted(digests)]
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def legacy_integrity(services: Mapping[str, Any]) -> str:
+    """The single-file integrity written before per-service digests: one
+    hash over every service's lines at once. Only read, to accept those files."""
+    lines = []
+    for service in sorted(services):
+        lines += _lines(service, services.get(service))
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+"""Journal layout of the canonical store: a snapshot plus one record per save.
+
+In the single-file layout every change -- one rotated password, a cluster
+setting -- re-serialises and re-encrypts the whole document. With the journal
+layout (`noah secrets migrate --layout journal`) a save encrypts only what
+changed, as one small record appended next to the snapshot:
+
+    Secrets/canonical-secrets.enc.yaml     the snapshot, at revision R
+    Secrets/canonical-journal/
+        00000043.enc.yaml                  {revision: 43, at: ..., changes: [...]}
+        00000044.enc.yaml
+        history.log                        one JSON line per change folded
+                                           into a snapshot -- no values
+
+A record's changes are canonical_merge leaves: ``{path: [services, authentik,
+password], value: {value, version, rotated_at}}``, or ``removed: true``.
+Loading replays the records above the snapshot's revision, in order; records
+at or below it are left over from an interrupted compaction and skipped.
+
+Compaction writes a new snapshot, appends the records' metadata to
+history.log, then deletes the records. It runs from `noah secrets compact`,
+and by itself once COMPACT_AFTER records have piled up, since every record
+costs one decryption on load. history.log is the audit trail rotated_at only
+hints at: who changed what, and when, without the secrets themselves.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from typing import Any
+
+from Scripts.security.canonical_merge import MISSING, LeafPath
+
+JOURNAL_DIRNAME = "canonical-journal"
+HISTORY_FILENAME = "history.log"
+LAYOUT_JOURNAL = "journal"
+# Records replayed on load before a save folds them into a new snapshot.
+COMPACT_AFTER = 16
+
+_RECORD_NAME = re.compile(r"(\d{8})(\.enc)?\.yaml")
+
+
+def record_name(revision: int, suffix: str) -> str:
+    return f"{revision:08d}{suffix}"
+
+
+def record_revision(name: str, suffix: str) -> int | None:
+    """Revision of the record file *name* in the *suffix* mode, else None."""
+    match = _RECORD_NAME.fullmatch(name)
+    if match is None or (match.group(2) is not None) != (suffix == ".enc.yaml"):
+        return None
+    return int(match.group(1))
+
+
+def encode_record(revision: int, edits: dict[LeafPath, Any]) -> dict[str, Any]:
+    changes = []
+    for path, value in edits.items():
+        if value is MISSING:
+            changes.append({"path": list(path), "removed": True})
+        else:
+            changes.append({"path": list(path), "value": value})
+    return {"revision": revision, "at": datetime.now(timezone.utc).isoformat(), "changes": changes}
+
+
+def decode_record(record: dict[str, Any]) -> dict[LeafPath, Any]:
+    return {
+        tuple(change["path"]): MISSING if change.get("removed") else change.get("value")
+        for change in record.get("changes") or ()
+    }
+
+
+def audit_entries(record: dict[str, Any]) -> list[dict[str, Any]]:
+    """What history.log keeps of *record*: which leaves changed, never to what.
+
+    A secret's version and rotated_at are kept; they are the audit trail.
+    """
+    entries = []
+    for change in record.get("changes") or ():
+        path = change["path"]
+        entry: dict[str, Any] = {"revision": record.get("revision"), "at": record.get("at")}
+        if path[0] == "services" and len(path) == 2:
+            if not change.get("removed"):
+                continue  # an added service: its keys follow as changes of their own
+            entry["service"] = path[1]
+        elif path[0] == "services":
+            entry.update(service=path[1], key=path[2])
+            value = change.get("value")
+            if isinstance(value, dict):
+                entry.update(version=value.get("version"), rotated_at=value.get("rotated_at"))
+        else:
+            entry["setting"] = ".".join(path)
+        if change.get("removed"):
+            entry["removed"] = True
+        entries.append(entry)
+    return entries
+
+
+def pending_entries(records: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [entry for record in records for entry in audit_entries(record)]
@@ -0,0 +1,190 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Three-way merge of canonical store documents, for concurrent writers.
+
+Two noah processes that open the store at the same time each hold a copy of
+it; without a merge the second save() silently drops what the first wrote.
+save() therefore notices when the file under it changed since it was read
+(see CanonicalSecretsStore._locked) and replays its own edits onto the
+document now on disk:
+
+    base    the document as this process read (or last wrote) it
+    ours    base plus this process's edits
+    theirs  the document on disk, written by someone else since
+
+An edit is a leaf that differs between base and ours: one secret
+(``services.<service>.<key>``), one cluster setting (``cluster.<key>``), a
+service added or removed, or another top-level value. Each applies cleanly
+when theirs still holds the base value, or already holds ours; otherwise both
+sides changed the same leaf, and that is a conflict. Bookkeeping fields
+(integrity, timestamps, revision) are recomputed, never merged.
+"""
+from __future__ import annotations
+
+import copy
+from collections.abc import Mapping, MutableMapping
+from typing import Any
+
+from Scripts.security.canonical_shards import ShardedServices
+
+BOOKKEEPING = frozenset({
+    "version", "revision", "integrity", "generated_at", "updated_at", "schema_upgraded_at",
+})
+
+LeafPath = tuple[str, ...]
+
+
+class _Sentinel:
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __repr__(self) -> str:
+        return self._name
+
+
+# A leaf absent from a document.
+MISSING = _Sentinel("MISSING")
+# A base shard this process never decrypted: its content is unknown, so no
+# edit over it can be proven safe.
+UNREAD = _Sentinel("UNREAD")
+
+
+class StoreConflictError(RuntimeError):
+    """Another process changed the same secrets as this one since both read the store.
+
+    Like AdminSecretLeakError, not a SopsError: nothing failed to decrypt or
+    encrypt, and the existing `except SopsError` handlers must not swallow it.
+    """
+
+    def __init__(self, paths: list[LeafPath]) -> None:
+        self.paths = paths
+        super().__init__(
+            "Canonical store changed concurrently: "
+            + ", ".join(".".join(p) for p in paths)
+            + " changed on both sides. Nothing was written; re-run the command."
+        )
+
+
+def _get(doc: Any, path: LeafPath) -> Any:
+    node = doc
+    for part in path:
+        if node is UNREAD:
+            return UNREAD
+        if not isinstance(node, Mapping) or part not in node:
+            return MISSING
+        node = node[part]
+    return node
+
+
+def _set(doc: MutableMapping, path: LeafPath, value: Any) -> None:
+    *parents, last = path
+    node = doc
+    for part in parents:
+        node = node.setdefault(part, {})
+    if value is MISSING:
+        node.pop(last, None)
+    else:
+        node[last] = copy.deepcopy(value)
+
+
+def changes(base: Mapping, ours: Mapping) -> dict[LeafPath, Any]:
+    """The edits that turn *base* into *ours*, leaf path -> new value.
+
+    A service's presence is its own leaf, ``("services", name)``: {} when it
+    was added (its keys follow as leaves of their own), MISSING when removed.
+    Shards of a sharded *ours* that were never loaded cannot have changed and
+    are not compared.
+    """
+    edits: dict[LeafPath, Any] = {}
+    for key in [*base, *(k for k in ours if k not in base)]:
+        if key == "services" or key in BOOKKEEPING:
+            continue
+        b, o = base.get(key, MISSING), ours.get(key, MISSING)
+        if isinstance(b, Mapping) or isinstance(o, Mapping):
+            # A settings map (cluster:) merges key by key, also when one
+            # side has no such map yet.
+            b = b if isinstance(b, Mapping) else {}
+            o = o if isinstance(o, Mapping) else {}
+            for sub in [*b, *(s for s in o if s not in b)]:
+                if b.get(sub, MISSING) != o.get(sub, MISSING):
+                    edits[(key, sub)] = o.get(sub, MISSING)
+        elif b != o:
+            edits[(key,)] = o
+
+    b_services = base.get("services") or {}
+    o_services = ours.get("services") or {}
+    o_loaded = o_services.loaded if isinstance(o_services, ShardedServices) else o_services
+    for service in [*b_services, *(s for s in o_services if s not in b_services)]:
+        if service not in o_services:
+            edits[("services", service)] = MISSING
+            continue
+        if service not in o_loaded:
+            continue
+        b_map = b_services.get(service, MISSING)
+        o_map = o_loaded[service] or {}
+        if b_map is MISSING:
+            edits[("services", service)] = {}
+        b_keys = b_map if isinstance(b_map, Mapping) else {}
+        for key in [*b_keys, *(k for k in o_map if k not in b_keys)]:
+            b = b_map.get(key, MISSING) if isinstance(b_map, Mapping) else b_map
+            o = o_map.get(key, MISSING)
+            if b is UNREAD or b != o:
+                edits[("services", service, key)] = o
+    return edits
+
+
+def apply(edits: dict[LeafPath, Any], base: Mapping, theirs: MutableMapping) -> list[LeafPath]:
+    """Replay *edits* onto *theirs* in place; return the conflicting paths.
+
+    Nothing is applied for a conflicting leaf, but the others are: callers
+    discard *theirs* when the list is not empty.
+    """
+    conflicts = []
+    for path, value in edits.items():
+        current = _get(theirs, path)
+        if path[0] == "services" and len(path) == 2:
+            if value is MISSING:
+                if current is MISSING:
+                    continue
+                if _get(base, path) != current:
+                    # Removed here, while the other side changed its secrets.
+                    conflicts.append(path)
+                    continue
+                _set(theirs, path, MISSING)
+            elif current is MISSING:
+                _set(theirs, path, {})
+            continue
+        if current == value:
+            continue
+        previous = _get(base, path)
+        if previous is UNREAD or current != previous:
+            conflicts.append(path)
+            continue
+        _set(theirs, path, value)
+    return conflicts
+
+
+def replay(doc: MutableMapping, edits: dict[LeafPath, Any]) -> None:
+    """Apply *edits* unconditionally: a journal record, already merged when written."""
+    for path, value in edits.items():
+        if path[0] == "services" and len(path) == 2 and value is not MISSING:
+            doc.setdefault("services", {}).setdefault(path[1], {})
+        else:
+            _set(doc, path, value)
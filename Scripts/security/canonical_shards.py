@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Sharded layout of the canonical secrets store.
+
+The single-file store decrypts and parses every service's secrets to read one
+of them. The sharded layout keeps one encrypted file per service next to a
+small encrypted index:
+
+    Secrets/canonical/
+        _index.enc.yaml        version, cluster settings, ..., and per shard
+                               the integrity digest of its content
+        authentik.enc.yaml     { secret_key: {value, version, rotated_at}, ... }
+        headlamp.enc.yaml
+        ...
+
+Opening the store decrypts the index only. ShardedServices stands in for the
+``services`` map and decrypts a shard the first time its service is read, so
+``get_service_secrets("authentik")`` costs one small decryption and listing
+services costs none. save() re-encrypts only the shards whose digest changed.
+The digests are those of canonical_integrity.py.
+"""
+from __future__ import annotations
+
+import copy
+import re
+from collections.abc import Callable, Iterable, Iterator, MutableMapping
+
+SHARD_DIRNAME = "canonical"
+INDEX_STEM = "_index"
+LAYOUT_SHARDED = "sharded"
+
+# A shard's file name is its service name, so the name must be a safe one. The
+# leading alphanumeric also keeps services clear of INDEX_STEM.
+_SERVICE_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
+
+def check_service_name(service: str) -> str:
+    if not isinstance(service, str) or not _SERVICE_NAME.fullmatch(service):
+        raise ValueError(f"Invalid service name for a store shard: {service!r}")
+    return service
+
+
+class ShardedServices(MutableMapping):
+    """The ``services`` map of a sharded store, decrypting shards on demand.
+
+    Membership, iteration and len() answer from the index and never decrypt.
+    Reading a service loads its shard once through *load*; assigning one
+    replaces it without reading the old shard at all.
+    """
+
+    def __init__(self, names: Iterable[str], load: Callable[[str], dict]) -> None:
+        self._names: dict[str, None] = dict.fromkeys(names)
+        self._loaded: dict[str, dict] = {}
+        self._load = load
+
+    def __getitem__(self, service: str) -> dict:
+        try:
+            return self._loaded[service]
+        except KeyError:
+            pass
+        if service not in self._names:
+            raise KeyError(service)
+        shard = self._loaded[service] = self._load(service)
+        return shard
+
+    def __setitem__(self, service: str, value: dict) -> None:
+        self._names[check_service_name(service)] = None
+        self._loaded[service] = value
+
+    def __delitem__(self, service: str) -> None:
+        del self._names[service]
+        self._loaded.pop(service, None)
+
+    def __contains__(self, service: object) -> bool:
+        return service in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._names))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f"<ShardedServices {len(self._names)} services, {len(self._loaded)} loaded>"
+
+    def __deepcopy__(self, memo: dict) -> ShardedServices:
+        clone = ShardedServices(self._names, self._load)
+        clone._loaded = copy.deepcopy(self._loaded, memo)
+        return clone
+
+    @property
+    def loaded(self) -> dict[str, dict]:
+        """The shards read or assigned so far; the only ones save() can have
+        anything new to write for."""
+        return self._loaded
@@ -47,6 +47,34 @@ Design:
   * If SOPS/Age not available OR NOAH_DISABLE_SOPS=true -> store plaintext at Secrets/canonical-secrets.yaml
     (still canonical but unencrypted; user warned)
 
+  * Optional sharded layout (`noah secrets migrate --layout sharded`): one
+    file per service under Secrets/canonical/ plus an index, each shard
+    decrypted on first access -- see canonical_shards.py.
+
+  * Optional journal layout (`noah secrets migrate --layout journal`): the
+    store file becomes a snapshot, and each save appends one small encrypted
+    record of what changed under Secrets/canonical-journal/, folded back by
+    `noah secrets compact` -- see canonical_journal.py.
+
+  * Optional schema v3 (NOAH_CANONICAL_FORMAT=json): the same document saved
+    as one compact JSON payload, so SOPS encrypts a single value instead of
+    three per secret -- see schema_version_for().
+
+  * get_canonical_store(readonly=True): a CanonicalStoreSnapshot for callers
+    that only read. It never writes, never creates Secrets/, and is safe to
+    share across threads.
+
+  * Several clusters (`noah --cluster <name>` or NOAH_CLUSTER): each named
+    cluster has a store of its own under Secrets/clusters/<name>/, in any of
+    the layouts above; Secrets/ itself holds the default cluster's. Opening
+    one cluster never reads another's files -- see list_clusters().
+
+  * Concurrent processes: loads hold a shared flock(2) on the Secrets/
+    directory, saves an exclusive one. A save that finds
+    the file changed since it was read merges its edits onto it, and fails
+    with StoreConflictError only when both sides changed the same secret --
+    see canonical_merge.py. Every save increments the store's `revision`.
+
 Responsibilities:
   This module ONLY concerns loading/saving canonical secret data.
   It does NOT perform password policy logic (delegated to NoahSecurityManager)
@@ -59,12 +87,18 @@ Extensibility:
 """
 from __future__ import annotations
 
+import copy
+import fcntl
 import hashlib
+import json
 import logging
 import os
+import re
 import sys
 import tempfile
-from collections.abc import Callable
+import threading
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
@@ -73,6 +107,32 @@ from typing import Any
 
 import yaml
 
+from Scripts.security import canonical_merge, session_cache
+from Scripts.security.canonical_integrity import (
+    DIGESTS_KEY,
+    legacy_integrity,
+    root_digest,
+    service_digest,
+)
+from Scripts.security.canonical_journal import (
+    COMPACT_AFTER,
+    HISTORY_FILENAME,
+    JOURNAL_DIRNAME,
+    audit_entries,
+    decode_record,
+    encode_record,
+    pending_entries,
+    record_name,
+    record_revision,
+)
+from Scripts.security.canonical_merge import UNREAD, StoreConflictError
+from Scripts.security.canonical_shards import (
+    INDEX_STEM,
+    LAYOUT_SHARDED,
+    SHARD_DIRNAME,
+    ShardedServices,
+    check_service_name,
+)
 from Scripts.security.sops_client import (
     SopsClient,
     SopsDecryptionError,
@@ -86,10 +146,25 @@ logger = logging.getLogger(__name__)
 CANONICAL_FILENAME_ENCRYPTED = "canonical-secrets.enc.yaml"
 CANONICAL_FILENAME_PLAINTEXT = "canonical-secrets.yaml"
 
+# Named clusters: Secrets/clusters/<name>/ holds each one's store. The default
+# cluster is the one whose store sits in Secrets/ itself.
+CLUSTERS_DIRNAME = "clusters"
+DEFAULT_CLUSTER = "default"
+# A cluster's directory name is its name, hence the same rule as shard names.
+_CLUSTER_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]*")
+
 # Schema versions:
 # v1: { version:1, services: { svc: { key: raw_value } } }
 # v2: { version:2, services: { svc: { key: { value: str, version: int, rotated_at: iso } } } }
+# v3: the v2 document, stored as { version:3, payload: <compact JSON of it> }
+#     -- opt-in, see schema_version_for()
 CURRENT_SCHEMA_VERSION = 2
+JSON_SCHEMA_VERSION = 3
+
+# libyaml when PyYAML was built with it: same safe subset of YAML, parsed and
+# emitted in C, several times faster on a store of a few thousand keys.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 # Environments where a plaintext store is tolerated. Any other value -- unset,
 # empty or unrecognised -- locks it: a forgotten setting must refuse to write,
@@ -139,6 +214,14 @@ class InsecureStoreError(RuntimeError):
     """
 
 
+class ReadOnlyStoreError(RuntimeError):
+    """A write was attempted through a read-only snapshot of the store."""
+
+
+class StoreWriteError(RuntimeError):
+    """The single write owed by a ``transaction(strict=True)`` block failed."""
+
+
 class PlaintextReason(Enum):
     """Why encryption is off.
 
@@ -179,6 +262,98 @@ def resolve_age_key_file(project_root: Path) -> Path:
     return Path(env_key) if env_key else project_root / "Age" / "keys.txt"
 
 
+def check_cluster_name(cluster: str) -> str:
+    if not isinstance(cluster, str) or not _CLUSTER_NAME.fullmatch(cluster):
+        raise ValueError(f"Invalid cluster name: {cluster!r}")
+    return cluster
+
+
+def selected_cluster(cluster: str | None = None) -> str | None:
+    """The named cluster to open: *cluster*, else NOAH_CLUSTER, else None.
+
+    None is the default cluster, also selected by its name, DEFAULT_CLUSTER.
+    `noah --cluster` sets NOAH_CLUSTER, which is how the choice reaches the
+    stores that commands open deep down, and the Ansible runs they start.
+    """
+    cluster = cluster or os.environ.get("NOAH_CLUSTER", "").strip() or None
+    if cluster is None or cluster == DEFAULT_CLUSTER:
+        return None
+    return check_cluster_name(cluster)
+
+
+def cluster_secrets_dir(project_root: Path, cluster: str | None) -> Path:
+    """The directory holding *cluster*'s store (None: the default cluster)."""
+    secrets_dir = project_root / "Secrets"
+    if cluster is None:
+        return secrets_dir
+    return secrets_dir / CLUSTERS_DIRNAME / check_cluster_name(cluster)
+
+
+def list_clusters(project_root: Path) -> list[str]:
+    """Names of the clusters with a store in *project_root*, default first.
+
+    Answers from the directory names alone -- nothing is decrypted, so the
+    listing is the index bulk commands iterate over.
+    """
+    secrets_dir = project_root / "Secrets"
+    found = []
+    default_files = (CANONICAL_FILENAME_ENCRYPTED, CANONICAL_FILENAME_PLAINTEXT, SHARD_DIRNAME)
+    if any((secrets_dir / name).exists() for name in default_files):
+        found.append(DEFAULT_CLUSTER)
+    clusters_dir = secrets_dir / CLUSTERS_DIRNAME
+    if clusters_dir.is_dir():
+        found.extend(sorted(path.name for path in clusters_dir.iterdir()
+                            if path.is_dir() and _CLUSTER_NAME.fullmatch(path.name)))
+    return found
+
+
+def schema_version_for(current: int | None) -> int:
+    """The schema a store at version *current* is saved in.
+
+    NOAH_CANONICAL_FORMAT=json upgrades to v3, =yaml goes back to v2; unset, a
+    store keeps the format it has (v1 upgrades to v2, a new one starts at v2).
+
+    Why v3: SOPS encrypts every YAML leaf separately, so a v2 store of N keys
+    carries 3N ENC[...] values -- one per value, version and rotated_at -- and
+    parsing them dominates a load. v3 is a single encrypted leaf holding JSON.
+    The price is the diff: any change re-encrypts the whole payload.
+    """
+    requested = os.environ.get("NOAH_CANONICAL_FORMAT", "").strip().lower()
+    if requested == "json":
+        return JSON_SCHEMA_VERSION
+    if requested == "yaml":
+        return CURRENT_SCHEMA_VERSION
+    if requested:
+        logger.warning("Ignoring NOAH_CANONICAL_FORMAT=%s (expected json or yaml)", requested)
+    return JSON_SCHEMA_VERSION if current == JSON_SCHEMA_VERSION else CURRENT_SCHEMA_VERSION
+
+
+def _load_yaml(text: str) -> Any:
+    return yaml.load(text, Loader=_YAML_LOADER)
+
+
+def _dump_yaml(document: Mapping[str, Any]) -> str:
+    return yaml.dump(document, Dumper=_YAML_DUMPER, default_flow_style=False, sort_keys=False)
+
+
+def _encode_document(document: Mapping[str, Any]) -> str:
+    """The text of a store file: *document* as YAML, or at v3 its JSON envelope."""
+    if document.get("version") == JSON_SCHEMA_VERSION:
+        # default=str: a hand-edited v2 file may hold an unquoted timestamp,
+        # which YAML parsed as a datetime.
+        payload = json.dumps(document, separators=(",", ":"), default=str)
+        document = {"version": JSON_SCHEMA_VERSION, "payload": payload}
+    return _dump_yaml(document)
+
+
+def _decode_document(document: Any) -> Any:
+    """Inverse of _encode_document(), given the parsed YAML."""
+    if (isinstance(document, dict) and document.get("version") == JSON_SCHEMA_VERSION
+            and isinstance(document.get("payload"), str)):
+        return json.loads(document["payload"])
+    return document
+
+
 def plaintext_reason(age_key_file: Path) -> PlaintextReason | None:
     """None if encryption is active, otherwise the cause of the plaintext fallback.
 
@@ -224,16 +399,42 @@ def _remediation_message(reason: PlaintextReason, age_key_file: Path) -> str:
 @dataclass
 class CanonicalSecretsStore:
     project_root: Path = field(default_factory=lambda: Path.cwd())
+    # The named cluster this store belongs to, None for the default one.
+    cluster: str | None = None
     secrets_dir: Path = field(init=False)
     age_key_file: Path = field(init=False)
     encrypted: bool = field(init=False)
-    data: dict[str, Any] = field(default_factory=dict)
+    # Decrypted on first access to `data` -- see the property below.
+    _data: dict[str, Any] | None = field(default=None, init=False, repr=False, compare=False)
+    # transaction() state: nesting depth, and the save() the outermost
+    # transaction owes on exit (None: nothing to write, else its rekey flag).
+    _transaction_depth: int = field(default=0, init=False, repr=False, compare=False)
+    _deferred_save: bool | None = field(default=None, init=False, repr=False, compare=False)
+    # Per-service integrity digests (canonical_integrity.py) as last read from
+    # or written to disk: the index's in a sharded store, the document's in a
+    # single file -- None for a single file saved before there were any.
+    _digests: dict[str, str] | None = field(default_factory=dict, init=False, repr=False, compare=False)
+    # Single file: the services already checked against their digest.
+    _verified: set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    # Concurrent writers -- see save(): the document as last read or written
+    # (the merge base), the SHA-256 of the file on disk at that moment, and
+    # the lock file descriptor while this store holds the lock.
+    _base: dict[str, Any] | None = field(default=None, init=False, repr=False, compare=False)
+    _disk_token: str | None = field(default=None, init=False, repr=False, compare=False)
+    _lock_fd: int | None = field(default=None, init=False, repr=False, compare=False)
+    # Journal layout: the records replayed over the snapshot, decrypted.
+    _journal: list[dict[str, Any]] = field(default_factory=list, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        self.secrets_dir = self.project_root / "Secrets"
+        self.secrets_dir = cluster_secrets_dir(self.project_root, self.cluster)
         # 0o700 for the same reason the Age key is 0o600: nothing here is fit
-        # for other local users. Only applied when this call creates the dir.
-        self.secrets_dir.mkdir(mode=0o700, exist_ok=True)
+        # for other local users. Only applied when this call creates the dir,
+        # and to Secrets/clusters/ as well for a named cluster.
+        if not self._readonly:
+            directory = self.project_root
+            for part in self.secrets_dir.relative_to(self.project_root).parts:
+                directory = directory / part
+                directory.mkdir(mode=0o700, exist_ok=True)
         self.age_key_file = self._resolve_age_key_file()
 
         reason = self._plaintext_reason()
@@ -246,7 +447,32 @@ class CanonicalSecretsStore:
         self.encrypted = reason is None
         if reason is not None:
             self._warn_plaintext(reason)
-        self._load()
+        # Nothing is decrypted yet: many commands open the store and never
+        # read it, or read one cluster setting. `data` loads on first access.
+
+    @property
+    def data(self) -> dict[str, Any]:
+        """The store's content, decrypted and parsed on first access.
+
+        The policy checks above run when the store is constructed; only the
+        decryption waits until something actually reads or writes a value.
+        """
+        if self._data is None:
+            self._load()
+        return self._data
+
+    @data.setter
+    def data(self, value: dict[str, Any]) -> None:
+        self._data = value
+
+    def load(self) -> CanonicalSecretsStore:
+        """Decrypt now instead of on first access (no-op once loaded).
+
+        For callers that handle a store that cannot be read at one place:
+        the same SopsKeyError would otherwise surface at the first accessor.
+        """
+        self.data  # noqa: B018 -- the property does the work
+        return self
 
     # ---------------- Internal Helpers ----------------
     # Which secrets this store refuses to hold. Overridden to the empty set by
@@ -256,6 +482,13 @@ class CanonicalSecretsStore:
     # be silently overwritten by the parent's default.
     _forbidden_services = ADMIN_ONLY_SERVICES
     _forbidden_keys = ADMIN_ONLY_KEYS
+    # Directories of the sharded and journal layouts under Secrets/, or None
+    # where a store does not offer them.
+    _shard_dirname = SHARD_DIRNAME
+    _journal_dirname = JOURNAL_DIRNAME
+    # True for CanonicalStoreSnapshot: nothing on disk is created, upgraded
+    # or reset on its behalf.
+    _readonly = False
 
     def _resolve_age_key_file(self) -> Path:
         return resolve_age_key_file(self.project_root)
@@ -267,7 +500,10 @@ class CanonicalSecretsStore:
         runs, and again from save() so a caller writing straight into .data
         cannot get round it.
         """
-        for service, secrets_map in (self.data.get("services") or {}).items():
+        services = self.data.get("services") or {}
+        # A shard not loaded since it was last written cannot have changed.
+        loaded = services.loaded if isinstance(services, ShardedServices) else services
+        for service in services:
             if service in self._forbidden_services:
                 raise AdminSecretLeakError(
                     f"Service {service!r} belongs to the Garage administration "
@@ -276,6 +512,7 @@ class CanonicalSecretsStore:
                     "Secret. Use Scripts/garage/admin_store.py "
                     "(Secrets/garage-admin.enc.yaml)."
                 )
+        for service, secrets_map in loaded.items():
             offending = sorted(set(secrets_map or {}) & self._forbidden_keys)
             if offending:
                 raise AdminSecretLeakError(
@@ -312,14 +549,179 @@ class CanonicalSecretsStore:
     def _active_path(self) -> Path:
         return self._encrypted_path() if self.encrypted else self._plaintext_path()
 
-    def _decrypt_file(self, path: Path) -> str | None:
+    def _shard_dir(self) -> Path:
+        return self.secrets_dir / self._shard_dirname
+
+    def _shard_suffix(self) -> str:
+        return ".enc.yaml" if self.encrypted else ".yaml"
+
+    def _index_path(self) -> Path:
+        return self._shard_dir() / f"{INDEX_STEM}{self._shard_suffix()}"
+
+    def _shard_path(self, service: str) -> Path:
+        return self._shard_dir() / f"{check_service_name(service)}{self._shard_suffix()}"
+
+    def _shard_files(self, suffix: str) -> dict[str, Path]:
+        """Service name -> shard file on disk, for shards ending in *suffix*."""
+        found = {}
+        if self._shard_dirname is None or not self._shard_dir().is_dir():
+            return found
+        for path in self._shard_dir().iterdir():
+            name = path.name
+            if name.startswith((".", INDEX_STEM)) or not name.endswith(suffix):
+                continue
+            if suffix == ".yaml" and name.endswith(".enc.yaml"):
+                continue
+            found[name[: -len(suffix)]] = path
+        return found
+
+    def _journal_dir(self) -> Path:
+        return self.secrets_dir / self._journal_dirname
+
+    def _journal_on_disk(self) -> bool:
+        return (self._journal_dirname is not None and self._journal_dir().is_dir()
+                and not (self._shard_dirname is not None and self._index_path().exists()))
+
+    def _journal_records(self) -> list[tuple[int, Path]]:
+        """(revision, file) of every journal record on disk, oldest first."""
+        if not self._journal_on_disk():
+            return []
+        suffix = ".enc.yaml" if self.encrypted else ".yaml"
+        records = []
+        for path in self._journal_dir().iterdir():
+            revision = record_revision(path.name, suffix)
+            if revision is not None:
+                records.append((revision, path))
+        return sorted(records)
+
+    def _replay_journal(self) -> None:
+        """Apply the records above the snapshot's revision to the loaded data."""
+        snapshot_revision = int(self._data.get("revision") or 0)
+        pending = [path for revision, path in self._journal_records() if revision > snapshot_revision]
+        self._journal = []
+        for path, raw in zip(pending, self._decrypt_records(pending)):
+            try:
+                record = _load_yaml(raw) if raw else None
+            except yaml.YAMLError as e:
+                record = None
+                print(f"[WARNING] Failed to parse canonical journal record {path.name}: {e}")
+            if not isinstance(record, dict):
+                # Skipped, not fatal: the next record still applies on top of
+                # the others, and this one is reported until compaction.
+                logger.error("Canonical journal record %s unreadable; its changes are skipped", path.name)
+                continue
+            canonical_merge.replay(self._data, decode_record(record))
+            self._data["revision"] = record.get("revision")
+            if record.get("integrity"):
+                self._data["integrity"] = record["integrity"]
+            if isinstance(record.get(DIGESTS_KEY), dict):
+                if self._digests is not None:
+                    self._digests.update(record[DIGESTS_KEY])
+            else:
+                self._digests = None  # written before the digests: check it all
+            self._journal.append(record)
+
+    def _decrypt_records(self, paths: list[Path]) -> list[str | None]:
+        """Decrypt journal records, concurrently when there are several.
+
+        A record that cannot be read is logged and skipped, however many are
+        pending, and never deleted: it holds a committed change, and a sops
+        timeout must not throw it away the way _decrypt_file() resets a store.
+        """
+        if not self.encrypted:
+            return [self._decrypt_file(path) for path in paths]
+        with SopsClient(self.age_key_file) as sops:
+            results = sops.decrypt_many(paths)
+        plaintexts = []
+        for path in paths:
+            result = results[path]
+            if isinstance(result, SopsKeyError):
+                raise result
+            if isinstance(result, SopsError):
+                logger.warning("Canonical journal record %s unreadable: %s", path.name, result.detail or result)
+                result = None
+            plaintexts.append(result)
+        return plaintexts
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """flock(2) the Secrets/ directory: shared to load, exclusive to save.
+
+        The directory itself, not a lock file: nothing extra appears next to
+        the secrets, and a read-only snapshot can take the lock without
+        creating anything. Re-entrant for this store and the copies save()
+        makes of it: two flock descriptors exclude each other even inside one
+        process, so a save() re-reading under its own lock must not wait on
+        itself.
+        """
+        if self._lock_fd is not None:
+            yield
+            return
+        try:
+            fd = os.open(self.secrets_dir, os.O_RDONLY | os.O_DIRECTORY)
+        except FileNotFoundError:
+            yield  # a snapshot of a store never written: nothing to wait for
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_fd = fd
+            yield
+        finally:
+            self._lock_fd = None
+            os.close(fd)  # releases the lock
+
+    def _head_path(self) -> Path:
+        """The file every save rewrites: the index of a sharded store, else the store file."""
+        if self._shard_dirname is not None and self._index_path().exists():
+            return self._index_path()
+        return self._active_path()
+
+    def _disk_digest(self) -> str | None:
+        try:
+            digest = hashlib.sha256(self._head_path().read_bytes())
+        except FileNotFoundError:
+            return None
+        # Records are never rewritten, only added or folded: their names are
+        # enough to tell the journal moved.
+        for _revision, path in self._journal_records():
+            digest.update(path.name.encode())
+        return digest.hexdigest()
+
+    def _remember_disk_state(self) -> None:
+        """Record what is on disk now as the base of the next save's merge.
+
+        Shards not loaded yet are UNREAD; _load_shard() fills them in.
+        """
+        self._disk_token = self._disk_digest()
+        if self._readonly:
+            return
+        services = self._data.get("services") or {}
+        loaded = services.loaded if isinstance(services, ShardedServices) else services
+        self._base = copy.deepcopy({k: v for k, v in self._data.items() if k != "services"})
+        self._base["services"] = {
+            service: copy.deepcopy(loaded[service]) if service in loaded else UNREAD
+            for service in services
+        }
+
+    def _decrypt_file(self, path: Path, reset_unreadable: bool = True) -> str | None:
+        """Decrypt *path*; None when it is missing or has just been reset.
+
+        A file that does not decrypt (stale recipient, corruption) is removed
+        so the next save recreates it. With *reset_unreadable* False, any other
+        SopsError -- a timeout, a missing binary -- is raised instead of
+        resetting the file: a shard holds one deployed service's secrets, and
+        an empty one would have them regenerated.
+        """
         if not path.exists():
             return None
         if not self.encrypted:
             return path.read_text(encoding="utf-8")
-        try:
+        def _decrypt() -> str:
             with SopsClient(self.age_key_file) as sops:
                 return sops.decrypt_to_string(path)
+
+        try:
+            return session_cache.decrypt_cached(path, _decrypt)
         except SopsKeyError as e:
             logger.error("Age key unavailable for decryption: %s", e)
             raise  # blocking -- cannot continue without secrets
@@ -331,9 +733,12 @@ class CanonicalSecretsStore:
                 path.name,
                 e.detail,
             )
-            path.unlink(missing_ok=True)
+            if not self._readonly:
+                path.unlink(missing_ok=True)
             return None
         except SopsError as e:
+            if not reset_unreadable:
+                raise
             # Covers SopsConfigError, SopsTimeoutError, SopsBinaryNotFoundError,
             # and the base-class catch-all (e.g. "File has no SOPS metadata" when
             # a previous save left a plaintext file with an .enc.yaml name).
@@ -343,79 +748,441 @@ class CanonicalSecretsStore:
                 path.name,
                 e.detail or str(e),
             )
-            path.unlink(missing_ok=True)
+            if not self._readonly:
+                path.unlink(missing_ok=True)
             return None
 
     def _compute_integrity(self) -> str:
-        """Compute SHA256 integrity hash over sorted service secrets.
+        """The store's root digest over its per-service digests (canonical_integrity.py)."""
+        return root_digest(self._current_digests())
+
+    def _current_digests(self, unchanged: bool = False) -> dict[str, str]:
+        """Each service's digest, rehashing only the services changed since read.
 
-        Format: For each service (sorted), for each key (sorted), append
-          f"{service}:{key}={value}\n" then hash the full concatenated string.
+        A service unchanged since it was read or written (and every service of
+        a snapshot, which cannot change) keeps the digest on record, and a
+        shard never loaded keeps the index's, so nothing is decrypted or
+        hashed for them. Unchanged is a dict comparison with the merge base,
+        skipped when the caller knows nothing changed (*unchanged*: a load).
         """
-        services = self.data.get("services", {}) if isinstance(self.data, dict) else {}
-        lines = []
-        for service in sorted(services.keys()):
-            secrets_map = services.get(service, {}) or {}
-            for key in sorted(secrets_map.keys()):
-                entry = secrets_map[key]
-                # Support both legacy string and v2 dict
-                if isinstance(entry, dict):
-                    val = entry.get('value')
-                else:
-                    val = entry
-                if val is None:
-                    continue
-                lines.append(f"{service}:{key}={val}")
-        payload = "\n".join(lines).encode("utf-8")
-        return hashlib.sha256(payload).hexdigest()
+        services = self.data.get("services") or {}
+        loaded = services.loaded if isinstance(services, ShardedServices) else services
+        recorded = self._digests or {}
+        base = self._base["services"] if self._base is not None and not unchanged else None
+        digests = {}
+        for service in services:
+            if service not in loaded:
+                digests[service] = recorded.get(service, "")
+                continue
+            content = loaded[service]
+            known = recorded.get(service)
+            if known is not None and (base is None or base.get(service) == content):
+                digests[service] = known
+            else:
+                digests[service] = service_digest(service, content)
+        return digests
 
     def _verify_integrity(self):
+        """Check the root digest against the per-service digests on record.
+
+        The content of each service is checked on its first read instead, see
+        _check_service() -- except in a file saved before per-service digests,
+        which is hashed in full once, then signed the current way.
+        """
         expected = self.data.get("integrity")
+        if self._digests is None:
+            services = self.data.get("services") or {}
+            self._digests = {service: service_digest(service, content) for service, content in services.items()}
+            self._verified = set(services)
+            actual = root_digest(self._digests)
+            # Accepted as either: an upgrade on load has already re-signed it.
+            matches = expected in (actual, legacy_integrity(services))
+        else:
+            actual = root_digest(self._current_digests(unchanged=True))
+            matches = expected == actual
         if not expected:
             # First time or legacy file; compute and set
-            self.data["integrity"] = self._compute_integrity()
+            self.data["integrity"] = actual
             return True
-        actual = self._compute_integrity()
-        if expected != actual:
+        if not matches:
             print("[ERROR] Canonical secrets integrity mismatch! Recomputing and continuing (possible external modification).")
             self.data["integrity"] = actual
             return False
+        self.data["integrity"] = actual
         return True
 
-    def _load(self):
-        raw = self._decrypt_file(self._active_path())
+    def _check_service(self, service: str) -> None:
+        """Single file: check *service* against its digest, on its first read.
+
+        A sharded store checks each shard as it decrypts it (_load_shard).
+        """
+        if service in self._verified or self.sharded:
+            return
+        self._verified.add(service)
+        services = self.data.get("services") or {}
+        expected = (self._digests or {}).get(service)
+        if expected is None or service not in services:
+            return
+        content = services[service]
+        if self._base is not None and self._base["services"].get(service) != content:
+            return  # changed since read: the next save() signs the new content
+        actual = service_digest(service, content)
+        if actual != expected:
+            print(f"[ERROR] Canonical secrets integrity mismatch for {service}! "
+                  "Continuing with the secrets as found (possible external modification).")
+            # On record as found, so the next save() re-signs it.
+            self._digests[service] = actual
+
+    def _load_sharded(self):
+        raw = self._decrypt_file(self._index_path())
+        index: Any = {}
+        if raw:
+            try:
+                index = _load_yaml(raw) or {}
+            except yaml.YAMLError as e:
+                print(f"[WARNING] Failed to parse canonical secrets index: {e}")
+        if not isinstance(index, dict):
+            index = {}
+        index.pop("layout", None)
+        self._digests = {
+            service: digest for service, digest in (index.pop("shards", None) or {}).items()
+        }
+        # A shard the index does not list (an index lost to a reset, a save
+        # interrupted between shard and index) is still a service.
+        names = list(self._digests)
+        names += [s for s in self._shard_files(self._shard_suffix()) if s not in self._digests]
+        index.setdefault("version", CURRENT_SCHEMA_VERSION)
+        self._data = {**index, "services": ShardedServices(names, self._load_shard)}
+
+    def _load_shard(self, service: str) -> dict:
+        raw = self._decrypt_file(self._shard_path(service), reset_unreadable=False)
+        shard: Any = {}
         if raw:
             try:
-                self.data = yaml.safe_load(raw) or {}
-            except Exception as e:
-                print(f"[WARNING] Failed to parse canonical secrets: {e}")
-                self.data = {}
-        if not self.data:
-            self.data = {"version": CURRENT_SCHEMA_VERSION, "services": {}, "generated_at": datetime.now(timezone.utc).isoformat()}
-        # Upgrade schema if needed
-        self._upgrade_schema_if_needed()
+                shard = _load_yaml(raw) or {}
+            except yaml.YAMLError as e:
+                print(f"[WARNING] Failed to parse canonical secrets shard {service}: {e}")
+        if not isinstance(shard, dict):
+            shard = {}
+        expected = self._digests.get(service)
+        actual = service_digest(service, shard)
+        if expected and expected != actual:
+            if self._disk_digest() != self._disk_token:
+                # Another noah process saved since the index was read: the
+                # shard is simply newer than it. save() merges over it.
+                logger.info("Shard %s changed by a concurrent save", service)
+            else:
+                print(f"[ERROR] Canonical secrets integrity mismatch for {service}! "
+                      "Continuing with the shard as found (possible external modification).")
+                # On record as found, so the next save() re-signs it in the index.
+                self._digests[service] = actual
+        if self._base is not None and self._base["services"].get(service) is UNREAD:
+            self._base["services"][service] = copy.deepcopy(shard)
+        return shard
+
+    def _load(self):
+        with self._locked(exclusive=False):
+            sharded = self._shard_dirname is not None and self._index_path().exists()
+            if sharded:
+                self._load_sharded()
+            else:
+                raw = self._decrypt_file(self._active_path())
+                data = {}
+                if raw:
+                    try:
+                        data = _decode_document(_load_yaml(raw)) or {}
+                    except Exception as e:
+                        print(f"[WARNING] Failed to parse canonical secrets: {e}")
+                digests = data.pop(DIGESTS_KEY, None) if isinstance(data, dict) else None
+                self._digests = dict(digests) if isinstance(digests, dict) else (None if data else {})
+                self._verified = set()
+                # Assigned once parsed, never before: a load that raises (no Age
+                # key) must leave the store unloaded, not holding an empty
+                # document that the next save() would write over the real one.
+                self._data = data or {"version": schema_version_for(None), "services": {}, "generated_at": datetime.now(timezone.utc).isoformat()}
+                if self._journal_on_disk():
+                    self._replay_journal()
+            self._remember_disk_state()
+        # Outside the lock: an upgrade saves, and a save takes it exclusively.
+        if not sharded:
+            self._upgrade_schema_if_needed()
         # Integrity check / initialization
         self._verify_integrity()
 
-    def _encrypt_in_place(self, path: Path) -> bool:
+    def _encrypt_bytes(self, plaintext: bytes, path: Path,
+                       previous: bytes | None = None) -> bytes | None:
+        """Return what save() writes to *path*: the ciphertext, or None on failure.
+
+        Encrypts in memory (sops on stdin/stdout), so the plaintext never
+        reaches the disk in encrypted mode. Given the *previous* ciphertext,
+        only the values that changed are re-encrypted, under its data key.
+        """
         if not self.encrypted:
-            return True
+            return plaintext
         try:
             with SopsClient(self.age_key_file) as sops:
-                sops.encrypt_in_place(path)
-            return True
+                if previous is not None:
+                    return sops.update_bytes(previous, plaintext, path)
+                return sops.encrypt_bytes(plaintext, path)
         except SopsEncryptionError as e:
             logger.error("Failed to encrypt canonical secrets: %s", e.detail)
-            return False
+            return None
 
     # ---------------- Public API ----------------
-    def save(self) -> bool:
+    @contextmanager
+    def transaction(self, strict: bool = False) -> Iterator[CanonicalSecretsStore]:
+        """Batch every save() made inside the block into one write on exit.
+
+        ``setup gitops`` fills a dozen services through ensure_service_entries,
+        each of which used to save -- a YAML dump, an integrity hash and a full
+        sops encryption per service. Inside a transaction save() only records
+        that a write is owed (and whether it asked for a re-key); leaving the
+        outermost block performs that single save(). Nested blocks join the
+        outer one.
+
+        An exception inside the block, or raised by the final save(), restores
+        ``data`` to what it was on entry and propagates; nothing is written.
+        A save() that merely fails (returns False) is logged, as it is outside
+        a transaction, and leaves the new values in memory -- unless ``strict``,
+        where it raises StoreWriteError and ``data`` is restored as above, so
+        the caller knows nothing was written. ``strict`` only applies to the
+        outermost block.
+        """
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        snapshot = copy.deepcopy(self.data)
+        # A save() that merged before it raised moved the base along with the
+        # data: both go back, or the next merge would undo the other side.
+        disk_state = self._base, self._disk_token, copy.copy(self._digests)
+        self._transaction_depth, self._deferred_save = 1, None
+        try:
+            yield self
+            self._transaction_depth = 0
+            if self._deferred_save is not None:
+                if not self.save(rekey=self._deferred_save) and strict:
+                    raise StoreWriteError(f"Failed to write the canonical store in {self.secrets_dir}")
+        except BaseException:
+            self.data = snapshot
+            self._base, self._disk_token, self._digests = disk_state
+            raise
+        finally:
+            self._transaction_depth, self._deferred_save = 0, None
+
+    def save(self, rekey: bool = False) -> bool:
+        """Persist the store atomically.
+
+        An existing encrypted file is updated like ``sops set``: only the
+        values that changed are re-encrypted, under its current data key.
+        ``rekey=True`` re-encrypts the whole store under a fresh data key and
+        the recipients of the current .sops.yaml instead.
+
+        Inside transaction() the write is deferred to the end of the block,
+        and this returns True.
+
+        Another process may have saved since this one loaded: the write holds
+        the store's lock exclusively, and if the file changed underneath, this
+        store's edits are merged onto the new content first. Raises
+        StoreConflictError, writing nothing, when both changed the same value.
+        """
+        if self._transaction_depth:
+            self._deferred_save = bool(self._deferred_save) or rekey
+            return True
         self._check_domain_separation()
+        with self._locked(exclusive=True):
+            self._merge_concurrent_save()
+            self.data["revision"] = int(self.data.get("revision") or 0) + 1
+            if self.sharded:
+                saved = self._save_sharded(rekey)
+            elif self._journal_on_disk():
+                saved = self._save_journal(rekey)
+            else:
+                saved = self._save_single(rekey)
+            if saved:
+                self._remember_disk_state()
+            return saved
+
+    def _merge_concurrent_save(self) -> None:
+        """Replay this store's edits onto the store another process saved since.
+
+        A no-op while the file on disk is the one this store read or wrote.
+        """
+        token = self._disk_digest()
+        if token == self._disk_token or self._base is None:
+            return
+        # A copy shares this store's settings and its held lock, and loads what
+        # is on disk now.
+        theirs = copy.copy(self)
+        theirs._data, theirs._base, theirs._digests, theirs._journal = None, None, {}, []
+        theirs._load()
+        base = self._base
+        for service, content in base["services"].items():
+            # A shard replaced or removed here without being read has an
+            # unknown base -- unless the other side left it untouched.
+            if (content is UNREAD and service in theirs.data["services"]
+                    and theirs._digests.get(service) == self._digests.get(service)):
+                base["services"][service] = copy.deepcopy(theirs.data["services"][service])
+        edits = canonical_merge.changes(base, self.data)
+        conflicts = canonical_merge.apply(edits, base, theirs.data)
+        if conflicts:
+            raise StoreConflictError(conflicts)
+        logger.info("Canonical store saved concurrently (revision %s); merged %d edit(s) onto it",
+                    theirs.data.get("revision"), len(edits))
+        services = theirs.data.get("services")
+        if isinstance(services, ShardedServices):
+            services._load = self._load_shard
+        self._data, self._base, self._journal = theirs._data, theirs._base, theirs._journal
+        self._digests, self._verified, self._disk_token = theirs._digests, theirs._verified, token
+
+    def _save_journal(self, rekey: bool) -> bool:
+        """save() for the journal layout: one record of what changed.
+
+        A re-key, or a journal already COMPACT_AFTER records long, writes a
+        new snapshot instead and folds the journal into it.
+        """
+        records = self._journal_records()
+        # A schema change is bookkeeping, not an edit: no record carries it.
+        reformat = self._base.get("version") != self.data.get("version")
+        if rekey or reformat or len(records) >= COMPACT_AFTER:
+            return self._fold_journal(records, rekey)
+        edits = canonical_merge.changes(self._base, self.data)
+        revision = self.data["revision"]
+        if not edits:
+            self.data["revision"] = revision - 1  # nothing written, nothing to count
+            return True
+        digests = self._current_digests()
+        self.data["integrity"] = root_digest(digests)
+        # The integrity after the change travels with it, and the digests of
+        # the services it touched: replay ends on the last record's integrity,
+        # which _verify_integrity() then checks against the digests as usual.
+        touched = sorted({path[1] for path in edits if path[0] == "services" and len(path) > 1})
+        record = {**encode_record(revision, edits), "integrity": self.data["integrity"],
+                  DIGESTS_KEY: {service: digests[service] for service in touched if service in digests}}
+        suffix = ".enc.yaml" if self.encrypted else ".yaml"
+        text = _dump_yaml(record)
+        if not self._write(self._journal_dir() / record_name(revision, suffix), text, rekey=False):
+            return False
+        self._digests = digests
+        self._journal.append(record)
+        return True
+
+    def _fold_journal(self, records: list[tuple[int, Path]], rekey: bool) -> bool:
+        """Write a snapshot of the current data, then retire the journal records.
+
+        In this order: until the snapshot is in place the records are still
+        needed, and once it is, replay skips them even if deleting them fails.
+        """
+        # What the snapshot adds on top of the records is history too.
+        edits = canonical_merge.changes(self._base, self.data)
+        if not self._save_single(rekey):
+            return False
+        if edits:
+            self._journal.append(encode_record(self.data["revision"], edits))
+        self._retire_journal(records)
+        return True
+
+    def _retire_journal(self, records: list[tuple[int, Path]]) -> None:
+        if self._journal:
+            history = self._journal_dir() / HISTORY_FILENAME
+            fd = os.open(history, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+            with os.fdopen(fd, "a", encoding="utf-8") as fh:
+                for record in self._journal:
+                    for entry in audit_entries(record):
+                        fh.write(json.dumps(entry) + "\n")
+            self._journal = []
+        for _revision, path in records:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    def _save_single(self, rekey: bool) -> bool:
         path = self._active_path()
 
         # Refresh integrity before persisting
-        self.data["integrity"] = self._compute_integrity()
-        yaml_str = yaml.dump(self.data, default_flow_style=False, sort_keys=False)
+        digests = self._current_digests()
+        self.data["integrity"] = root_digest(digests)
+        yaml_str = _encode_document({**self.data, DIGESTS_KEY: digests})
+        if not self._write(path, yaml_str, rekey):
+            return False
+        self._digests = digests
+
+        # Only now that the new state is in place: drop the opposite-mode
+        # variant left by a previous run. Removing it first would destroy the
+        # old state before the new one exists.
+        try:
+            other = self._plaintext_path() if self.encrypted else self._encrypted_path()
+            if other.exists():
+                other.unlink()
+        except OSError:
+            pass
+        return True
+
+    def _save_sharded(self, rekey: bool) -> bool:
+        """save() for the sharded layout: the changed shards, then the index.
+
+        A shard is rewritten when its digest differs from the one on disk, so
+        a rotation re-encrypts one small file. The index goes last: it is what
+        names the shards, and a save interrupted before it leaves the previous
+        index describing the previous shards (at worst, a shard written ahead
+        of it reports an integrity mismatch once and is re-signed).
+        """
+        services = self.data["services"]
+        if rekey:
+            for service in services:
+                services[service]  # a re-key rewrites every shard
+        self._shard_dir().mkdir(mode=0o700, exist_ok=True)
+
+        digests = self._current_digests()
+        for service, shard in list(services.loaded.items()):
+            path = self._shard_path(service)
+            if not rekey and digests[service] == self._digests.get(service) and path.exists():
+                continue
+            text = _dump_yaml(shard)
+            if not self._write(path, text, rekey):
+                return False
+            self._digests[service] = digests[service]
+
+        self.data["integrity"] = root_digest(digests)
+        index = {k: v for k, v in self.data.items() if k != "services"}
+        index.update(layout=LAYOUT_SHARDED, shards=digests)
+        if not self._write(self._index_path(), _dump_yaml(index), rekey):
+            return False
+
+        # Shards of removed services, and of the opposite mode, only once the
+        # index no longer names them.
+        for service in [s for s in self._digests if s not in services]:
+            del self._digests[service]
+        stale = [p for s, p in self._shard_files(self._shard_suffix()).items() if s not in services]
+        other_suffix = ".yaml" if self.encrypted else ".enc.yaml"
+        stale += self._shard_files(other_suffix).values()
+        other_index = self._shard_dir() / f"{INDEX_STEM}{other_suffix}"
+        for path in [*stale, other_index]:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+        return True
+
+    def _write(self, path: Path, yaml_str: str, rekey: bool) -> bool:
+        """Encrypt *yaml_str* and atomically replace *path* with it."""
+        previous = None
+        if self.encrypted and not rekey:
+            try:
+                previous = path.read_bytes()
+            except FileNotFoundError:
+                pass
+
+        # Encrypt first, in memory: on failure the definitive file is left
+        # untouched -- the previous state survives a failed save.
+        content = self._encrypt_bytes(yaml_str.encode("utf-8"), path, previous)
+        if content is None:
+            return False
 
         # The content must never appear under its final name before it is in its
         # final state. Write to a temp file in the SAME directory (os.replace is
@@ -424,22 +1191,18 @@ class CanonicalSecretsStore:
         # mkstemp creates the file O_EXCL at 0o600, so the mode is in force
         # *before* any content is written -- a write_text() followed by a chmod
         # would leave a real, if brief, world-readable window instead.
-        #
-        # The suffix mirrors the final name so SOPS' .sops.yaml creation rules
-        # match the temp file too. (encrypt_in_place makes its own .enc.yaml
-        # temp, so this is belt-and-braces rather than load-bearing today.)
         suffix = ".enc.yaml" if self.encrypted else ".yaml"
         fd, tmp_str = tempfile.mkstemp(
-            dir=self.secrets_dir, prefix=".canonical-", suffix=suffix
+            dir=path.parent, prefix=".canonical-", suffix=suffix
         )
         tmp = Path(tmp_str)
         try:
-            with os.fdopen(fd, "w", encoding="utf-8") as fh:
-                fh.write(yaml_str)
-            # No-op when not encrypted. On failure the definitive file is left
-            # untouched -- the previous state survives a failed save.
-            if not self._encrypt_in_place(tmp):
-                return False
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(content)
+            if self.encrypted:
+                # Keep an open `noah session` warm: the next reader would
+                # otherwise miss on the new ciphertext and fork sops again.
+                session_cache.remember(path, content, yaml_str)
             os.replace(tmp, path)
         except OSError as e:
             logger.error("Failed to write canonical secrets to %s: %s", path.name, e)
@@ -448,18 +1211,110 @@ class CanonicalSecretsStore:
             # No-op after a successful replace; the cleanup that matters is the
             # failure path, which must not leave a temp file behind.
             tmp.unlink(missing_ok=True)
+        return True
 
-        # Only now that the new state is in place: drop the opposite-mode
-        # variant left by a previous run. Removing it first would destroy the
-        # old state before the new one exists.
-        try:
-            other = self._plaintext_path() if self.encrypted else self._encrypted_path()
-            if other.exists():
-                other.unlink()
-        except OSError:
-            pass
+    @property
+    def sharded(self) -> bool:
+        """Whether the store uses the sharded layout (one file per service)."""
+        return isinstance(self.data.get("services"), ShardedServices)
+
+    def file_for(self, service: str) -> Path:
+        """The file holding *service*'s secrets: its shard, or the store file."""
+        return self._shard_path(service) if self.sharded else self._active_path()
+
+    @property
+    def journaled(self) -> bool:
+        """Whether the store uses the journal layout (snapshot plus records)."""
+        return self._journal_on_disk()
+
+    def migrate_to_journal(self) -> bool:
+        """Switch a single-file store to the journal layout.
+
+        Nothing is rewritten: the store file becomes the snapshot, and the next
+        save() appends the first record.
+        """
+        if self._journal_dirname is None:
+            raise ValueError(f"{type(self).__name__} does not support the journal layout")
+        if self.sharded:
+            raise ValueError("The journal layout applies to the single-file store, not a sharded one")
+        with self._locked(exclusive=True):
+            self._journal_dir().mkdir(mode=0o700, exist_ok=True)
+            self._disk_token = self._disk_digest()
         return True
 
+    def compact(self) -> int | None:
+        """Fold the journal into a new snapshot.
+
+        Returns the number of records folded (0 when there were none), or None
+        when writing the snapshot failed and the journal was left in place.
+        """
+        self.load()
+        with self._locked(exclusive=True):
+            self._merge_concurrent_save()
+            records = self._journal_records()
+            if not records:
+                return 0
+            if canonical_merge.changes(self._base, self.data):
+                # Unsaved edits land in the snapshot: a revision of their own.
+                self.data["revision"] = int(self.data.get("revision") or 0) + 1
+            if not self._fold_journal(records, rekey=False):
+                return None
+            self._remember_disk_state()
+            return len(records)
+
+    def history(self) -> list[dict[str, Any]]:
+        """Audit trail of the journal layout: one entry per changed leaf, oldest first.
+
+        Entries name the service and key (or setting), revision, time, and a
+        secret's version and rotated_at -- never a value. Folded entries come
+        from history.log, pending ones from the records not yet compacted.
+        """
+        self.load()
+        entries = []
+        path = self._journal_dir() if self._journal_dirname is not None else None
+        if path is not None and (path / HISTORY_FILENAME).exists():
+            with open(path / HISTORY_FILENAME, encoding="utf-8") as fh:
+                entries = [json.loads(line) for line in fh if line.strip()]
+        return entries + pending_entries(self._journal)
+
+    def migrate_to_sharded(self) -> bool:
+        """Move a single-file store to the sharded layout.
+
+        Every service becomes a shard, then the index is written, and only
+        then is the single file removed: an interrupted migration leaves the
+        single file in charge. Returns save()'s result; False leaves the
+        store as it was.
+        """
+        if self._shard_dirname is None:
+            raise ValueError(f"{type(self).__name__} does not support the sharded layout")
+        with self._locked(exclusive=True):
+            # Convert what is on disk now, not what this store read earlier.
+            self._merge_concurrent_save()
+            if self.sharded:
+                return True
+            flat = self.data.get("services") or {}
+            for service in flat:
+                check_service_name(service)
+            sharded = ShardedServices((), self._load_shard)
+            for service, secrets_map in flat.items():
+                sharded[service] = secrets_map
+            self._digests = {}
+            self.data["services"] = sharded
+            # Shards are small YAML files: the v3 envelope has nothing to save there.
+            version = self.data.get("version")
+            if version == JSON_SCHEMA_VERSION:
+                self.data["version"] = CURRENT_SCHEMA_VERSION
+            records = self._journal_records()
+            if not self.save():
+                self.data["services"] = flat
+                self.data["version"] = version
+                return False
+            # The shards hold everything the journal did; history.log stays.
+            self._retire_journal(records)
+            for path in (self._encrypted_path(), self._plaintext_path()):
+                path.unlink(missing_ok=True)
+            return True
+
     def ensure_service(self, service: str):
         if service in self._forbidden_services:
             raise AdminSecretLeakError(
@@ -480,6 +1335,7 @@ class CanonicalSecretsStore:
           dict of the service's secrets after ensuring
         """
         self.ensure_service(service)
+        self._check_service(service)
         offending = sorted(set(required_keys) & self._forbidden_keys)
         if offending:
             raise AdminSecretLeakError(
@@ -515,6 +1371,7 @@ class CanonicalSecretsStore:
         return {k: (v.get('value') if isinstance(v, dict) else v) for k, v in svc.items()}
 
     def get_service_secrets(self, service: str) -> dict[str, str]:
+        self._check_service(service)
         svc = self.data.get("services", {}).get(service, {})
         result = {}
         for k, v in svc.items():
@@ -563,7 +1420,8 @@ class CanonicalSecretsStore:
     # ---------------- Schema Upgrade ----------------
     def _upgrade_schema_if_needed(self):
         cur = self.data.get('version', 1)
-        if cur == CURRENT_SCHEMA_VERSION:
+        target = schema_version_for(cur)
+        if cur == target:
             return
         services = self.data.get('services', {})
         # Upgrade v1 -> v2
@@ -577,20 +1435,192 @@ class CanonicalSecretsStore:
                         'version': 1,
                         'rotated_at': datetime.now(timezone.utc).isoformat()
                     }
-            self.data['version'] = CURRENT_SCHEMA_VERSION
+            cur = CURRENT_SCHEMA_VERSION
+        # v2 <-> v3: the same document, only saved differently (_encode_document)
+        if cur in (CURRENT_SCHEMA_VERSION, JSON_SCHEMA_VERSION):
+            self.data['version'] = target
             self.data['schema_upgraded_at'] = datetime.now(timezone.utc).isoformat()
             # Recompute integrity post-upgrade
             self.data['integrity'] = self._compute_integrity()
+            if self._readonly:
+                return  # upgraded in memory; the next writable store persists it
             try:
                 self.save()
             except Exception:
                 pass
 
-# Convenience accessor (lazy singleton pattern if desired)
+
+class _FrozenDict(dict):
+    """A dict that refuses writes.
+
+    A dict subclass rather than a MappingProxyType: callers tell a v2 entry
+    ({value, version, rotated_at}) from a legacy raw value with
+    isinstance(entry, dict), and must keep doing so on a snapshot.
+    """
+
+    def _refuse(self, *args, **kwargs):
+        raise ReadOnlyStoreError("the data of a canonical store snapshot is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _refuse
+    clear = pop = popitem = setdefault = update = _refuse
+
+    # copy.deepcopy() and pickle would rebuild it through the refused
+    # mutators; a copy is the caller's to edit anyway, so hand out plain data.
+    def __deepcopy__(self, memo):
+        return _thaw(self)
+
+    def __reduce__(self):
+        return dict, (_thaw(self),)
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of a parsed YAML value: mappings and lists, recursively."""
+    if isinstance(value, Mapping):
+        return _FrozenDict({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Plain, writable copy of what _freeze() returned."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def _represent_frozen(dumper: yaml.SafeDumper, data: Mapping[str, Any]) -> yaml.Node:
+    return dumper.represent_dict(_thaw(data))
+
+
+class _FrozenServices(Mapping):
+    """Read-only view of a sharded `services` mapping.
+
+    Keeps shards lazy: each one is decrypted and frozen on first access,
+    under the snapshot's lock.
+    """
+
+    def __init__(self, services: ShardedServices, lock: threading.RLock) -> None:
+        self._services = services
+        self._lock = lock
+        self._frozen: dict[str, Any] = {}
+
+    def __getitem__(self, service: str) -> Any:
+        with self._lock:
+            if service not in self._frozen:
+                self._frozen[service] = _freeze(self._services[service])
+            return self._frozen[service]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._services)
+
+    def __len__(self) -> int:
+        return len(self._services)
+
+    def __contains__(self, service: object) -> bool:
+        return service in self._services
+
+    def __deepcopy__(self, memo):
+        return _thaw(self)
+
+    def __reduce__(self):
+        return dict, (_thaw(self),)
+
+
+# yaml.safe_dump(snapshot.data) works like it does on a writable store's.
+for _dumper in {yaml.SafeDumper, _YAML_DUMPER}:
+    _dumper.add_representer(_FrozenDict, _represent_frozen)
+    _dumper.add_representer(_FrozenServices, _represent_frozen)
+
+
+def _read_only(name: str) -> Callable[..., Any]:
+    def _refuse(self, *args, **kwargs):
+        raise ReadOnlyStoreError(
+            f"{name}() called on a read-only snapshot of the canonical store; "
+            "use get_canonical_store() without readonly=True to write"
+        )
+    _refuse.__name__ = name
+    return _refuse
+
+
+@dataclass
+class CanonicalStoreSnapshot(CanonicalSecretsStore):
+    """Read-only view of the canonical store, for commands that only read.
+
+    Same loading, layouts and policy checks as the writable store, but it
+    never writes: no Secrets/ directory is created, a schema upgrade stays in
+    memory, a file that cannot be decrypted is reported, not reset, and every
+    writer raises ReadOnlyStoreError. `data` is frozen, so writing into it
+    directly raises as well. Loading happens once, under a lock,
+    so one snapshot can be shared across threads.
+    """
+
+    _frozen: Mapping[str, Any] | None = field(default=None, init=False, repr=False, compare=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+
+    _readonly = True
+
+    @property
+    def data(self) -> Mapping[str, Any]:
+        frozen = self._frozen
+        if frozen is not None:
+            return frozen
+        with self._lock:
+            if self._frozen is None:
+                if self._data is not None:
+                    # _load() on this thread, reading back what it has parsed
+                    # so far: the other threads are waiting on the lock.
+                    return self._data
+                self._load()
+                data = dict(self._data)
+                services = data.get("services")
+                data["services"] = (_FrozenServices(services, self._lock)
+                                    if isinstance(services, ShardedServices) else _freeze(services or {}))
+                self._frozen = _FrozenDict({k: v if k == "services" else _freeze(v)
+                                            for k, v in data.items()})
+            return self._frozen
+
+    @property
+    def sharded(self) -> bool:
+        self.load()
+        return isinstance(self._data.get("services"), ShardedServices)
+
+    save = _read_only("save")
+    transaction = _read_only("transaction")
+    migrate_to_sharded = _read_only("migrate_to_sharded")
+    migrate_to_journal = _read_only("migrate_to_journal")
+    compact = _read_only("compact")
+    ensure_service = _read_only("ensure_service")
+    ensure_service_entries = _read_only("ensure_service_entries")
+    set_cluster_domain = _read_only("set_cluster_domain")
+    set_cluster_ssh_key_file = _read_only("set_cluster_ssh_key_file")
+    set_node_public_ip = _read_only("set_node_public_ip")
+
+
+# Convenience accessor (lazy singleton pattern if desired): the default
+# cluster's store, and each named cluster's.
 _store_instance: CanonicalSecretsStore | None = None
+_cluster_stores: dict[str, CanonicalSecretsStore] = {}
+
+def get_canonical_store(project_root: Path | None = None,
+                        readonly: bool = False,
+                        cluster: str | None = None) -> CanonicalSecretsStore:
+    """The process-wide writable store, or with *readonly* a fresh snapshot.
 
-def get_canonical_store(project_root: Path | None = None) -> CanonicalSecretsStore:
+    A snapshot reads the files as they are on disk now; decrypting them again
+    is cheap, as SopsClient caches the plaintext for unchanged ciphertext.
+    *cluster* picks a named cluster's store -- see selected_cluster().
+    """
+    cluster = selected_cluster(cluster)
+    if readonly:
+        return CanonicalStoreSnapshot(project_root or Path.cwd(), cluster)
     global _store_instance
+    if cluster is not None:
+        if cluster not in _cluster_stores:
+            _cluster_stores[cluster] = CanonicalSecretsStore(project_root or Path.cwd(), cluster)
+        return _cluster_stores[cluster]
     if _store_instance is None:
         _store_instance = CanonicalSecretsStore(project_root or Path.cwd())
     return _store_instance
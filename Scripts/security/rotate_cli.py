@@ -21,52 +21,162 @@
 
 Sépare la logique de rotation depuis noah.py afin d'alléger le fichier principal.
 """
+import time
+
 import click  # type: ignore
 
 from Scripts.security import ensure_security_initialized  # type: ignore
 from Scripts.security.canonical_store import get_canonical_store  # type: ignore
 
 
+def _parse_older_than(ctx, param, value):
+    # Unité obligatoire : `--older-than 90` lu en secondes ferait tourner
+    # tout le store.
+    if value is None:
+        return None
+    from datetime import timedelta
+
+    from Scripts.utils.durations import parse_duration
+    try:
+        return timedelta(seconds=parse_duration(value, bare_unit=None))
+    except ValueError:
+        raise click.BadParameter(f"Durée invalide {value!r} : unité obligatoire (ex. 90d, 12w)",
+                                 ctx=ctx, param=param) from None
+
+
+@click.command(name='rotate')  # type: ignore
+@click.option('--service', help='Service dont on veut faire tourner les secrets (authentik, cilium, etc)')
+@click.option('--services', help='Plusieurs services séparés par des virgules, en une seule écriture')
+@click.option('--all', 'all_services', is_flag=True,
+              help='Tous les services du store dont NOAH génère les secrets, en une seule écriture')
+@click.option('--older-than', callback=_parse_older_than,
+              help="Seulement les clés dont la dernière rotation (rotated_at) date de plus de, ex. 90d "
+                   "(défaut avec --all / --services : toutes)")
+@click.option('--keys', help='Liste de clés spécifiques séparées par des virgules (défaut: toutes)')
+@click.option('--show', is_flag=True, help='Afficher les métadonnées après rotation (valeurs masquées)')
+@click.option('--apply', 'do_apply', is_flag=True, help='Appliquer les secrets au cluster en cours (sans re-bootstrap)')
+@click.option('--rekey', is_flag=True,
+              help='Re-chiffrer tout le store sous une nouvelle clé de données SOPS '
+                   '(par défaut seules les valeurs modifiées sont re-chiffrées)')
+@click.pass_context
+def rotate_canonical(ctx, service, services, all_services, older_than, keys, show, do_apply, rekey):
+    """Fait tourner un ou plusieurs secrets (store canonique)."""
+    if sum(bool(choice) for choice in (service, services, all_services)) > 1:
+        raise click.UsageError("--service, --services et --all s'excluent mutuellement.")
+    if services or all_services or older_than:
+        if keys:
+            raise click.UsageError("--keys ne s'applique qu'à un seul --service.")
+        selected = [s.strip() for s in services.split(',') if s.strip()] if services else None
+        if service:
+            selected = [service]
+        _rotate_many(ctx, selected, older_than, show, do_apply, rekey)
+        return
+    if not service:
+        service = click.prompt('Service dont on veut faire tourner les secrets')
+
+    ensure_security_initialized(ctx)
+    key_list = [k.strip() for k in keys.split(',')] if keys else None
+    rotated = ctx.obj['secrets'].rotate_service_secrets_canonical(service, key_list, rekey=rekey)
+    if not rotated:
+        click.echo(f"❌ Aucune rotation effectuée pour {service}")
+        return
+    click.echo(f"✅ Rotation effectuée pour {service}: {', '.join(key_list) if key_list else 'TOUTES les clés'}")
+    applied = _apply() if do_apply else True
+    if show:
+        _show(service)
+    if not applied:
+        ctx.exit(1)
+
+
+def _rotate_many(ctx, selected, older_than, show, do_apply, rekey):
+    """Rotation groupée : tout est planifié d'abord, écrit une fois, appliqué une fois.
+
+    Args:
+        selected: services demandés (None = tous ceux du store)
+        older_than: timedelta, ou None pour toutes les clés
+    """
+    ensure_security_initialized(ctx)
+    manager = ctx.obj['secrets']
+    phases = {}
+
+    started = time.perf_counter()
+    plan = manager.plan_canonical_rotation(selected, older_than)
+    phases['planification'] = time.perf_counter() - started
+    if not plan:
+        click.echo("✅ Aucun secret à faire tourner.")
+        _report(phases)
+        return
+    click.echo(f"📋 {sum(len(k) for k in plan.values())} clé(s) dans {len(plan)} service(s) :")
+    for svc, svc_keys in plan.items():
+        click.echo(f"  {svc}: {', '.join(svc_keys)}")
+
+    timings = {}
+    rotated = manager.rotate_canonical_secrets(plan, rekey=rekey, timings=timings)
+    phases['génération'] = timings.get('rotate', 0.0)
+    if 'save' in timings:
+        phases['écriture'] = timings['save']
+    if rotated is None:
+        click.echo("❌ Rotation non enregistrée : le store et le cluster sont inchangés.")
+        _report(phases)
+        ctx.exit(1)
+    click.echo(f"✅ Rotation effectuée pour {len(rotated)} service(s) en une seule écriture")
+
+    from Scripts.security.security_manager import GARAGE_S3_SERVICES  # type: ignore
+    if any(svc in GARAGE_S3_SERVICES for svc in rotated):
+        click.echo("💡 Clés S3 Garage renouvelées : imposez-les à Garage avec `noah garage provision`.")
+    applied = True
+    if do_apply:
+        started = time.perf_counter()
+        applied = _apply()
+        phases['application' if applied else 'application (échec)'] = time.perf_counter() - started
+    if show:
+        for svc in rotated:
+            _show(svc)
+    _report(phases)
+    if not applied:
+        # Le store a tourné mais pas le cluster : un script ne doit pas y
+        # voir un succès.
+        ctx.exit(1)
+
+
+def _report(phases):
+    click.echo("⏱  " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in phases.items()))
+
+
+def _apply():
+    """Applique les secrets au cluster ; False si l'application a échoué."""
+    from Scripts.gitops.gitops_init import apply_app_secrets
+    try:
+        apply_app_secrets(print_status=lambda m, lvl='INFO': click.echo(m))
+    except Exception as e:  # noqa: BLE001
+        click.echo(f"❌ Échec de l'application au cluster: {e}")
+        click.echo("   Les nouveaux secrets sont enregistrés dans le store, pas encore dans le cluster.")
+        return False
+    click.echo("✅ Secrets appliqués au cluster (aucun re-bootstrap nécessaire).")
+    return True
+
+
+def _show(service):
+    store = get_canonical_store()
+    svc = store.data.get('services', {}).get(service, {})
+    click.echo(f"\n[{service} mis à jour]")
+    for k, v in sorted(svc.items()):
+        if isinstance(v, dict) and 'value' in v:
+            display_val = (v['value'][:4] + '...') if v.get('value') else ''
+            click.echo(f"  {k}: {display_val} (v{v.get('version')} rotated:{v.get('rotated_at')})")
+        else:
+            display_val = (v[:4] + '...') if v else ''
+            click.echo(f"  {k}: {display_val}")
+
+
 def register_rotate_command(secrets_group):
     """Enregistre la commande rotate sur le groupe secrets.
 
+    noah.py la référence désormais par chemin (LazyGroup) ; conservé pour les
+    appelants qui construisent leur propre groupe click.
+
     Args:
         secrets_group: objet Click group (secrets)
     """
-
-    @secrets_group.command(name='rotate')  # type: ignore
-    @click.option('--service', required=True, prompt='Service dont on veut faire tourner les secrets',
-                  help='Service dont on veut faire tourner les secrets (authentik, cilium, etc)')
-    @click.option('--keys', help='Liste de clés spécifiques séparées par des virgules (défaut: toutes)')
-    @click.option('--show', is_flag=True, help='Afficher les métadonnées après rotation (valeurs masquées)')
-    @click.option('--apply', 'do_apply', is_flag=True, help='Appliquer les secrets au cluster en cours (sans re-bootstrap)')
-    @click.pass_context
-    def rotate_canonical(ctx, service, keys, show, do_apply):
-        """Fait tourner un ou plusieurs secrets (store canonique)."""
-        ensure_security_initialized(ctx)
-        key_list = [k.strip() for k in keys.split(',')] if keys else None
-        rotated = ctx.obj['secrets'].rotate_service_secrets_canonical(service, key_list)
-        if not rotated:
-            click.echo(f"❌ Aucune rotation effectuée pour {service}")
-            return
-        click.echo(f"✅ Rotation effectuée pour {service}: {', '.join(key_list) if key_list else 'TOUTES les clés'}")
-        if do_apply:
-            from Scripts.gitops.gitops_init import apply_app_secrets
-            try:
-                apply_app_secrets(print_status=lambda m, lvl='INFO': click.echo(m))
-                click.echo("✅ Secrets appliqués au cluster (aucun re-bootstrap nécessaire).")
-            except Exception as e:  # noqa: BLE001
-                click.echo(f"❌ Échec de l'application au cluster: {e}")
-        if show:
-            store = get_canonical_store()
-            svc = store.data.get('services', {}).get(service, {})
-            click.echo(f"\n[{service} mis à jour]")
-            for k, v in sorted(svc.items()):
-                if isinstance(v, dict) and 'value' in v:
-                    display_val = (v['value'][:4] + '...') if v.get('value') else ''
-                    click.echo(f"  {k}: {display_val} (v{v.get('version')} rotated:{v.get('rotated_at')})")
-                else:
-                    display_val = (v[:4] + '...') if v else ''
-                    click.echo(f"  {k}: {display_val}")
-
+    secrets_group.add_command(rotate_canonical)
     return rotate_canonical
@@ -28,6 +28,7 @@ from pathlib import Path
 
 import yaml
 
+from Scripts.security import session_cache
 from Scripts.security.sops_client import SopsClient, SopsError
 from Scripts.utils.dict_utils import flatten_mapping  # shared flatten helper
 from Scripts.utils.paths import NOAH_PATHS  # centralized path resolution
@@ -64,9 +65,12 @@ class SecureEnvLoader:
             logger.warning("Encrypted file not found: %s", encrypted_file)
             return None
 
-        try:
+        def _decrypt() -> str:
             with SopsClient(self.age_key_file, self.sops_config) as sops:
-                raw = sops.decrypt_to_string(encrypted_file)
+                return sops.decrypt_to_string(encrypted_file)
+
+        try:
+            raw = session_cache.decrypt_cached(encrypted_file, _decrypt)
         except SopsError as e:
             logger.error("SOPS decryption failed for %s: %s", encrypted_file, e)
             return None
@@ -134,6 +138,33 @@ class SecureEnvLoader:
             return False
 
 
+# Encrypted NOAH configuration, relative to the repository root (the CLI
+# refuses to run from anywhere else).
+CONFIG_ENC_FILE = Path("Config/config.enc.yaml")
+
+_secure_env_loaded = False
+
+
+def ensure_secure_env_loaded(encrypted_file: Path | None = None) -> bool:
+    """Decrypt Config/config.enc.yaml into os.environ, at most once per process.
+
+    Called by commands marked ``needs_secure_env`` in noah.py and by
+    ConfigLoader.get on its first miss, so commands that never read a NOAH_*
+    variable don't pay for a sops fork and an Age decryption.
+
+    Returns True when this call loaded the file. A missing file is not
+    recorded as an attempt: ensure_security_initialized may create it later.
+    """
+    global _secure_env_loaded
+    if _secure_env_loaded:
+        return False
+    encrypted_file = encrypted_file or CONFIG_ENC_FILE
+    if not encrypted_file.exists():
+        return False
+    _secure_env_loaded = True
+    return SecureEnvLoader().load_secure_env(encrypted_file)
+
+
 if __name__ == "__main__":
     # CLI usage for testing
     import argparse
@@ -67,18 +67,20 @@ def get_security_config(domain=None):
 
 
 def _config_enc_readable(config_path: Path, age_key_file: Path) -> bool:
-    """Return True if config_path exists and can be decrypted with the current age key."""
+    """Return True if config_path exists and can be decrypted with the current age key.
+
+    Goes through SopsClient so that the plaintext stays in its process-wide
+    cache: SecureEnvLoader decrypts the same file right after.
+    """
     if not config_path.exists():
         return False
-    import os
-    import subprocess
-    env = os.environ.copy()
-    env['SOPS_AGE_KEY_FILE'] = str(age_key_file)
-    result = subprocess.run(
-        ['sops', '--decrypt', str(config_path)],
-        capture_output=True, env=env
-    )
-    return result.returncode == 0
+    from Scripts.security.sops_client import SopsClient, SopsError
+    try:
+        with SopsClient(age_key_file) as sops:
+            sops.decrypt_to_string(config_path)
+    except SopsError:
+        return False
+    return True
 
 
 def _create_fresh_config_enc(config_path: Path, age_key_file: Path, domain: str):
@@ -103,7 +105,7 @@ def _create_fresh_config_enc(config_path: Path, age_key_file: Path, domain: str)
         # canonical store to the Helm values Secret (REPLACE_WITH_50_CHAR_SECRET
         # in gitops_init), never through this file. The key that used to sit
         # here held an unrelated random value -- SecureEnvLoader flattens this
-        # mapping into os.environ on every noah.py start, so it published an
+        # mapping into os.environ whenever noah.py loads it, so it published an
         # AUTHENTIK_SECRET_KEY that no code read and that matched nothing.
         'certificates': {'ca_key_password': secrets.token_urlsafe(24)},
         'secrets': {'encryption_key': secrets.token_hex(32)},
@@ -136,6 +138,9 @@ def ensure_security_initialized(ctx):
     """Ensure SOPS/Age keys and certificates are initialized"""
     # Get default domain from environment or fallback
     import os
+
+    from Scripts.security.secure_env_loader import ensure_secure_env_loaded
+    ensure_secure_env_loaded()
     DEFAULT_DOMAIN = os.environ.get('NOAH_DOMAIN', '')
 
     age_dir = Path("Age")
@@ -172,7 +177,7 @@ def ensure_security_initialized(ctx):
         except Exception as exc:
             click.echo(f"[WARNING] Could not create config.enc.yaml: {exc}")
 
-    # Reload config into os.environ if it was just created (startup load was skipped)
+    # Load config into os.environ if it was just created (the on-demand load found no file)
     if config_was_created and config_enc.exists():
         from Scripts.security.secure_env_loader import SecureEnvLoader
         SecureEnvLoader().load_secure_env(config_enc)
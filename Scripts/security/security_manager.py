@@ -31,8 +31,9 @@ import os
 import secrets
 import string
 import subprocess
+import time
 from collections.abc import Callable
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import yaml
@@ -61,18 +62,43 @@ GARAGE_S3_SERVICES: dict[str, str] = {
     "garage-logs":      "logs",                # audit retention, lot 13
 }
 
+# Services a bulk rotation leaves alone: NOAH does not generate their value,
+# and "rotating" it would blank it (set it with set-cloudflare-token instead).
+USER_PROVIDED_SERVICES = frozenset({"cloudflare"})
+
+
+def _rotated_before(entry, cutoff: datetime) -> bool:
+    """Whether a canonical store entry was last rotated before *cutoff*.
+
+    Entries without a readable rotated_at (legacy strings, keys not generated
+    yet) count as due: their age is unknown.
+    """
+    rotated_at = entry.get('rotated_at') if isinstance(entry, dict) else None
+    if isinstance(rotated_at, str):
+        try:
+            rotated_at = datetime.fromisoformat(rotated_at)
+        except ValueError:
+            return True
+    if not isinstance(rotated_at, datetime):
+        return True
+    if rotated_at.tzinfo is None:
+        rotated_at = rotated_at.replace(tzinfo=timezone.utc)
+    return rotated_at < cutoff
+
 
 class NoahSecurityManager:
     """Unified security manager for NOAH infrastructure"""
     
-    def __init__(self, config_loader=None, project_root=None):
+    def __init__(self, config_loader=None, project_root=None, cluster=None):
         """Initialize the security manager
         
         Args:
             config_loader: Optional configuration loader (for backward compatibility)
             project_root: Project root directory (auto-detected if not provided)
+            cluster: Named cluster whose canonical store to use (default: NOAH_CLUSTER)
         """
         self.project_root = Path(project_root) if project_root else Path(__file__).parent.parent.parent
+        self.cluster = cluster
         self.config = config_loader
         
         # Directory structure
@@ -264,7 +290,7 @@ class NoahSecurityManager:
         """
         try:
             from Scripts.security.canonical_store import get_canonical_store
-            store = get_canonical_store(self.project_root)
+            store = get_canonical_store(self.project_root, cluster=self.cluster).load()
         except InsecureStoreError:
             # Falling back to "ephemeral generation" here would silently drop
             # the very secrets the lock is protecting.
@@ -284,36 +310,153 @@ class NoahSecurityManager:
             # Fallback (non-persistent) - generate all now
             return {k: gen() for k, gen in required.items()}
 
-    def rotate_service_secrets_canonical(self, service_name: str, rotate_keys: list | None = None) -> dict[str, str]:
+    def rotate_service_secrets_canonical(self, service_name: str, rotate_keys: list | None = None,
+                                         rekey: bool = False) -> dict[str, str]:
         """Rotate selected secrets in the canonical store.
 
+        Only the rotated values are re-encrypted, under the store's existing
+        SOPS data key; see CanonicalSecretsStore.save().
+
         Args:
             service_name: target service
             rotate_keys: list of keys to rotate (None = all for service)
+            rekey: also re-encrypt the whole store under a fresh data key
         Returns:
             Updated secrets dict
         """
         try:
             from Scripts.security.canonical_store import get_canonical_store
-            store = get_canonical_store(self.project_root)
+            store = get_canonical_store(self.project_root, cluster=self.cluster).load()
         except InsecureStoreError:
             raise
         except Exception as e:
             print(f"[ERROR] Cannot rotate canonical secrets (store unavailable): {e}")
             return {}
 
-        # We need raw data access for metadata updates
-        services_root = store.data.get('services', {})
-        existing_full = services_root.get(service_name, {})
-        # Produce simplified map for return later
-        existing_simple = store.get_service_secrets(service_name)
-        if not existing_full:
+        if not store.data.get('services', {}).get(service_name):
             print(f"[WARNING] No existing secrets for {service_name}; generating instead of rotating")
             return self.generate_service_secrets(service_name)
 
         # Ensure the service exists in the store, then reuse the single
         # generator definition so every generatable service is rotatable.
         self.generate_service_secrets(service_name)
+        existing_simple, rotated_count = self._rotate_entries(store, service_name, rotate_keys)
+        if rotated_count:
+            try:
+                # Integrity will be recomputed on save
+                store.save(rekey=rekey)
+                print(f"[INFO] Rotated {rotated_count} secret(s) for {service_name} in canonical store")
+            except Exception as e:
+                print(f"[ERROR] Failed to persist rotated secrets: {e}")
+        return existing_simple
+
+    def plan_canonical_rotation(self, services: list | None = None,
+                                older_than: timedelta | None = None) -> dict[str, list[str]]:
+        """Decide up front which keys a bulk rotation rotates.
+
+        Args:
+            services: services to consider (None = every service in the store)
+            older_than: only keys last rotated longer ago than this; a key with
+                no rotated_at (legacy value, or not generated yet) is due
+        Returns:
+            service -> keys to rotate, leaving out services with nothing due
+            and services NOAH cannot generate (e.g. the Cloudflare token)
+        """
+        from Scripts.security.canonical_store import get_canonical_store
+        store = get_canonical_store(self.project_root, cluster=self.cluster).load()
+        services_root = store.data.get('services', {})
+        cutoff = datetime.now(timezone.utc) - older_than if older_than is not None else None
+        plan: dict[str, list[str]] = {}
+        for service in (services if services is not None else list(services_root)):
+            gen_mapping = self._service_generators(service)
+            if not gen_mapping or service in USER_PROVIDED_SERVICES:
+                if services is not None:
+                    print(f"[WARNING] Service '{service}' has no generated secrets to rotate")
+                continue
+            if cutoff is None:
+                keys = list(gen_mapping)
+            else:
+                # Reading rotated_at decrypts the service's shard, if sharded.
+                entries = services_root.get(service) or {}
+                keys = [key for key in gen_mapping if _rotated_before(entries.get(key), cutoff)]
+            if keys:
+                plan[service] = keys
+        return plan
+
+    def rotate_canonical_secrets(self, plan: dict[str, list[str]], rekey: bool = False,
+                                 timings: dict | None = None) -> dict[str, int] | None:
+        """Carry out a plan from plan_canonical_rotation() with ONE encrypted write.
+
+        rotate_service_secrets_canonical() saves once per service; here every
+        value is rotated in memory and the store saved once at the end. A
+        service with no secrets yet is generated instead, as it is there, in
+        that same write.
+
+        Args:
+            plan: service -> keys to rotate
+            rekey: also re-encrypt the whole store under a fresh data key
+            timings: filled with the seconds spent generating ('rotate') and
+                writing ('save'), for the caller's report
+        Returns:
+            service -> number of keys rotated, or None when nothing could be
+            persisted -- the cluster must then not be given the new values
+        """
+        try:
+            from Scripts.security.canonical_store import get_canonical_store
+            store = get_canonical_store(self.project_root, cluster=self.cluster).load()
+        except InsecureStoreError:
+            raise
+        except Exception as e:
+            print(f"[ERROR] Cannot rotate canonical secrets (store unavailable): {e}")
+            return None
+
+        timings = {} if timings is None else timings
+        started = time.perf_counter()
+        services_root = store.data.get('services', {})
+        missing = [service for service in plan if not services_root.get(service)]
+        for service in missing:
+            print(f"[WARNING] No existing secrets for {service}; generating instead of rotating")
+        # Missing keys and new values share the transaction's single write: if
+        # it fails, neither reaches disk and the data goes back as it was.
+        rotated: dict[str, int] = {}
+        try:
+            with store.transaction(strict=True):
+                for service in plan:
+                    self.generate_service_secrets(service)
+                for service, keys in plan.items():
+                    if service in missing:
+                        continue
+                    _, rotated_count = self._rotate_entries(store, service, keys)
+                    if rotated_count:
+                        rotated[service] = rotated_count
+                if rotated:
+                    store.save(rekey=rekey)
+                timings['rotate'] = time.perf_counter() - started
+                started = time.perf_counter()
+        except InsecureStoreError:
+            raise
+        except Exception as e:
+            print(f"[ERROR] Failed to persist rotated secrets: {e}")
+            return None
+        finally:
+            if 'rotate' in timings:
+                timings['save'] = time.perf_counter() - started
+        if rotated:
+            print(f"[INFO] Rotated {sum(rotated.values())} secret(s) across "
+                  f"{len(rotated)} service(s) in canonical store")
+        return rotated
+
+    def _rotate_entries(self, store, service_name: str,
+                        rotate_keys: list | None) -> tuple[dict[str, str], int]:
+        """Give *service_name*'s keys new values in *store*, without saving.
+
+        Returns:
+            (updated secrets dict, number of keys rotated)
+        """
+        # We need raw data access for metadata updates
+        existing_full = store.data.get('services', {}).get(service_name, {})
+        # Produce simplified map for return later
+        existing_simple = store.get_service_secrets(service_name)
         gen_mapping = self._service_generators(service_name)
 
         targets = rotate_keys or list(gen_mapping.keys())
@@ -337,14 +480,7 @@ class NoahSecurityManager:
                 }
             existing_simple[key] = new_val
             rotated_count += 1
-        if rotated_count:
-            try:
-                # Integrity will be recomputed on save
-                store.save()
-                print(f"[INFO] Rotated {rotated_count} secret(s) for {service_name} in canonical store")
-            except Exception as e:
-                print(f"[ERROR] Failed to persist rotated secrets: {e}")
-        return existing_simple
+        return existing_simple, rotated_count
 
     # ================================
     # KUBERNETES SECRET MANAGEMENT
@@ -659,7 +795,11 @@ class NoahSecurityManager:
         
         # Clean up generated Kubernetes secrets
         if self.secrets_dir.exists():
-            for secret_file in self.secrets_dir.glob("*.yaml"):
+            from Scripts.security.canonical_journal import JOURNAL_DIRNAME
+            from Scripts.security.canonical_shards import SHARD_DIRNAME
+            shards = self.secrets_dir.glob(f"{SHARD_DIRNAME}/*.yaml")
+            records = self.secrets_dir.glob(f"{JOURNAL_DIRNAME}/*.yaml")
+            for secret_file in [*self.secrets_dir.glob("*.yaml"), *shards, *records]:
                 if secret_file.is_file():
                     secret_file.unlink()
                     cleaned_files.append(str(secret_file))
@@ -0,0 +1,205 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Opt-in session cache for decrypted SOPS payloads.
+
+`noah session start --ttl 15m` opens a session: until it expires (or
+`noah session stop`), the plaintext of every SOPS file decrypted through
+decrypt_cached() is kept in a single 0600 file under $XDG_RUNTIME_DIR -- a
+per-user tmpfs on systemd hosts, wiped at logout -- so a run of commands pays
+for one `sops -d` per file instead of one per command.
+
+Entries are keyed by the SHA-256 of the ciphertext, so a file rewritten by
+save() or by hand simply misses: there is nothing to invalidate. Only one entry
+is kept per file path, so a rewrite also drops the stale plaintext.
+
+Without an open session every helper here is a no-op that costs one stat();
+nothing is hashed and nothing is written. Hosts without XDG_RUNTIME_DIR cannot
+open a session at all: a fallback to /tmp would put secrets on a disk-backed,
+shared directory, which is precisely what this cache must not do.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from Scripts.utils.durations import parse_duration
+
+logger = logging.getLogger(__name__)
+
+SESSION_FILENAME = "session.json"
+
+
+class SessionCacheError(RuntimeError):
+    """A session cannot be opened (no private runtime directory)."""
+
+
+def parse_ttl(value: str) -> int:
+    """Parse a duration such as ``900``, ``90s``, ``15m``, ``2h`` or ``1d``."""
+    try:
+        return parse_duration(value)
+    except ValueError:
+        raise ValueError(f"Invalid TTL {value!r} (expected e.g. 900, 15m, 2h)") from None
+
+
+def _runtime_dir() -> Path | None:
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if not base or not Path(base).is_dir():
+        return None
+    return Path(base) / "noah"
+
+
+def session_file() -> Path | None:
+    """Path of the session file, or None where no session can exist."""
+    runtime = _runtime_dir()
+    return runtime / SESSION_FILENAME if runtime else None
+
+
+def _is_private(path: Path) -> bool:
+    """Trust only a regular file we own that nobody else can read or write."""
+    try:
+        st = path.lstat()
+    except OSError:
+        return False
+    return (
+        stat.S_ISREG(st.st_mode)
+        and st.st_uid == os.getuid()
+        and not st.st_mode & 0o077
+    )
+
+
+def _read_session() -> dict | None:
+    path = session_file()
+    if path is None or not path.exists():
+        return None
+    if not _is_private(path):
+        logger.warning("Ignoring session cache %s: not a private file", path)
+        return None
+    try:
+        session = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(session, dict) or session.get("expires_at", 0) <= time.time():
+        path.unlink(missing_ok=True)
+        return None
+    session.setdefault("entries", {})
+    return session
+
+
+def _write_session(session: dict) -> Path:
+    runtime = _runtime_dir()
+    if runtime is None:
+        raise SessionCacheError(
+            "XDG_RUNTIME_DIR is not set: no private tmpfs to hold decrypted "
+            "secrets, refusing to open a session."
+        )
+    runtime.mkdir(mode=0o700, exist_ok=True)
+    # Same pattern as CanonicalSecretsStore.save(): mkstemp creates the file at
+    # 0o600 before any plaintext reaches it, os.replace swaps it in atomically.
+    fd, tmp_str = tempfile.mkstemp(dir=runtime, prefix=".session-", suffix=".json")
+    tmp = Path(tmp_str)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(session, fh)
+        os.replace(tmp, runtime / SESSION_FILENAME)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return runtime / SESSION_FILENAME
+
+
+def start_session(ttl_seconds: int) -> float:
+    """Open (or extend) the session; returns its expiry as a UNIX timestamp.
+
+    Raises SessionCacheError when the host has no XDG_RUNTIME_DIR.
+    """
+    session = _read_session() or {"entries": {}}
+    session["expires_at"] = time.time() + ttl_seconds
+    _write_session(session)
+    return session["expires_at"]
+
+
+def stop_session() -> bool:
+    """Close the session and drop every cached plaintext. True if one was open."""
+    path = session_file()
+    if path is None or not path.exists():
+        return False
+    path.unlink(missing_ok=True)
+    return True
+
+
+def session_info() -> dict | None:
+    """Expiry and entry count of the open session, or None."""
+    session = _read_session()
+    if session is None:
+        return None
+    return {
+        "expires_at": session["expires_at"],
+        "entries": len(session["entries"]),
+        "path": str(session_file()),
+    }
+
+
+def _digest(ciphertext: bytes) -> str:
+    return hashlib.sha256(ciphertext).hexdigest()
+
+
+def remember(path: Path, ciphertext: bytes, plaintext: str) -> None:
+    """Cache *plaintext* for *ciphertext* if a session is open.
+
+    Lets a writer that has just encrypted a file keep the session warm instead
+    of forcing the next reader through sops.
+    """
+    session = _read_session()
+    if session is None:
+        return
+    source = str(Path(path).resolve())
+    entries = {
+        digest: entry for digest, entry in session["entries"].items()
+        if entry.get("path") != source
+    }
+    entries[_digest(ciphertext)] = {"path": source, "plaintext": plaintext}
+    session["entries"] = entries
+    try:
+        _write_session(session)
+    except (OSError, SessionCacheError) as e:
+        logger.warning("Could not update session cache: %s", e)
+
+
+def decrypt_cached(path: Path, decrypt: Callable[[], str]) -> str:
+    """Return the plaintext of *path*, from the session cache when possible.
+
+    *decrypt* performs the real decryption (typically a SopsClient call) and
+    its exceptions propagate unchanged; only successful results are cached.
+    """
+    session = _read_session()
+    if session is None:
+        return decrypt()
+    ciphertext = Path(path).read_bytes()
+    entry = session["entries"].get(_digest(ciphertext))
+    if entry is not None:
+        return entry["plaintext"]
+    plaintext = decrypt()
+    remember(path, ciphertext, plaintext)
+    return plaintext
@@ -0,0 +1,667 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""In-process decryption of SOPS files encrypted for age recipients.
+
+`sops -d` costs a fork plus a Go runtime start per file, paid by every read of
+the canonical store and of Config/config.enc.yaml. For the files NOAH writes --
+YAML, age recipients only -- the whole job is a few primitives that the
+`cryptography` package already provides:
+
+  1. age: X25519 with our identity, HKDF-SHA256, ChaCha20-Poly1305 unwrap the
+     file key from the recipient stanza; the header HMAC is checked and the
+     STREAM payload decrypted into the 32-byte SOPS data key
+  2. SOPS: every ``ENC[AES256_GCM,data:,iv:,tag:,type:]`` leaf is opened with
+     AES-256-GCM under that data key, its key path as associated data
+  3. the MAC -- a SHA-512 over every value, in document order, itself stored
+     encrypted with ``lastmodified`` as associated data -- must match
+
+Anything outside that subset (JSON/dotenv/binary stores, Shamir key groups,
+comment regexes, ``mac_only_encrypted``) raises NativeUnsupported, and SopsClient hands the file to the sops binary instead.
+
+The same primitives run the other way for update_text(), the in-process
+``sops set``: changed values are sealed under the file's existing data key and
+the MAC renewed, leaving every other ciphertext untouched.
+NativeSopsRunner plugs this into SopsClient's ``_runner`` seam.
+
+``NOAH_SOPS_NATIVE=0`` turns the engine off.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import re
+import subprocess
+from collections.abc import Callable
+from pathlib import Path
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+_ENC_LEAF = re.compile(
+    r"^ENC\[AES256_GCM,data:(?P<data>[^,]*),iv:(?P<iv>[^,]+),"
+    r"tag:(?P<tag>[^,]+),type:(?P<type>[a-z]+)\]$"
+)
+_AGE_INTRO = b"age-encryption.org/v1\n"
+_AGE_ARMOR_BEGIN = "-----BEGIN AGE ENCRYPTED FILE-----"
+_AGE_ARMOR_END = "-----END AGE ENCRYPTED FILE-----"
+_AGE_CHUNK = 64 * 1024
+_BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+_IDENTITY_HRP = "age-secret-key-"
+
+# Metadata keys that change which values SOPS encrypts or how it reads them;
+# those without a faithful implementation below send the file to the binary.
+_UNSUPPORTED_METADATA = (
+    "shamir_threshold", "unencrypted_comment_regex", "encrypted_comment_regex",
+    "mac_only_encrypted",
+)
+
+
+# A comment SOPS stored as a sequence item: `sops -d` turns it back into a
+# YAML comment. Comments are outside the MAC and left out of the tree.
+_COMMENT = object()
+
+
+class NativeDecryptError(Exception):
+    """The file cannot be decrypted: malformed or tampered data."""
+
+    # The sops exit status for the same failure, for _raise_for_decrypt_error.
+    returncode = 1
+
+
+class NativeKeyError(NativeDecryptError):
+    """None of our age identities can unwrap the data key."""
+
+    returncode = 128
+
+
+class NativeUnsupported(NativeDecryptError):
+    """The file uses a SOPS feature this engine does not implement."""
+
+
+def native_enabled() -> bool:
+    return os.environ.get("NOAH_SOPS_NATIVE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+# ---------------------------------------------------------------------------
+# age
+# ---------------------------------------------------------------------------
+
+def _bech32_decode(text: str) -> tuple[str, bytes]:
+    """Decode a bech32 string (BIP 173, no length limit) into (hrp, data)."""
+    text = text.lower()
+    hrp, sep, data = text.rpartition("1")
+    if not sep or not hrp or len(data) < 6:
+        raise NativeDecryptError("Malformed age identity")
+    try:
+        values = [_BECH32_CHARSET.index(c) for c in data]
+    except ValueError:
+        raise NativeDecryptError("Malformed age identity") from None
+    if _bech32_polymod([ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp] + values) != 1:
+        raise NativeDecryptError("Malformed age identity (checksum)")
+    acc = bits = 0
+    out = bytearray()
+    for value in values[:-6]:
+        acc = (acc << 5) | value
+        bits += 5
+        if bits >= 8:
+            bits -= 8
+            out.append((acc >> bits) & 0xFF)
+    return hrp, bytes(out)
+
+
+def _bech32_polymod(values: list[int]) -> int:
+    generator = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+    chk = 1
+    for value in values:
+        top = chk >> 25
+        chk = (chk & 0x1FFFFFF) << 5 ^ value
+        for i in range(5):
+            if (top >> i) & 1:
+                chk ^= generator[i]
+    return chk
+
+
+def load_identities(key_file: Path) -> list[bytes]:
+    """X25519 scalars of every ``AGE-SECRET-KEY-1...`` line in *key_file*."""
+    identities = []
+    for line in Path(key_file).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if not line.upper().startswith("AGE-SECRET-KEY-1"):
+            # Plugin identities (AGE-PLUGIN-...) need their plugin binary.
+            raise NativeUnsupported("Unsupported age identity type")
+        hrp, scalar = _bech32_decode(line)
+        if hrp != _IDENTITY_HRP or len(scalar) != 32:
+            raise NativeDecryptError("Malformed age identity")
+        identities.append(scalar)
+    return identities
+
+
+def _b64_raw(text: str) -> bytes:
+    # age uses unpadded standard base64 in its header and rejects padding.
+    if "=" in text or "\n" in text:
+        raise NativeDecryptError("Malformed age header")
+    return base64.b64decode(text + "=" * (-len(text) % 4), validate=True)
+
+
+def _hkdf(ikm: bytes, salt: bytes, info: bytes) -> bytes:
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=info).derive(ikm)
+
+
+def _dearmor(armored: str) -> bytes:
+    lines = [line.strip() for line in armored.strip().splitlines()]
+    if len(lines) < 2 or lines[0] != _AGE_ARMOR_BEGIN or lines[-1] != _AGE_ARMOR_END:
+        raise NativeDecryptError("Malformed age armor")
+    try:
+        return base64.b64decode("".join(lines[1:-1]), validate=True)
+    except ValueError:
+        raise NativeDecryptError("Malformed age armor") from None
+
+
+def _unwrap_file_key(stanzas: list[tuple[list[str], bytes]], identities: list[bytes]) -> bytes:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey, X25519PublicKey
+    from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+    for args, body in stanzas:
+        if args[0] != "X25519" or len(args) != 2:
+            continue
+        share = _b64_raw(args[1])
+        if len(share) != 32 or len(body) != 32:
+            raise NativeDecryptError("Malformed X25519 stanza")
+        for scalar in identities:
+            private = X25519PrivateKey.from_private_bytes(scalar)
+            ours = private.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+            shared = private.exchange(X25519PublicKey.from_public_bytes(share))
+            if shared == bytes(32):
+                raise NativeDecryptError("X25519 stanza has a low-order share")
+            wrap_key = _hkdf(shared, share + ours, b"age-encryption.org/v1/X25519")
+            try:
+                return ChaCha20Poly1305(wrap_key).decrypt(bytes(12), body, None)
+            except InvalidTag:
+                continue
+    raise NativeKeyError("no identity matched any of the recipients")
+
+
+def decrypt_age(armored: str, identities: list[bytes]) -> bytes:
+    """Decrypt an armored age file with one of *identities*."""
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+
+    raw = _dearmor(armored)
+    if not raw.startswith(_AGE_INTRO):
+        raise NativeUnsupported("Unsupported age version")
+    end = raw.find(b"\n---", len(_AGE_INTRO) - 1)
+    if end < 0:
+        raise NativeDecryptError("Malformed age header")
+    mac_line_end = raw.find(b"\n", end + 1)
+    if mac_line_end < 0:
+        raise NativeDecryptError("Malformed age header")
+    header = raw[:end + 4]  # up to and including "---"
+    mac_line = raw[end + 1:mac_line_end].decode("ascii")
+    payload = raw[mac_line_end + 1:]
+
+    stanzas: list[tuple[list[str], bytes]] = []
+    lines = raw[len(_AGE_INTRO):end + 1].decode("ascii").split("\n")[:-1]
+    i = 0
+    while i < len(lines):
+        if not lines[i].startswith("-> "):
+            raise NativeDecryptError("Malformed age header")
+        args = lines[i][3:].split(" ")
+        i += 1
+        body = ""
+        # The body is wrapped at 64 columns; a shorter line ends it.
+        while i < len(lines):
+            body += lines[i]
+            i += 1
+            if len(lines[i - 1]) < 64:
+                break
+        stanzas.append((args, _b64_raw(body)))
+
+    file_key = _unwrap_file_key(stanzas, identities)
+    if not mac_line.startswith("--- "):
+        raise NativeDecryptError("Malformed age header")
+    expected = hmac.new(_hkdf(file_key, b"", b"header"), header, hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, _b64_raw(mac_line[4:])):
+        raise NativeDecryptError("age header MAC mismatch")
+
+    nonce, ciphertext = payload[:16], payload[16:]
+    if len(nonce) != 16:
+        raise NativeDecryptError("Truncated age payload")
+    aead = ChaCha20Poly1305(_hkdf(file_key, nonce, b"payload"))
+    chunk = _AGE_CHUNK + 16
+    out = bytearray()
+    counter = 0
+    while True:
+        block, ciphertext = ciphertext[:chunk], ciphertext[chunk:]
+        last = not ciphertext
+        try:
+            out += aead.decrypt(counter.to_bytes(11, "big") + (b"\x01" if last else b"\x00"), block, None)
+        except InvalidTag:
+            raise NativeDecryptError("age payload authentication failed") from None
+        if last:
+            return bytes(out)
+        counter += 1
+
+
+# ---------------------------------------------------------------------------
+# SOPS
+# ---------------------------------------------------------------------------
+
+# libyaml when PyYAML was built with it: the same documents, parsed (and the
+# decrypted tree emitted) in C -- what a load of a large store spends its time on.
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+class _SopsLoader(_SafeLoader):
+    """SafeLoader that keeps timestamps as strings.
+
+    ``lastmodified`` is the MAC's associated data byte for byte, and values a
+    user wrote as dates must round-trip as SOPS (YAML 1.2) reads them.
+    """
+
+
+_SopsLoader.yaml_implicit_resolvers = {
+    first: [(tag, regexp) for tag, regexp in resolvers if tag != "tag:yaml.org,2002:timestamp"]
+    for first, resolvers in yaml.SafeLoader.yaml_implicit_resolvers.items()
+}
+
+
+class _SopsDumper(yaml.SafeDumper):
+    """SafeDumper laid out like SOPS' own output: 4-space indents, indented
+    sequences, and multi-line strings (the age stanzas) as literal blocks."""
+
+    def increase_indent(self, flow=False, indentless=False):
+        return super().increase_indent(flow, False)
+
+
+def _represent_str(dumper: yaml.SafeDumper, value: str):
+    style = "|" if "\n" in value else None
+    return dumper.represent_scalar("tag:yaml.org,2002:str", value, style=style)
+
+
+_SopsDumper.add_representer(str, _represent_str)
+
+
+class _SopsBodyDumper(_SafeDumper):
+    """_SopsDumper's layout without its sequence indents, in C when available.
+
+    Only for a body holding no sequence, where the two lay out the same: the
+    one difference, increase_indent(), cannot be overridden in libyaml. (libyaml
+    may fold a long double-quoted string at another column; same value.)
+    """
+
+
+_SopsBodyDumper.add_representer(str, _represent_str)
+
+
+def _has_sequence(node) -> bool:
+    if isinstance(node, dict):
+        return any(_has_sequence(value) for value in node.values())
+    return isinstance(node, list)
+
+
+def _dump_document(body: dict, metadata: dict) -> str:
+    """SOPS YAML of *body* and its *metadata*, as update_text() writes it.
+
+    Emitting is most of an update's cost, all of it in the encrypted values:
+    a body without sequences goes through _SopsBodyDumper, the metadata (age
+    stanzas are a sequence) through _SopsDumper.
+    """
+    options = dict(indent=4, sort_keys=False, allow_unicode=True, default_flow_style=False)
+    if body and not _has_sequence(body):
+        return (yaml.dump(body, Dumper=_SopsBodyDumper, **options)
+                + yaml.dump({"sops": metadata}, Dumper=_SopsDumper, **options))
+    return yaml.dump({**body, "sops": metadata}, Dumper=_SopsDumper, **options)
+
+
+def _go_float(value: float) -> str:
+    """strconv.FormatFloat(value, 'f', -1, 64): shortest digits, no exponent."""
+    from decimal import Decimal
+    text = format(Decimal(repr(value)), "f")
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _mac_bytes(value) -> bytes:
+    """sops.ToBytes for a value SOPS left in clear."""
+    if isinstance(value, bool):
+        return b"True" if value else b"False"
+    if isinstance(value, int):
+        return str(value).encode()
+    if isinstance(value, float):
+        return _go_float(value).encode()
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    if value is None:
+        return b""
+    raise NativeUnsupported(f"Unsupported value type {type(value).__name__}")
+
+
+def _aes_gcm_open(leaf: re.Match, key: bytes, aad: str) -> bytes:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    try:
+        data = base64.b64decode(leaf["data"], validate=True)
+        iv = base64.b64decode(leaf["iv"], validate=True)
+        tag = base64.b64decode(leaf["tag"], validate=True)
+        return AESGCM(key).decrypt(iv, data + tag, aad.encode("utf-8"))
+    except (InvalidTag, ValueError):
+        raise NativeDecryptError("Could not decrypt value") from None
+
+
+def _open_leaf(leaf: re.Match, key: bytes, aad: str) -> tuple[object, bytes]:
+    """Decrypt one leaf; returns its typed value and its MAC contribution.
+
+    SOPS encrypts the same string ToBytes hashes (strconv formatting), except
+    for booleans: stored as ``true``, hashed as ``True``.
+    """
+    plaintext = _aes_gcm_open(leaf, key, aad)
+    text = plaintext.decode("utf-8")
+    kind = leaf["type"]
+    if kind == "str":
+        return text, plaintext
+    if kind == "int":
+        return int(text), plaintext
+    if kind == "float":
+        return float(text), plaintext
+    if kind == "bool":
+        value = text.lower() in ("true", "t", "1")
+        return value, _mac_bytes(value)
+    if kind == "time":
+        # RFC 3339, as `sops -d` prints it: let YAML read it back the same way.
+        return yaml.safe_load(text), plaintext
+    if kind == "bytes":
+        return plaintext, plaintext
+    if kind == "comment":
+        return _COMMENT, b""
+    raise NativeUnsupported(f"Unsupported SOPS value type {kind}")
+
+
+class _Rules:
+    """Which key paths SOPS encrypted (Metadata suffixes and regexes)."""
+
+    def __init__(self, metadata: dict) -> None:
+        self.unencrypted_suffix = metadata.get("unencrypted_suffix") or ""
+        self.encrypted_suffix = metadata.get("encrypted_suffix") or ""
+        self.unencrypted_regex = metadata.get("unencrypted_regex") or ""
+        self.encrypted_regex = metadata.get("encrypted_regex") or ""
+
+    def encrypted(self, path: list[str]) -> bool:
+        encrypted = True
+        if self.unencrypted_suffix and any(p.endswith(self.unencrypted_suffix) for p in path):
+            encrypted = False
+        if self.encrypted_suffix:
+            encrypted = any(p.endswith(self.encrypted_suffix) for p in path)
+        if self.unencrypted_regex and any(re.search(self.unencrypted_regex, p) for p in path):
+            encrypted = False
+        if self.encrypted_regex:
+            encrypted = any(re.search(self.encrypted_regex, p) for p in path)
+        return encrypted
+
+
+def decrypt_tree(document: dict, data_key: bytes) -> dict:
+    """Decrypt the values of a parsed SOPS document and verify its MAC."""
+    metadata = document.get("sops")
+    if not isinstance(metadata, dict):
+        raise NativeDecryptError("Not a SOPS file (no sops metadata)")
+    rules = _Rules(metadata)
+    mac = hashlib.sha512()
+
+    def walk(node, path: list[str]):
+        if isinstance(node, dict):
+            out = {}
+            for key, value in node.items():
+                if not isinstance(key, str):
+                    raise NativeUnsupported("Non-string mapping key")
+                out[key] = walk(value, path + [key])
+            return out
+        if isinstance(node, list):
+            items = [walk(item, path) for item in node]
+            return [item for item in items if item is not _COMMENT]
+        # Empty strings and nulls are never encrypted.
+        if rules.encrypted(path) and isinstance(node, str) and node:
+            leaf = _ENC_LEAF.match(node)
+            if leaf is None:
+                raise NativeDecryptError(f"Value at {':'.join(path)} is not encrypted")
+            value, digest_input = _open_leaf(leaf, data_key, ":".join(path) + ":")
+        else:
+            value, digest_input = node, _mac_bytes(node)
+        mac.update(digest_input)
+        return value
+
+    tree = walk({k: v for k, v in document.items() if k != "sops"}, [])
+
+    stored = _ENC_LEAF.match(str(metadata.get("mac", "")))
+    if stored is None:
+        raise NativeDecryptError("Missing or malformed SOPS MAC")
+    expected = _aes_gcm_open(stored, data_key, str(metadata.get("lastmodified", ""))).decode()
+    if not hmac.compare_digest(expected.upper(), mac.hexdigest().upper()):
+        raise NativeUnsupported("MAC mismatch")
+    return tree
+
+
+def decrypt_file(path: Path, identities: list[bytes]) -> dict:
+    """Decrypt a SOPS YAML file encrypted for one of *identities*."""
+    path = Path(path)
+    if path.suffix not in (".yaml", ".yml"):
+        raise NativeUnsupported("Only YAML files are decrypted natively")
+    return decrypt_text(path.read_text(encoding="utf-8"), identities)
+
+
+def decrypt_text(text: str, identities: list[bytes]) -> dict:
+    """Decrypt SOPS YAML *text* (a file's content) for one of *identities*."""
+    document, data_key = _open_document(text, identities)
+    return decrypt_tree(document, data_key)
+
+
+def _open_document(text: str, identities: list[bytes]) -> tuple[dict, bytes]:
+    """Parse SOPS YAML *text* and unwrap its data key with one of *identities*."""
+    try:
+        document = yaml.load(text, Loader=_SopsLoader)
+    except yaml.YAMLError:
+        raise NativeDecryptError("Not a valid YAML file") from None
+    if not isinstance(document, dict) or not isinstance(document.get("sops"), dict):
+        raise NativeDecryptError("Not a SOPS file (no sops metadata)")
+    metadata = document["sops"]
+    if any(metadata.get(key) for key in _UNSUPPORTED_METADATA) or metadata.get("key_groups"):
+        raise NativeUnsupported("Unsupported SOPS metadata (key groups, Shamir, comment rules)")
+    recipients = metadata.get("age") or []
+    if not recipients:
+        raise NativeUnsupported("No age recipient")
+    for recipient in recipients:
+        try:
+            data_key = decrypt_age(recipient.get("enc", ""), identities)
+        except NativeKeyError:
+            continue
+        if len(data_key) != 32:
+            raise NativeDecryptError("Unexpected SOPS data key length")
+        return document, data_key
+    raise NativeKeyError("no identity matched any of the recipients")
+
+
+# ---------------------------------------------------------------------------
+# Targeted updates (`sops set`, under the existing data key)
+# ---------------------------------------------------------------------------
+
+def _seal_leaf(value, key: bytes, aad: str) -> tuple[str, bytes]:
+    """Encrypt one value as SOPS does; returns the ENC[] string and its MAC input."""
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    if isinstance(value, bool):
+        kind, plaintext = "bool", b"true" if value else b"false"
+    elif isinstance(value, int):
+        kind, plaintext = "int", str(value).encode()
+    elif isinstance(value, float):
+        kind, plaintext = "float", _go_float(value).encode()
+    elif isinstance(value, str):
+        kind, plaintext = "str", value.encode("utf-8")
+    else:
+        # Dates and binary values have SOPS types of their own; leave those
+        # documents to the binary rather than guess at its encoding.
+        raise NativeUnsupported(f"Unsupported value type {type(value).__name__}")
+    iv = os.urandom(32)
+    sealed = AESGCM(key).encrypt(iv, plaintext, aad.encode("utf-8"))
+    b64 = lambda raw: base64.b64encode(raw).decode()  # noqa: E731
+    leaf = (f"ENC[AES256_GCM,data:{b64(sealed[:-16])},iv:{b64(iv)},"
+            f"tag:{b64(sealed[-16:])},type:{kind}]")
+    return leaf, _mac_bytes(value)
+
+
+def _lastmodified() -> str:
+    """time.Now().UTC().Format(time.RFC3339), as SOPS stamps a write."""
+    from datetime import datetime, timezone
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def update_text(text: str, tree: dict, identities: list[bytes]) -> str:
+    """Return SOPS YAML *text* rewritten to hold *tree*, like ``sops set``.
+
+    The data key, the recipients and the ciphertext of every value that is
+    unchanged (same key path, same value and type) are kept byte for byte;
+    only new or changed values are encrypted, then the MAC and
+    ``lastmodified`` are renewed. The old MAC is verified first, so a
+    tampered file is never silently re-signed. Comments are not carried over.
+    """
+    document, data_key = _open_document(text, identities)
+    old_tree = decrypt_tree(document, data_key)
+    metadata = document["sops"]
+    rules = _Rules(metadata)
+    mac = hashlib.sha512()
+    _MISSING = object()
+
+    def walk(node, old_enc, old_plain, path: list[str]):
+        if isinstance(node, dict):
+            same = isinstance(old_enc, dict) and isinstance(old_plain, dict)
+            out = {}
+            for key, value in node.items():
+                if not isinstance(key, str) or key == "sops" and not path:
+                    raise NativeUnsupported("Unsupported mapping key")
+                out[key] = walk(
+                    value,
+                    old_enc.get(key, _MISSING) if same else _MISSING,
+                    old_plain.get(key, _MISSING) if same else _MISSING,
+                    path + [key],
+                )
+            return out
+        if isinstance(node, list):
+            if isinstance(old_enc, list):
+                # Stored comments are items too, but not in the decrypted tree.
+                old_enc = [item for item in old_enc
+                           if not (isinstance(item, str) and item.endswith(",type:comment]"))]
+            same = (isinstance(old_enc, list) and isinstance(old_plain, list)
+                    and len(old_enc) == len(old_plain))
+            return [
+                walk(item,
+                     old_enc[i] if same and i < len(old_enc) else _MISSING,
+                     old_plain[i] if same and i < len(old_plain) else _MISSING,
+                     path)
+                for i, item in enumerate(node)
+            ]
+        if rules.encrypted(path) and node is not None and node != "":
+            aad = ":".join(path) + ":"
+            kept = _ENC_LEAF.match(old_enc) if isinstance(old_enc, str) else None
+            if (kept is not None and old_plain is not _MISSING
+                    and type(old_plain) is type(node) and old_plain == node):
+                # Its MAC input as decrypt_tree hashed it (dates included).
+                mac.update(_open_leaf(kept, data_key, aad)[1])
+                return old_enc
+            leaf, digest_input = _seal_leaf(node, data_key, aad)
+            mac.update(digest_input)
+            return leaf
+        mac.update(_mac_bytes(node))
+        return node
+
+    if not isinstance(tree, dict):
+        raise NativeUnsupported("Top-level value is not a mapping")
+    body = walk(tree, {k: v for k, v in document.items() if k != "sops"}, old_tree, [])
+
+    lastmodified = _lastmodified()
+    metadata["lastmodified"] = lastmodified
+    metadata["mac"], _ = _seal_leaf(mac.hexdigest().upper(), data_key, lastmodified)
+    return _dump_document(body, metadata)
+
+
+class NativeSopsRunner:
+    """A SopsClient ``_runner`` serving ``sops -d <file>`` in process.
+
+    The stdin form SopsClient.decrypt_bytes uses (``sops decrypt
+    --filename-override <name>`` with the ciphertext as *input*) is served the
+    same way.
+
+    Every other command, and every file the engine declines or fails on, goes
+    to *fallback* (normally SopsClient's subprocess runner), so the binary
+    stays the reference: the native path can only be faster, never stricter.
+    Only when the binary is missing is a native failure reported as such,
+    the way sops itself would report it.
+    """
+
+    def __init__(self, age_key_file: Path,
+                 fallback: Callable[..., subprocess.CompletedProcess]) -> None:
+        self.age_key_file = Path(age_key_file)
+        self.fallback = fallback
+        self._identities: list[bytes] | None = None
+
+    def __call__(self, cmd: list[str], **kwargs) -> subprocess.CompletedProcess:
+        if len(cmd) == 3 and cmd[:2] == ["sops", "-d"]:
+            name, read = cmd[2], lambda: Path(cmd[2]).read_text(encoding="utf-8")
+        elif len(cmd) == 4 and cmd[:3] == ["sops", "decrypt", "--filename-override"] \
+                and kwargs.get("input") is not None:
+            name, read = cmd[3], lambda: kwargs["input"]
+        else:
+            return self.fallback(cmd, **kwargs)
+        try:
+            if Path(name).suffix not in (".yaml", ".yml"):
+                raise NativeUnsupported("Only YAML files are decrypted natively")
+            if self._identities is None:
+                self._identities = load_identities(self.age_key_file)
+            tree = decrypt_text(read(), self._identities)
+        except (NativeDecryptError, OSError, UnicodeDecodeError, ValueError) as e:
+            logger.debug("Native SOPS decryption of %s declined: %s", name, e)
+            return self._fall_back(cmd, e, **kwargs)
+        stdout = yaml.dump(tree, Dumper=_SafeDumper, sort_keys=False, allow_unicode=True,
+                           default_flow_style=False)
+        return subprocess.CompletedProcess(cmd, 0, stdout, "")
+
+    def update(self, text: str, tree: dict) -> str:
+        """update_text() with this runner's identities; raises NativeDecryptError
+        (or NativeUnsupported) when the caller must fall back to the binary."""
+        if self._identities is None:
+            self._identities = load_identities(self.age_key_file)
+        return update_text(text, tree, self._identities)
+
+    def _fall_back(self, cmd: list[str], error: Exception, **kwargs) -> subprocess.CompletedProcess:
+        from Scripts.security.sops_client import SopsBinaryNotFoundError
+        try:
+            return self.fallback(cmd, **kwargs)
+        except SopsBinaryNotFoundError:
+            if not isinstance(error, NativeDecryptError) or isinstance(error, NativeUnsupported):
+                raise
+            return subprocess.CompletedProcess(
+                cmd, error.returncode, "", f"Error decrypting file: could not decrypt: {error}",
+            )
@@ -21,6 +21,7 @@
 
 Provides a typed, testable interface over the SOPS binary, replacing the
 scattered subprocess.run("sops", ...) call sites throughout the codebase.
+AsyncSopsClient is the same interface for asyncio code.
 
 Exception hierarchy
 -------------------
@@ -37,17 +38,38 @@ logging and debugging without accidentally leaking it in user-facing messages.
 """
 from __future__ import annotations
 
+import asyncio
+import atexit
+import hashlib
+import json
 import logging
 import os
 import subprocess
 import tempfile
-from collections.abc import Callable
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import yaml
 
 logger = logging.getLogger(__name__)
 
+# libyaml when PyYAML was built with it (update_bytes parses a whole store).
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Concurrent sops processes for decrypt_many / encrypt_many. Each one is mostly
+# a Go runtime start and a little I/O, so a few more than the core count is
+# still a win; the cap keeps a big gitops/ tree from forking dozens at once.
+DEFAULT_MAX_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+
+# Bounds of the decrypted-content cache shared by every SopsClient. A command
+# touches a handful of small files (config.enc.yaml, the canonical store), so
+# these only matter against a runaway caller.
+DECRYPT_CACHE_ENTRIES = 32
+DECRYPT_CACHE_BYTES = 8 * 1024 * 1024
+
 
 # ---------------------------------------------------------------------------
 # Exception hierarchy
@@ -88,10 +110,115 @@ class SopsTimeoutError(SopsError):
     """Subprocess exceeded the configured timeout."""
 
 
+def _replace_file(path: Path, data: bytes) -> None:
+    """Atomically replace *path* with *data*, keeping its permission bits."""
+    fd, tmp_str = tempfile.mkstemp(dir=path.parent, suffix=".enc.yaml")
+    tmp = Path(tmp_str)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        tmp.chmod(path.stat().st_mode & 0o777)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
 # ---------------------------------------------------------------------------
 # SopsClient
 # ---------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------------
+# Decrypted-content cache
+# ---------------------------------------------------------------------------
+
+class _DecryptCache:
+    """Bounded LRU of decrypted file contents, shared by every SopsClient.
+
+    One command often decrypts the same file several times through separate
+    clients: ensure_security_initialized() checks config.enc.yaml is readable
+    and then SecureEnvLoader loads it, the canonical store is opened by more
+    than one helper. Entries are keyed by (absolute path, SHA-256 of the
+    ciphertext, fingerprint of the age key file), so a rewritten file or a
+    different key simply misses and nothing needs invalidating.
+
+    Plaintext is held in bytearrays that are overwritten with zeros when an
+    entry is evicted or replaced, on clear(), and at interpreter exit. The str
+    copies handed to callers are theirs and cannot be wiped.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str, str], bytearray] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: tuple[str, str, str]) -> str | None:
+        with self._lock:
+            buf = self._entries.get(key)
+            if buf is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return buf.decode("utf-8")
+
+    def put(self, key: tuple[str, str, str], plaintext: str) -> None:
+        buf = bytearray(plaintext.encode("utf-8"))
+        if len(buf) > self.max_bytes:
+            _wipe(buf)
+            return
+        with self._lock:
+            # One entry per path: an older ciphertext of the same file is stale.
+            for stale in [k for k in self._entries if k[0] == key[0]]:
+                self._discard(stale)
+            self._entries[key] = buf
+            self._size += len(buf)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._discard(key)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _discard(self, key: tuple[str, str, str]) -> None:
+        buf = self._entries.pop(key)
+        self._size -= len(buf)
+        _wipe(buf)
+
+
+def _wipe(buf: bytearray) -> None:
+    buf[:] = bytes(len(buf))
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("NOAH_SOPS_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+_decrypt_cache = _DecryptCache(DECRYPT_CACHE_ENTRIES, DECRYPT_CACHE_BYTES)
+atexit.register(_decrypt_cache.clear)
+
+
+def _digest(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
 class SopsClient:
     """Typed, testable wrapper around the SOPS binary.
 
@@ -106,7 +233,11 @@ class SopsClient:
     _runner:
         Optional callable used instead of subprocess.run, enabling unit tests
         without the SOPS binary. Must accept a list[str] and return a
-        subprocess.CompletedProcess.
+        subprocess.CompletedProcess; encrypt_bytes / decrypt_bytes also pass
+        the text to feed sops on stdin as an ``input`` keyword. When omitted,
+        ``sops -d`` is served in process by sops_age.NativeSopsRunner for the
+        age-encrypted YAML files it supports, and by the binary otherwise
+        (``NOAH_SOPS_NATIVE=0`` forces the binary).
     """
 
     def __init__(
@@ -114,16 +245,19 @@ class SopsClient:
         age_key_file: Path,
         sops_config: Path | None = None,
         timeout: int = 30,
-        _runner: Callable[[list[str]], subprocess.CompletedProcess] | None = None,
+        _runner: Callable[..., subprocess.CompletedProcess] | None = None,
     ) -> None:
         self.age_key_file = Path(age_key_file)
         self.sops_config = Path(sops_config) if sops_config else None
         self.timeout = timeout
-        self._run_fn = _runner or self._default_run
 
         # Validate at init time so failures surface immediately.
         if _runner is None:
             self._validate()
+            from Scripts.security.sops_age import NativeSopsRunner, native_enabled
+            if native_enabled():
+                _runner = NativeSopsRunner(self.age_key_file, fallback=self._default_run)
+        self._run_fn = _runner or self._default_run
 
     # ------------------------------------------------------------------
     # Context manager
@@ -172,9 +306,18 @@ class SopsClient:
         SopsKeyError
             If the Age key is unavailable.
         """
+        key = self._cache_key(path)
+        if key is not None:
+            cached = _decrypt_cache.get(key)
+            if cached is not None:
+                return cached
         result = self._run(["sops", "-d", str(path)])
         if result.returncode != 0:
             self._raise_for_decrypt_error(result.returncode, result.stderr)
+        # Only cache what sops actually read: the file may have been replaced
+        # while it ran.
+        if key is not None and _digest(path) == key[1]:
+            _decrypt_cache.put(key, result.stdout)
         return result.stdout
 
     def encrypt_in_place(self, path: Path) -> None:
@@ -241,28 +384,207 @@ class SopsClient:
                 detail=result.stderr,
             )
 
+    def encrypt_bytes(self, plaintext: bytes, filename_hint: str | Path) -> bytes:
+        """Encrypt *plaintext* in memory and return the ciphertext.
+
+        Nothing touches the disk: the content goes to ``sops encrypt`` on
+        stdin and comes back on stdout. *filename_hint* stands in for the file
+        name, both for the input format and for .sops.yaml creation_rules
+        matching, so pass the path the ciphertext will be written to.
+        Requires sops >= 3.9 (stdin with ``--filename-override``).
+
+        Raises
+        ------
+        SopsEncryptionError
+            If encryption fails.
+        """
+        result = self._run(
+            ["sops", "encrypt", "--filename-override", str(filename_hint)],
+            input=plaintext.decode("utf-8"),
+        )
+        if result.returncode != 0:
+            raise SopsEncryptionError(
+                f"SOPS encryption failed for {Path(filename_hint).name}",
+                detail=result.stderr,
+            )
+        return result.stdout.encode("utf-8")
+
+    def decrypt_bytes(self, ciphertext: bytes, filename_hint: str | Path) -> bytes:
+        """Decrypt *ciphertext* in memory and return the plaintext.
+
+        The counterpart of encrypt_bytes, for content that is not (or not yet)
+        on disk. *filename_hint* selects the input format.
+
+        Raises
+        ------
+        SopsDecryptionError
+            If decryption fails.
+        SopsKeyError
+            If the Age key is unavailable.
+        """
+        result = self._run(
+            ["sops", "decrypt", "--filename-override", str(filename_hint)],
+            input=ciphertext.decode("utf-8"),
+        )
+        if result.returncode != 0:
+            self._raise_for_decrypt_error(result.returncode, result.stderr)
+        return result.stdout.encode("utf-8")
+
+    def update_bytes(
+        self, ciphertext: bytes, plaintext: bytes, filename_hint: str | Path
+    ) -> bytes:
+        """Return *ciphertext* rewritten to hold *plaintext* (YAML), like ``sops set``.
+
+        Only the values that changed are re-encrypted, under the document's
+        existing data key, and the MAC is renewed: no new data key and no
+        re-encryption of the rest. This is served in process for the files
+        sops_age supports. Anything else, including ``NOAH_SOPS_NATIVE=0`` or
+        a key that cannot open *ciphertext*, gets a full encrypt_bytes: a
+        fresh data key and the recipients of the current .sops.yaml. That
+        full path is also the one to call directly to re-key.
+
+        Raises
+        ------
+        SopsEncryptionError
+            If the full re-encryption fallback fails.
+        """
+        update = getattr(self._run_fn, "update", None)
+        if update is not None and Path(filename_hint).suffix in (".yaml", ".yml"):
+            from Scripts.security.sops_age import NativeDecryptError
+            try:
+                tree = yaml.load(plaintext.decode("utf-8"), Loader=_SafeLoader)
+                return update(ciphertext.decode("utf-8"), tree).encode("utf-8")
+            except (NativeDecryptError, OSError, UnicodeDecodeError, ValueError,
+                    yaml.YAMLError) as e:
+                logger.debug("In-process update of %s declined: %s", Path(filename_hint).name, e)
+        return self.encrypt_bytes(plaintext, filename_hint)
+
+    def set_value(self, path: Path, key_path: Iterable[str | int], value) -> None:
+        """Set one value of an encrypted file in place (``sops set``).
+
+        *key_path* addresses the value, e.g. ``("services", "authentik",
+        "secret_key", "value")``. Intermediate mappings are created as needed.
+        The data key is kept and only that value and the MAC are
+        re-encrypted. Without the in-process engine, the binary's own
+        ``sops set`` does the same job.
+
+        Raises
+        ------
+        SopsDecryptionError / SopsKeyError
+            If the file cannot be decrypted.
+        SopsEncryptionError
+            If the update fails.
+        """
+        path = Path(path)
+        key_path = list(key_path)
+        if not key_path:
+            raise ValueError("key_path must name at least one key")
+        if getattr(self._run_fn, "update", None) is None:
+            index = "".join(f"[{json.dumps(k)}]" for k in key_path)
+            result = self._run(["sops", "set", str(path), index, json.dumps(value)])
+            if result.returncode != 0:
+                raise SopsEncryptionError(
+                    f"SOPS set failed for {path.name}", detail=result.stderr,
+                )
+            return
+
+        ciphertext = path.read_bytes()
+        tree = yaml.safe_load(self.decrypt_to_string(path)) or {}
+        node = tree
+        for key in key_path[:-1]:
+            node = node.setdefault(key, {}) if isinstance(node, dict) else node[key]
+        node[key_path[-1]] = value
+        plaintext = yaml.safe_dump(tree, sort_keys=False, allow_unicode=True).encode("utf-8")
+        _replace_file(path, self.update_bytes(ciphertext, plaintext, path))
+
+    def decrypt_many(
+        self, paths: Iterable[Path], max_workers: int | None = None
+    ) -> dict[Path, str | SopsError]:
+        """Decrypt several files concurrently, at most *max_workers* at a time.
+
+        Returns one entry per path, in input order: the decrypted content, or
+        the typed SopsError decrypt_to_string raised for that file, so one bad
+        file does not hide the others' results. Anything that is not a
+        SopsError still propagates.
+        """
+        return self._map(self.decrypt_to_string, paths, max_workers)
+
+    def encrypt_many(
+        self, paths: Iterable[Path], max_workers: int | None = None
+    ) -> dict[Path, SopsError | None]:
+        """Run encrypt_in_place on several files concurrently.
+
+        Returns one entry per path, in input order: None once that file is
+        encrypted, or the SopsEncryptionError raised for it.
+        """
+        def encrypt(path: Path) -> None:
+            self.encrypt_in_place(path)
+
+        return self._map(encrypt, paths, max_workers)
+
+    def encrypt_bytes_many(
+        self, contents: dict[Path, bytes], max_workers: int | None = None
+    ) -> dict[Path, bytes | SopsError]:
+        """Run encrypt_bytes on several plaintexts concurrently.
+
+        *contents* maps each destination path (the filename hint) to its
+        plaintext. Returns one entry per path, in input order: the ciphertext,
+        or the SopsEncryptionError raised for it. Nothing is written.
+        """
+        contents = {Path(p): data for p, data in contents.items()}
+
+        def encrypt(path: Path) -> bytes:
+            return self.encrypt_bytes(contents[path], path)
+
+        return self._map(encrypt, contents, max_workers)
+
     @staticmethod
     def is_available() -> bool:
         """Return True if the sops binary is present in PATH.
 
         Never raises -- intended for conditional checks such as
-        ``_should_encrypt()``.
+        ``_should_encrypt()``. Served by the toolchain registry, so
+        ``sops --version`` runs once per installed binary, not once per call.
         """
         try:
-            result = subprocess.run(
-                ["sops", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
-            return result.returncode == 0
+            from Scripts.utils import toolchain
+            return toolchain.is_available("sops")
         except Exception:
             return False
 
+    @staticmethod
+    def cache_stats() -> dict[str, int]:
+        """Hit/miss/eviction counters and current size of the decrypt cache."""
+        return _decrypt_cache.stats()
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop (and zero) every decrypted content held by the process."""
+        _decrypt_cache.clear()
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _cache_key(self, path: Path) -> tuple[str, str, str] | None:
+        """Key of *path* in the decrypt cache, or None when it must not be cached.
+
+        The age key is part of the key so that a rotated key (or a client
+        pointed at another one) re-proves it can decrypt the file. An
+        unreadable key file or ciphertext means no caching, and lets sops
+        report the error.
+        """
+        if not cache_enabled():
+            return None
+        try:
+            key_fingerprint = hashlib.sha256(self.age_key_file.read_bytes()).hexdigest()
+        except OSError:
+            return None
+        digest = _digest(path)
+        if digest is None:
+            return None
+        return (str(Path(path).resolve()), digest, key_fingerprint)
+
     def _validate(self) -> None:
         """Raise early if the Age key is missing or unreadable."""
         if not self.age_key_file.exists():
@@ -288,11 +610,12 @@ class SopsClient:
             env["SOPS_CONFIG"] = str(self.sops_config)
         return env
 
-    def _default_run(self, cmd: list[str]) -> subprocess.CompletedProcess:
+    def _default_run(self, cmd: list[str], input: str | None = None) -> subprocess.CompletedProcess:
         """Execute *cmd* with timeout and environment injection."""
         try:
             return subprocess.run(
                 cmd,
+                input=input,
                 capture_output=True,
                 text=True,
                 env=self._build_env(),
@@ -310,9 +633,36 @@ class SopsClient:
                 detail="",
             ) from exc
 
-    def _run(self, cmd: list[str]) -> subprocess.CompletedProcess:
-        """Dispatch to either the injected runner or the real subprocess."""
-        return self._run_fn(cmd)
+    def _map(self, operation: Callable[[Path], object], paths: Iterable[Path],
+             max_workers: int | None) -> dict:
+        """Apply *operation* to every path through a bounded thread pool.
+
+        Threads are enough: each worker spends its time waiting on a sops
+        process (or in cryptography, which releases the GIL).
+        """
+        paths = [Path(p) for p in paths]
+
+        def attempt(path: Path):
+            try:
+                return operation(path)
+            except SopsError as exc:
+                return exc
+
+        workers = min(len(paths), max_workers or DEFAULT_MAX_WORKERS)
+        if workers <= 1:
+            return {path: attempt(path) for path in paths}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sops") as pool:
+            return dict(zip(paths, pool.map(attempt, paths)))
+
+    def _run(self, cmd: list[str], input: str | None = None) -> subprocess.CompletedProcess:
+        """Dispatch to either the injected runner or the real subprocess.
+
+        *input* is only passed on when given, so runners written for the
+        file-based commands keep their one-argument signature.
+        """
+        if input is None:
+            return self._run_fn(cmd)
+        return self._run_fn(cmd, input=input)
 
     def _raise_for_decrypt_error(self, returncode: int, stderr: str) -> None:
         """Map a non-zero returncode + stderr to a typed exception.
@@ -359,3 +709,178 @@ class SopsClient:
             f"SOPS exited with unexpected code {returncode}",
             detail=stderr,
         )
+
+
+# ---------------------------------------------------------------------------
+# asyncio
+# ---------------------------------------------------------------------------
+
+class _Declined(Exception):
+    """Raised by AsyncSopsClient's native-runner fallback: the engine passed
+    on the file, so the caller awaits the binary instead."""
+
+
+def _decline(cmd: list[str], **kwargs) -> subprocess.CompletedProcess:
+    raise _Declined()
+
+
+class AsyncSopsClient:
+    """SopsClient for asyncio code, on asyncio.create_subprocess_exec.
+
+    Same methods (as coroutines), same exception mapping, same timeout, same
+    process-wide decrypt cache and in-process decryption of age-encrypted
+    YAML (run in a worker thread). At most *max_concurrency* sops processes
+    run at once per client, however many coroutines await it, so callers can
+    gather() freely.
+
+    Parameters
+    ----------
+    age_key_file, sops_config, timeout:
+        As for SopsClient.
+    max_concurrency:
+        Cap on concurrent sops processes (default: DEFAULT_MAX_WORKERS).
+    _runner:
+        Optional coroutine function used instead of the subprocess. Receives
+        the argv and an ``input`` keyword (str or None) and returns a
+        subprocess.CompletedProcess.
+    """
+
+    def __init__(
+        self,
+        age_key_file: Path,
+        sops_config: Path | None = None,
+        timeout: int = 30,
+        max_concurrency: int | None = None,
+        _runner: Callable[..., Awaitable[subprocess.CompletedProcess]] | None = None,
+    ) -> None:
+        # The sync client validates the key and owns the environment, the
+        # error mapping and the cache key; only the process handling differs.
+        self._sync = SopsClient(age_key_file, sops_config, timeout,
+                                _runner=_decline if _runner is not None else None)
+        self.age_key_file = self._sync.age_key_file
+        self.sops_config = self._sync.sops_config
+        self.timeout = timeout
+        self._native = None
+        if _runner is None:
+            from Scripts.security.sops_age import NativeSopsRunner, native_enabled
+            if native_enabled():
+                self._native = NativeSopsRunner(self.age_key_file, fallback=_decline)
+        self._run_fn = _runner or self._default_run
+        self._semaphore = asyncio.Semaphore(max_concurrency or DEFAULT_MAX_WORKERS)
+
+    async def __aenter__(self) -> AsyncSopsClient:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> bool:
+        return self._sync.__exit__(exc_type, exc_val, exc_tb)
+
+    # ------------------------------------------------------------------
+    # Public methods
+    # ------------------------------------------------------------------
+
+    async def decrypt_yaml(self, path: Path) -> dict:
+        """Async SopsClient.decrypt_yaml."""
+        raw = await self.decrypt_to_string(path)
+        return yaml.safe_load(raw) or {}
+
+    async def decrypt_to_string(self, path: Path) -> str:
+        """Async SopsClient.decrypt_to_string."""
+        key = self._sync._cache_key(path)
+        if key is not None:
+            cached = _decrypt_cache.get(key)
+            if cached is not None:
+                return cached
+        result = await self._run(["sops", "-d", str(path)])
+        if result.returncode != 0:
+            self._sync._raise_for_decrypt_error(result.returncode, result.stderr)
+        if key is not None and _digest(path) == key[1]:
+            _decrypt_cache.put(key, result.stdout)
+        return result.stdout
+
+    async def encrypt_in_place(self, path: Path) -> None:
+        """Async SopsClient.encrypt_in_place: same temp file + atomic rename."""
+        path = Path(path)
+        tmp_path: Path | None = None
+        try:
+            fd, tmp_str = tempfile.mkstemp(dir=path.parent, suffix=".enc.yaml")
+            tmp_path = Path(tmp_str)
+            os.close(fd)
+            tmp_path.write_bytes(path.read_bytes())
+
+            result = await self._run(["sops", "-e", "--in-place", str(tmp_path)])
+            if result.returncode != 0:
+                raise SopsEncryptionError(
+                    f"SOPS encryption failed for {path.name}",
+                    detail=result.stderr,
+                )
+
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except SopsError:
+            raise
+        except Exception as exc:
+            raise SopsEncryptionError(
+                f"Unexpected error during encryption of {path.name}: {exc}",
+                detail="",
+            ) from exc
+        finally:
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+
+    async def encrypt_to(self, source: Path, destination: Path) -> None:
+        """Async SopsClient.encrypt_to."""
+        result = await self._run(
+            ["sops", "--encrypt", "--output", str(destination), str(source)]
+        )
+        if result.returncode != 0:
+            raise SopsEncryptionError(
+                f"SOPS encryption failed: {source.name} -> {destination.name}",
+                detail=result.stderr,
+            )
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    async def _run(self, cmd: list[str], input: str | None = None) -> subprocess.CompletedProcess:
+        if self._native is not None and cmd[:2] == ["sops", "-d"]:
+            try:
+                return await asyncio.to_thread(self._native, cmd)
+            except _Declined:
+                pass
+        async with self._semaphore:
+            return await self._run_fn(cmd, input=input)
+
+    async def _default_run(self, cmd: list[str], input: str | None = None) -> subprocess.CompletedProcess:
+        """Run *cmd* as a child process, killing it after the timeout."""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self._sync._build_env(),
+            )
+        except FileNotFoundError as exc:
+            raise SopsBinaryNotFoundError(
+                "SOPS binary not found in PATH. "
+                "Install via: https://github.com/getsops/sops",
+                detail="",
+            ) from exc
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(input.encode("utf-8") if input is not None else None),
+                timeout=self.timeout,
+            )
+        except asyncio.TimeoutError as exc:
+            proc.kill()
+            await proc.wait()
+            raise SopsTimeoutError(
+                f"SOPS command timed out after {self.timeout}s: {cmd}",
+                detail="",
+            ) from exc
+        return subprocess.CompletedProcess(
+            cmd, proc.returncode,
+            stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace"),
+        )
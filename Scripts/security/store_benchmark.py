@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+NOAH canonical store benchmark
+
+Times the canonical store on a synthetic store of N keys, in each on-disk
+format, from the repository root:
+
+    python3 -m Scripts.security.store_benchmark [--keys 5000] [--runs 3]
+
+  v2 PyYAML     schema v2 parsed and emitted by PyYAML's pure-Python classes
+  v2 libyaml    schema v2 through the libyaml C classes (the default when built)
+  v3 JSON       schema v3: one compact JSON payload (NOAH_CANONICAL_FORMAT=json)
+
+save writes the whole store, update changes one value and saves, load opens
+a fresh store with the decrypt cache cleared. Encrypted with the repository's
+Age key (or AGE_KEY_FILE) when sops is available, in plaintext otherwise. The
+stores live in a temporary directory; nothing under Secrets/ is touched.
+"""
+
+import argparse
+import copy
+import os
+import secrets
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import yaml
+
+from Scripts.security import canonical_store
+from Scripts.security.canonical_store import (
+    CURRENT_SCHEMA_VERSION,
+    JSON_SCHEMA_VERSION,
+    CanonicalSecretsStore,
+)
+from Scripts.security.sops_client import SopsClient
+
+KEYS_PER_SERVICE = 5
+
+
+def synthetic_services(keys: int) -> dict:
+    """*keys* v2 entries, KEYS_PER_SERVICE per service."""
+    services: dict = {}
+    for i in range(keys):
+        service = services.setdefault(f"service-{i // KEYS_PER_SERVICE:04d}", {})
+        service[f"key_{i % KEYS_PER_SERVICE}"] = {
+            "value": secrets.token_urlsafe(32),
+            "version": 1,
+            "rotated_at": "2026-01-01T00:00:00.000000+00:00",
+        }
+    return services
+
+
+def _prepare_root(root: Path, repo: Path) -> None:
+    """Point the temporary project at the repository's Age key, if it has one."""
+    key_file = Path(os.environ.get("AGE_KEY_FILE") or repo / "Age" / "keys.txt")
+    if not key_file.exists():
+        return
+    os.environ["AGE_KEY_FILE"] = str(key_file)
+    recipient = next((line.split(":", 1)[1].strip() for line in key_file.read_text().splitlines()
+                      if line.startswith("# public key:")), None)
+    if recipient:
+        (root / ".sops.yaml").write_text(
+            f"creation_rules:\n  - path_regex: \\.enc\\.yaml$\n    age: {recipient}\n"
+        )
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_format(root: Path, services: dict, version: int, runs: int) -> dict[str, float]:
+    """Median milliseconds of save / update / load, and the file size in KiB."""
+    saves, updates, loads = [], [], []
+    for _ in range(runs):
+        store = CanonicalSecretsStore(project_root=root)
+        store.data = {"version": version, "services": copy.deepcopy(services)}
+        saves.append(_timed(lambda: store.save(rekey=True)))
+        store.data["services"]["service-0000"]["key_0"]["value"] = secrets.token_urlsafe(32)
+        updates.append(_timed(store.save))
+        SopsClient.clear_cache()
+        loads.append(_timed(lambda: CanonicalSecretsStore(project_root=root).load()))
+    path = CanonicalSecretsStore(project_root=root)._active_path()
+    return {
+        "save": statistics.median(saves),
+        "update": statistics.median(updates),
+        "load": statistics.median(loads),
+        "KiB": path.stat().st_size / 1024,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keys", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    repo = Path.cwd()
+    if not (repo / "noah.py").exists():
+        print("Run from the NOAH repository root.", file=sys.stderr)
+        return 1
+
+    services = synthetic_services(args.keys)
+    rows = [
+        ("v2 PyYAML", CURRENT_SCHEMA_VERSION, "yaml", yaml.SafeLoader, yaml.SafeDumper),
+        ("v2 libyaml", CURRENT_SCHEMA_VERSION, "yaml", canonical_store._YAML_LOADER, canonical_store._YAML_DUMPER),
+        ("v3 JSON", JSON_SCHEMA_VERSION, "json", canonical_store._YAML_LOADER, canonical_store._YAML_DUMPER),
+    ]
+    saved_env = {k: os.environ.get(k) for k in ("AGE_KEY_FILE", "NOAH_CANONICAL_FORMAT")}
+    loader, dumper = canonical_store._YAML_LOADER, canonical_store._YAML_DUMPER
+    try:
+        with tempfile.TemporaryDirectory(prefix="noah-store-bench-") as tmp:
+            root = Path(tmp)
+            _prepare_root(root, repo)
+            # sops looks for .sops.yaml from the working directory up.
+            os.chdir(root)
+            mode = "encrypted" if CanonicalSecretsStore(project_root=root).encrypted else "plaintext"
+            print(f"{'format':<12} {'save':>9} {'update':>9} {'load':>9} {'size':>10}"
+                  f"   ({args.keys} keys, {mode}, median of {args.runs})")
+            for label, version, requested, row_loader, row_dumper in rows:
+                os.environ["NOAH_CANONICAL_FORMAT"] = requested
+                canonical_store._YAML_LOADER, canonical_store._YAML_DUMPER = row_loader, row_dumper
+                result = run_format(root, services, version, args.runs)
+                print(f"{label:<12} {result['save']:>7.0f}ms {result['update']:>7.0f}ms "
+                      f"{result['load']:>7.0f}ms {result['KiB']:>7.0f}KiB")
+    finally:
+        os.chdir(repo)
+        canonical_store._YAML_LOADER, canonical_store._YAML_DUMPER = loader, dumper
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
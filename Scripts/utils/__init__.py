@@ -21,15 +21,7 @@ NOAH Scripts Utilities
 Utility functions and helpers for NOAH configuration management
 """
 
-# Import modules for direct access
-from . import config_loader
-from .config_utils import (
-    generate_helm_values,
-    get_service_fqdn,
-    override_service_configuration,
-    show_configuration,
-    show_domains,
-)
+import importlib
 
 __all__ = [
     # Core utility functions
@@ -40,4 +32,15 @@ __all__ = [
     'override_service_configuration',
     # Modules
     'config_loader',
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # Lazy re-export: stdlib-only helpers such as Scripts.utils.profiling and
+    # Scripts.utils.batch must be importable without yaml and the config
+    # modules coming in through this package.
+    if name == 'config_loader':
+        return importlib.import_module('.config_loader', __name__)
+    if name in __all__:
+        return getattr(importlib.import_module('.config_utils', __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
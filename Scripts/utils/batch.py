@@ -0,0 +1,125 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""`noah batch`: run a list of noah subcommands in one process.
+
+One line per step, written exactly as it would follow `python3 noah.py` on a
+shell prompt (shlex rules, so quoting works). Blank lines and `#` comments are
+skipped, and a leading `noah`, `./noah` or `noah.py` token is tolerated so a
+shell script can be pasted as is:
+
+    # rotate, push, check
+    secrets rotate --service authentik --keys bootstrap_password
+    secrets apply
+    cluster verify --timeout 900
+    password show-password
+
+Every step runs through the same click group and the same process, so the
+canonical store, the decrypted configuration and the kubernetes clients are
+built once and shared by all of them.
+"""
+from __future__ import annotations
+
+import shlex
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+_PROGRAM_TOKENS = frozenset({"noah", "./noah", "noah.py", "./noah.py"})
+
+
+class BatchSyntaxError(ValueError):
+    """A batch line cannot be parsed, or names a command batch refuses."""
+
+
+@dataclass
+class BatchStep:
+    line_no: int
+    argv: list[str]
+    exit_code: int | None = None
+    seconds: float = 0.0
+
+    @property
+    def label(self) -> str:
+        return shlex.join(self.argv)
+
+
+def parse_batch(lines: Iterable[str]) -> list[BatchStep]:
+    """Parse batch lines into steps; raises BatchSyntaxError with the line number."""
+    steps = []
+    for line_no, line in enumerate(lines, start=1):
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as e:
+            raise BatchSyntaxError(f"line {line_no}: {e}") from None
+        if argv[:2] and argv[0] in ("python", "python3") and argv[1].endswith("noah.py"):
+            argv = argv[2:]
+        elif argv and argv[0] in _PROGRAM_TOKENS:
+            argv = argv[1:]
+        if not argv:
+            continue
+        if argv[0] in ("batch", "daemon"):
+            raise BatchSyntaxError(f"line {line_no}: `{argv[0]}` cannot run inside a batch")
+        steps.append(BatchStep(line_no, argv))
+    return steps
+
+
+def run_batch(
+    steps: list[BatchStep],
+    invoke: Callable[[list[str]], int],
+    keep_going: bool = False,
+    on_step: Callable[[BatchStep], None] | None = None,
+) -> list[BatchStep]:
+    """Run *steps* in order through *invoke*, which returns an exit status.
+
+    Stops at the first failing step unless *keep_going*; steps never reached
+    keep exit_code None. *on_step* is called before each step runs.
+    """
+    for step in steps:
+        if on_step is not None:
+            on_step(step)
+        start = time.perf_counter()
+        step.exit_code = invoke(step.argv)
+        step.seconds = time.perf_counter() - start
+        if step.exit_code != 0 and not keep_going:
+            break
+    return steps
+
+
+def batch_exit_code(steps: list[BatchStep]) -> int:
+    """The first non-zero step status, or 0 when every step ran and passed."""
+    for step in steps:
+        if step.exit_code:
+            return step.exit_code
+    return 0
+
+
+def format_report(steps: list[BatchStep]) -> str:
+    """Per-step exit status and wall time, as a plain-text table."""
+    width = max((len(step.label) for step in steps), default=10)
+    width = min(max(width, 10), 60)
+    rows = [f"{'#':>4}  {'command':<{width}}  {'exit':>4}  {'time':>8}"]
+    for step in steps:
+        label = step.label if len(step.label) <= width else step.label[:width - 1] + "…"
+        status = "skip" if step.exit_code is None else str(step.exit_code)
+        timing = "" if step.exit_code is None else f"{step.seconds:7.2f}s"
+        rows.append(f"{step.line_no:>4}  {label:<{width}}  {status:>4}  {timing:>8}")
+    total = sum(step.seconds for step in steps)
+    rows.append(f"{'':>4}  {'total':<{width}}  {'':>4}  {total:7.2f}s")
+    return "\n".join(rows)
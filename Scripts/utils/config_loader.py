@@ -35,7 +35,7 @@ class ConfigLoader:
         """
         Initialize ConfigLoader with enhanced domain management.
         Note: env_file parameter is kept for backward compatibility but ignored.
-        Configuration is now loaded by SecureEnvLoader in noah.py.
+        Configuration is loaded on demand from Config/config.enc.yaml (see get()).
         """
         self.config = {}
         self.service_configs = {}
@@ -43,7 +43,7 @@ class ConfigLoader:
         self._init_service_configurations()
     
     def load_config(self):
-        """Load configuration from environment variables (already set by SecureEnvLoader)"""
+        """Load configuration from environment variables (as set by SecureEnvLoader)"""
         # Load all environment variables starting with NOAH_ or specific prefixes
         prefixes = ['NOAH_', 'KUBERNETES_', 'AUTHENTIK_', 
                    'CILIUM_', 'TLS_', 'AGE_', 'SOPS_', 'ANSIBLE_', 'HELM_']
@@ -110,7 +110,15 @@ class ConfigLoader:
         }
     
     def get(self, key: str, default: Any | None = None) -> Any:
-        """Get configuration value from environment or cached config"""
+        """Get configuration value from environment or cached config.
+
+        The first key found in neither triggers the (once-per-process)
+        decryption of Config/config.enc.yaml before falling back to default.
+        """
+        if key not in self.config and key not in os.environ:
+            from Scripts.security.secure_env_loader import ensure_secure_env_loaded
+            if ensure_secure_env_loaded():
+                self.load_config()
         return self.config.get(key, os.environ.get(key, default))
     
     def set(self, key: str, value: Any):
@@ -0,0 +1,48 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Duration helpers for NOAH.
+
+Currently provides:
+    parse_duration(value, bare_unit='s') -> int
+
+Shared by `session start --ttl` and `secrets rotate --older-than`.
+"""
+from __future__ import annotations
+
+import re
+
+__all__ = ["parse_duration"]
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+_DURATION = re.compile(r"\s*(\d+)\s*([smhdw]?)\s*")
+
+
+def parse_duration(value: str, bare_unit: str | None = "s") -> int:
+    """Seconds in a positive duration such as ``90s``, ``15m``, ``2h``, ``1d`` or ``2w``.
+
+    A bare number is read in *bare_unit*; with None it is refused, for
+    options where guessing the unit wrong would do damage.
+    """
+    match = _DURATION.fullmatch(value or "")
+    unit = match.group(2) or bare_unit if match else None
+    if not match or unit is None or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid duration {value!r}")
+    return int(match.group(1)) * UNITS[unit]
@@ -0,0 +1,383 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""`noah --profile`: where does one invocation spend its time?
+
+    python3 noah.py --profile secrets apply
+    python3 noah.py --profile=subprocess,imports cluster verify
+
+Three collectors, all on by default, any subset with ``--profile=a,b``:
+
+  imports     wall time of every module executed after noah.py started,
+              self and cumulative, like ``python -X importtime``
+  cprofile    cProfile hotspots of the command itself, by own and
+              cumulative time
+  subprocess  every external process spawned through subprocess (sops,
+              kubectl, flux, ansible-playbook, ssh, ...), with its wall time
+              and exit code
+
+They are written together to one JSON report (``--profile-output``, by default
+noah-profile-<timestamp>.json in the current directory) when the command
+finishes, failed or not. Arguments that look like ``password=...`` are masked in
+the process table; environments are never recorded.
+
+Stdlib only, and nothing but this docstring is paid by an unprofiled run: noah.py
+imports this module when ``--profile`` is on its command line, before click, so
+the import timer sees everything the command imports.
+"""
+from __future__ import annotations
+
+import _thread
+import json
+import os
+import re
+import sys
+import time
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from importlib.machinery import ExtensionFileLoader, SourceFileLoader, SourcelessFileLoader
+from pathlib import Path
+
+MODES = ("imports", "cprofile", "subprocess")
+DEFAULT_OUTPUT = "noah-profile-{timestamp}.json"
+HOTSPOT_LIMIT = 30
+IMPORT_LIMIT = 50
+
+# Loaders FileFinder creates one per module; anything else may be shared.
+_PER_MODULE_LOADERS = (SourceFileLoader, SourcelessFileLoader, ExtensionFileLoader)
+
+_SECRET_ARG = re.compile(r"(?i)^([^=]*(?:pass|secret|token|key)[^=]*=).+$")
+
+# Installed by noah.py before its own imports when --profile is requested.
+_import_timer: ImportTimer | None = None
+
+
+def parse_modes(value: str) -> tuple[str, ...]:
+    """Parse ``all`` or a comma-separated subset of MODES."""
+    names = [part.strip() for part in (value or "").split(",") if part.strip()]
+    if not names or names == ["all"]:
+        return MODES
+    unknown = sorted(set(names) - set(MODES))
+    if unknown:
+        raise ValueError(
+            f"Unknown profile mode(s) {', '.join(unknown)} "
+            f"(expected all or a comma-separated list of {', '.join(MODES)})"
+        )
+    return tuple(mode for mode in MODES if mode in names)
+
+
+def _is_mode_spec(token: str) -> bool:
+    try:
+        parse_modes(token)
+    except ValueError:
+        return False
+    return not token.startswith("-")
+
+
+def expand_bare_flag(args: Sequence[str]) -> list[str]:
+    """Rewrite a bare ``--profile`` among the root options to ``--profile=all``.
+
+    click lets an option's value be omitted, but then takes any following word
+    as the value -- the subcommand name included. Only the options before the
+    subcommand are looked at.
+    """
+    args = list(args)
+    i = 0
+    while i < len(args) and args[i].startswith("-"):
+        if args[i] == "--profile-output":
+            i += 2
+            continue
+        if args[i] == "--profile" and (i + 1 == len(args) or not _is_mode_spec(args[i + 1])):
+            args[i] = "--profile=all"
+        i += 1
+    return args
+
+
+def requested(argv: Sequence[str]) -> bool:
+    """True when *argv* (without the program name) asks for a profile."""
+    for arg in argv:
+        if not arg.startswith("-"):
+            return False
+        if arg == "--profile" or arg.startswith("--profile="):
+            return True
+    return False
+
+
+class ImportTimer:
+    """sys.meta_path hook timing the execution of every module imported.
+
+    It finds nothing itself: it asks the finders behind it, then wraps the
+    exec_module of per-module file loaders (source, bytecode, extension) and
+    restores it once the module has run. Builtin and frozen modules, loaded by
+    shared class-level loaders, are not timed -- they cost next to nothing.
+    """
+
+    def __init__(self) -> None:
+        self.records: list[dict] = []
+        self._stacks: dict[int, list[float]] = {}
+
+    def install(self) -> ImportTimer:
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        if type(loader) in _PER_MODULE_LOADERS:
+            loader.exec_module = self._timed(fullname, loader)
+        return spec
+
+    def _timed(self, fullname, loader):
+        exec_module = type(loader).exec_module
+
+        def timed_exec_module(module):
+            del loader.exec_module  # back to the class method, for reload()
+            stack = self._stacks.setdefault(_thread.get_ident(), [])
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                exec_module(loader, module)
+            finally:
+                cumulative = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += cumulative
+                self.records.append({
+                    "module": fullname,
+                    "self_ms": _ms(cumulative - children),
+                    "cumulative_ms": _ms(cumulative),
+                })
+        return timed_exec_module
+
+    def report(self, limit: int = IMPORT_LIMIT) -> dict:
+        top_level = [r for r in self.records if "." not in r["module"]]
+        return {
+            "modules_imported": len(self.records),
+            "total_self_ms": round(sum(r["self_ms"] for r in self.records), 3),
+            "top_level_cumulative_ms": round(sum(r["cumulative_ms"] for r in top_level), 3),
+            "slowest": sorted(self.records, key=lambda r: r["self_ms"], reverse=True)[:limit],
+        }
+
+
+def install_import_timer() -> ImportTimer:
+    """Start timing imports now; picked up by the next ProfileSession."""
+    global _import_timer
+    if _import_timer is None:
+        _import_timer = ImportTimer().install()
+    return _import_timer
+
+
+def _redact(arg) -> str:
+    return _SECRET_ARG.sub(r"\1***", os.fsdecode(arg) if isinstance(arg, bytes) else str(arg))
+
+
+class ProcessRecorder:
+    """Replaces subprocess.Popen with a subclass that logs every process.
+
+    subprocess.run/check_output/call all go through subprocess.Popen, so
+    patching the module attribute is enough. A process counts as finished the
+    first time wait() or poll() sees its exit status; one still running when
+    the report is written has a null exit code.
+    """
+
+    def __init__(self) -> None:
+        self.processes: list[dict] = []
+        self._original = None
+        self._origin = time.perf_counter()
+
+    def install(self) -> ProcessRecorder:
+        import subprocess
+        if self._original is not None:
+            return self
+        self._original = subprocess.Popen
+        recorder = self
+
+        class RecordedPopen(subprocess.Popen):
+            def __init__(self, args, *rest, **kwargs):
+                self._noah_record = recorder._start(args, kwargs.get("shell", False))
+                try:
+                    super().__init__(args, *rest, **kwargs)
+                except OSError as e:
+                    recorder._finish(self._noah_record, None, error=str(e))
+                    raise
+                self._noah_record["pid"] = self.pid
+
+            def wait(self, timeout=None):
+                code = super().wait(timeout)
+                recorder._finish(self._noah_record, code)
+                return code
+
+            def poll(self):
+                code = super().poll()
+                if code is not None:
+                    recorder._finish(self._noah_record, code)
+                return code
+
+        subprocess.Popen = RecordedPopen
+        return self
+
+    def uninstall(self) -> None:
+        if self._original is not None:
+            import subprocess
+            subprocess.Popen = self._original
+            self._original = None
+
+    def _start(self, args, shell) -> dict:
+        argv = [args] if isinstance(args, (str, bytes, os.PathLike)) else list(args)
+        argv = [_redact(os.fspath(a) if isinstance(a, os.PathLike) else a) for a in argv]
+        record = {
+            "program": "sh" if shell else os.path.basename(argv[0]) if argv else "",
+            "argv": argv,
+            "pid": None,
+            "started_ms": _ms(time.perf_counter() - self._origin),
+            "wall_ms": None,
+            "exit_code": None,
+            "_start": time.perf_counter(),
+        }
+        self.processes.append(record)
+        return record
+
+    def _finish(self, record: dict, code, error: str | None = None) -> None:
+        if record["wall_ms"] is not None:
+            return
+        record["wall_ms"] = _ms(time.perf_counter() - record["_start"])
+        record["exit_code"] = code
+        if error:
+            record["error"] = error
+
+    def report(self) -> dict:
+        processes = [{k: v for k, v in p.items() if k != "_start"} for p in self.processes]
+        by_program: dict[str, dict] = {}
+        for p in processes:
+            entry = by_program.setdefault(p["program"], {"count": 0, "wall_ms": 0.0, "failed": 0})
+            entry["count"] += 1
+            entry["wall_ms"] = round(entry["wall_ms"] + (p["wall_ms"] or 0.0), 3)
+            if p["exit_code"] != 0:
+                entry["failed"] += 1
+        return {
+            "count": len(processes),
+            "wall_ms": round(sum(p["wall_ms"] or 0.0 for p in processes), 3),
+            "by_program": by_program,
+            "processes": processes,
+        }
+
+
+def _hotspots(profiler, limit: int) -> dict:
+    import pstats
+    stats = pstats.Stats(profiler).stats
+    rows = [
+        {
+            "function": func,
+            "file": file,
+            "line": line,
+            "calls": ncalls,
+            "tottime_ms": _ms(tottime),
+            "cumtime_ms": _ms(cumtime),
+        }
+        for (file, line, func), (_, ncalls, tottime, cumtime, _) in stats.items()
+    ]
+    return {
+        "functions": len(rows),
+        "by_tottime": sorted(rows, key=lambda r: r["tottime_ms"], reverse=True)[:limit],
+        "by_cumtime": sorted(rows, key=lambda r: r["cumtime_ms"], reverse=True)[:limit],
+    }
+
+
+class ProfileSession:
+    """The collectors of one profiled invocation, and the report they write."""
+
+    def __init__(self, modes: Sequence[str], output: Path | None = None,
+                 argv: Sequence[str] | None = None) -> None:
+        self.modes = tuple(modes)
+        self.argv = list(sys.argv[1:] if argv is None else argv)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.output = Path(output) if output else Path(DEFAULT_OUTPUT.format(timestamp=stamp))
+        self.import_timer: ImportTimer | None = None
+        self.recorder: ProcessRecorder | None = None
+        self.profiler = None
+        self._started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+
+    def start(self) -> ProfileSession:
+        if "imports" in self.modes:
+            # Installed late (a test, or `noah batch`), it only sees the
+            # imports from here on.
+            self.import_timer = install_import_timer()
+        if "subprocess" in self.modes:
+            self.recorder = ProcessRecorder().install()
+        if "cprofile" in self.modes:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def stop(self) -> dict:
+        """Stop every collector and return the report."""
+        wall = time.perf_counter() - self._start
+        if self.profiler is not None:
+            self.profiler.disable()
+        report: dict = {
+            "noah_argv": self.argv,
+            "modes": list(self.modes),
+            "python": sys.version.split()[0],
+            "pid": os.getpid(),
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "wall_ms": _ms(wall),
+        }
+        if self.import_timer is not None:
+            self.import_timer.uninstall()
+            report["imports"] = self.import_timer.report()
+        if self.profiler is not None:
+            report["cprofile"] = _hotspots(self.profiler, HOTSPOT_LIMIT)
+        if self.recorder is not None:
+            self.recorder.uninstall()
+            for record in self.recorder.processes:
+                if record["wall_ms"] is None:
+                    record["still_running"] = True
+            report["subprocesses"] = self.recorder.report()
+        # Only when the command loaded it: the profiler must not import sops_client.
+        sops_client = sys.modules.get("Scripts.security.sops_client")
+        if sops_client is not None:
+            report["sops_cache"] = sops_client.SopsClient.cache_stats()
+        return report
+
+    def finish(self) -> Path:
+        """Stop the collectors and write the JSON report; returns its path."""
+        global _import_timer
+        report = self.stop()
+        _import_timer = None
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        self.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        return self.output
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
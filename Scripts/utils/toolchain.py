@@ -0,0 +1,190 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Toolchain registry: where each external binary is, and which version.
+
+`noah doctor`, `setup initialize` and SopsClient.is_available() all need to
+know whether sops, kubectl, flux... are installed and how recent they are.
+Each used to find out by forking: `which <tool>` for presence, `<tool>
+--version` for the version (and `sops --version` also asks GitHub for the
+latest release). resolve() answers both without forking on a warm cache:
+
+- presence is shutil.which(), a few stat() calls;
+- the version probe runs once per binary *file*, and its result is persisted
+  under $XDG_CACHE_HOME/noah/toolchain.json keyed by the binary's path, mtime
+  and size -- so replacing a binary (`setup update-sops`, a package upgrade)
+  re-probes it, and nothing else does. Only successful probes are kept: a
+  failed one -- a timeout on a loaded machine, say -- is retried next call,
+  as it was before the cache.
+
+NOAH_TOOLCHAIN_CACHE overrides the cache file; set it empty to keep probe
+results in memory only.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Version probes, tried in order until one exits 0. The first argv for sops
+# skips its online "latest version" check; sops older than 3.7 lacks the flag.
+PROBES: dict[str, tuple[tuple[str, ...], ...]] = {
+    "sops": (("--version", "--disable-version-check"), ("--version",)),
+    "age": (("--version",),),
+    "kubectl": (("version", "--client"),),
+    "flux": (("--version",),),
+    "helm": (("version", "--short"),),
+    "ansible-playbook": (("--version",),),
+    "tofu": (("version",),),
+}
+TOOLS = tuple(PROBES)
+
+PROBE_TIMEOUT = 5
+
+_VERSION = re.compile(r"\d+\.\d+(?:\.\d+)?(?:[-+][0-9A-Za-z.+-]*)?")
+
+_lock = threading.Lock()
+_probes: dict[str, dict] | None = None
+
+
+@dataclass(frozen=True)
+class Tool:
+    """One binary as found on PATH. `path` is None when it is not installed;
+    `available` also requires its version probe to have exited 0."""
+
+    name: str
+    path: str | None
+    version: str | None = None
+    available: bool = False
+
+
+def cache_file() -> Path | None:
+    """Where probe results persist, or None when they are kept in memory."""
+    override = os.environ.get("NOAH_TOOLCHAIN_CACHE")
+    if override is not None:
+        return Path(override) if override else None
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "noah" / "toolchain.json"
+
+
+def parse_version(output: str) -> str | None:
+    """First dotted version number in a tool's --version output."""
+    match = _VERSION.search(output or "")
+    return match.group(0) if match else None
+
+
+def which(name: str) -> str | None:
+    """shutil.which(), for the callers that only need presence."""
+    return shutil.which(name)
+
+
+def resolve(name: str) -> Tool:
+    """Locate *name* on PATH and return it with its (cached) version."""
+    path = shutil.which(name)
+    if path is None:
+        return Tool(name, None)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return Tool(name, None)
+    fingerprint = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+    with _lock:
+        probes = _load()
+        entry = probes.get(path)
+        if (entry is None or not entry.get("ok")
+                or {k: entry.get(k) for k in fingerprint} != fingerprint):
+            entry = {**fingerprint, **_probe(name, path)}
+            # A failure is not persisted: SopsClient.is_available() reads
+            # this, and one slow `sops --version` would otherwise turn the
+            # store to plaintext (or refuse it) on every later run.
+            if entry["ok"]:
+                probes[path] = entry
+                _save(probes)
+            else:
+                probes.pop(path, None)
+    return Tool(name, path, entry.get("version"), bool(entry.get("ok")))
+
+
+def is_available(name: str) -> bool:
+    """True if *name* is on PATH and its version probe succeeds."""
+    return resolve(name).available
+
+
+def reset() -> None:
+    """Forget the in-memory copy of the cache (the file is re-read on demand)."""
+    global _probes
+    with _lock:
+        _probes = None
+
+
+def _probe(name: str, path: str) -> dict:
+    for args in PROBES.get(name, (("--version",),)):
+        try:
+            result = subprocess.run(
+                [path, *args], capture_output=True, text=True, timeout=PROBE_TIMEOUT,
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug("Version probe of %s failed: %s", path, e)
+            continue
+        if result.returncode == 0:
+            return {"ok": True, "version": parse_version(result.stdout + result.stderr)}
+    return {"ok": False, "version": None}
+
+
+def _load() -> dict[str, dict]:
+    global _probes
+    if _probes is None:
+        _probes = {}
+        path = cache_file()
+        if path is not None:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if isinstance(data, dict):
+                    _probes = {k: v for k, v in data.items() if isinstance(v, dict)}
+            except (OSError, ValueError):
+                pass
+    return _probes
+
+
+def _save(probes: dict[str, dict]) -> None:
+    """Best effort: a read-only home only costs the next run its probes."""
+    path = cache_file()
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_str = tempfile.mkstemp(dir=path.parent, prefix=".toolchain-", suffix=".json")
+        tmp = Path(tmp_str)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(probes, fh, indent=1, sort_keys=True)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+    except OSError as e:
+        logger.debug("Could not persist the toolchain cache to %s: %s", path, e)
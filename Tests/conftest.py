@@ -38,6 +38,8 @@ import pytest
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from Scripts.security import canonical_store  # noqa: E402
+from Scripts.security.sops_client import SopsClient  # noqa: E402
+from Scripts.utils import toolchain  # noqa: E402
 
 
 @pytest.fixture(autouse=True)
@@ -46,7 +48,30 @@ def _unlocked_environment(monkeypatch):
 
     The singleton reset generalises what test_security_manager.py and
     test_canonical_store.py already do individually, so a store built by one
-    test cannot leak into the next.
+    test cannot leak into the next. The store's on-disk format is the
+    default one unless a test asks otherwise.
     """
     monkeypatch.setenv("NOAH_ENVIRONMENT", "test")
+    monkeypatch.delenv("NOAH_CANONICAL_FORMAT", raising=False)
+    monkeypatch.delenv("NOAH_CLUSTER", raising=False)
     monkeypatch.setattr(canonical_store, "_store_instance", None, raising=False)
+    monkeypatch.setattr(canonical_store, "_cluster_stores", {}, raising=False)
+
+
+@pytest.fixture(autouse=True)
+def _private_toolchain_cache(tmp_path, monkeypatch):
+    """Keep version probes out of the developer's ~/.cache and out of the
+    next test: each test starts with an empty toolchain cache of its own."""
+    monkeypatch.setenv("NOAH_TOOLCHAIN_CACHE", str(tmp_path / "toolchain.json"))
+    toolchain.reset()
+    yield
+    toolchain.reset()
+
+
+@pytest.fixture(autouse=True)
+def _empty_decrypt_cache():
+    """The decrypt cache is process-wide: a file decrypted by one test must
+    not be served from memory to the next."""
+    SopsClient.clear_cache()
+    yield
+    SopsClient.clear_cache()
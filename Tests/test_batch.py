@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Tests for `noah batch`."""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from Scripts.utils.batch import (
+    BatchStep,
+    BatchSyntaxError,
+    batch_exit_code,
+    format_report,
+    parse_batch,
+    run_batch,
+)
+
+
+class TestParseBatch:
+    def test_comments_blanks_and_quoting(self):
+        steps = parse_batch([
+            "# rotate then apply\n",
+            "\n",
+            "secrets rotate --service authentik --keys 'a,b'  # inline comment\n",
+            "   secrets apply\n",
+        ])
+        assert [(s.line_no, s.argv) for s in steps] == [
+            (3, ["secrets", "rotate", "--service", "authentik", "--keys", "a,b"]),
+            (4, ["secrets", "apply"]),
+        ]
+
+    @pytest.mark.parametrize("line", [
+        "noah flux status",
+        "./noah flux status",
+        "noah.py flux status",
+        "python3 noah.py flux status",
+        "python3 /opt/NOAH/noah.py flux status",
+    ])
+    def test_program_prefix_is_dropped(self, line):
+        assert parse_batch([line])[0].argv == ["flux", "status"]
+
+    @pytest.mark.parametrize("line", ["batch other.txt", "noah daemon start", "flux 'unterminated"])
+    def test_rejected_lines_name_their_line_number(self, line):
+        with pytest.raises(BatchSyntaxError, match="line 2"):
+            parse_batch(["status", line])
+
+
+class TestRunBatch:
+    def _steps(self, *commands):
+        return [BatchStep(i, [c]) for i, c in enumerate(commands, start=1)]
+
+    def test_stops_at_the_first_failure(self):
+        ran = []
+        steps = run_batch(self._steps("a", "b", "c"),
+                          lambda argv: ran.append(argv[0]) or (2 if argv == ["b"] else 0))
+        assert ran == ["a", "b"]
+        assert [s.exit_code for s in steps] == [0, 2, None]
+        assert batch_exit_code(steps) == 2
+        assert "skip" in format_report(steps).splitlines()[3]
+
+    def test_keep_going_runs_everything(self):
+        steps = run_batch(self._steps("a", "b", "c"),
+                          lambda argv: 3 if argv == ["b"] else 0, keep_going=True)
+        assert [s.exit_code for s in steps] == [0, 3, 0]
+        assert batch_exit_code(steps) == 3
+
+    def test_all_passing_batch_exits_zero(self):
+        assert batch_exit_code(run_batch(self._steps("a", "b"), lambda argv: 0)) == 0
+
+
+def test_batch_command_shares_context_objects_across_steps(tmp_path):
+    import noah
+
+    batch_file = tmp_path / "steps.txt"
+    batch_file.write_text("config domains\nconfig domains\nflux status\ncertificates list\n")
+    seen = []
+    with patch('noah.ConfigLoader') as config, \
+         patch('Scripts.utils.config_utils.show_domains',
+               side_effect=lambda ctx: seen.append(ctx.obj['config'].get_all_domains)):
+        result = CliRunner().invoke(noah.cli, ['batch', str(batch_file)])
+
+    config.assert_called_once()
+    assert len(seen) == 2 and seen[0] is seen[1]
+    # flux is not on PATH here: step 3 fails, step 4 never runs.
+    assert result.exit_code == 1
+    report = result.stderr.splitlines()[-6:]
+    assert [line.split()[0] for line in report[1:5]] == ["1", "2", "3", "4"]
+    assert report[3].split()[-2] == "1"
+    assert report[4].split()[-1] == "skip"
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+"""Tests for named clusters in the canonical store (Secrets/clusters/<name>/).
+
+Plaintext mode throughout (NOAH_DISABLE_SOPS): a cluster's store is an
+ordinary store in another directory, so the suffix is all encryption changes.
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Scripts.security import canonical_store as cs  # noqa: E402
+from Scripts.security.canonical_store import (  # noqa: E402
+    CANONICAL_FILENAME_PLAINTEXT,
+    CanonicalSecretsStore,
+    get_canonical_store,
+    list_clusters,
+)
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+    monkeypatch.delenv("NOAH_CLUSTER", raising=False)
+    monkeypatch.setattr(cs, "_cluster_stores", {})
+    for cluster in (None, "prod", "staging"):
+        store = CanonicalSecretsStore(project_root=tmp_path, cluster=cluster)
+        store.ensure_service_entries("authentik", {"password": lambda c=cluster: f"{c}-pw"})
+        store.set_cluster_domain(f"{cluster or 'default'}.example.org")
+    return tmp_path
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Paths of the files the store decrypts, relative to Secrets/."""
+    seen = []
+    original = cs.CanonicalSecretsStore._decrypt_file
+
+    def _spy(self, path, *args, **kwargs):
+        seen.append(path.relative_to(self.project_root / "Secrets").as_posix())
+        return original(self, path, *args, **kwargs)
+
+    monkeypatch.setattr(cs.CanonicalSecretsStore, "_decrypt_file", _spy)
+    return seen
+
+
+class TestClusterStores:
+    def test_each_cluster_has_its_own_file(self, root):
+        assert (root / "Secrets" / CANONICAL_FILENAME_PLAINTEXT).exists()
+        for cluster in ("prod", "staging"):
+            assert (root / "Secrets" / "clusters" / cluster / CANONICAL_FILENAME_PLAINTEXT).exists()
+        assert oct((root / "Secrets" / "clusters").stat().st_mode & 0o777) == "0o700"
+
+    def test_values_do_not_leak_between_clusters(self, root):
+        prod = CanonicalSecretsStore(project_root=root, cluster="prod")
+        assert prod.get_service_secrets("authentik") == {"password": "prod-pw"}
+        assert prod.get_cluster_domain() == "prod.example.org"
+        assert CanonicalSecretsStore(project_root=root).get_cluster_domain() == "default.example.org"
+
+    def test_opening_a_cluster_reads_no_other(self, root, reads):
+        get_canonical_store(root, readonly=True, cluster="staging").get_cluster_domain()
+        assert reads == [f"clusters/staging/{CANONICAL_FILENAME_PLAINTEXT}"]
+
+    def test_a_cluster_can_use_another_layout(self, root):
+        store = CanonicalSecretsStore(project_root=root, cluster="prod")
+        assert store.migrate_to_sharded() is True
+        assert (root / "Secrets" / "clusters" / "prod" / "canonical").is_dir()
+        assert not CanonicalSecretsStore(project_root=root, cluster="staging").sharded
+
+    @pytest.mark.parametrize("name", ["../escape", "", ".hidden", "a/b"])
+    def test_unsafe_names_are_refused(self, root, name):
+        with pytest.raises(ValueError):
+            CanonicalSecretsStore(project_root=root, cluster=name)
+
+
+class TestSelection:
+    def test_noah_cluster_selects_the_store(self, root, monkeypatch):
+        monkeypatch.setenv("NOAH_CLUSTER", "staging")
+        assert get_canonical_store(root).get_cluster_domain() == "staging.example.org"
+        # An explicit choice wins, and the default cluster has a name too.
+        assert get_canonical_store(root, cluster="default").get_cluster_domain() == "default.example.org"
+
+    def test_one_singleton_per_cluster(self, root):
+        prod = get_canonical_store(root, cluster="prod")
+        assert get_canonical_store(root, cluster="prod") is prod
+        assert get_canonical_store(root) is not prod
+
+    def test_listing_answers_from_the_directories(self, root, reads):
+        assert list_clusters(root) == ["default", "prod", "staging"]
+        assert reads == []
+
+    def test_no_default_cluster_without_its_store(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        CanonicalSecretsStore(project_root=tmp_path, cluster="prod").set_cluster_domain("x")
+        assert list_clusters(tmp_path) == ["prod"]
+
+
+class TestKubeconfig:
+    def test_a_named_cluster_uses_its_own_kubeconfig_only(self, tmp_path, monkeypatch):
+        import click
+
+        from Scripts.cluster_create import flux_utils
+
+        monkeypatch.setitem(flux_utils.NOAH_PATHS, "root_dir", tmp_path)
+        monkeypatch.setenv("KUBECONFIG", str(tmp_path / "other.yaml"))
+        (tmp_path / "other.yaml").write_text("")
+        with pytest.raises(click.ClickException, match="prod"):
+            flux_utils._require_kubeconfig("prod")
+        (tmp_path / "Kube").mkdir()
+        (tmp_path / "Kube" / "prod.yaml").write_text("")
+        flux_utils._require_kubeconfig("prod")
+        assert os.environ["KUBECONFIG"] == str(tmp_path / "Kube" / "prod.yaml")
+
+
+class TestCli:
+    @pytest.fixture
+    def cli(self, root, monkeypatch):
+        import noah
+
+        monkeypatch.setattr(noah, "check_repository_root", lambda: None)
+        # --cluster publishes NOAH_CLUSTER: have monkeypatch restore it.
+        monkeypatch.setenv("NOAH_CLUSTER", "")
+        monkeypatch.chdir(root)
+        return noah.cli
+
+    def test_clusters_lists_every_store_and_marks_the_selected_one(self, cli):
+        result = CliRunner().invoke(cli, ["--cluster", "prod", "secrets", "clusters"])
+        assert result.exit_code == 0, result.output
+        assert result.output.splitlines() == [
+            "  default  Secrets",
+            "* prod  Secrets/clusters/prod",
+            "  staging  Secrets/clusters/staging",
+        ]
+
+    def test_batch_steps_do_not_inherit_another_steps_cluster(self, cli, root):
+        steps = root / "steps.txt"
+        steps.write_text("--cluster prod secrets clusters\nsecrets clusters\n")
+        result = CliRunner().invoke(cli, ["batch", str(steps)])
+        assert result.exit_code == 0, result.output
+        selected = [line for line in result.output.splitlines() if line.startswith("* ")]
+        assert selected == ["* prod  Secrets/clusters/prod", "* default  Secrets"]
+        assert os.environ["NOAH_CLUSTER"] == ""
+
+    def test_invalid_cluster_name_is_a_usage_error(self, cli):
+        result = CliRunner().invoke(cli, ["--cluster", "../prod", "secrets", "clusters"])
+        assert result.exit_code == 2
+        assert "Invalid cluster name" in result.output
+
+    def test_compact_all_clusters(self, cli):
+        result = CliRunner().invoke(cli, ["secrets", "compact", "--all-clusters"])
+        assert result.exit_code == 0, result.output
+        lines = [line for line in result.output.splitlines() if "UNENCRYPTED" not in line]
+        assert [line.split()[0] for line in lines] == [
+            "[default]", "[prod]", "[staging]",
+        ]
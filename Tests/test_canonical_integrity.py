@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+"""Tests for the per-service integrity digests of the canonical store
+(canonical_integrity.py), in both layouts.
+
+Plaintext mode throughout (NOAH_DISABLE_SOPS), which lets a test edit a
+store file by hand the way the integrity check is meant to catch.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Scripts.security import canonical_store as cs  # noqa: E402
+from Scripts.security.canonical_integrity import (  # noqa: E402
+    legacy_integrity,
+    root_digest,
+    service_digest,
+)
+from Scripts.security.canonical_store import (  # noqa: E402
+    CANONICAL_FILENAME_PLAINTEXT,
+    CanonicalSecretsStore,
+)
+
+SERVICES = ("authentik", "headlamp", "nextcloud")
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+    store = CanonicalSecretsStore(project_root=tmp_path)
+    with store.transaction():
+        for service in SERVICES:
+            store.ensure_service_entries(service, {"password": lambda s=service: f"{s}-pw"})
+    return tmp_path
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Services whose digest the store computes."""
+    seen = []
+
+    def _spy(service, secrets_map):
+        seen.append(service)
+        return service_digest(service, secrets_map)
+
+    monkeypatch.setattr(cs, "service_digest", _spy)
+    return seen
+
+
+def _path(root):
+    return root / "Secrets" / CANONICAL_FILENAME_PLAINTEXT
+
+
+def _document(root):
+    return yaml.safe_load(_path(root).read_text())
+
+
+def _edit(root, edit):
+    document = _document(root)
+    edit(document)
+    _path(root).write_text(yaml.safe_dump(document, sort_keys=False))
+
+
+class TestSingleFile:
+    def test_the_root_covers_one_digest_per_service(self, root):
+        document = _document(root)
+        assert sorted(document["digests"]) == list(SERVICES)
+        for service in SERVICES:
+            assert document["digests"][service] == service_digest(service, document["services"][service])
+        assert document["integrity"] == root_digest(document["digests"])
+
+    def test_a_load_hashes_nothing(self, root, hashed, capsys):
+        store = CanonicalSecretsStore(project_root=root).load()
+        assert store.data["integrity"] == _document(root)["integrity"]
+        assert hashed == []
+        assert "mismatch" not in capsys.readouterr().out
+
+    def test_a_save_rehashes_the_changed_service_only(self, root, hashed):
+        store = CanonicalSecretsStore(project_root=root)
+        store.get_service_secrets("headlamp")
+        store.data["services"]["authentik"]["password"]["value"] = "rotated"
+        store.save()
+        assert hashed == ["headlamp", "authentik"]  # one check on read, one rehash
+        document = _document(root)
+        assert document["digests"]["authentik"] == service_digest("authentik", document["services"]["authentik"])
+        assert document["integrity"] == root_digest(document["digests"])
+
+    def test_a_removed_service_leaves_the_root(self, root):
+        store = CanonicalSecretsStore(project_root=root)
+        del store.data["services"]["headlamp"]
+        store.save()
+        assert sorted(_document(root)["digests"]) == ["authentik", "nextcloud"]
+        assert CanonicalSecretsStore(project_root=root)._verify_integrity()
+
+
+class TestTampering:
+    @pytest.fixture
+    def tampered(self, root):
+        _edit(root, lambda d: d["services"]["nextcloud"]["password"].update(value="tampered"))
+        return root
+
+    def test_reported_when_the_service_is_read(self, tampered, capsys):
+        store = CanonicalSecretsStore(project_root=tampered).load()
+        store.get_service_secrets("authentik")
+        assert "mismatch" not in capsys.readouterr().out
+        assert store.get_service_secrets("nextcloud") == {"password": "tampered"}
+        store.get_service_secrets("nextcloud")
+        assert capsys.readouterr().out.count("integrity mismatch for nextcloud") == 1
+
+    def test_re_signed_by_the_next_save(self, tampered, capsys):
+        store = CanonicalSecretsStore(project_root=tampered)
+        store.get_service_secrets("nextcloud")
+        store.set_cluster_domain("example.org")
+        capsys.readouterr()
+        CanonicalSecretsStore(project_root=tampered).get_service_secrets("nextcloud")
+        assert "mismatch" not in capsys.readouterr().out
+
+    def test_a_snapshot_reports_it_too(self, tampered, capsys):
+        snap = cs.get_canonical_store(tampered, readonly=True)
+        snap.get_service_secrets("nextcloud")
+        assert "integrity mismatch for nextcloud" in capsys.readouterr().out
+
+    def test_a_forged_digest_fails_the_root(self, root, capsys):
+        _edit(root, lambda d: d["digests"].update(nextcloud="0" * 64))
+        CanonicalSecretsStore(project_root=root).load()
+        assert "Canonical secrets integrity mismatch!" in capsys.readouterr().out
+
+
+class TestLegacyFiles:
+    def _legacy(self, root, integrity=None):
+        def edit(document):
+            del document["digests"]
+            document["integrity"] = integrity or legacy_integrity(document["services"])
+        _edit(root, edit)
+
+    def test_accepted_once_then_signed_per_service(self, root, capsys):
+        self._legacy(root)
+        store = CanonicalSecretsStore(project_root=root)
+        assert store._verify_integrity()
+        store.set_cluster_domain("example.org")
+        assert sorted(_document(root)["digests"]) == list(SERVICES)
+        assert "mismatch" not in capsys.readouterr().out
+
+    def test_a_legacy_mismatch_is_still_reported(self, root, capsys):
+        self._legacy(root, integrity="0" * 64)
+        CanonicalSecretsStore(project_root=root).load()
+        assert "Canonical secrets integrity mismatch!" in capsys.readouterr().out
+
+
+class TestOtherLayouts:
+    def test_journal_records_carry_the_digests_they_change(self, root, hashed, capsys):
+        assert CanonicalSecretsStore(project_root=root).migrate_to_journal()
+        store = CanonicalSecretsStore(project_root=root)
+        store.data["services"]["authentik"]["password"]["value"] = "rotated"
+        store.save()
+        record = store._journal[-1]
+        assert list(record["digests"]) == ["authentik"]
+
+        hashed.clear()
+        reread = CanonicalSecretsStore(project_root=root).load()
+        assert hashed == []
+        assert reread.get_service_secrets("authentik") == {"password": "rotated"}
+        assert "mismatch" not in capsys.readouterr().out
+
+    def test_a_sharded_save_rehashes_the_changed_shard_only(self, root, hashed):
+        assert CanonicalSecretsStore(project_root=root).migrate_to_sharded()
+        store = CanonicalSecretsStore(project_root=root)
+        store.get_service_secrets("headlamp")
+        hashed.clear()
+        store.data["services"]["authentik"]["password"]["value"] = "rotated"
+        store.save()
+        assert hashed == ["authentik", "authentik"]  # checked on decryption, rehashed once changed
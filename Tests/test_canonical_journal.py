@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+"""Tests for the journal layout of the canonical store (canonical_journal.py).
+
+Plaintext mode throughout (NOAH_DISABLE_SOPS): records are the same documents
+in both modes, and only the file suffix changes.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Scripts.security import canonical_journal  # noqa: E402
+from Scripts.security import canonical_store as cs  # noqa: E402
+from Scripts.security.canonical_journal import HISTORY_FILENAME, JOURNAL_DIRNAME  # noqa: E402
+from Scripts.security.canonical_store import (  # noqa: E402
+    CANONICAL_FILENAME_PLAINTEXT,
+    CanonicalSecretsStore,
+)
+from Scripts.security.sops_client import SopsTimeoutError  # noqa: E402
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+    store = CanonicalSecretsStore(project_root=tmp_path)
+    store.ensure_service_entries("authentik", {"password": lambda: "a0"})
+    store.ensure_service_entries("headlamp", {"password": lambda: "h0"})
+    assert store.migrate_to_journal() is True
+    return tmp_path
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    seen = []
+    original = cs.CanonicalSecretsStore._encrypt_bytes
+
+    def _spy(self, plaintext, path, previous=None):
+        seen.append(Path(path).name)
+        return original(self, plaintext, path, previous)
+
+    monkeypatch.setattr(cs.CanonicalSecretsStore, "_encrypt_bytes", _spy)
+    return seen
+
+
+def _journal(root):
+    return root / "Secrets" / JOURNAL_DIRNAME
+
+
+def _rotate(store, service, value, version=2):
+    store.data["services"][service]["password"] = {"value": value, "version": version, "rotated_at": f"t{version}"}
+    return store.save()
+
+
+class TestAppend:
+    def test_a_change_is_one_record_and_the_snapshot_is_untouched(self, root, writes):
+        snapshot = (root / "Secrets" / CANONICAL_FILENAME_PLAINTEXT).read_bytes()
+        store = CanonicalSecretsStore(project_root=root)
+        assert store.journaled
+        assert _rotate(store, "authentik", "a1")
+        assert len(writes) == 1 and writes[0].endswith(".yaml")
+        assert (root / "Secrets" / CANONICAL_FILENAME_PLAINTEXT).read_bytes() == snapshot
+        record = yaml.safe_load((_journal(root) / writes[0]).read_text())
+        assert record["changes"] == [{
+            "path": ["services", "authentik", "password"],
+            "value": {"value": "a1", "version": 2, "rotated_at": "t2"},
+        }]
+
+    def test_records_replay_in_order(self, root, capsys):
+        store = CanonicalSecretsStore(project_root=root)
+        _rotate(store, "authentik", "a1")
+        _rotate(store, "authentik", "a2", version=3)
+        store.set_cluster_domain("example.org")
+        del store.data["services"]["headlamp"]
+        store.save()
+
+        reread = CanonicalSecretsStore(project_root=root)
+        assert reread.get_service_secrets("authentik") == {"password": "a2"}
+        assert reread.get_cluster_domain() == "example.org"
+        assert "headlamp" not in reread.data["services"]
+        assert reread.data["revision"] == store.data["revision"]
+        # Each record carries the integrity after it: no false alarm.
+        assert "mismatch" not in capsys.readouterr().out
+
+    def test_no_change_writes_nothing(self, root, writes):
+        store = CanonicalSecretsStore(project_root=root)
+        revision = store.data["revision"]
+        assert store.save() is True
+        assert writes == []
+        assert store.data["revision"] == revision
+
+    def test_records_at_or_below_the_snapshot_are_skipped(self, root):
+        store = CanonicalSecretsStore(project_root=root)
+        _rotate(store, "authentik", "a1")
+        # As if compaction stopped between the snapshot and the deletions.
+        stale = _journal(root) / canonical_journal.record_name(store.data["revision"] - 5, ".yaml")
+        stale.write_text(yaml.safe_dump({"revision": 1, "changes": [
+            {"path": ["services", "authentik", "password"], "value": {"value": "stale"}},
+        ]}))
+        assert CanonicalSecretsStore(project_root=root).get_service_secrets("authentik") == {"password": "a1"}
+
+    def test_a_single_unreadable_record_stays_on_disk(self, root, monkeypatch):
+        store = CanonicalSecretsStore(project_root=root)
+        _rotate(store, "authentik", "a1")
+        (record,) = _journal(root).glob("*.yaml")
+
+        class _TimingOut:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def decrypt_many(self, paths):
+                return {path: SopsTimeoutError("sops timed out") for path in paths}
+
+        monkeypatch.setattr(cs, "SopsClient", _TimingOut)
+        store.encrypted = True
+        assert store._decrypt_records([record]) == [None]
+        assert record.exists()
+
+
+class TestCompaction:
+    def test_compact_folds_the_records_into_the_snapshot(self, root):
+        store = CanonicalSecretsStore(project_root=root)
+        _rotate(store, "authentik", "a1")
+        store.set_cluster_domain("example.org")
+        assert CanonicalSecretsStore(project_root=root).compact() == 2
+        assert [p.name for p in _journal(root).iterdir()] == [HISTORY_FILENAME]
+        snapshot = yaml.safe_load((root / "Secrets" / CANONICAL_FILENAME_PLAINTEXT).read_text())
+        assert snapshot["services"]["authentik"]["password"]["value"] == "a1"
+        assert CanonicalSecretsStore(project_root=root).compact() == 0
+
+    def test_a_long_journal_is_folded_by_the_next_save(self, root, monkeypatch):
+        monkeypatch.setattr(cs, "COMPACT_AFTER", 3)
+        store = CanonicalSecretsStore(project_root=root)
+        for version in range(2, 5):
+            _rotate(store, "authentik", f"a{version}", version)
+        assert len(store._journal_records()) == 3
+        _rotate(store, "authentik", "a5", 5)
+        assert store._journal_records() == []
+        assert CanonicalSecretsStore(project_root=root).get_service_secrets("authentik") == {"password": "a5"}
+
+    def test_history_keeps_versions_not_values(self, root):
+        store = CanonicalSecretsStore(project_root=root)
+        _rotate(store, "authentik", "a1")
+        store.set_cluster_domain("example.org")
+        store.compact()
+        _rotate(store, "authentik", "a2", version=3)
+        history = CanonicalSecretsStore(project_root=root).history()
+        assert [(e.get("service"), e.get("key"), e.get("setting"), e.get("version")) for e in history] == [
+            ("authentik", "password", None, 2),
+            (None, None, "cluster.domain", None),
+            ("authentik", "password", None, 3),
+        ]
+        log = (_journal(root) / HISTORY_FILENAME).read_text()
+        assert "a1" not in log and "example.org" not in log
+        assert all(json.loads(line)["revision"] for line in log.splitlines())
+
+
+class TestLayouts:
+    def test_concurrent_appends_merge(self, root):
+        first, second = CanonicalSecretsStore(project_root=root), CanonicalSecretsStore(project_root=root)
+        first.load()
+        second.load()
+        assert _rotate(first, "authentik", "a1")
+        assert _rotate(second, "headlamp", "h1")
+        store = CanonicalSecretsStore(project_root=root)
+        assert store.get_service_secrets("authentik") == {"password": "a1"}
+        assert store.get_service_secrets("headlamp") == {"password": "h1"}
+
+    def test_the_snapshot_mode_reads_the_journal(self, root):
+        _rotate(CanonicalSecretsStore(project_root=root), "authentik", "a1")
+        snap = cs.get_canonical_store(root, readonly=True)
+        assert snap.get_service_secrets("authentik") == {"password": "a1"}
+        assert snap.history()[-1]["version"] == 2
+
+    def test_a_sharded_store_is_not_journaled(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        store = CanonicalSecretsStore(project_root=tmp_path)
+        store.migrate_to_sharded()
+        with pytest.raises(ValueError):
+            store.migrate_to_journal()
+
+    def test_sharding_retires_the_records(self, root):
+        _rotate(CanonicalSecretsStore(project_root=root), "authentik", "a1")
+        store = CanonicalSecretsStore(project_root=root)
+        assert store.migrate_to_sharded() is True
+        assert [p.name for p in _journal(root).iterdir()] == [HISTORY_FILENAME]
+        assert CanonicalSecretsStore(project_root=root).get_service_secrets("authentik") == {"password": "a1"}
+
+    def test_the_admin_store_is_not_journaled(self, tmp_path, monkeypatch):
+        from Scripts.garage.admin_store import GarageAdminStore
+
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        with pytest.raises(ValueError):
+            GarageAdminStore(project_root=tmp_path).migrate_to_journal()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+"""Tests for concurrent writers of the canonical store (canonical_merge.py).
+
+Two CanonicalSecretsStore instances on one project root stand in for two
+noah processes: each loads, edits, and saves without knowing of the other.
+Plaintext mode throughout (NOAH_DISABLE_SOPS).
+"""
+import fcntl
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Scripts.security import canonical_merge  # noqa: E402
+from Scripts.security.canonical_merge import MISSING, UNREAD  # noqa: E402
+from Scripts.security.canonical_store import (  # noqa: E402
+    CANONICAL_FILENAME_PLAINTEXT,
+    CanonicalSecretsStore,
+    StoreConflictError,
+)
+
+
+def _entry(value):
+    return {"value": value, "version": 1, "rotated_at": "earlier"}
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+    store = CanonicalSecretsStore(project_root=tmp_path)
+    store.ensure_service_entries("authentik", {"password": lambda: "a0", "secret_key": lambda: "k0"})
+    store.ensure_service_entries("headlamp", {"password": lambda: "h0"})
+    return tmp_path
+
+
+def _pair(root):
+    first, second = CanonicalSecretsStore(project_root=root), CanonicalSecretsStore(project_root=root)
+    first.load()
+    second.load()
+    return first, second
+
+
+def _rotate(store, service, key, value):
+    store.data["services"][service][key] = _entry(value)
+    return store.save()
+
+
+class TestMerge:
+    def test_edits_to_different_secrets_are_both_kept(self, root):
+        first, second = _pair(root)
+        assert _rotate(first, "authentik", "password", "a1")
+        assert _rotate(second, "authentik", "secret_key", "k1")
+        assert CanonicalSecretsStore(project_root=root).get_service_secrets("authentik") == {
+            "password": "a1", "secret_key": "k1",
+        }
+
+    def test_services_added_on_both_sides(self, root):
+        first, second = _pair(root)
+        first.ensure_service_entries("nextcloud", {"password": lambda: "n"})
+        second.ensure_service_entries("stalwart", {"password": lambda: "s"})
+        services = CanonicalSecretsStore(project_root=root).data["services"]
+        assert sorted(services) == ["authentik", "headlamp", "nextcloud", "stalwart"]
+        # The second writer now holds the merged document, not just its own.
+        assert "nextcloud" in second.data["services"]
+
+    def test_cluster_settings_merge_key_by_key(self, root):
+        first, second = _pair(root)
+        first.set_cluster_domain("example.org")
+        second.set_node_public_ip("198.51.100.7")
+        store = CanonicalSecretsStore(project_root=root)
+        assert store.get_cluster_domain() == "example.org"
+        assert store.get_node_public_ip() == "198.51.100.7"
+
+    def test_same_secret_changed_on_both_sides_is_a_conflict(self, root):
+        first, second = _pair(root)
+        assert _rotate(first, "authentik", "password", "a1")
+        path = root / "Secrets" / CANONICAL_FILENAME_PLAINTEXT
+        before = path.read_bytes()
+        with pytest.raises(StoreConflictError, match="services.authentik.password"):
+            _rotate(second, "authentik", "password", "a2")
+        assert path.read_bytes() == before
+
+    def test_the_same_change_on_both_sides_is_not_a_conflict(self, root):
+        first, second = _pair(root)
+        first.set_cluster_domain("example.org")
+        assert second.set_cluster_domain("example.org") is True
+
+    def test_removing_a_service_the_other_side_changed_is_a_conflict(self, root):
+        first, second = _pair(root)
+        assert _rotate(first, "headlamp", "password", "h1")
+        del second.data["services"]["headlamp"]
+        with pytest.raises(StoreConflictError, match="services.headlamp"):
+            second.save()
+
+    def test_removing_an_untouched_service_applies(self, root):
+        first, second = _pair(root)
+        assert _rotate(first, "authentik", "password", "a1")
+        del second.data["services"]["headlamp"]
+        assert second.save() is True
+        assert sorted(CanonicalSecretsStore(project_root=root).data["services"]) == ["authentik"]
+
+    def test_revision_increases_with_every_save(self, root):
+        start = CanonicalSecretsStore(project_root=root).data["revision"]
+        first, second = _pair(root)
+        assert _rotate(first, "authentik", "password", "a1")
+        assert _rotate(second, "headlamp", "password", "h1")
+        assert yaml.safe_load((root / "Secrets" / CANONICAL_FILENAME_PLAINTEXT).read_text())["revision"] == start + 2
+
+    def test_a_failed_transaction_keeps_the_pre_merge_base(self, root, monkeypatch):
+        first, second = _pair(root)
+        assert _rotate(first, "headlamp", "password", "h1")
+
+        original, full = CanonicalSecretsStore._save_single, [True]
+
+        def _disk_full(self, rekey):
+            if full[0]:
+                raise OSError("disk full")
+            return original(self, rekey)
+
+        monkeypatch.setattr(CanonicalSecretsStore, "_save_single", _disk_full)
+        with pytest.raises(OSError):
+            with second.transaction():
+                _rotate(second, "authentik", "password", "a1")
+        full[0] = False
+        # Had the merged base survived the rollback, this save would write
+        # headlamp's old password back over the first writer's.
+        assert second.ensure_service_entries("nextcloud", {"password": lambda: "n"})
+        assert CanonicalSecretsStore(project_root=root).get_service_secrets("headlamp") == {"password": "h1"}
+
+
+class TestShardedMerge:
+    @pytest.fixture
+    def sharded_root(self, root):
+        assert CanonicalSecretsStore(project_root=root).migrate_to_sharded() is True
+        return root
+
+    def test_rotations_of_different_services(self, sharded_root):
+        first, second = _pair(sharded_root)
+        assert _rotate(first, "authentik", "password", "a1")
+        assert _rotate(second, "headlamp", "password", "h1")
+        store = CanonicalSecretsStore(project_root=sharded_root)
+        assert store.get_service_secrets("authentik")["password"] == "a1"
+        assert store.get_service_secrets("headlamp") == {"password": "h1"}
+
+    def test_conflict_within_a_shard(self, sharded_root):
+        first, second = _pair(sharded_root)
+        second.get_service_secrets("headlamp")
+        assert _rotate(first, "headlamp", "password", "h1")
+        with pytest.raises(StoreConflictError):
+            _rotate(second, "headlamp", "password", "h2")
+
+    def test_a_shard_first_read_after_the_other_save_is_its_new_content(self, sharded_root, capsys):
+        first, second = _pair(sharded_root)
+        assert _rotate(first, "headlamp", "password", "h1")
+        # Read now, so edited knowingly: not a lost update, and not tampering.
+        assert second.get_service_secrets("headlamp") == {"password": "h1"}
+        assert "mismatch" not in capsys.readouterr().out
+        assert _rotate(second, "headlamp", "password", "h2")
+        assert CanonicalSecretsStore(project_root=sharded_root).get_service_secrets("headlamp") == {"password": "h2"}
+
+    def test_replacing_an_unread_shard_the_other_side_rotated(self, sharded_root):
+        first, second = _pair(sharded_root)
+        assert _rotate(first, "headlamp", "password", "h1")
+        # Assigned without reading: the base of this shard is unknown, and
+        # the other side changed it -- nothing proves the overwrite safe.
+        second.data["services"]["headlamp"] = {"password": _entry("h2")}
+        with pytest.raises(StoreConflictError):
+            second.save()
+
+    def test_replacing_an_unread_shard_nobody_else_touched(self, sharded_root):
+        first, second = _pair(sharded_root)
+        assert _rotate(first, "authentik", "password", "a1")
+        second.data["services"]["headlamp"] = {"password": _entry("h2")}
+        assert second.save() is True
+        store = CanonicalSecretsStore(project_root=sharded_root)
+        assert store.get_service_secrets("headlamp") == {"password": "h2"}
+        assert store.get_service_secrets("authentik")["password"] == "a1"
+
+
+class TestLock:
+    def test_save_waits_for_a_lock_held_elsewhere(self, root):
+        store = CanonicalSecretsStore(project_root=root)
+        store.load()
+        fd = os.open(root / "Secrets", os.O_RDONLY)
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        done = threading.Event()
+        worker = threading.Thread(target=lambda: (store.set_cluster_domain("example.org"), done.set()))
+        try:
+            worker.start()
+            assert not done.wait(0.3)
+        finally:
+            os.close(fd)
+        worker.join(5)
+        assert done.is_set()
+
+    def test_nothing_is_left_next_to_the_secrets(self, root):
+        CanonicalSecretsStore(project_root=root).set_cluster_domain("example.org")
+        assert sorted(p.name for p in (root / "Secrets").iterdir()) == [CANONICAL_FILENAME_PLAINTEXT]
+
+
+class TestChanges:
+    def test_leaves(self):
+        base = {"revision": 3, "cluster": {"domain": "a"},
+                "services": {"x": {"k": _entry("1")}, "gone": {}, "lazy": UNREAD}}
+        ours = {"revision": 4, "cluster": {"domain": "b"},
+                "services": {"x": {"k": _entry("2")}, "new": {"k": _entry("n")}, "lazy": {}}}
+        assert canonical_merge.changes(base, ours) == {
+            ("cluster", "domain"): "b",
+            ("services", "x", "k"): _entry("2"),
+            ("services", "gone"): MISSING,
+            ("services", "new"): {},
+            ("services", "new", "k"): _entry("n"),
+        }
+
+    def test_apply_reports_conflicts_and_applies_the_rest(self):
+        base = {"cluster": {"domain": "a", "node_public_ip": "1"}}
+        theirs = {"cluster": {"domain": "c", "node_public_ip": "1"}}
+        edits = {("cluster", "domain"): "b", ("cluster", "node_public_ip"): "2"}
+        assert canonical_merge.apply(edits, base, theirs) == [("cluster", "domain")]
+        assert theirs["cluster"]["node_public_ip"] == "2"
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Tests for the sharded layout of the canonical store (canonical_shards.py).
+
+Plaintext mode throughout (NOAH_DISABLE_SOPS): the layout logic is the same
+in both modes and only the file suffix changes.
+"""
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Scripts.security import canonical_store as cs  # noqa: E402
+from Scripts.security.canonical_integrity import service_digest  # noqa: E402
+from Scripts.security.canonical_shards import ShardedServices  # noqa: E402
+from Scripts.security.canonical_store import (  # noqa: E402
+    CANONICAL_FILENAME_PLAINTEXT,
+    AdminSecretLeakError,
+    CanonicalSecretsStore,
+)
+from Scripts.security.sops_client import SopsDecryptionError, SopsTimeoutError  # noqa: E402
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+    store = CanonicalSecretsStore(project_root=tmp_path)
+    for service in ("authentik", "headlamp", "nextcloud"):
+        store.ensure_service_entries(service, {"password": lambda s=service: f"{s}-pw"})
+    store.set_cluster_domain("example.org")
+    assert store.migrate_to_sharded() is True
+    return tmp_path
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Names of the files the store decrypts (reads, in plaintext mode)."""
+    seen = []
+    original = cs.CanonicalSecretsStore._decrypt_file
+
+    def _spy(self, path, *args, **kwargs):
+        seen.append(path.name)
+        return original(self, path, *args, **kwargs)
+
+    monkeypatch.setattr(cs.CanonicalSecretsStore, "_decrypt_file", _spy)
+    return seen
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Names of the files the store writes."""
+    seen = []
+    original = cs.CanonicalSecretsStore._encrypt_bytes
+
+    def _spy(self, plaintext, path, previous=None):
+        seen.append(Path(path).name)
+        return original(self, plaintext, path, previous)
+
+    monkeypatch.setattr(cs.CanonicalSecretsStore, "_encrypt_bytes", _spy)
+    return seen
+
+
+class TestMigration:
+    def test_one_file_per_service_and_the_single_file_is_gone(self, root):
+        shard_dir = root / "Secrets" / "canonical"
+        assert sorted(p.name for p in shard_dir.iterdir()) == [
+            "_index.yaml", "authentik.yaml", "headlamp.yaml", "nextcloud.yaml",
+        ]
+        assert not (root / "Secrets" / CANONICAL_FILENAME_PLAINTEXT).exists()
+        index = yaml.safe_load((shard_dir / "_index.yaml").read_text())
+        assert index["layout"] == "sharded"
+        assert index["cluster"] == {"domain": "example.org"}
+        assert "services" not in index
+        shard = yaml.safe_load((shard_dir / "authentik.yaml").read_text())
+        assert index["shards"]["authentik"] == service_digest("authentik", shard)
+
+    def test_values_survive(self, root):
+        store = CanonicalSecretsStore(project_root=root)
+        assert store.sharded
+        assert store.get_service_secrets("headlamp") == {"password": "headlamp-pw"}
+        assert store.get_cluster_domain() == "example.org"
+
+    def test_the_admin_store_stays_a_single_file(self, tmp_path, monkeypatch):
+        from Scripts.garage.admin_store import GarageAdminStore
+
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        with pytest.raises(ValueError):
+            GarageAdminStore(project_root=tmp_path).migrate_to_sharded()
+
+
+class TestLazyShards:
+    def test_opening_reads_the_index_only(self, root, reads):
+        store = CanonicalSecretsStore(project_root=root)
+        assert reads == []
+        # Listing services answers from the index.
+        assert sorted(store.data["services"]) == ["authentik", "headlamp", "nextcloud"]
+        assert "nextcloud" in store.data["services"]
+        assert store.get_cluster_domain() == "example.org"
+        assert reads == ["_index.yaml"]
+
+    def test_a_service_is_decrypted_on_first_access_only(self, root, reads):
+        store = CanonicalSecretsStore(project_root=root)
+        store.get_service_secrets("authentik")
+        store.get_service_secrets("authentik")
+        assert reads == ["_index.yaml", "authentik.yaml"]
+        assert store.get_service_secrets("unknown") == {}
+
+    def test_a_read_only_snapshot_stays_lazy(self, root, reads):
+        snap = cs.get_canonical_store(root, readonly=True)
+        assert snap.sharded
+        assert sorted(snap.data["services"]) == ["authentik", "headlamp", "nextcloud"]
+        assert snap.get_service_secrets("headlamp") == {"password": "headlamp-pw"}
+        assert reads == ["_index.yaml", "headlamp.yaml"]
+        with pytest.raises(cs.ReadOnlyStoreError):
+            snap.data["services"]["headlamp"]["password"]["value"] = "changed"
+
+    def test_a_read_only_snapshot_copies_and_dumps_as_plain_data(self, root):
+        snap = cs.get_canonical_store(root, readonly=True)
+        data = copy.deepcopy(snap.data)
+        assert type(data["services"]) is dict
+        assert data["services"]["headlamp"]["password"]["value"] == "headlamp-pw"
+        assert yaml.safe_load(yaml.safe_dump(snap.data))["services"] == data["services"]
+
+
+class TestDirtyShards:
+    def test_only_changed_shards_and_the_index_are_rewritten(self, root, writes):
+        store = CanonicalSecretsStore(project_root=root)
+        store.get_service_secrets("headlamp")  # read, not changed
+        store.data["services"]["authentik"]["password"]["value"] = "rotated"
+        assert store.save() is True
+        assert writes == ["authentik.yaml", "_index.yaml"]
+        assert CanonicalSecretsStore(project_root=root).get_service_secrets("authentik") == {
+            "password": "rotated"
+        }
+
+    def test_cluster_settings_touch_the_index_only(self, root, writes):
+        CanonicalSecretsStore(project_root=root).set_node_public_ip("198.51.100.7")
+        assert writes == ["_index.yaml"]
+
+    def test_new_service_gets_a_shard(self, root, writes):
+        store = CanonicalSecretsStore(project_root=root)
+        store.ensure_service_entries("stalwart", {"admin_password": lambda: "x"})
+        assert writes == ["stalwart.yaml", "_index.yaml"]
+        assert (root / "Secrets" / "canonical" / "stalwart.yaml").exists()
+
+    def test_rekey_rewrites_every_shard(self, root, writes):
+        assert CanonicalSecretsStore(project_root=root).save(rekey=True) is True
+        assert sorted(writes) == ["_index.yaml", "authentik.yaml", "headlamp.yaml", "nextcloud.yaml"]
+
+    def test_removed_service_loses_its_shard(self, root):
+        store = CanonicalSecretsStore(project_root=root)
+        del store.data["services"]["headlamp"]
+        assert store.save() is True
+        assert not (root / "Secrets" / "canonical" / "headlamp.yaml").exists()
+        assert "headlamp" not in CanonicalSecretsStore(project_root=root).data["services"]
+
+
+class TestIntegrity:
+    def test_tampered_shard_is_reported_then_re_signed(self, root, capsys):
+        shard = root / "Secrets" / "canonical" / "nextcloud.yaml"
+        shard.write_text(shard.read_text().replace("nextcloud-pw", "tampered"))
+        store = CanonicalSecretsStore(project_root=root)
+        assert "mismatch" not in capsys.readouterr().out  # not read yet
+        store.get_service_secrets("nextcloud")
+        assert "integrity mismatch for nextcloud" in capsys.readouterr().out
+
+        assert store.save() is True
+        CanonicalSecretsStore(project_root=root).get_service_secrets("nextcloud")
+        assert "mismatch" not in capsys.readouterr().out
+
+    def _unreadable_shard(self, root, monkeypatch, error):
+        """The authentik shard, encrypted, failing to decrypt with *error*."""
+        store = CanonicalSecretsStore(project_root=root).load()
+        store.encrypted = True
+        shard = root / "Secrets" / "canonical" / "authentik.enc.yaml"
+        shard.write_text("ENC[...]")
+
+        def _fail(path, decrypt):
+            raise error
+
+        monkeypatch.setattr(cs.session_cache, "decrypt_cached", _fail)
+        return store, shard
+
+    def test_a_transient_sops_failure_leaves_the_shard_alone(self, root, monkeypatch):
+        store, shard = self._unreadable_shard(root, monkeypatch, SopsTimeoutError("sops timed out"))
+        with pytest.raises(SopsTimeoutError):
+            store.get_service_secrets("authentik")
+        assert shard.exists()
+        assert "authentik" not in store.data["services"].loaded
+
+    def test_a_shard_that_does_not_decrypt_is_reset(self, root, monkeypatch):
+        store, shard = self._unreadable_shard(root, monkeypatch, SopsDecryptionError("bad key"))
+        assert store.get_service_secrets("authentik") == {}
+        assert not shard.exists()
+
+    def test_shard_missing_from_the_index_is_still_found(self, root):
+        index = root / "Secrets" / "canonical" / "_index.yaml"
+        data = yaml.safe_load(index.read_text())
+        del data["shards"]["headlamp"]
+        index.write_text(yaml.safe_dump(data))
+        store = CanonicalSecretsStore(project_root=root)
+        assert store.get_service_secrets("headlamp") == {"password": "headlamp-pw"}
+
+    def test_domain_separation_still_applies(self, root):
+        store = CanonicalSecretsStore(project_root=root)
+        store.data["services"]["authentik"]["admin_token"] = {"value": "x"}
+        with pytest.raises(AdminSecretLeakError):
+            store.save()
+
+
+class TestShardedServices:
+    def test_transaction_rollback_restores_loaded_shards(self, root):
+        store = CanonicalSecretsStore(project_root=root)
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.ensure_service_entries("stalwart", {"admin_password": lambda: "x"})
+                store.data["services"]["authentik"]["password"]["value"] = "changed"
+                raise RuntimeError("boom")
+        assert isinstance(store.data["services"], ShardedServices)
+        assert "stalwart" not in store.data["services"]
+        assert store.get_service_secrets("authentik") == {"password": "authentik-pw"}
+
+    def test_deepcopy_does_not_load_anything(self):
+        loads = []
+        services = ShardedServices(["a", "b"], lambda s: loads.append(s) or {})
+        clone = copy.deepcopy(services)
+        assert list(clone) == ["a", "b"] and loads == []
+
+    def test_unsafe_service_names_are_refused(self):
+        services = ShardedServices([], lambda s: {})
+        for name in ("../escape", "_index", "", "a/b"):
+            with pytest.raises(ValueError):
+                services[name] = {}
@@ -23,9 +23,13 @@ Tests for canonical store cluster metadata accessors (domain + node public IP).
 Isolated: each test uses a temporary project_root and NOAH_DISABLE_SOPS so it
 never touches the real Secrets/canonical-secrets store.
 """
+import copy
+import json
 import os
 import stat
 import sys
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
@@ -38,9 +42,12 @@ from Scripts.security.canonical_store import (  # noqa: E402
     CANONICAL_FILENAME_ENCRYPTED,
     CANONICAL_FILENAME_PLAINTEXT,
     CURRENT_SCHEMA_VERSION,
+    JSON_SCHEMA_VERSION,
+    AdminSecretLeakError,
     CanonicalSecretsStore,
     InsecureStoreError,
     PlaintextReason,
+    ReadOnlyStoreError,
     get_canonical_store,
 )
 
@@ -181,6 +188,69 @@ class TestSchemaUpgrade:
         assert entry == {"value": "kept", "version": 7, "rotated_at": "earlier"}
 
 
+class TestJsonFormat:
+    """Schema v3: the v2 document as one compact JSON payload (NOAH_CANONICAL_FORMAT)."""
+
+    @pytest.fixture
+    def v2(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        _write_raw(tmp_path, {
+            "version": 2,
+            # Unquoted in a hand-edited file: YAML reads a datetime.
+            "generated_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+            "services": {"authentik": {"secret_key": {"value": "kept", "version": 3, "rotated_at": "x"}}},
+        })
+        return tmp_path
+
+    def _on_disk(self, root):
+        return yaml.safe_load((root / "Secrets" / CANONICAL_FILENAME_PLAINTEXT).read_text())
+
+    def test_v2_is_upgraded_on_load_when_asked(self, v2, monkeypatch):
+        monkeypatch.setenv("NOAH_CANONICAL_FORMAT", "json")
+        store = _store(v2)
+        assert store.data["version"] == JSON_SCHEMA_VERSION
+        on_disk = self._on_disk(v2)
+        assert sorted(on_disk) == ["payload", "version"]
+        payload = json.loads(on_disk["payload"])
+        assert payload["services"]["authentik"]["secret_key"]["version"] == 3
+        assert payload["generated_at"].startswith("2026-01-01")
+
+    def test_v3_is_kept_then_reverted_on_request(self, v2, monkeypatch):
+        monkeypatch.setenv("NOAH_CANONICAL_FORMAT", "json")
+        _store(v2).load()
+        monkeypatch.delenv("NOAH_CANONICAL_FORMAT")
+        store = _store(v2)
+        assert store.data["version"] == JSON_SCHEMA_VERSION
+        store.ensure_service_entries("headlamp", {"password": lambda: "h"})
+        assert self._on_disk(v2)["version"] == JSON_SCHEMA_VERSION
+
+        monkeypatch.setenv("NOAH_CANONICAL_FORMAT", "yaml")
+        assert _store(v2).get_service_secrets("headlamp") == {"password": "h"}
+        on_disk = self._on_disk(v2)
+        assert on_disk["version"] == CURRENT_SCHEMA_VERSION
+        assert on_disk["services"]["authentik"]["secret_key"]["value"] == "kept"
+
+    def test_a_new_store_starts_in_v3_without_writing(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        monkeypatch.setenv("NOAH_CANONICAL_FORMAT", "json")
+        store = _store(tmp_path)
+        assert store.data["version"] == JSON_SCHEMA_VERSION
+        assert not (tmp_path / "Secrets" / CANONICAL_FILENAME_PLAINTEXT).exists()
+
+    def test_a_journaled_store_rewrites_its_snapshot(self, v2, monkeypatch):
+        assert _store(v2).migrate_to_journal()
+        monkeypatch.setenv("NOAH_CANONICAL_FORMAT", "json")
+        _store(v2).load()
+        assert self._on_disk(v2)["version"] == JSON_SCHEMA_VERSION
+
+    def test_sharding_goes_back_to_yaml(self, v2, monkeypatch):
+        monkeypatch.setenv("NOAH_CANONICAL_FORMAT", "json")
+        assert _store(v2).migrate_to_sharded()
+        index = yaml.safe_load((v2 / "Secrets" / "canonical" / "_index.yaml").read_text())
+        assert index["version"] == CURRENT_SCHEMA_VERSION
+        assert _store(v2).get_service_secrets("authentik") == {"secret_key": "kept"}
+
+
 class TestGetCanonicalStore:
     def test_returns_a_cached_singleton(self, tmp_path, monkeypatch):
         monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
@@ -209,21 +279,19 @@ def _sops(monkeypatch, available: bool) -> None:
 
 
 def _stub_encrypt(monkeypatch, ok: bool = True, on_call=None) -> None:
-    """Stand in for _encrypt_in_place, which shells out to the sops binary.
+    """Stand in for _encrypt_bytes, which shells out to the sops binary.
 
-    Mirrors what the real one leaves behind: encrypted bytes in a file whose
-    0600 mode is preserved (it os.replaces its own mkstemp temp into place).
+    Mirrors the real one: ciphertext back from the plaintext bytes, or None
+    when encryption fails.
     """
-    def _impl(self, path):
-        path = Path(path)
+    def _impl(self, plaintext, path, previous=None):
         if on_call is not None:
-            on_call(path)
+            on_call(plaintext, Path(path))
         if not ok:
-            return False
-        path.write_text("sops:\n    version: fake\n", encoding="utf-8")
-        return True
+            return None
+        return b"sops:\n    version: fake\n"
 
-    monkeypatch.setattr(cs.CanonicalSecretsStore, "_encrypt_in_place", _impl)
+    monkeypatch.setattr(cs.CanonicalSecretsStore, "_encrypt_bytes", _impl)
 
 
 def _mode(path: Path) -> int:
@@ -362,23 +430,26 @@ class TestAtomicSave:
         _stub_encrypt(monkeypatch, **stub)
         return CanonicalSecretsStore(project_root=tmp_path)
 
-    def test_t9_plaintext_never_appears_under_the_definitive_name(self, tmp_path, monkeypatch):
-        final = tmp_path / "Secrets" / CANONICAL_FILENAME_ENCRYPTED
+    def test_t9_plaintext_never_reaches_the_disk(self, tmp_path, monkeypatch):
+        secrets_dir = tmp_path / "Secrets"
+        final = secrets_dir / CANONICAL_FILENAME_ENCRYPTED
         seen = {}
 
-        def _observe(tmp):
-            # Sampled at the one moment plaintext exists on disk.
-            seen["tmp_is_not_final"] = tmp != final
-            seen["tmp_holds_plaintext"] = "probe" in tmp.read_text()
-            seen["final_exists"] = final.exists()
+        def _observe(plaintext, path):
+            # Sampled at the one moment plaintext exists, in memory only.
+            seen["plaintext_in_memory"] = b"probe" in plaintext
+            seen["hint_is_final"] = path == final
+            seen["files"] = sorted(p.name for p in secrets_dir.iterdir())
 
         store = self._encrypted_store(tmp_path, monkeypatch, on_call=_observe)
         store.data.setdefault("services", {})["probe"] = {"k": "v"}
         assert store.save() is True
 
-        assert seen["tmp_is_not_final"] is True
-        assert seen["tmp_holds_plaintext"] is True
-        assert seen["final_exists"] is False
+        assert seen["plaintext_in_memory"] is True
+        # The final name is the creation-rules hint, never a plaintext file.
+        assert seen["hint_is_final"] is True
+        assert seen["files"] == []
+        assert b"probe" not in final.read_bytes()
 
     @pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
     def test_t10_encrypted_file_is_0600(self, tmp_path, monkeypatch):
@@ -431,6 +502,266 @@ class TestAtomicSave:
         assert store.save() is True
         assert not stale.exists()
 
+    def test_save_hands_the_current_ciphertext_over_unless_rekeying(self, tmp_path, monkeypatch):
+        store = self._encrypted_store(tmp_path, monkeypatch)
+        assert store.save() is True
+        final = tmp_path / "Secrets" / CANONICAL_FILENAME_ENCRYPTED
+        seen = []
+
+        def _record(self, plaintext, path, previous=None):
+            seen.append(previous)
+            return b"sops:\n    version: next\n"
+
+        monkeypatch.setattr(cs.CanonicalSecretsStore, "_encrypt_bytes", _record)
+        before = final.read_bytes()
+        assert store.save() is True
+        assert store.save(rekey=True) is True
+        # Only the values that changed get re-encrypted against the old file;
+        # a re-key starts from nothing.
+        assert seen == [before, None]
+
+
+class TestTransaction:
+    def _store(self, tmp_path, monkeypatch, calls):
+        monkeypatch.setenv("NOAH_ENVIRONMENT", "production")
+        monkeypatch.delenv("NOAH_DISABLE_SOPS", raising=False)
+        _age_key(tmp_path)
+        _sops(monkeypatch, True)
+
+        def _record(self, plaintext, path, previous=None):
+            calls.append((yaml.safe_load(plaintext), previous))
+            return b"sops:\n    version: fake\n"
+
+        monkeypatch.setattr(cs.CanonicalSecretsStore, "_encrypt_bytes", _record)
+        return CanonicalSecretsStore(project_root=tmp_path)
+
+    def test_one_encrypted_write_for_the_whole_block(self, tmp_path, monkeypatch):
+        calls = []
+        store = self._store(tmp_path, monkeypatch, calls)
+        calls.clear()
+        with store.transaction():
+            for service in ("authentik", "headlamp", "nextcloud"):
+                store.ensure_service_entries(service, {"password": lambda: "s3cret"})
+            store.set_cluster_domain("example.org")
+            assert calls == []
+        assert len(calls) == 1
+        written = calls[0][0]
+        assert sorted(written["services"]) == ["authentik", "headlamp", "nextcloud"]
+        assert written["integrity"] == store._compute_integrity()
+
+    def test_nothing_to_write(self, tmp_path, monkeypatch):
+        calls = []
+        store = self._store(tmp_path, monkeypatch, calls)
+        calls.clear()
+        with store.transaction():
+            store.get_service_secrets("authentik")
+        assert calls == []
+
+    def test_an_exception_rolls_back_and_writes_nothing(self, tmp_path, monkeypatch):
+        calls = []
+        store = self._store(tmp_path, monkeypatch, calls)
+        store.ensure_service_entries("authentik", {"password": lambda: "old"})
+        before = copy.deepcopy(store.data)
+        calls.clear()
+        with pytest.raises(RuntimeError):
+            with store.transaction():
+                store.ensure_service_entries("headlamp", {"password": lambda: "new"})
+                raise RuntimeError("boom")
+        assert calls == []
+        assert store.data == before
+        # The store is usable again afterwards, outside any transaction.
+        store.ensure_service_entries("headlamp", {"password": lambda: "new"})
+        assert len(calls) == 1
+
+    def test_a_refused_save_rolls_back_too(self, tmp_path, monkeypatch):
+        calls = []
+        store = self._store(tmp_path, monkeypatch, calls)
+        before = copy.deepcopy(store.data)
+        calls.clear()
+        with pytest.raises(AdminSecretLeakError):
+            with store.transaction():
+                store.ensure_service_entries("authentik", {"password": lambda: "x"})
+                # Slipped in behind ensure_service's back: caught by save().
+                store.data["services"]["garage-admin"] = {"admin_token": "t"}
+                store.save()
+        assert calls == []
+        assert store.data == before
+
+    def test_nested_blocks_join_the_outer_one_and_keep_rekey(self, tmp_path, monkeypatch):
+        calls = []
+        store = self._store(tmp_path, monkeypatch, calls)
+        calls.clear()
+        with store.transaction():
+            with store.transaction():
+                store.ensure_service_entries("authentik", {"password": lambda: "x"})
+                store.save(rekey=True)
+            assert calls == []
+            store.save()
+        assert len(calls) == 1
+        # rekey: the write starts from nothing instead of the current file.
+        assert calls[0][1] is None
+
+
+
+class TestLazyLoad:
+    def _count_decrypts(self, monkeypatch, calls, result="version: 2\nservices:\n  authentik: {}\n"):
+        def _decrypt(self, path):
+            calls.append(path.name)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        monkeypatch.setattr(cs.CanonicalSecretsStore, "_decrypt_file", _decrypt)
+
+    def test_constructing_the_store_decrypts_nothing(self, tmp_path, monkeypatch):
+        calls = []
+        self._count_decrypts(monkeypatch, calls)
+        CanonicalSecretsStore(project_root=tmp_path)
+        assert calls == []
+
+    def test_first_access_decrypts_once(self, tmp_path, monkeypatch):
+        calls = []
+        self._count_decrypts(monkeypatch, calls)
+        store = CanonicalSecretsStore(project_root=tmp_path)
+        assert store.get_cluster_domain() is None
+        assert "authentik" in store.data["services"]
+        store.get_service_secrets("authentik")
+        assert calls == [CANONICAL_FILENAME_PLAINTEXT]
+
+    def test_load_is_explicit_and_idempotent(self, tmp_path, monkeypatch):
+        calls = []
+        self._count_decrypts(monkeypatch, calls)
+        store = CanonicalSecretsStore(project_root=tmp_path)
+        assert store.load() is store
+        store.load()
+        assert calls == [CANONICAL_FILENAME_PLAINTEXT]
+
+    def test_a_failed_load_surfaces_on_access_and_leaves_nothing_to_save(self, tmp_path, monkeypatch):
+        calls = []
+        self._count_decrypts(monkeypatch, calls, result=cs.SopsKeyError("no key"))
+        store = CanonicalSecretsStore(project_root=tmp_path)
+        with pytest.raises(cs.SopsKeyError):
+            store.get_cluster_domain()
+        # Still unloaded: the next access retries instead of seeing an empty store.
+        with pytest.raises(cs.SopsKeyError):
+            store.load()
+        assert len(calls) == 2
+
+
+
+class TestReadOnlySnapshot:
+    def test_reads_like_the_store(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        store = _store(tmp_path)
+        store.ensure_service_entries("authentik", {"password": lambda: "pw"})
+        store.set_cluster_domain("example.org")
+        snap = get_canonical_store(tmp_path, readonly=True)
+        assert isinstance(snap, cs.CanonicalStoreSnapshot)
+        assert snap.get_service_secrets("authentik") == {"password": "pw"}
+        assert snap.get_cluster_domain() == "example.org"
+        assert snap.data["integrity"] == store.data["integrity"]
+
+    def test_a_fresh_snapshot_per_call(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        monkeypatch.setattr(cs, "_store_instance", None)
+        snap = get_canonical_store(tmp_path, readonly=True)
+        assert get_canonical_store(tmp_path, readonly=True) is not snap
+        assert get_canonical_store(tmp_path) is not snap
+
+    def test_never_creates_the_secrets_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        snap = get_canonical_store(tmp_path, readonly=True)
+        assert snap.get_cluster_domain() is None
+        assert not (tmp_path / "Secrets").exists()
+
+    def test_writers_refuse(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        _store(tmp_path).ensure_service_entries("authentik", {"password": lambda: "pw"})
+        before = (tmp_path / "Secrets" / CANONICAL_FILENAME_PLAINTEXT).read_bytes()
+        snap = get_canonical_store(tmp_path, readonly=True)
+        with pytest.raises(ReadOnlyStoreError):
+            snap.set_cluster_domain("example.org")
+        with pytest.raises(ReadOnlyStoreError):
+            snap.ensure_service_entries("headlamp", {"password": lambda: "x"})
+        with pytest.raises(ReadOnlyStoreError):
+            snap.save()
+        with pytest.raises(ReadOnlyStoreError):
+            snap.data["services"]["authentik"]["password"]["value"] = "changed"
+        with pytest.raises(ReadOnlyStoreError):
+            snap.data.setdefault("cluster", {})
+        assert (tmp_path / "Secrets" / CANONICAL_FILENAME_PLAINTEXT).read_bytes() == before
+
+    @pytest.fixture
+    def snap(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        _store(tmp_path).ensure_service_entries("authentik", {"password": lambda: "pw"})
+        return get_canonical_store(tmp_path, readonly=True)
+
+    def test_deepcopy_gives_plain_writable_data(self, snap):
+        data = copy.deepcopy(snap.data)
+        assert type(data) is dict and type(data["services"]["authentik"]) is dict
+        data["services"]["authentik"]["password"]["value"] = "changed"
+        assert snap.get_service_secrets("authentik") == {"password": "pw"}
+
+    def test_pickles_as_plain_data(self, snap):
+        import pickle
+        data = pickle.loads(pickle.dumps(snap.data))
+        assert type(data) is dict
+        assert data["services"]["authentik"]["password"]["value"] == "pw"
+
+    def test_dumps_as_yaml(self, snap):
+        for dump in (yaml.safe_dump, lambda d: yaml.dump(d, Dumper=cs._YAML_DUMPER)):
+            loaded = yaml.safe_load(dump(snap.data))
+            assert loaded["services"]["authentik"]["password"]["value"] == "pw"
+
+    def test_schema_upgrade_stays_in_memory(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        _write_raw(tmp_path, {"version": 1, "services": {"authentik": {"secret_key": "legacy"}}})
+        path = tmp_path / "Secrets" / CANONICAL_FILENAME_PLAINTEXT
+        before = path.read_bytes()
+        snap = get_canonical_store(tmp_path, readonly=True)
+        assert snap.data["version"] == CURRENT_SCHEMA_VERSION
+        assert snap.data["services"]["authentik"]["secret_key"]["value"] == "legacy"
+        assert path.read_bytes() == before
+
+    def test_an_undecryptable_file_is_not_reset(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_ENVIRONMENT", "production")
+        monkeypatch.delenv("NOAH_DISABLE_SOPS", raising=False)
+        _age_key(tmp_path)
+        _sops(monkeypatch, True)
+        enc = tmp_path / "Secrets" / CANONICAL_FILENAME_ENCRYPTED
+        enc.parent.mkdir()
+        enc.write_text("not: sops\n")
+
+        def _fail(path, decrypt):
+            raise cs.SopsDecryptionError("corrupt", "bad mac")
+
+        monkeypatch.setattr(cs.session_cache, "decrypt_cached", _fail)
+        assert get_canonical_store(tmp_path, readonly=True).data["services"] == {}
+        assert enc.exists()
+
+    def test_shared_across_threads_loads_once(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_DISABLE_SOPS", "true")
+        _store(tmp_path).ensure_service_entries("authentik", {"password": lambda: "pw"})
+        reads = []
+        original = cs.CanonicalSecretsStore._decrypt_file
+
+        def _count(self, path):
+            reads.append(path.name)
+            return original(self, path)
+
+        monkeypatch.setattr(cs.CanonicalSecretsStore, "_decrypt_file", _count)
+        snap = get_canonical_store(tmp_path, readonly=True)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(snap.get_service_secrets("authentik")))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == [{"password": "pw"}] * 8
+        assert reads == [CANONICAL_FILENAME_PLAINTEXT]
+
 
 # ---------------------------------------------------------------------------
 # The store files must be un-committable. A per-file .gitignore rule once left
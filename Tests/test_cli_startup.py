@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Import-time regression tests for noah.py.
+
+Every probe runs in a fresh interpreter: the test process itself has imported
+most of Scripts/ by the time it gets here, so sys.modules in-process says
+nothing about what a real `python3 noah.py ...` pays for at startup.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+# Implementation modules no command should pay for unless it dispatches to them.
+HEAVY = (
+    "Scripts.cluster_create.bootstrap_utils",
+    "Scripts.cluster_create.verify_utils",
+    "Scripts.cluster_destroy.cluster_destroy_utils",
+    "Scripts.core_helm.authentik_credentials",
+    "Scripts.env_init.environment_initializer",
+    "Scripts.env_init.doctor_utils",
+    "Scripts.garage.garage_deploy",
+    "Scripts.gitops.gitops_init",
+    "Scripts.security.rotate_cli",
+    # Reached only through ctx.obj, which builds them on first use.
+    "Scripts.core_helm.cluster_manager",
+    "Scripts.security.security_manager",
+    "kubernetes",
+)
+
+_PROBE = """
+import json, sys
+from click.testing import CliRunner
+import noah
+CliRunner().invoke(noah.cli, json.loads(sys.argv[1]))
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def _loaded_modules(args: list[str], tmp_path: Path) -> set[str]:
+    # An empty PATH keeps dispatched commands from reaching a real flux/kubectl.
+    env = {**os.environ, "PATH": str(tmp_path), "NOAH_ENVIRONMENT": "test"}
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE, json.dumps(args)],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+
+def test_root_help_imports_no_implementation(tmp_path):
+    loaded = _loaded_modules(["--help"], tmp_path)
+    assert not loaded & {*HEAVY, "requests"}
+
+
+@pytest.mark.parametrize("args, expected", [
+    (["flux", "status"], "Scripts.cluster_create.flux_utils"),
+    (["flux", "logs", "--help"], None),
+    (["garage", "infra", "plan", "--help"], None),
+    (["setup", "gitops", "--help"], None),
+    (["certificates", "deploy-manager"], None),
+    (["secrets", "rotate", "--help"], "Scripts.security.rotate_cli"),
+    (["garage", "admin", "show", "--help"], None),
+])
+def test_subcommand_imports_only_its_own_module(tmp_path, args, expected):
+    loaded = _loaded_modules(args, tmp_path)
+    if expected:
+        assert expected in loaded
+    assert not loaded & (set(HEAVY) - {expected})
+
+
+def test_context_objects_are_built_on_first_use():
+    import noah
+    from click.testing import CliRunner
+
+    with patch('noah.ConfigLoader') as config, \
+         patch('noah.ClusterManager') as cluster, \
+         patch('noah.SecretManager') as secrets:
+        result = CliRunner().invoke(noah.cli, ['certificates', 'deploy-manager'])
+        assert result.exit_code == 0, result.output
+        config.assert_not_called()
+        cluster.assert_not_called()
+        secrets.assert_not_called()
+
+        result = CliRunner().invoke(noah.cli, ['status'])
+        cluster.assert_called_once()
+        secrets.assert_not_called()
+
+
+def test_lazy_proxy_forwards_to_a_single_instance():
+    import noah
+
+    built = []
+
+    class _Target:
+        value = 1
+
+    def factory():
+        built.append(1)
+        return _Target()
+
+    proxy = noah.LazyProxy(factory)
+    assert built == []
+    assert proxy.value == 1
+    proxy.value = 2
+    assert proxy.value == 2
+    assert built == [1]
+
+
+def test_lazy_attributes_still_resolve_from_the_module():
+    import noah
+    for name in noah._LAZY_ATTRIBUTES:
+        assert getattr(noah, name) is not None
+
+
+@pytest.fixture
+def secure_env(tmp_path, monkeypatch):
+    """Point the on-demand config load at a placeholder file and count decrypts."""
+    from Scripts.security import secure_env_loader
+
+    config_enc = tmp_path / "config.enc.yaml"
+    config_enc.write_text("placeholder: true\n")
+    monkeypatch.setattr(secure_env_loader, "CONFIG_ENC_FILE", config_enc)
+    monkeypatch.setattr(secure_env_loader, "_secure_env_loaded", False)
+    with patch.object(secure_env_loader.SecureEnvLoader, "load_secure_env",
+                      return_value=True) as load:
+        yield load
+
+
+@pytest.mark.parametrize("args", [
+    ["--version"],
+    ["flux", "logs", "--help"],
+    ["garage", "infra", "plan", "--help"],
+    ["certificates", "generate-certs", "--help"],
+])
+def test_unmarked_commands_do_not_decrypt_config(secure_env, args):
+    import noah
+    from click.testing import CliRunner
+
+    result = CliRunner().invoke(noah.cli, args)
+    assert result.exit_code == 0, result.output
+    secure_env.assert_not_called()
+
+
+def test_marked_command_decrypts_config_once(secure_env):
+    import noah
+    from click.testing import CliRunner
+
+    with patch('noah.ConfigLoader') as config:
+        config.return_value.get_all_domains.return_value = {}
+        CliRunner().invoke(noah.cli, ['config', 'domains'])
+        CliRunner().invoke(noah.cli, ['config', 'domains'])
+    assert getattr(noah.config.callback, 'needs_secure_env', False)
+    secure_env.assert_called_once()
+
+
+def test_config_loader_miss_decrypts_config_once(secure_env, monkeypatch):
+    from Scripts.utils.config_loader import ConfigLoader
+
+    monkeypatch.setenv("NOAH_DOMAIN", "example.test")
+    loader = ConfigLoader.__new__(ConfigLoader)
+    loader.config = {}
+    assert loader.get("NOAH_DOMAIN") == "example.test"
+    secure_env.assert_not_called()
+    assert loader.get("NOAH_MISSING_KEY", "fallback") == "fallback"
+    assert loader.get("NOAH_OTHER_MISSING_KEY") is None
+    secure_env.assert_called_once()
+
+
+_FAKE_NOAH = """
+import json, sys
+print(json.dumps({"executable": sys.executable, "argv": sys.argv, "path0": sys.path[0]}))
+"""
+
+
+@pytest.mark.parametrize("interpreter_dir", ["bin", "dir with spaces"])
+def test_launcher_runs_noah_under_the_given_interpreter(tmp_path, interpreter_dir):
+    from Scripts.env_init.environment_initializer import write_launcher
+
+    (tmp_path / "noah.py").write_text(_FAKE_NOAH)
+    bindir = tmp_path / interpreter_dir
+    bindir.mkdir()
+    interpreter = bindir / "python3"
+    interpreter.symlink_to(sys.executable)
+
+    launcher = write_launcher(interpreter, tmp_path)
+    assert launcher == tmp_path / "noah"
+    assert os.access(launcher, os.X_OK)
+    first_line = launcher.read_text().splitlines()[0]
+    assert first_line == ("#!/bin/sh" if " " in str(interpreter) else f"#!{interpreter}")
+
+    result = subprocess.run([str(launcher), "flux", "status"], capture_output=True,
+                            text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    seen = json.loads(result.stdout)
+    assert seen["executable"] == str(interpreter)
+    assert seen["argv"] == [str(tmp_path / "noah.py"), "flux", "status"]
+    assert seen["path0"] == str(tmp_path)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Tests for `noah daemon`: the fork-per-command server and its thin client."""
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from Scripts.daemon import client
+from Scripts.daemon.server import DaemonError, NoahDaemon
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def runtime_dir(tmp_path, monkeypatch):
+    runtime = tmp_path / "run"
+    runtime.mkdir(mode=0o700)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(runtime))
+    return runtime
+
+
+def _echo_command(argv):
+    """Stand-in for noah.main: report what the forked child sees."""
+    print(json.dumps({
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "client": os.environ.get("NOAH_TEST_CLIENT"),
+        "overlay": os.environ.get("NOAH_TEST_OVERLAY"),
+    }), flush=True)
+    if argv[:1] == ["fail"]:
+        sys.exit(3)
+    if argv[:1] == ["sleep"]:
+        time.sleep(30)
+
+
+def _forward_capturing(argv, root, tmp_path):
+    """client.forward() with fd 1 pointed at a file; returns (status, last line)."""
+    out = tmp_path / "stdout"
+    fd = os.open(out, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    saved = os.dup(1)
+    os.dup2(fd, 1)
+    try:
+        status = client.forward(argv, root)
+    finally:
+        os.dup2(saved, 1)
+        os.close(saved)
+        os.close(fd)
+    return status, json.loads(out.read_text().strip().splitlines()[-1])
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+@pytest.fixture
+def daemon(tmp_path, runtime_dir):
+    """A NoahDaemon serving *tmp_path*, in a forked process."""
+    watched = tmp_path / "config.enc.yaml"
+    watched.write_text("v1")
+    counter = tmp_path / "warm-ups"
+
+    def warm_up():
+        with counter.open("a") as fh:
+            fh.write("x")
+        if watched.read_text() == "mid-rewrite":
+            raise ValueError("cannot decrypt")
+        return {"NOAH_TEST_OVERLAY": watched.read_text()}
+
+    sock = client.socket_path(tmp_path)
+    server = NoahDaemon(sock, run=_echo_command, warm_up=warm_up, watch=[watched])
+    listener = server.bind()
+    process = multiprocessing.get_context("fork").Process(
+        target=server.serve_forever, args=(listener,), daemon=True
+    )
+    process.start()
+    listener.close()
+    assert _wait_for(lambda: counter.exists())
+    yield tmp_path, process, watched, counter
+    client.request(tmp_path, "stop")
+    process.join(5)
+    if process.is_alive():
+        process.kill()
+
+
+def test_no_daemon_means_in_process(tmp_path, runtime_dir):
+    assert client.forward(["--version"], tmp_path) is None
+    assert client.request(tmp_path, "status") is None
+
+
+def test_no_runtime_dir_means_no_daemon(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    assert client.socket_path(tmp_path) is None
+    assert client.forward(["--version"], tmp_path) is None
+
+
+def test_stale_socket_falls_back(tmp_path, runtime_dir):
+    sock = client.socket_path(tmp_path)
+    sock.parent.mkdir(mode=0o700)
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(sock))
+    stale.close()  # bound, never listening: what a killed daemon leaves
+    assert client.forward(["--version"], tmp_path) is None
+
+
+def test_command_runs_in_the_daemon_with_client_context(daemon, monkeypatch):
+    root, _process, _watched, _counter = daemon
+    monkeypatch.setenv("NOAH_TEST_CLIENT", "from-client")
+    monkeypatch.chdir(root)
+
+    status, seen = _forward_capturing(["status", "--all"], root, root)
+    assert status == 0
+    assert seen == {
+        "argv": ["status", "--all"],
+        "cwd": str(root),
+        "client": "from-client",
+        "overlay": "v1",
+    }
+
+
+def test_exit_status_is_propagated(daemon):
+    root = daemon[0]
+    assert client.forward(["fail"], root) == 3
+
+
+def test_socket_is_private(daemon):
+    sock = client.socket_path(daemon[0])
+    assert sock.stat().st_mode & 0o777 == 0o600
+    assert sock.parent.stat().st_mode & 0o777 == 0o700
+
+
+def test_second_daemon_refuses_to_start(daemon):
+    sock = client.socket_path(daemon[0])
+    with pytest.raises(DaemonError):
+        NoahDaemon(sock, run=_echo_command, warm_up=dict).bind()
+
+
+def test_watched_file_change_rebuilds_warm_state(daemon):
+    root, _process, watched, counter = daemon
+    client.forward(["one"], root)
+    assert counter.read_text() == "x"
+
+    watched.write_text("v2-longer")
+    _status, seen = _forward_capturing(["two"], root, root)
+    assert counter.read_text() == "xx"
+    assert seen["overlay"] == "v2-longer"
+
+
+def test_failed_warm_up_keeps_the_previous_state(daemon):
+    root, process, watched, counter = daemon
+    watched.write_text("mid-rewrite")
+    _status, seen = _forward_capturing(["one"], root, root)
+    assert counter.read_text() == "xx"
+    assert seen["overlay"] == "v1"
+    assert process.is_alive()
+
+    watched.write_text("v2-longer")  # retried until it succeeds
+    _status, seen = _forward_capturing(["two"], root, root)
+    assert seen["overlay"] == "v2-longer"
+
+
+def test_silent_daemon_falls_back_after_a_timeout(tmp_path, runtime_dir, monkeypatch):
+    sock = client.socket_path(tmp_path)
+    sock.parent.mkdir(mode=0o700)
+    hung = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    hung.bind(str(sock))
+    hung.listen(1)  # accepts the connection, never answers
+    monkeypatch.setattr(client, "START_TIMEOUT", 0.2)
+    try:
+        assert client.forward(["one"], tmp_path) is None
+    finally:
+        hung.close()
+
+
+def test_status_and_stop(daemon):
+    root, process, _watched, _counter = daemon
+    client.forward(["one"], root)
+    status = client.request(root, "status")
+    assert status["pid"] == process.pid
+    assert status["served"] == 1
+
+    assert client.request(root, "stop") == {"stopped": process.pid}
+    process.join(5)
+    assert not process.is_alive()
+    assert not client.socket_path(root).exists()
+    assert client.forward(["one"], root) is None
+
+
+def test_client_disconnect_terminates_the_command(daemon):
+    root = daemon[0]
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(str(client.socket_path(root)))
+    devnull = os.open(os.devnull, os.O_RDWR)
+    try:
+        client._send(sock, {"op": "run", "argv": ["sleep"], "cwd": str(root), "env": {}},
+                     [devnull, devnull, devnull])
+        started = client._Reader(sock).next()
+    finally:
+        os.close(devnull)
+    sock.close()
+    assert _wait_for(lambda: client.request(root, "status")["running"] == 0)
+    # `running` drops as soon as the server notices the hang-up; the child may
+    # still be dying, or a zombie until the server reaps it.
+    assert _wait_for(lambda: not _alive(started["started"]))
+
+
+def test_noah_forwards_to_a_running_daemon(runtime_dir, tmp_path):
+    env = {**os.environ, "NOAH_ENVIRONMENT": "test", "PATH": f"{tmp_path}:{os.path.dirname(sys.executable)}"}
+    noah = [sys.executable, str(ROOT / "noah.py")]
+    started = subprocess.run(noah + ["daemon", "start"], cwd=ROOT, env=env,
+                             capture_output=True, text=True, timeout=60)
+    assert started.returncode == 0, started.stderr
+    try:
+        assert _wait_for(lambda: client.request(ROOT, "status") is not None, timeout=30)
+        result = subprocess.run(noah + ["--version"], cwd=ROOT, env=env,
+                                capture_output=True, text=True, timeout=30)
+        assert result.returncode == 0
+        assert "0.1.0" in result.stdout
+        assert client.request(ROOT, "status")["served"] == 1
+
+        bypass = subprocess.run(noah + ["--version"], cwd=ROOT,
+                                env={**env, "NOAH_NO_DAEMON": "1"},
+                                capture_output=True, text=True, timeout=30)
+        assert bypass.returncode == 0
+        assert client.request(ROOT, "status")["served"] == 1
+    finally:
+        subprocess.run(noah + ["daemon", "stop"], cwd=ROOT, env=env,
+                       capture_output=True, timeout=30)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+"""Tests for Scripts/utils/durations.py."""
+import pytest
+
+from Scripts.utils.durations import parse_duration
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("900", 900), ("90s", 90), ("15m", 900), ("2h", 7200), ("90d", 7776000), ("2w", 1209600),
+])
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == seconds
+
+
+def test_bare_number_takes_the_given_unit_or_is_refused():
+    assert parse_duration("90", bare_unit="d") == 90 * 86400
+    with pytest.raises(ValueError):
+        parse_duration("90", bare_unit=None)
+    assert parse_duration("90d", bare_unit=None) == 90 * 86400
+
+
+@pytest.mark.parametrize("value", ["", "0", "0d", "15x", "-5m", "d"])
+def test_garbage_is_refused(value):
+    with pytest.raises(ValueError):
+        parse_duration(value)
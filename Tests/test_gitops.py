@@ -325,7 +325,7 @@ class TestSetupGitopsInPlace:
 
         with patch.object(gitops_init, "_get_or_generate_secrets",
                           return_value=dict(FAKE_SECRETS)), \
-             patch.object(gitops_init, "_sops_encrypt"), \
+             patch.object(gitops_init, "_sops_encrypt_many", return_value={}), \
              patch("Scripts.security.canonical_store.get_canonical_store",
                    return_value=store):
             gitops_init.setup_gitops(
@@ -374,6 +374,90 @@ class TestSetupGitopsInPlace:
         store.set_node_public_ip.assert_not_called()
 
 
+class TestSetupGitopsSopsBatch:
+    """Existing *.enc.yaml files go through one decrypt_many call and one
+    encrypt_bytes_many call; plaintext never reaches the disk, and a failure
+    writes nothing."""
+
+    CIPHERTEXT = "data: ENC[AES256_GCM,data:x,type:str]\nsops:\n    version: 3.11.0\n"
+
+    def _tree(self, project_root, count=3):
+        secrets_dir = project_root / "gitops" / "apps" / "demo"
+        secrets_dir.mkdir(parents=True)
+        extra_dir = project_root / "gitops" / "apps-extra"
+        extra_dir.mkdir(parents=True)
+        (extra_dir / "kustomization.yaml").write_text("resources: []\n")
+        files = []
+        for i in range(count):
+            f = secrets_dir / f"s{i}.enc.yaml"
+            f.write_text(self.CIPHERTEXT)
+            files.append(f)
+        return files
+
+    def _run(self, project_root, client):
+        from Scripts.gitops import gitops_init
+
+        store = MagicMock()
+        store.get_cluster_domain.return_value = DOMAIN
+        with patch.object(gitops_init, "_get_or_generate_secrets",
+                          return_value={"REPLACE_ME": "filled"}), \
+             patch.object(gitops_init, "_sops_client", return_value=client), \
+             patch("Scripts.security.canonical_store.get_canonical_store",
+                   return_value=store):
+            gitops_init.setup_gitops(DOMAIN, project_root, _noop_print_status)
+
+    def test_changed_files_are_reencrypted_together(self, project_root):
+        files = self._tree(project_root)
+        client = MagicMock()
+        client.decrypt_many.side_effect = lambda paths: {
+            p: ("data: REPLACE_ME\n" if p == files[1] else "data: same\n") for p in paths
+        }
+        seen_on_disk = []
+
+        def _encrypt(contents):
+            seen_on_disk.extend(f.read_text() for f in files)
+            return {p: b"sops: " + data for p, data in contents.items()}
+
+        client.encrypt_bytes_many.side_effect = _encrypt
+
+        self._run(project_root, client)
+
+        client.decrypt_many.assert_called_once()
+        assert sorted(client.decrypt_many.call_args[0][0]) == files
+        # Unchanged plaintext keeps its ciphertext; only s1 is re-encrypted,
+        # from memory: the files held nothing but ciphertext meanwhile.
+        client.encrypt_bytes_many.assert_called_once_with({files[1]: b"data: filled\n"})
+        assert seen_on_disk == [self.CIPHERTEXT] * 3
+        assert files[0].read_text() == self.CIPHERTEXT
+        assert files[1].read_text() == "sops: data: filled\n"
+
+    def test_encryption_failure_writes_nothing(self, project_root):
+        from Scripts.security.sops_client import SopsEncryptionError
+
+        files = self._tree(project_root)
+        client = MagicMock()
+        client.decrypt_many.side_effect = lambda paths: {p: "data: REPLACE_ME\n" for p in paths}
+        client.encrypt_bytes_many.side_effect = lambda contents: {
+            p: (SopsEncryptionError("failed", detail="boom") if p == files[2] else b"sops: new\n")
+            for p in contents
+        }
+
+        with pytest.raises(RuntimeError, match="boom"):
+            self._run(project_root, client)
+        assert [f.read_text() for f in files] == [self.CIPHERTEXT] * 3
+
+    @pytest.mark.parametrize("stderr", [
+        "Error: no identity matched any of the recipients",
+        # sops >= 3.9 wording, wrapped in its "| " box
+        "    - | failed to create reader for decrypting sops data key with\n"
+        "      | age: identity did not match any of the recipients: incorrect\n",
+    ])
+    def test_unreachable_recipient_wordings(self, stderr):
+        from Scripts.gitops.gitops_init import _is_unreachable_recipient_error
+        assert _is_unreachable_recipient_error(stderr)
+        assert not _is_unreachable_recipient_error("mac mismatch")
+
+
 # ---------------------------------------------------------------------------
 # CLI tests — `setup gitops` command
 # ---------------------------------------------------------------------------
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for `noah --profile`."""
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from click.testing import CliRunner
+
+from Scripts.utils import profiling
+from Scripts.utils.profiling import (
+    MODES,
+    ImportTimer,
+    ProcessRecorder,
+    expand_bare_flag,
+    parse_modes,
+    requested,
+)
+
+
+class TestArguments:
+    @pytest.mark.parametrize("value,modes", [
+        ("all", MODES),
+        ("", MODES),
+        ("subprocess", ("subprocess",)),
+        ("subprocess, imports", ("imports", "subprocess")),
+    ])
+    def test_parse_modes(self, value, modes):
+        assert parse_modes(value) == modes
+
+    def test_unknown_mode_is_named(self):
+        with pytest.raises(ValueError, match="bogus"):
+            parse_modes("cprofile,bogus")
+
+    @pytest.mark.parametrize("args,expected", [
+        (["--profile", "flux", "status"], ["--profile=all", "flux", "status"]),
+        (["--profile"], ["--profile=all"]),
+        (["--profile", "imports", "flux"], ["--profile", "imports", "flux"]),
+        (["--profile", "--profile-output", "r.json", "status"],
+         ["--profile=all", "--profile-output", "r.json", "status"]),
+        # Only the root options are rewritten, never a subcommand's.
+        (["flux", "--profile", "x"], ["flux", "--profile", "x"]),
+    ])
+    def test_expand_bare_flag(self, args, expected):
+        assert expand_bare_flag(args) == expected
+
+    def test_requested_looks_at_root_options_only(self):
+        assert requested(["--profile=imports", "status"])
+        assert requested(["--profile", "status"])
+        assert not requested(["secrets", "--profile"])
+        assert not requested([])
+
+
+def test_import_timer_reports_self_and_cumulative_time(tmp_path, monkeypatch):
+    package = tmp_path / "profiled_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("from . import child\n")
+    (package / "child.py").write_text(textwrap.dedent("""
+        import time
+        time.sleep(0.02)
+    """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    timer = ImportTimer().install()
+    try:
+        import profiled_pkg
+    finally:
+        timer.uninstall()
+        sys.modules.pop("profiled_pkg", None)
+        sys.modules.pop("profiled_pkg.child", None)
+
+    records = {r["module"]: r for r in timer.records}
+    assert records["profiled_pkg.child"]["self_ms"] >= 20
+    parent = records["profiled_pkg"]
+    assert parent["cumulative_ms"] >= records["profiled_pkg.child"]["cumulative_ms"]
+    assert parent["self_ms"] < 20
+    # The loader is handed back untouched once the module has run.
+    assert "exec_module" not in vars(profiled_pkg.__loader__)
+    assert timer.report()["slowest"][0]["module"] == "profiled_pkg.child"
+
+
+class TestProcessRecorder:
+    def test_records_wall_time_and_exit_code(self):
+        recorder = ProcessRecorder().install()
+        try:
+            subprocess.run([sys.executable, "-c", "raise SystemExit(3)"])
+            out = subprocess.check_output([sys.executable, "-c", "print('ok')"], text=True)
+        finally:
+            recorder.uninstall()
+        assert out == "ok\n"
+        report = recorder.report()
+        assert [p["exit_code"] for p in report["processes"]] == [3, 0]
+        assert all(p["wall_ms"] > 0 and p["pid"] for p in report["processes"])
+        program = report["processes"][0]["program"]
+        assert report["by_program"][program] == {
+            "count": 2, "wall_ms": report["wall_ms"], "failed": 1,
+        }
+
+    def test_missing_binary_and_secret_arguments(self):
+        recorder = ProcessRecorder().install()
+        try:
+            with pytest.raises(FileNotFoundError):
+                subprocess.run(["noah-no-such-binary", "--admin-password=hunter2", "plain=1"])
+        finally:
+            recorder.uninstall()
+        [process] = recorder.report()["processes"]
+        assert process["argv"] == ["noah-no-such-binary", "--admin-password=***", "plain=1"]
+        assert process["exit_code"] is None and "error" in process
+
+    def test_uninstall_restores_popen(self):
+        original = subprocess.Popen
+        ProcessRecorder().install().uninstall()
+        assert subprocess.Popen is original
+
+
+class TestCli:
+    def _invoke(self, args):
+        import noah
+        return CliRunner().invoke(noah.cli, args)
+
+    def test_report_combines_every_collector(self, tmp_path):
+        output = tmp_path / "report.json"
+        result = self._invoke(["--profile", "--profile-output", str(output), "session", "status"])
+        assert result.exit_code == 0, result.output
+        report = json.loads(output.read_text())
+        assert report["modes"] == list(MODES)
+        assert {"imports", "cprofile", "subprocesses"} <= report.keys()
+        assert report["cprofile"]["by_cumtime"]
+        assert profiling._import_timer is None
+
+    def test_failed_command_is_profiled_too(self, tmp_path):
+        output = tmp_path / "report.json"
+        result = self._invoke(["--profile=subprocess", "--profile-output", str(output),
+                               "flux", "status"])
+        # flux is not installed here: the command fails, the report is written.
+        assert result.exit_code != 0
+        report = json.loads(output.read_text())
+        assert report["modes"] == ["subprocess"]
+        assert "cprofile" not in report
+
+    def test_unknown_mode_is_a_usage_error(self, tmp_path):
+        result = self._invoke(["--profile=bogus", "session", "status"])
+        assert result.exit_code == 2
+        assert "bogus" in result.output
+
+    def test_without_profile_nothing_is_written(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        assert self._invoke(["--version"]).exit_code == 0
+        assert not list(tmp_path.glob("noah-profile-*.json"))
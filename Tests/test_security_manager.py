@@ -174,6 +174,137 @@ class TestRotateServiceSecrets:
         assert after['oidc_client_id'] == 'headlamp'
 
 
+# ---------------------------------------------------------------------------
+# Bulk rotation — plan first, one encrypted write for the whole plan
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def saves(monkeypatch):
+    """Count of store writes (save() outside a transaction)."""
+    seen = []
+    original = cs.CanonicalSecretsStore.save
+
+    def _spy(self, rekey=False):
+        if not self._transaction_depth:
+            seen.append(rekey)
+        return original(self, rekey)
+
+    monkeypatch.setattr(cs.CanonicalSecretsStore, "save", _spy)
+    return seen
+
+
+class TestBulkRotation:
+    @pytest.fixture
+    def filled(self, manager):
+        for service in ('authentik', 'headlamp', 'cloudflare'):
+            manager.generate_service_secrets(service)
+        return manager
+
+    def test_plan_covers_generated_services_only(self, filled):
+        plan = filled.plan_canonical_rotation()
+        assert sorted(plan) == ['authentik', 'headlamp']  # never the Cloudflare token
+        assert set(plan['authentik']) == EXPECTED_KEYS['authentik']
+
+    def test_older_than_uses_rotated_at(self, filled):
+        from datetime import timedelta
+        store = cs.get_canonical_store(filled.project_root)
+        store.data['services']['headlamp']['oidc_client_secret']['rotated_at'] = '2020-01-01T00:00:00+00:00'
+        store.data['services']['authentik']['secret_key']['rotated_at'] = 'not a date'
+        plan = filled.plan_canonical_rotation(older_than=timedelta(days=90))
+        assert plan == {'authentik': ['secret_key'], 'headlamp': ['oidc_client_secret']}
+
+    def test_one_write_for_every_service(self, filled, saves):
+        before = {s: filled.generate_service_secrets(s) for s in ('authentik', 'headlamp')}
+        plan = filled.plan_canonical_rotation(['authentik', 'headlamp'])
+        rotated = filled.rotate_canonical_secrets(plan)
+        assert rotated == {'authentik': len(EXPECTED_KEYS['authentik']), 'headlamp': 2}
+        assert saves == [False]
+        fresh = cs.CanonicalSecretsStore(project_root=filled.project_root)
+        assert fresh.get_service_secrets('authentik')['secret_key'] != before['authentik']['secret_key']
+        assert fresh.data['services']['headlamp']['oidc_client_secret']['version'] == 2
+
+    @pytest.fixture
+    def failing_write(self, monkeypatch):
+        original = cs.CanonicalSecretsStore.save
+
+        def _save(self, rekey=False):
+            return original(self, rekey) if self._transaction_depth else False
+
+        monkeypatch.setattr(cs.CanonicalSecretsStore, "save", _save)
+
+    def test_failed_write_is_reported_as_none(self, filled, failing_write):
+        assert filled.rotate_canonical_secrets({'authentik': ['secret_key']}) is None
+
+    def test_missing_service_is_generated_in_the_same_write(self, filled, saves):
+        rotated = filled.rotate_canonical_secrets({'authentik': ['secret_key'], 'cilium': []})
+        assert rotated == {'authentik': 1}
+        assert saves == [False]
+        fresh = cs.CanonicalSecretsStore(project_root=filled.project_root)
+        assert set(fresh.get_service_secrets('cilium')) == EXPECTED_KEYS['cilium']
+
+    def test_failed_write_leaves_the_store_unchanged(self, filled, failing_write):
+        store = cs.get_canonical_store(filled.project_root)
+        before = store.get_service_secrets('authentik')
+        assert filled.rotate_canonical_secrets({'authentik': ['secret_key'], 'cilium': []}) is None
+        assert 'cilium' not in store.data['services']
+        assert store.get_service_secrets('authentik') == before
+        fresh = cs.CanonicalSecretsStore(project_root=filled.project_root)
+        assert 'cilium' not in fresh.data['services']
+
+    def test_cli_writes_once_applies_once_and_times_each_phase(self, filled, saves, monkeypatch):
+        from click.testing import CliRunner
+
+        from Scripts.gitops import gitops_init
+        from Scripts.security import rotate_cli
+
+        applied = []
+        monkeypatch.setattr(rotate_cli, "ensure_security_initialized", lambda ctx: None)
+        monkeypatch.setattr(gitops_init, "apply_app_secrets", lambda **kw: applied.append(kw))
+        result = CliRunner().invoke(rotate_cli.rotate_canonical, ["--all", "--apply"],
+                                    obj={'secrets': filled})
+        assert result.exit_code == 0, result.output
+        assert saves == [False] and len(applied) == 1
+        assert "headlamp: oidc_client_id, oidc_client_secret" in result.output
+        timing = result.output.splitlines()[-1]
+        for phase in ("planification", "génération", "écriture", "application"):
+            assert phase in timing
+
+    def test_cli_failed_apply_exits_non_zero(self, filled, monkeypatch):
+        from click.testing import CliRunner
+
+        from Scripts.gitops import gitops_init
+        from Scripts.security import rotate_cli
+
+        def _unreachable(**kw):
+            raise RuntimeError("cluster unreachable")
+
+        monkeypatch.setattr(rotate_cli, "ensure_security_initialized", lambda ctx: None)
+        monkeypatch.setattr(gitops_init, "apply_app_secrets", _unreachable)
+        result = CliRunner().invoke(rotate_cli.rotate_canonical, ["--all", "--apply"],
+                                    obj={'secrets': filled})
+        assert result.exit_code == 1
+        assert "application (échec)" in result.output.splitlines()[-1]
+
+    def test_cli_older_than_requires_a_unit(self, filled):
+        from click.testing import CliRunner
+
+        from Scripts.security import rotate_cli
+
+        result = CliRunner().invoke(rotate_cli.rotate_canonical, ["--older-than", "90"],
+                                    obj={'secrets': filled})
+        assert result.exit_code == 2
+        assert "unité obligatoire" in result.output
+
+    def test_cli_refuses_keys_with_several_services(self, filled):
+        from click.testing import CliRunner
+
+        from Scripts.security import rotate_cli
+
+        result = CliRunner().invoke(rotate_cli.rotate_canonical, ["--all", "--keys", "a"],
+                                    obj={'secrets': filled})
+        assert result.exit_code == 2
+
+
 # ---------------------------------------------------------------------------
 # Regression: rotation used to be defined separately from generation, so
 # hubble-ui, nextcloud, stalwart and cloudflare were generatable but silently
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for the opt-in `noah session` decrypted-payload cache."""
+from __future__ import annotations
+
+import stat
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from Scripts.security import session_cache
+from Scripts.security.secure_env_loader import SecureEnvLoader
+
+
+@pytest.fixture
+def runtime_dir(tmp_path, monkeypatch):
+    runtime = tmp_path / "run"
+    runtime.mkdir(mode=0o700)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(runtime))
+    return runtime
+
+
+def _counting_decrypt(plaintext: str = "noah:\n  domain: example.test\n"):
+    decrypt = MagicMock(return_value=plaintext)
+    return decrypt
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("900", 900), ("90s", 90), ("15m", 900), ("2h", 7200), ("1d", 86400),
+])
+def test_parse_ttl(value, seconds):
+    assert session_cache.parse_ttl(value) == seconds
+
+
+@pytest.mark.parametrize("value", ["", "0", "15x", "-5m", "m"])
+def test_parse_ttl_rejects_garbage(value):
+    with pytest.raises(ValueError):
+        session_cache.parse_ttl(value)
+
+
+def test_no_runtime_dir_means_no_session(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    with pytest.raises(session_cache.SessionCacheError):
+        session_cache.start_session(60)
+    enc = tmp_path / "config.enc.yaml"
+    enc.write_bytes(b"ciphertext")
+    decrypt = _counting_decrypt()
+    session_cache.decrypt_cached(enc, decrypt)
+    session_cache.decrypt_cached(enc, decrypt)
+    assert decrypt.call_count == 2
+
+
+def test_without_open_session_nothing_is_cached(tmp_path, runtime_dir):
+    enc = tmp_path / "config.enc.yaml"
+    enc.write_bytes(b"ciphertext")
+    decrypt = _counting_decrypt()
+    session_cache.decrypt_cached(enc, decrypt)
+    session_cache.decrypt_cached(enc, decrypt)
+    assert decrypt.call_count == 2
+    assert not (runtime_dir / "noah").exists()
+
+
+def test_session_serves_repeat_decrypts_from_a_private_file(tmp_path, runtime_dir):
+    session_cache.start_session(60)
+    enc = tmp_path / "config.enc.yaml"
+    enc.write_bytes(b"ciphertext")
+    decrypt = _counting_decrypt()
+
+    assert session_cache.decrypt_cached(enc, decrypt) == decrypt.return_value
+    assert session_cache.decrypt_cached(enc, decrypt) == decrypt.return_value
+    assert decrypt.call_count == 1
+
+    cache_file = session_cache.session_file()
+    assert stat.S_IMODE(cache_file.stat().st_mode) == 0o600
+    assert stat.S_IMODE(cache_file.parent.stat().st_mode) == 0o700
+
+
+def test_changed_ciphertext_misses_and_replaces_the_entry(tmp_path, runtime_dir):
+    session_cache.start_session(60)
+    enc = tmp_path / "config.enc.yaml"
+    enc.write_bytes(b"ciphertext-1")
+    session_cache.decrypt_cached(enc, _counting_decrypt("old"))
+
+    enc.write_bytes(b"ciphertext-2")
+    decrypt = _counting_decrypt("new")
+    assert session_cache.decrypt_cached(enc, decrypt) == "new"
+    decrypt.assert_called_once()
+    assert session_cache.session_info()["entries"] == 1
+
+
+def test_failed_decrypt_is_not_cached(tmp_path, runtime_dir):
+    session_cache.start_session(60)
+    enc = tmp_path / "config.enc.yaml"
+    enc.write_bytes(b"ciphertext")
+    with pytest.raises(RuntimeError):
+        session_cache.decrypt_cached(enc, MagicMock(side_effect=RuntimeError("boom")))
+    assert session_cache.session_info()["entries"] == 0
+
+
+def test_expired_session_is_removed(tmp_path, runtime_dir):
+    session_cache.start_session(60)
+    enc = tmp_path / "config.enc.yaml"
+    enc.write_bytes(b"ciphertext")
+    session_cache.decrypt_cached(enc, _counting_decrypt())
+
+    with patch.object(session_cache.time, "time", return_value=time.time() + 61):
+        decrypt = _counting_decrypt()
+        session_cache.decrypt_cached(enc, decrypt)
+        decrypt.assert_called_once()
+    assert not session_cache.session_file().exists()
+
+
+def test_group_readable_session_file_is_ignored(tmp_path, runtime_dir):
+    session_cache.start_session(60)
+    session_cache.session_file().chmod(0o640)
+    assert session_cache.session_info() is None
+
+
+def test_stop_drops_the_cache(runtime_dir):
+    session_cache.start_session(60)
+    assert session_cache.stop_session() is True
+    assert session_cache.stop_session() is False
+    assert session_cache.session_info() is None
+
+
+def test_secure_env_loader_consults_the_session(tmp_path, runtime_dir):
+    session_cache.start_session(60)
+    enc = tmp_path / "config.enc.yaml"
+    enc.write_bytes(b"ciphertext")
+    loader = SecureEnvLoader(noah_root=tmp_path, age_key_file=tmp_path / "keys.txt")
+
+    with patch("Scripts.security.secure_env_loader.SopsClient") as client:
+        client.return_value.__enter__.return_value.decrypt_to_string.return_value = (
+            "noah:\n  domain: example.test\n"
+        )
+        assert loader.decrypt_env_file(enc) == {"NOAH_DOMAIN": "example.test"}
+        assert loader.decrypt_env_file(enc) == {"NOAH_DOMAIN": "example.test"}
+    assert client.call_count == 1
+
+
+def test_session_cli_roundtrip(runtime_dir):
+    import noah
+
+    runner = CliRunner()
+    result = runner.invoke(noah.cli, ["session", "start", "--ttl", "10m"])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(noah.cli, ["session", "status"])
+    assert "Session open: 0 cached file(s)" in result.output
+    result = runner.invoke(noah.cli, ["session", "stop"])
+    assert "Session closed" in result.output
+    assert not Path(session_cache.session_file()).exists()
+
+    result = runner.invoke(noah.cli, ["session", "start", "--ttl", "soon"])
+    assert result.exit_code != 0
+
+
+def test_canonical_store_save_keeps_the_session_warm(tmp_path, runtime_dir, monkeypatch):
+    """A store reopened after save() reads its own write from the session."""
+    from Scripts.security import canonical_store as cs
+
+    monkeypatch.setenv("NOAH_ENVIRONMENT", "production")
+    monkeypatch.delenv("NOAH_DISABLE_SOPS", raising=False)
+    (tmp_path / "Age").mkdir()
+    (tmp_path / "Age" / "keys.txt").write_text("AGE-SECRET-KEY-1FAKE\n")
+    monkeypatch.setattr(cs.SopsClient, "is_available", staticmethod(lambda: True))
+
+    def _fake_encrypt(self, plaintext, path, previous=None):
+        return b"sops:\n    version: fake\n"
+
+    monkeypatch.setattr(cs.CanonicalSecretsStore, "_encrypt_bytes", _fake_encrypt)
+    session_cache.start_session(60)
+
+    store = cs.CanonicalSecretsStore(project_root=tmp_path)
+    store.ensure_service_entries("authentik", {"secret_key": lambda: "s3cret"})
+
+    with patch.object(cs, "SopsClient") as client:
+        reopened = cs.CanonicalSecretsStore(project_root=tmp_path)
+    client.assert_not_called()
+    assert reopened.get_service_secrets("authentik") == {"secret_key": "s3cret"}
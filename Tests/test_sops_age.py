@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Tests for the in-process SOPS/age decryption engine.
+
+The fixture below was encrypted by the sops 3.11.0 binary; the engine must read
+it exactly as `sops -d` does, without the binary.
+"""
+from __future__ import annotations
+
+import datetime
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from Scripts.security import sops_age
+from Scripts.security.sops_age import (
+    NativeDecryptError,
+    NativeKeyError,
+    NativeSopsRunner,
+    NativeUnsupported,
+    decrypt_file,
+    decrypt_text,
+    load_identities,
+    update_text,
+)
+from Scripts.security.sops_client import SopsBinaryNotFoundError, SopsClient, SopsKeyError
+
+# Test-only identities, generated for this file.
+AGE_KEY = """\
+# created: 2026-10-17
+# public key: age1nvdc4lx4zj3cx0hsq8vy09x8v7wlp6w3d5wa4ftwxyl5jqu0spgsphq7ec
+AGE-SECRET-KEY-18NVN7QSPGMKG3D6GDK2RJ0QF4JV65JSQT8P4VJQ4VS2A980QDHRS0ZWL92
+"""
+OTHER_AGE_KEY = "AGE-SECRET-KEY-1KFXZGT4SVPA76CJANFYJRWM0FAWLMRZY7V35XSA73FQD3MXRKW6QSHC94E\n"
+
+ENCRYPTED = """\
+version: ENC[AES256_GCM,data:Ig==,iv:IfVgjvA1YRHtefqpURUyc+5Hf1eqU5WpfusGAAWhY3s=,tag:jV8pIVaLEVSMg0aFdxdHHQ==,type:int]
+services:
+    authentik:
+        #ENC[AES256_GCM,data:e3jCcjDaSfZjiR6Sm9qFhIef4hkww2xa7zk2ZcZJPS/Y,iv:g12nmU34JYIfhCqKW68MLM8mRHfLCgOFOdqZLxu9MCA=,tag:HK0g0tkKfsosrnd54urapQ==,type:comment]
+        secret_key: ENC[AES256_GCM,data:A3QYBW5iEql+kmiBqaSNiCKx,iv:vDKUDIHRvJy2rgfM1ykH1xYoAAKIpuXVLfCsxZVDddQ=,tag:0o6hb3yZQrf9cJ9hSTWsCw==,type:str]
+        port: ENC[AES256_GCM,data:LlGZCw==,iv:H9hMODvIfxInwJjwoBe8ZwnTQ0URZp5Mk+Ym6m/Aark=,tag:zHKoXl6DCpwTmRVEPpIbng==,type:int]
+        enabled: ENC[AES256_GCM,data:gNGgRA==,iv:LSYyxS74i+JRnUPG00pCtl2OzH8JxdErDfrALSQLxTM=,tag:inKQg1VHdBwi973J7SnqyA==,type:bool]
+        ratio: ENC[AES256_GCM,data:mCJcyQ==,iv:irqp9qlEyP+vL6TtfBzRbUCf4fj/dNybjcVBEaBYA1Q=,tag:6rzb//BUNdMllQmzOkmXOA==,type:float]
+        hosts:
+            - ENC[AES256_GCM,data:A/7pfpk3RkF3je0=,iv:S97wG6FIOWpYe6rOvVpNlgf9+dUQpk71Kw8Zfpwzl+w=,tag:/1LQKBy+IncmLco2WcaGtg==,type:comment]
+            - ENC[AES256_GCM,data:gLCYZwRV8tE7FcW53mCmNA==,iv:avYcWfYtn5LzU59EnFOOuvc4RYOZogq2nknLBxpF5ig=,tag:dQHp0I+7baKksc6gibm07Q==,type:str]
+            - ENC[AES256_GCM,data:H4XPfugWUstEQyu2oG0=,iv:o8IGCfgPxxN9dwaXYPUpUp2RTNKg8SUKxtanDmRt81E=,tag:sQx79zgO7lV6XN2BjrLSuA==,type:str]
+        note_unencrypted: left in clear
+    empty: ""
+created: ENC[AES256_GCM,data:U/oH+RW2k9PD4B45AeDhTF4Wtx8=,iv:e0G60SVgl9KYlDQ/+7gJnn63RHrWCkPM3M3COdmFFyQ=,tag:fjhj70vq0n0nSQIK6nf/ww==,type:time]
+sops:
+    age:
+        - recipient: age1nvdc4lx4zj3cx0hsq8vy09x8v7wlp6w3d5wa4ftwxyl5jqu0spgsphq7ec
+          enc: |
+            -----BEGIN AGE ENCRYPTED FILE-----
+            YWdlLWVuY3J5cHRpb24ub3JnL3YxCi0+IFgyNTUxOSByWXBHU1UzSUxkZll0SWxq
+            enlVTkdhNlluN2ZDQ0xYUnYvdXNBVjhTVWtFCkwxK0Vodlg2M1JQc0hBUmdXcGlE
+            UHJ6dnN6VmdINlNqaUJRL2Y5bEViZzQKLS0tIDN3TDFvQlRYaVNYMVFBTmhEKzBy
+            OFp4L0dmWnFENm00U1cxUFNYdGtGVFUKVcRcluYSrOvlCMgvOvCN6yJUY5Y2KnXj
+            ZidLQEzfVQDQ6hWykHnyAHYFy3ixNLeJ7JvOrTfeNDaq0T0g8/9FSQ==
+            -----END AGE ENCRYPTED FILE-----
+    lastmodified: "2026-10-17T06:19:55Z"
+    mac: ENC[AES256_GCM,data:QX1C0CVOp+tSKHfjRkX6zHH04o7SLXi621hvElVLfKcTYFlZ2SAKAjXIobeq6YGMY7z9xLzMhnHwd+g9R/gha4fDV8fje7UAkLhQ/aVCKhoLLxkOfe2BhNUDHv52HwqNk23cD7zY1ACLX5sjQs3IA3yPFv1P5NKYigFoxv80PG0=,iv:fbTZXdNrUG+DfHD3fuoVBLzsUQcq67ciDYqRkuE0fwo=,tag:HQENGbF/QUOqJJm5gwta3A==,type:str]
+    unencrypted_suffix: _unencrypted
+    version: 3.11.0
+"""
+
+PLAINTEXT = {
+    "version": 2,
+    "services": {
+        "authentik": {
+            "secret_key": "s3cr3t: with colon",
+            "port": 9443,
+            "enabled": True,
+            "ratio": 0.25,
+            "hosts": ["auth.example.org", "id.example.org"],
+            "note_unencrypted": "left in clear",
+        },
+        "empty": "",
+    },
+    "created": datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+}
+
+
+@pytest.fixture
+def key_file(tmp_path):
+    path = tmp_path / "keys.txt"
+    path.write_text(AGE_KEY)
+    return path
+
+
+@pytest.fixture
+def encrypted(tmp_path):
+    path = tmp_path / "secrets.enc.yaml"
+    path.write_text(ENCRYPTED)
+    return path
+
+
+def _no_binary(cmd, **kwargs):
+    raise SopsBinaryNotFoundError("SOPS binary not found in PATH.")
+
+
+class TestIdentities:
+    def test_identity_matches_the_recipient_it_was_encrypted_for(self, key_file):
+        from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
+        from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+        [scalar] = load_identities(key_file)
+        public = X25519PrivateKey.from_private_bytes(scalar).public_key()
+        hrp, recipient = sops_age._bech32_decode(
+            "age1nvdc4lx4zj3cx0hsq8vy09x8v7wlp6w3d5wa4ftwxyl5jqu0spgsphq7ec")
+        assert hrp == "age"
+        assert recipient == public.public_bytes(Encoding.Raw, PublicFormat.Raw)
+
+    def test_bad_checksum_is_rejected(self, tmp_path):
+        path = tmp_path / "keys.txt"
+        path.write_text(AGE_KEY.replace("ZWL92", "ZWL93"))
+        with pytest.raises(NativeDecryptError, match="checksum"):
+            load_identities(path)
+
+    def test_plugin_identities_are_left_to_the_binary(self, tmp_path):
+        path = tmp_path / "keys.txt"
+        path.write_text("AGE-PLUGIN-YUBIKEY-1QQQQQQ\n")
+        with pytest.raises(NativeUnsupported):
+            load_identities(path)
+
+
+class TestDecryptFile:
+    def test_reads_what_sops_wrote(self, key_file, encrypted):
+        assert decrypt_file(encrypted, load_identities(key_file)) == PLAINTEXT
+
+    def test_wrong_identity(self, tmp_path, encrypted):
+        other = tmp_path / "other.txt"
+        other.write_text(OTHER_AGE_KEY)
+        with pytest.raises(NativeKeyError):
+            decrypt_file(encrypted, load_identities(other))
+
+    def test_value_left_in_clear_is_covered_by_the_mac(self, key_file, encrypted):
+        encrypted.write_text(ENCRYPTED.replace("left in clear", "left in clear!"))
+        with pytest.raises(NativeDecryptError, match="MAC mismatch"):
+            decrypt_file(encrypted, load_identities(key_file))
+
+    def test_swapped_ciphertexts_fail_authentication(self, key_file, encrypted):
+        # Both leaves are valid ciphertexts, but bound to their own key path.
+        lines = ENCRYPTED.splitlines()
+        hosts = [i for i, line in enumerate(lines) if line.strip().startswith("- ENC")][1:]
+        lines[hosts[0]], lines[hosts[1]] = lines[hosts[1]], lines[hosts[0]]
+        port = next(i for i, line in enumerate(lines) if line.strip().startswith("port:"))
+        lines[port] = lines[port].replace("port:", "ports:")
+        encrypted.write_text("\n".join(lines) + "\n")
+        with pytest.raises(NativeDecryptError):
+            decrypt_file(encrypted, load_identities(key_file))
+
+    @pytest.mark.parametrize("metadata", ["shamir_threshold: 2", "mac_only_encrypted: true"])
+    def test_unimplemented_metadata_is_declined(self, key_file, encrypted, metadata):
+        encrypted.write_text(ENCRYPTED.replace("    version: 3.11.0", f"    {metadata}\n    version: 3.11.0"))
+        with pytest.raises(NativeUnsupported):
+            decrypt_file(encrypted, load_identities(key_file))
+
+    def test_only_yaml_files(self, key_file, tmp_path):
+        path = tmp_path / "secrets.enc.json"
+        path.write_text("{}")
+        with pytest.raises(NativeUnsupported):
+            decrypt_file(path, load_identities(key_file))
+
+
+class TestNativeSopsRunner:
+    def test_decrypt_is_served_in_process(self, key_file, encrypted):
+        fallback = []
+        runner = NativeSopsRunner(key_file, fallback=lambda cmd: fallback.append(cmd))
+        result = runner(["sops", "-d", str(encrypted)])
+        assert result.returncode == 0 and not fallback
+        import yaml
+        assert yaml.safe_load(result.stdout) == PLAINTEXT
+
+    def test_stdin_decrypt_is_served_in_process(self, key_file):
+        runner = NativeSopsRunner(key_file, fallback=_no_binary)
+        client = SopsClient(key_file, _runner=runner)
+        import yaml
+        plaintext = client.decrypt_bytes(ENCRYPTED.encode(), "secrets.enc.yaml")
+        assert yaml.safe_load(plaintext) == PLAINTEXT
+
+    def test_stdin_encrypt_goes_to_the_binary_with_its_input(self, key_file):
+        seen = []
+
+        def binary(cmd, input=None):
+            seen.append((cmd, input))
+            return subprocess.CompletedProcess(cmd, 0, "sops: {}\n", "")
+
+        client = SopsClient(key_file, _runner=NativeSopsRunner(key_file, fallback=binary))
+        assert client.encrypt_bytes(b"a: b\n", "x.enc.yaml") == b"sops: {}\n"
+        assert seen == [(["sops", "encrypt", "--filename-override", "x.enc.yaml"], "a: b\n")]
+
+    def test_other_commands_and_declined_files_go_to_the_binary(self, key_file, encrypted):
+        seen = []
+
+        def binary(cmd):
+            seen.append(cmd)
+            return subprocess.CompletedProcess(cmd, 0, "from: binary\n", "")
+
+        runner = NativeSopsRunner(key_file, fallback=binary)
+        runner(["sops", "-e", "--in-place", str(encrypted)])
+        encrypted.write_text(ENCRYPTED.replace("left in clear", "tampered"))
+        assert runner(["sops", "-d", str(encrypted)]).stdout == "from: binary\n"
+        assert [cmd[1] for cmd in seen] == ["-e", "-d"]
+
+    def test_without_binary_a_wrong_key_still_maps_to_a_key_error(self, tmp_path, encrypted):
+        other = tmp_path / "other.txt"
+        other.write_text(OTHER_AGE_KEY)
+        client = SopsClient(other, _runner=NativeSopsRunner(other, fallback=_no_binary))
+        with pytest.raises(SopsKeyError):
+            client.decrypt_yaml(encrypted)
+
+    def test_without_binary_unsupported_files_report_the_missing_binary(self, key_file, encrypted):
+        encrypted.write_text(ENCRYPTED.replace("left in clear", "tampered"))
+        client = SopsClient(key_file, _runner=NativeSopsRunner(key_file, fallback=_no_binary))
+        with pytest.raises(SopsBinaryNotFoundError):
+            client.decrypt_yaml(encrypted)
+
+
+class TestSopsClientDefault:
+    def test_decrypt_does_not_fork_sops(self, key_file, encrypted, monkeypatch):
+        monkeypatch.delenv("NOAH_SOPS_NATIVE", raising=False)
+        with patch("subprocess.run", side_effect=AssertionError("sops was forked")):
+            assert SopsClient(key_file).decrypt_yaml(encrypted) == PLAINTEXT
+
+    def test_opt_out_uses_the_binary(self, key_file, encrypted, monkeypatch):
+        monkeypatch.setenv("NOAH_SOPS_NATIVE", "0")
+        completed = subprocess.CompletedProcess([], 0, "from: binary\n", "")
+        with patch("subprocess.run", return_value=completed) as run:
+            assert SopsClient(key_file).decrypt_yaml(encrypted) == {"from": "binary"}
+        assert run.call_args[0][0] == ["sops", "-d", str(encrypted)]
+
+
+class TestUpdateText:
+    def _leaves(self, text):
+        import re
+        return set(re.findall(r"ENC\[[^\]]+type:(?!comment)[a-z]+\]", text.split("\nsops:")[0]))
+
+    def test_only_the_changed_value_is_re_encrypted(self, key_file):
+        identities = load_identities(key_file)
+        tree = decrypt_text(ENCRYPTED, identities)
+        tree["services"]["authentik"]["port"] = 9444
+
+        updated = update_text(ENCRYPTED, tree, identities)
+
+        assert decrypt_text(updated, identities) == tree
+        kept = self._leaves(ENCRYPTED) & self._leaves(updated)
+        # Everything but `port` survives byte for byte; the comments do not.
+        assert len(self._leaves(updated) - kept) == 1
+        assert "port: ENC" in updated and ",type:int]" in updated
+        # Same data key: the recipient stanza is untouched.
+        import yaml
+        assert yaml.safe_load(updated)["sops"]["age"] == yaml.safe_load(ENCRYPTED)["sops"]["age"]
+
+    def test_new_and_unencrypted_values(self, key_file):
+        identities = load_identities(key_file)
+        tree = decrypt_text(ENCRYPTED, identities)
+        tree["services"]["new"] = {"token": "t0k3n", "flag": False, "n": None}
+        tree["services"]["authentik"]["note_unencrypted"] = "still clear"
+        updated = update_text(ENCRYPTED, tree, identities)
+        assert decrypt_text(updated, identities) == tree
+        assert "note_unencrypted: still clear" in updated
+        assert "t0k3n" not in updated
+
+    def test_layout_with_and_without_sequences(self, key_file):
+        import yaml
+        identities = load_identities(key_file)
+        tree = decrypt_text(ENCRYPTED, identities)
+        # Sequences keep SOPS' indentation...
+        assert "\n            - ENC[" in update_text(ENCRYPTED, tree, identities)
+        # ...and a body without any is laid out as _SopsDumper would, if faster.
+        del tree["services"]["authentik"]["hosts"]
+        updated = update_text(ENCRYPTED, tree, identities)
+        assert decrypt_text(updated, identities) == tree
+        document = yaml.load(updated, Loader=sops_age._SopsLoader)
+        assert updated == yaml.dump(document, Dumper=sops_age._SopsDumper, indent=4, sort_keys=False,
+                                    allow_unicode=True, default_flow_style=False)
+
+    def test_tampered_file_is_not_re_signed(self, key_file):
+        identities = load_identities(key_file)
+        tampered = ENCRYPTED.replace("left in clear", "tampered")
+        with pytest.raises(NativeDecryptError):
+            update_text(tampered, {"version": 3}, identities)
+
+    def test_client_falls_back_to_a_full_encrypt(self, tmp_path, key_file):
+        seen = []
+
+        def binary(cmd, input=None):
+            seen.append(cmd[:2])
+            return subprocess.CompletedProcess(cmd, 0, "sops: {}\n", "")
+
+        client = SopsClient(key_file, _runner=NativeSopsRunner(key_file, fallback=binary))
+        tampered = ENCRYPTED.replace("left in clear", "tampered").encode()
+        assert client.update_bytes(tampered, b"a: b\n", "s.enc.yaml") == b"sops: {}\n"
+        assert seen == [["sops", "encrypt"]]
+
+    def test_set_value(self, key_file, encrypted):
+        client = SopsClient(key_file, _runner=NativeSopsRunner(key_file, fallback=_no_binary))
+        client.set_value(encrypted, ["services", "authentik", "secret_key"], "rotated")
+        tree = client.decrypt_yaml(encrypted)
+        assert tree["services"]["authentik"]["secret_key"] == "rotated"
+        assert tree["services"]["authentik"]["port"] == 9443
+
+    def test_set_value_uses_the_binary_without_the_engine(self, tmp_path, key_file):
+        seen = []
+        client = SopsClient(key_file, _runner=lambda cmd: seen.append(cmd) or
+                            subprocess.CompletedProcess(cmd, 0, "", ""))
+        client.set_value(tmp_path / "s.enc.yaml", ["services", "a", 0], {"k": "v"})
+        assert seen == [["sops", "set", str(tmp_path / "s.enc.yaml"),
+                         '["services"]["a"][0]', '{"k": "v"}']]
@@ -31,6 +31,7 @@ Run all tests (requires sops binary):
 """
 from __future__ import annotations
 
+import asyncio
 import os
 import subprocess
 from pathlib import Path
@@ -42,6 +43,7 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from Scripts.security.sops_client import (
+    AsyncSopsClient,
     SopsClient,
     SopsBinaryNotFoundError,
     SopsConfigError,
@@ -246,6 +248,187 @@ class TestDecryptYaml:
         assert result == {}
 
 
+# ---------------------------------------------------------------------------
+# Process-wide decrypt cache
+# ---------------------------------------------------------------------------
+
+class TestDecryptCache:
+    def _counting_runner(self, calls):
+        def runner(cmd):
+            calls.append(cmd)
+            return _make_completed(0, stdout=f"read: {Path(cmd[-1]).read_text()}")
+        return runner
+
+    def test_second_client_is_served_from_memory(self, tmp_path):
+        key_file = _fake_key_file(tmp_path)
+        enc_file = tmp_path / "config.enc.yaml"
+        enc_file.write_text("v1")
+        calls = []
+        runner = self._counting_runner(calls)
+        before = SopsClient.cache_stats()
+
+        first = SopsClient(key_file, _runner=runner).decrypt_to_string(enc_file)
+        second = SopsClient(key_file, _runner=runner).decrypt_to_string(enc_file)
+        assert first == second == "read: v1"
+        assert len(calls) == 1
+        # The counters live as long as the process; clear_cache() keeps them.
+        after = SopsClient.cache_stats()
+        assert after["hits"] - before["hits"] == 1
+        assert after["misses"] - before["misses"] == 1
+        assert after["entries"] == 1
+
+    def test_new_ciphertext_or_new_key_misses(self, tmp_path):
+        key_file = _fake_key_file(tmp_path)
+        enc_file = tmp_path / "config.enc.yaml"
+        enc_file.write_text("v1")
+        calls = []
+        client = SopsClient(key_file, _runner=self._counting_runner(calls))
+        client.decrypt_to_string(enc_file)
+
+        enc_file.write_text("v2")
+        assert client.decrypt_to_string(enc_file) == "read: v2"
+        key_file.write_text("# public key: age1other\nAGE-SECRET-KEY-1OTHER\n")
+        client.decrypt_to_string(enc_file)
+        assert len(calls) == 3
+        # A rewrite replaces the file's entry rather than piling up next to it.
+        assert SopsClient.cache_stats()["entries"] == 1
+
+    def test_failures_are_not_cached(self, tmp_path):
+        enc_file = tmp_path / "config.enc.yaml"
+        enc_file.write_text("v1")
+        client = SopsClient(_fake_key_file(tmp_path), _runner=_mock_runner(1, stderr="MAC mismatch"))
+        for _ in range(2):
+            with pytest.raises(SopsDecryptionError):
+                client.decrypt_to_string(enc_file)
+        assert SopsClient.cache_stats()["entries"] == 0
+
+    def test_lru_eviction_zeroes_the_plaintext(self, tmp_path, monkeypatch):
+        from Scripts.security import sops_client
+
+        cache = sops_client._DecryptCache(max_entries=2, max_bytes=1024)
+        monkeypatch.setattr(sops_client, "_decrypt_cache", cache)
+        key_file = _fake_key_file(tmp_path)
+        client = SopsClient(key_file, _runner=self._counting_runner([]))
+        files = []
+        for name in ("a", "b", "c"):
+            f = tmp_path / f"{name}.enc.yaml"
+            f.write_text(name)
+            files.append(f)
+
+        client.decrypt_to_string(files[0])
+        held = next(iter(cache._entries.values()))
+        client.decrypt_to_string(files[1])
+        client.decrypt_to_string(files[0])  # a is now the most recent
+        client.decrypt_to_string(files[2])  # evicts b, not a
+        assert [Path(k[0]).name for k in cache._entries] == ["a.enc.yaml", "c.enc.yaml"]
+        assert cache.stats()["evictions"] == 1
+
+        cache.clear()
+        assert held == bytearray(len(held))
+        assert cache.stats()["bytes"] == 0
+
+    def test_oversized_content_is_not_kept(self, tmp_path, monkeypatch):
+        from Scripts.security import sops_client
+
+        monkeypatch.setattr(sops_client, "_decrypt_cache", sops_client._DecryptCache(4, 8))
+        enc_file = tmp_path / "big.enc.yaml"
+        enc_file.write_text("x" * 64)
+        SopsClient(_fake_key_file(tmp_path), _runner=self._counting_runner([])).decrypt_to_string(enc_file)
+        assert SopsClient.cache_stats()["entries"] == 0
+
+    def test_can_be_turned_off(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOAH_SOPS_CACHE", "0")
+        enc_file = tmp_path / "config.enc.yaml"
+        enc_file.write_text("v1")
+        calls = []
+        client = SopsClient(_fake_key_file(tmp_path), _runner=self._counting_runner(calls))
+        client.decrypt_to_string(enc_file)
+        client.decrypt_to_string(enc_file)
+        assert len(calls) == 2
+
+
+# ---------------------------------------------------------------------------
+# decrypt_many / encrypt_many
+# ---------------------------------------------------------------------------
+
+class TestMany:
+    def _files(self, tmp_path, count):
+        files = []
+        for i in range(count):
+            f = tmp_path / f"s{i}.enc.yaml"
+            f.write_text(f"value: {i}\n")
+            files.append(f)
+        return files
+
+    def test_decrypt_many_runs_concurrently_within_the_bound(self, tmp_path):
+        import threading
+        import time
+
+        lock = threading.Lock()
+        running = peak = 0
+
+        def runner(cmd):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+            return _make_completed(0, stdout=Path(cmd[-1]).read_text())
+
+        files = self._files(tmp_path, 6)
+        client = SopsClient(_fake_key_file(tmp_path), _runner=runner)
+        result = client.decrypt_many(files, max_workers=3)
+        assert list(result) == files
+        assert result[files[4]] == "value: 4\n"
+        assert peak == 3
+
+    def test_decrypt_many_keeps_per_file_typed_errors(self, tmp_path):
+        files = self._files(tmp_path, 3)
+
+        def runner(cmd):
+            if cmd[-1] == str(files[1]):
+                return _make_completed(128, stderr="Failed to get the data key")
+            return _make_completed(0, stdout="ok: true\n")
+
+        client = SopsClient(_fake_key_file(tmp_path), _runner=runner)
+        result = client.decrypt_many(files)
+        assert result[files[0]] == result[files[2]] == "ok: true\n"
+        assert isinstance(result[files[1]], SopsKeyError)
+        assert result[files[1]].detail == "Failed to get the data key"
+
+    def test_decrypt_many_does_not_swallow_unexpected_errors(self, tmp_path):
+        def runner(cmd):
+            raise RuntimeError("bug")
+
+        client = SopsClient(_fake_key_file(tmp_path), _runner=runner)
+        with pytest.raises(RuntimeError, match="bug"):
+            client.decrypt_many(self._files(tmp_path, 2))
+
+    def test_encrypt_many(self, tmp_path):
+        files = self._files(tmp_path, 4)
+
+        def runner(cmd):
+            tmp_file = Path(cmd[-1])
+            if tmp_file.read_text() == "value: 2\n":
+                return _make_completed(1, stderr="encryption failed")
+            tmp_file.write_text("sops: {}\n")
+            return _make_completed(0)
+
+        client = SopsClient(_fake_key_file(tmp_path), _runner=runner)
+        result = client.encrypt_many(files, max_workers=2)
+        assert [result[f] is None for f in files] == [True, True, False, True]
+        assert isinstance(result[files[2]], SopsEncryptionError)
+        assert files[0].read_text() == "sops: {}\n"
+        assert files[2].read_text() == "value: 2\n"
+
+    def test_empty_input(self, tmp_path):
+        client = SopsClient(_fake_key_file(tmp_path), _runner=_mock_runner(0))
+        assert client.decrypt_many([]) == {}
+        assert client.encrypt_many([]) == {}
+
+
 # ---------------------------------------------------------------------------
 # encrypt_in_place (atomicity)
 # ---------------------------------------------------------------------------
@@ -299,6 +482,67 @@ class TestEncryptInPlace:
         assert after == before
 
 
+# ---------------------------------------------------------------------------
+# encrypt_bytes / decrypt_bytes (stdin/stdout, nothing on disk)
+# ---------------------------------------------------------------------------
+
+class TestBytes:
+    def test_encrypt_bytes_feeds_stdin_and_writes_nothing(self, tmp_path):
+        key_file = _fake_key_file(tmp_path)
+        captured = {}
+
+        def runner(cmd, input=None):
+            captured.update(cmd=cmd, input=input)
+            return _make_completed(0, stdout="password: ENC[...]\nsops: {}\n")
+
+        before = set(tmp_path.iterdir())
+        hint = tmp_path / "secrets.enc.yaml"
+        ciphertext = SopsClient(key_file, _runner=runner).encrypt_bytes(b"password: hunter2\n", hint)
+
+        assert ciphertext == b"password: ENC[...]\nsops: {}\n"
+        assert captured["cmd"] == ["sops", "encrypt", "--filename-override", str(hint)]
+        assert captured["input"] == "password: hunter2\n"
+        assert set(tmp_path.iterdir()) == before
+
+    def test_encrypt_bytes_failure_raises_encryption_error(self, tmp_path):
+        client = SopsClient(_fake_key_file(tmp_path),
+                            _runner=lambda cmd, input=None: _make_completed(1, stderr="no matching creation rules"))
+        with pytest.raises(SopsEncryptionError) as exc:
+            client.encrypt_bytes(b"a: b\n", "x.enc.yaml")
+        assert exc.value.detail == "no matching creation rules"
+
+    def test_decrypt_bytes(self, tmp_path):
+        captured = {}
+
+        def runner(cmd, input=None):
+            captured.update(cmd=cmd, input=input)
+            return _make_completed(0, stdout="password: hunter2\n")
+
+        client = SopsClient(_fake_key_file(tmp_path), _runner=runner)
+        assert client.decrypt_bytes(b"sops: {}\n", "x.enc.yaml") == b"password: hunter2\n"
+        assert captured["cmd"] == ["sops", "decrypt", "--filename-override", "x.enc.yaml"]
+        assert captured["input"] == "sops: {}\n"
+
+    def test_decrypt_bytes_maps_errors_like_decrypt_to_string(self, tmp_path):
+        client = SopsClient(_fake_key_file(tmp_path),
+                            _runner=lambda cmd, input=None: _make_completed(128, stderr="no key"))
+        with pytest.raises(SopsKeyError):
+            client.decrypt_bytes(b"sops: {}\n", "x.enc.yaml")
+
+    def test_encrypt_bytes_many(self, tmp_path):
+        def runner(cmd, input=None):
+            if cmd[-1].endswith("bad.enc.yaml"):
+                return _make_completed(1, stderr="boom")
+            return _make_completed(0, stdout=f"enc({input})")
+
+        client = SopsClient(_fake_key_file(tmp_path), _runner=runner)
+        good, bad = tmp_path / "good.enc.yaml", tmp_path / "bad.enc.yaml"
+        results = client.encrypt_bytes_many({good: b"a", bad: b"b"}, max_workers=2)
+        assert list(results) == [good, bad]
+        assert results[good] == b"enc(a)"
+        assert isinstance(results[bad], SopsEncryptionError)
+
+
 # ---------------------------------------------------------------------------
 # encrypt_to
 # ---------------------------------------------------------------------------
@@ -413,36 +657,181 @@ class TestDefaultRun:
 # ---------------------------------------------------------------------------
 
 class TestIsAvailable:
-    def test_returns_true_when_sops_exits_zero(self):
+    """Served by Scripts.utils.toolchain: sops must be on PATH and its
+    version probe must exit 0."""
+
+    @pytest.fixture
+    def on_path(self):
+        with patch("Scripts.utils.toolchain.shutil.which", return_value="/usr/bin/env"):
+            yield
+
+    def test_returns_true_when_sops_exits_zero(self, on_path):
         with patch(
-            "Scripts.security.sops_client.subprocess.run",
-            return_value=_make_completed(0),
+            "Scripts.utils.toolchain.subprocess.run",
+            return_value=_make_completed(0, stdout="sops 3.11.0"),
         ):
             assert SopsClient.is_available() is True
 
-    def test_returns_false_when_sops_exits_nonzero(self):
+    def test_returns_false_when_sops_exits_nonzero(self, on_path):
         with patch(
-            "Scripts.security.sops_client.subprocess.run",
+            "Scripts.utils.toolchain.subprocess.run",
             return_value=_make_completed(1),
         ):
             assert SopsClient.is_available() is False
 
     def test_returns_false_when_binary_missing(self):
-        with patch(
-            "Scripts.security.sops_client.subprocess.run",
-            side_effect=FileNotFoundError(),
-        ):
+        with patch("Scripts.utils.toolchain.shutil.which", return_value=None), \
+             patch("Scripts.utils.toolchain.subprocess.run") as run:
             assert SopsClient.is_available() is False
+        run.assert_not_called()
 
-    def test_never_raises(self):
+    def test_never_raises(self, on_path):
         with patch(
-            "Scripts.security.sops_client.subprocess.run",
+            "Scripts.utils.toolchain.subprocess.run",
             side_effect=Exception("unexpected"),
         ):
             # Must not propagate
             result = SopsClient.is_available()
             assert isinstance(result, bool)
 
+    def test_probes_once_per_binary(self, on_path):
+        with patch(
+            "Scripts.utils.toolchain.subprocess.run",
+            return_value=_make_completed(0, stdout="sops 3.11.0"),
+        ) as run:
+            assert SopsClient.is_available() and SopsClient.is_available()
+        assert run.call_count == 1
+
+
+# ---------------------------------------------------------------------------
+# AsyncSopsClient
+# ---------------------------------------------------------------------------
+
+def _async_runner(returncode: int, stdout: str = "", stderr: str = "", calls=None):
+    async def runner(cmd, input=None):
+        if calls is not None:
+            calls.append(cmd)
+        return _make_completed(returncode, stdout, stderr)
+    return runner
+
+
+class TestAsyncSopsClient:
+    def test_decrypt_yaml(self, tmp_path):
+        enc_file = tmp_path / "test.enc.yaml"
+        enc_file.write_text("placeholder")
+        client = AsyncSopsClient(_fake_key_file(tmp_path), _runner=_async_runner(0, "key: value\n"))
+        assert asyncio.run(client.decrypt_yaml(enc_file)) == {"key": "value"}
+
+    @pytest.mark.parametrize("returncode, stderr, expected", [
+        (128, "Failed to get the data key", SopsKeyError),
+        (1, "MAC mismatch", SopsDecryptionError),
+        (1, "no matching creation_rules", SopsConfigError),
+    ])
+    def test_same_exception_mapping(self, tmp_path, returncode, stderr, expected):
+        enc_file = tmp_path / "test.enc.yaml"
+        enc_file.write_text("placeholder")
+        client = AsyncSopsClient(_fake_key_file(tmp_path), _runner=_async_runner(returncode, stderr=stderr))
+        with pytest.raises(expected):
+            asyncio.run(client.decrypt_to_string(enc_file))
+
+    def test_concurrency_is_capped(self, tmp_path):
+        running = peak = 0
+
+        async def runner(cmd, input=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return _make_completed(0, stdout=Path(cmd[-1]).read_text())
+
+        files = []
+        for i in range(6):
+            files.append(tmp_path / f"s{i}.enc.yaml")
+            files[-1].write_text(f"value: {i}\n")
+        client = AsyncSopsClient(_fake_key_file(tmp_path), max_concurrency=2, _runner=runner)
+
+        async def main():
+            return await asyncio.gather(*(client.decrypt_to_string(f) for f in files))
+
+        assert asyncio.run(main()) == [f"value: {i}\n" for i in range(6)]
+        assert peak == 2
+
+    def test_shares_the_decrypt_cache_with_sopsclient(self, tmp_path):
+        key_file = _fake_key_file(tmp_path)
+        enc_file = tmp_path / "config.enc.yaml"
+        enc_file.write_text("v1")
+        SopsClient(key_file, _runner=_mock_runner(0, "a: 1\n")).decrypt_to_string(enc_file)
+        calls = []
+        client = AsyncSopsClient(key_file, _runner=_async_runner(0, "a: 2\n", calls=calls))
+        assert asyncio.run(client.decrypt_to_string(enc_file)) == "a: 1\n"
+        assert calls == []
+
+    def test_encrypt_in_place_and_encrypt_to(self, tmp_path):
+        async def runner(cmd, input=None):
+            if "--in-place" in cmd:
+                Path(cmd[-1]).write_text("sops: encrypted\n")
+                return _make_completed(0)
+            return _make_completed(2, stderr="boom")
+
+        plain = tmp_path / "secret.yaml"
+        plain.write_text("password: hunter2\n")
+        client = AsyncSopsClient(_fake_key_file(tmp_path), _runner=runner)
+        asyncio.run(client.encrypt_in_place(plain))
+        assert plain.read_text() == "sops: encrypted\n"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["keys.txt", "secret.yaml"]
+        with pytest.raises(SopsEncryptionError):
+            asyncio.run(client.encrypt_to(plain, tmp_path / "out.enc.yaml"))
+
+
+@pytest.mark.skipif(os.name == "nt", reason="shell-script fakes")
+class TestAsyncSubprocess:
+    """The default runner, against a fake sops on PATH."""
+
+    @pytest.fixture
+    def fake_sops(self, tmp_path, monkeypatch):
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        monkeypatch.setenv("PATH", str(bin_dir))
+        monkeypatch.setenv("NOAH_SOPS_NATIVE", "0")
+
+        def install(body: str) -> None:
+            script = bin_dir / "sops"
+            script.write_text(f"#!/bin/sh\n{body}\n")
+            script.chmod(0o755)
+        return install
+
+    def test_runs_sops_with_the_key_in_its_environment(self, tmp_path, fake_sops):
+        fake_sops('echo "key: $SOPS_AGE_KEY_FILE"; echo "args: $*"')
+        key_file = _fake_key_file(tmp_path)
+        enc_file = tmp_path / "a.enc.yaml"
+        enc_file.write_text("x")
+        out = asyncio.run(AsyncSopsClient(key_file).decrypt_yaml(enc_file))
+        assert out == {"key": str(key_file), "args": f"-d {enc_file}"}
+
+    def test_exit_code_and_stderr_are_mapped(self, tmp_path, fake_sops):
+        fake_sops('echo "Failed to get the data key" >&2; exit 128')
+        enc_file = tmp_path / "a.enc.yaml"
+        enc_file.write_text("x")
+        with pytest.raises(SopsKeyError) as excinfo:
+            asyncio.run(AsyncSopsClient(_fake_key_file(tmp_path)).decrypt_to_string(enc_file))
+        assert "Failed to get the data key" in excinfo.value.detail
+
+    def test_timeout_kills_the_process(self, tmp_path, fake_sops):
+        import shutil
+        fake_sops(f"exec {shutil.which('sleep', path=os.defpath)} 10")
+        enc_file = tmp_path / "a.enc.yaml"
+        enc_file.write_text("x")
+        client = AsyncSopsClient(_fake_key_file(tmp_path), timeout=1)
+        with pytest.raises(SopsTimeoutError):
+            asyncio.run(client.decrypt_to_string(enc_file))
+
+    def test_missing_binary(self, tmp_path, fake_sops):
+        enc_file = tmp_path / "a.enc.yaml"
+        enc_file.write_text("x")
+        with pytest.raises(SopsBinaryNotFoundError):
+            asyncio.run(AsyncSopsClient(_fake_key_file(tmp_path)).decrypt_to_string(enc_file))
+
 
 # ---------------------------------------------------------------------------
 # Integration tests (require real sops binary)
@@ -515,6 +904,15 @@ class TestIntegration:
         assert "top_secret" not in content
         assert "sops" in content.lower()
 
+    def test_bytes_round_trip_never_touches_the_disk(self, tmp_path, age_key, sops_config):
+        before = set(tmp_path.iterdir())
+        hint = tmp_path / "secret.enc.yaml"
+        with SopsClient(age_key, sops_config) as sops:
+            ciphertext = sops.encrypt_bytes(b"api_key: top_secret\n", hint)
+            assert b"top_secret" not in ciphertext
+            assert sops.decrypt_bytes(ciphertext, hint) == b"api_key: top_secret\n"
+        assert set(tmp_path.iterdir()) == before
+
     def test_decrypt_to_string_returns_raw_yaml(self, tmp_path, age_key, sops_config):
         plaintext_file = tmp_path / "secret.yaml"
         plaintext_file.write_text("token: abc123\n")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# NOAH - Network Operations & Automation Hub
+# Copyright (C) 2026 Nicolas Engel <contact@nicolasengel.fr>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Tests for the toolchain registry (Scripts.utils.toolchain)."""
+from __future__ import annotations
+
+import json
+import os
+import stat
+
+import pytest
+
+from Scripts.utils import toolchain
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="shell-script fakes")
+
+
+@pytest.fixture
+def bin_dir(tmp_path, monkeypatch):
+    """A PATH holding only fake tools that log each invocation."""
+    path = tmp_path / "bin"
+    path.mkdir()
+    monkeypatch.setenv("PATH", str(path))
+    return path
+
+
+def _fake_tool(bin_dir, name, output="tool 1.2.3", exit_code=0, reject=None):
+    log = bin_dir / f"{name}.calls"
+    script = bin_dir / name
+    guard = f'case "$*" in *{reject}*) exit 2;; esac\n' if reject else ""
+    script.write_text(
+        "#!/bin/sh\n"
+        f'echo "$*" >> "{log}"\n'
+        f"{guard}"
+        f'echo "{output}"\n'
+        f"exit {exit_code}\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return log
+
+
+def _calls(log):
+    return log.read_text().splitlines() if log.exists() else []
+
+
+@pytest.mark.parametrize("output, version", [
+    ("sops 3.11.0 (latest)", "3.11.0"),
+    ("Client Version: v1.31.2\nKustomize Version: v5.4.2", "1.31.2"),
+    ("v3.15.2+g1a500d5", "3.15.2+g1a500d5"),
+    ("ansible-playbook [core 2.17.1]", "2.17.1"),
+    ("OpenTofu v1.8.0\non linux_amd64", "1.8.0"),
+    ("no version here", None),
+])
+def test_parse_version(output, version):
+    assert toolchain.parse_version(output) == version
+
+
+def test_missing_tool_is_not_probed(bin_dir):
+    tool = toolchain.resolve("kubectl")
+    assert tool == toolchain.Tool("kubectl", None)
+    assert not tool.available
+
+
+def test_probe_runs_once_and_survives_a_new_process(bin_dir):
+    log = _fake_tool(bin_dir, "flux", "flux version 2.3.0")
+    first = toolchain.resolve("flux")
+    assert (first.available, first.version) == (True, "2.3.0")
+    assert toolchain.resolve("flux") == first
+
+    toolchain.reset()   # what a fresh process sees: only the cache file
+    assert toolchain.resolve("flux") == first
+    assert _calls(log) == ["--version"]
+    cached = json.loads(toolchain.cache_file().read_text())
+    assert cached[first.path]["version"] == "2.3.0"
+
+
+def test_replaced_binary_is_probed_again(bin_dir):
+    log = _fake_tool(bin_dir, "helm", "v3.14.0")
+    assert toolchain.resolve("helm").version == "3.14.0"
+    _fake_tool(bin_dir, "helm", "v3.15.20")  # an upgrade: new size and mtime
+    assert toolchain.resolve("helm").version == "3.15.20"
+    assert _calls(log) == ["version --short", "version --short"]
+
+
+def test_sops_probe_skips_the_online_check_and_falls_back(bin_dir):
+    log = _fake_tool(bin_dir, "sops", "sops 3.6.1", reject="disable-version-check")
+    assert toolchain.resolve("sops").version == "3.6.1"
+    assert _calls(log) == ["--version --disable-version-check", "--version"]
+
+
+def test_failing_probe_means_unavailable(bin_dir):
+    _fake_tool(bin_dir, "tofu", exit_code=1)
+    tool = toolchain.resolve("tofu")
+    assert tool.path is not None and not tool.available
+    assert toolchain.is_available("tofu") is False
+
+
+def test_timed_out_probe_is_retried_on_the_next_resolve(bin_dir, monkeypatch):
+    log = _fake_tool(bin_dir, "sops", "sops 3.11.0")
+    original = toolchain.subprocess.run
+
+    def _slow(*args, **kwargs):
+        raise toolchain.subprocess.TimeoutExpired(args[0], toolchain.PROBE_TIMEOUT)
+
+    monkeypatch.setattr(toolchain.subprocess, "run", _slow)
+    assert toolchain.resolve("sops").available is False
+    assert not toolchain.cache_file().exists()
+
+    monkeypatch.setattr(toolchain.subprocess, "run", original)
+    toolchain.reset()
+    assert toolchain.resolve("sops").available is True
+    assert _calls(log) == ["--version --disable-version-check"]
+
+def test_empty_cache_setting_keeps_results_in_memory(bin_dir, monkeypatch, tmp_path):
+    monkeypatch.setenv("NOAH_TOOLCHAIN_CACHE", "")
+    _fake_tool(bin_dir, "age", "v1.2.0")
+    assert toolchain.cache_file() is None
+    assert toolchain.resolve("age").version == "1.2.0"
+    assert not (tmp_path / "toolchain.json").exists()
+
+
+def test_unreadable_cache_is_ignored(bin_dir):
+    toolchain.cache_file().write_text("{not json")
+    _fake_tool(bin_dir, "kubectl", "Client Version: v1.31.2")
+    assert toolchain.resolve("kubectl").version == "1.31.2"
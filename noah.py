@@ -28,75 +28,237 @@ import os
 import sys
 
 
+# Hand the command to a running `noah daemon` before paying for anything else
+# -- the venv re-exec included. The client is stdlib-only; with no daemon
+# listening it returns None and the command runs in-process as usual.
+def _forward_to_daemon():
+    if os.environ.get('NOAH_NO_DAEMON') or sys.argv[1:2] == ['daemon']:
+        return
+    from pathlib import Path
+
+    from Scripts.daemon.client import forward
+    code = forward(sys.argv[1:], Path(__file__).resolve().parent)
+    if code is not None:
+        sys.exit(code)
+
+if __name__ == '__main__':
+    _forward_to_daemon()
+
+
 # Re-exec under the venv interpreter as soon as possible so all subsequent
 # imports see the venv's packages.  Skip when:
 #   - the venv doesn't exist yet (first run / setup initialize)
 #   - we're already running inside it (avoid infinite loop)
+# The ./noah launcher written by `setup initialize` starts under the venv in
+# the first place, so the re-exec -- a second interpreter start -- is only
+# paid by `python3 noah.py`. When the launcher exists it is the exec target,
+# keeping one entry point.
 def _bootstrap_venv():
     from pathlib import Path
-    venv_python = Path(__file__).parent / ".venv" / "bin" / "python3"
+    root = Path(__file__).parent
+    venv_dir = root / ".venv"
+    venv_python = venv_dir / "bin" / "python3"
+    # Popped so it never outlives this process (and reaches a noah.py that
+    # some command runs in turn).
+    reexeced = os.environ.pop('NOAH_VENV_REEXEC', None)
     if not venv_python.exists():
         return
-    if os.path.realpath(sys.executable) == os.path.realpath(str(venv_python)):
+    # sys.prefix, not the executable: a venv's python3 is a symlink to the
+    # system interpreter, so comparing realpaths matched outside the venv too.
+    if os.path.realpath(sys.prefix) == os.path.realpath(venv_dir):
         return
+    if reexeced:
+        return  # already re-exec'd once (e.g. a launcher for a moved venv)
+    os.environ['NOAH_VENV_REEXEC'] = '1'
+    launcher = root / "noah"
+    if launcher.is_file() and os.access(launcher, os.X_OK):
+        os.execv(str(launcher), [str(launcher)] + sys.argv[1:])
     os.execv(str(venv_python), [str(venv_python)] + sys.argv)
 
 _bootstrap_venv()
 
+# `--profile` times imports too, so its hook has to go in before them; the
+# value itself is validated later, by click.
+if __name__ == '__main__':
+    from Scripts.utils import profiling as _profiling
+    if _profiling.requested(sys.argv[1:]):
+        _profiling.install_import_timer()
+
+import functools
+import importlib
 import shutil
 import subprocess
 from pathlib import Path
 
 import click  # type: ignore
 
-from Scripts.security.secure_env_loader import SecureEnvLoader
-
-# Load environment variables from encrypted configuration (best-effort on startup;
-# missing file is expected on first run — ensure_security_initialized will create it)
-_CONFIG_ENC = Path("Config/config.enc.yaml")
-secure_loader = SecureEnvLoader()
-if _CONFIG_ENC.exists():
-    secure_loader.load_secure_env(_CONFIG_ENC)
-
-# Import CLI utilities
-from Scripts.cluster_create.bootstrap_utils import (
-    run_add_nodes as cluster_add_nodes,
-)
-from Scripts.cluster_create.bootstrap_utils import (
-    run_bootstrap as cluster_bootstrap,
-)
-from Scripts.cluster_create.bootstrap_utils import (
-    show_cluster_status_v2,
-)
-from Scripts.cluster_create.flux_utils import (
-    cmd_logs as flux_cmd_logs,
-)
-from Scripts.cluster_create.flux_utils import (
-    cmd_status as flux_cmd_status,
-)
-from Scripts.cluster_create.flux_utils import (
-    cmd_sync as flux_cmd_sync,
-)
-from Scripts.cluster_create.status_utils import show_cluster_status
-from Scripts.cluster_destroy.cluster_destroy_utils import destroy_cluster_command
-from Scripts.core_helm import (
-    get_admin_credentials,
-    regenerate_authentik_password,
-)
-from Scripts.core_helm.cluster_manager import ClusterManager
-from Scripts.env_init.doctor_utils import diagnose_noah_environment, print_status
-from Scripts.env_init.environment_initializer import (
-    initialize_noah_environment,
-    update_sops_version,
-)
-from Scripts.security import ensure_security_initialized, get_security_config
-from Scripts.security.canonical_store import InsecureStoreError
-from Scripts.security.rotate_cli import register_rotate_command  # type: ignore
-from Scripts.security.security_manager import NoahSecurityManager as SecretManager
-from Scripts.utils.config_loader import ConfigLoader
+# CLI implementations, imported on first use rather than at startup. Importing
+# them all up front cost every invocation -- `--help` included -- the whole
+# Scripts tree plus kubernetes/requests, for the one module a command needs.
+# Resolved through __getattr__ below, so `noah.<name>` (and mock.patch on it)
+# behaves exactly as the former module-level imports did.
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    'cluster_add_nodes':           'Scripts.cluster_create.bootstrap_utils:run_add_nodes',
+    'cluster_bootstrap':           'Scripts.cluster_create.bootstrap_utils:run_bootstrap',
+    'show_cluster_status_v2':      'Scripts.cluster_create.bootstrap_utils:show_cluster_status_v2',
+    'flux_cmd_logs':               'Scripts.cluster_create.flux_utils:cmd_logs',
+    'flux_cmd_status':             'Scripts.cluster_create.flux_utils:cmd_status',
+    'flux_cmd_sync':               'Scripts.cluster_create.flux_utils:cmd_sync',
+    'show_cluster_status':         'Scripts.cluster_create.status_utils:show_cluster_status',
+    'destroy_cluster_command':     'Scripts.cluster_destroy.cluster_destroy_utils:destroy_cluster_command',
+    'get_admin_credentials':       'Scripts.core_helm.authentik_credentials:get_admin_credentials',
+    'regenerate_authentik_password': 'Scripts.core_helm.authentik_credentials:regenerate_authentik_password',
+    'ClusterManager':              'Scripts.core_helm.cluster_manager:ClusterManager',
+    'diagnose_noah_environment':   'Scripts.env_init.doctor_utils:diagnose_noah_environment',
+    'print_status':                'Scripts.env_init.doctor_utils:print_status',
+    'initialize_noah_environment': 'Scripts.env_init.environment_initializer:initialize_noah_environment',
+    'update_sops_version':         'Scripts.env_init.environment_initializer:update_sops_version',
+    'ensure_security_initialized': 'Scripts.security.security_initializer:ensure_security_initialized',
+    'get_security_config':         'Scripts.security.security_initializer:get_security_config',
+    'InsecureStoreError':          'Scripts.security.canonical_store:InsecureStoreError',
+    'StoreConflictError':          'Scripts.security.canonical_store:StoreConflictError',
+    'SecretManager':               'Scripts.security.security_manager:NoahSecurityManager',
+    'ConfigLoader':                'Scripts.utils.config_loader:ConfigLoader',
+}
+
+
+def _import_path(path: str):
+    """Import and return the object named by 'package.module:attribute'."""
+    module_name, _, attribute = path.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def __getattr__(name: str):
+    # PEP 562: only reached for names not already in the module namespace.
+    try:
+        path = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = _import_path(path)
+    globals()[name] = value
+    return value
+
+
+def _lazy(name: str):
+    """Resolve a _LAZY_ATTRIBUTES entry from inside this module.
+
+    A bare global lookup would bypass __getattr__; going through the module
+    object also picks up a test's patch('noah.<name>').
+    """
+    return getattr(sys.modules[__name__], name)
+
+
+class LazyGroup(click.Group):
+    """click.Group whose subcommands can be registered by import path.
+
+    ``lazy_subcommands`` maps a command name to 'package.module:attribute'.
+    The module is imported only when click resolves that name -- dispatching
+    it, or listing it in the group's --help -- never when the group is built.
+    """
+
+    def __init__(self, *args, lazy_subcommands: dict[str, str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = dict(lazy_subcommands or {})
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_subcommands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            self.add_command(_import_path(self.lazy_subcommands[cmd_name]), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+
+class RootGroup(LazyGroup):
+    """The ``cli`` group: a bare ``--profile`` must not swallow the subcommand."""
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        from Scripts.utils.profiling import expand_bare_flag
+        return super().parse_args(ctx, expand_bare_flag(args))
+
+
+class LazyProxy:
+    """Stand-in for a ctx.obj entry, built by ``factory`` on first use.
+
+    Attribute reads and writes are forwarded to the real object, so callers
+    cannot tell the difference -- except that a command which never touches
+    the entry never pays for building it.
+    """
+
+    __slots__ = ('_factory', '_instance')
+
+    def __init__(self, factory):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+
+    def _resolve(self):
+        if self._instance is None:
+            object.__setattr__(self, '_instance', self._factory())
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
+
+    def __repr__(self) -> str:
+        state = 'unresolved' if self._instance is None else repr(self._instance)
+        return f"<LazyProxy {state}>"
+
+
+def _load_secure_env() -> None:
+    from Scripts.security.secure_env_loader import ensure_secure_env_loaded
+    ensure_secure_env_loaded()
+
+
+def needs_secure_env(f):
+    """Mark a command (or group) as reading settings from Config/config.enc.yaml.
+
+    The file is decrypted into os.environ just before the callback runs, once
+    per process. Unmarked commands never fork sops for it; ConfigLoader.get
+    still loads it on its first miss for anything reached indirectly.
+    Apply it directly above the ``def``, below the click decorators.
+    """
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        _load_secure_env()
+        return f(*args, **kwargs)
+    wrapper.needs_secure_env = True
+    return wrapper
+
+
+def _default_domain() -> str:
+    """NOAH_DOMAIN, as a callable --domain default: click resolves it while
+    parsing, before the callback, so it has to trigger the load itself."""
+    _load_secure_env()
+    return os.environ.get('NOAH_DOMAIN', '')
+
 
 VERSION = "0.1.0"
-DEFAULT_DOMAIN = os.environ.get('NOAH_DOMAIN', '')
+
+# Filled by `noah daemon` before it forks a command; empty otherwise.
+_warm_context: dict[str, object] = {}
+
+
+def _start_profile(ctx: click.Context, modes, output) -> None:
+    """Collect a --profile report until the root context closes.
+
+    call_on_close callbacks run on the way out of the command, through
+    SystemExit and exceptions alike, so a failed command is profiled too.
+    """
+    from Scripts.utils.profiling import ProfileSession
+    session = ProfileSession(modes, output).start()
+
+    def write_report():
+        try:
+            path = session.finish()
+        except OSError as e:
+            click.echo(f"❌ Could not write the profile report: {e}", err=True)
+        else:
+            click.echo(f"📊 Profile report written to {path}", err=True)
+
+    ctx.call_on_close(write_report)
 
 
 def _print_banner() -> None:
@@ -143,10 +305,56 @@ def check_repository_root():
         click.echo("   python noah.py <command>", err=True)
         sys.exit(1)
 
-@click.group(invoke_without_command=True)
+def _parse_profile_modes(ctx, param, value):
+    if value is None:
+        return None
+    from Scripts.utils.profiling import parse_modes
+    try:
+        return parse_modes(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), ctx=ctx, param=param) from None
+
+def _select_cluster(ctx, param, value):
+    """Validate --cluster and publish it as NOAH_CLUSTER, which every canonical
+    store opened by this command -- and the Ansible runs it starts -- reads.
+
+    Restored when the command's context closes: `noah batch` runs its steps
+    in this process, and one step's --cluster must not carry over to the next.
+    """
+    if value is None:
+        return None
+    from Scripts.security.canonical_store import check_cluster_name
+    try:
+        check_cluster_name(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), ctx=ctx, param=param) from None
+    previous = os.environ.get('NOAH_CLUSTER')
+
+    def _restore():
+        if previous is None:
+            os.environ.pop('NOAH_CLUSTER', None)
+        else:
+            os.environ['NOAH_CLUSTER'] = previous
+
+    os.environ['NOAH_CLUSTER'] = value
+    ctx.call_on_close(_restore)
+    return value
+
+
+@click.group(cls=RootGroup, invoke_without_command=True)
 @click.version_option(version=VERSION, prog_name="NOAH")
+@click.option('--profile', 'profile_modes', is_flag=False, flag_value='all', default=None,
+              metavar='[MODES]', callback=_parse_profile_modes,
+              help='Profile this command: imports, cprofile, subprocess (comma-separated; '
+                   'all when bare) into a JSON report')
+@click.option('--profile-output', type=click.Path(dir_okay=False, path_type=Path), default=None,
+              help='Profile report path (default: ./noah-profile-<timestamp>.json)')
+@click.option('--cluster', 'cluster_name', default=None, metavar='NAME', callback=_select_cluster,
+              expose_value=False,
+              help='Named cluster whose secrets to use, kept under Secrets/clusters/NAME/ '
+                   '(default: NOAH_CLUSTER, else the store in Secrets/)')
 @click.pass_context
-def cli(ctx: click.Context) -> None:
+def cli(ctx: click.Context, profile_modes, profile_output) -> None:
     """NOAH - Network Operations & Automation Hub
 
     Automates deployment of open source information systems on Kubernetes
@@ -156,7 +364,7 @@ def cli(ctx: click.Context) -> None:
     if sys.stdout.isatty():
         _print_banner()
 
-    # No subcommand → show help and stop before building the heavy managers.
+    # No subcommand → show help and stop before anything else.
     if ctx.invoked_subcommand is None:
         click.echo(ctx.get_help())
         ctx.exit()
@@ -164,10 +372,21 @@ def cli(ctx: click.Context) -> None:
     # Check if running from repository root before initializing
     check_repository_root()
 
+    if profile_modes:
+        _start_profile(ctx, profile_modes, profile_output)
+
+    # Built on first use: ClusterManager alone loads the kubeconfig and the
+    # kubernetes client, which `setup gitops`, `garage admin show` and most
+    # other commands never need.
     ctx.ensure_object(dict)
-    ctx.obj['config'] = ConfigLoader()
-    ctx.obj['cluster'] = ClusterManager(ctx.obj['config'])
-    ctx.obj['secrets'] = SecretManager(ctx.obj['config'])
+    if 'config' in ctx.obj:
+        return  # a `noah batch` step, reusing the batch's own objects
+    config = LazyProxy(lambda: _lazy('ConfigLoader')())
+    ctx.obj['config'] = config
+    ctx.obj['cluster'] = LazyProxy(lambda: _lazy('ClusterManager')(config))
+    ctx.obj['secrets'] = LazyProxy(lambda: _lazy('SecretManager')(config))
+    # Under `noah daemon`, the instances it built before forking this command.
+    ctx.obj.update(_warm_context)
 
 @cli.group()  # type: ignore
 @click.pass_context
@@ -182,9 +401,10 @@ def cluster(ctx):
                    'Pass --purge-secrets to also delete the canonical store '
                    '(including the Cloudflare token), generated secrets, and certificates.')
 @click.pass_context
+@needs_secure_env
 def destroy(ctx, name, force, keep_secrets):
     """Destroy Kubernetes cluster and clean up resources"""
-    destroy_cluster_command(ctx, name, force, keep_secrets, get_security_config)
+    _lazy('destroy_cluster_command')(ctx, name, force, keep_secrets, _lazy('get_security_config'))
 
 
 # ──────────────────────────────────────────────────────────────────────
@@ -231,6 +451,7 @@ def destroy(ctx, name, force, keep_secrets):
 @click.option('--url-timeout', 'url_timeout', default=300, show_default=True,
               help='Seconds to wait for the public URLs to become reachable after Flux converges.')
 @click.pass_context
+@needs_secure_env
 def bootstrap(ctx, node, nodes, ha, domain, flux_repo, flux_branch, flux_path,
               ssh_user, ssh_key, age_key_file, k3s_version, force_reset,
               git_token, git_provider, no_wait, verify_timeout, url_timeout):
@@ -261,7 +482,7 @@ def bootstrap(ctx, node, nodes, ha, domain, flux_repo, flux_branch, flux_path,
     if not node and not nodes and not ha:
         node = store.get_node_public_ip() or click.prompt('Single node IP (single-node mode)')
 
-    rc = cluster_bootstrap(
+    rc = _lazy('cluster_bootstrap')(
         node=node,
         nodes=nodes,
         ha=ha,
@@ -300,10 +521,11 @@ def bootstrap(ctx, node, nodes, ha, domain, flux_repo, flux_branch, flux_path,
 @click.option('--ssh-key', default=None, help='SSH private key path (optional)')
 @click.option('--k3s-version', default=None)
 @click.pass_context
+@needs_secure_env
 def add_nodes(ctx, primary, nodes, ssh_user, ssh_key, k3s_version):
     """Scale a single-node cluster to HA by joining new server nodes."""
     new_nodes = [n.strip() for n in nodes.split(',') if n.strip()]
-    rc = cluster_add_nodes(
+    rc = _lazy('cluster_add_nodes')(
         primary=primary,
         new_nodes=new_nodes,
         ssh_user=ssh_user,
@@ -318,7 +540,7 @@ def add_nodes(ctx, primary, nodes, ssh_user, ssh_key, k3s_version):
 @click.pass_context
 def cluster_status(ctx):
     """Show node, etcd quorum, and FluxCD reconciliation state."""
-    sys.exit(show_cluster_status_v2())
+    sys.exit(_lazy('show_cluster_status_v2')())
 
 
 @cluster.command('verify')
@@ -332,7 +554,7 @@ def cluster_verify(ctx, domain, timeout, url_timeout):
     from Scripts.cluster_create.verify_utils import verify_deployment
     if not domain:
         from Scripts.security.canonical_store import get_canonical_store  # type: ignore
-        domain = get_canonical_store().get_cluster_domain()
+        domain = get_canonical_store(readonly=True).get_cluster_domain()
     ok = verify_deployment(domain=domain, timeout=timeout, url_timeout=url_timeout)
     sys.exit(0 if ok else 1)
 
@@ -347,14 +569,14 @@ def flux(ctx):
 @click.pass_context
 def flux_sync(ctx):
     """Force immediate reconciliation of every Kustomization + HelmRelease."""
-    sys.exit(flux_cmd_sync())
+    sys.exit(_lazy('flux_cmd_sync')())
 
 
 @flux.command('status')
 @click.pass_context
 def flux_status_cmd(ctx):
     """Show the state of every Flux resource in the cluster."""
-    sys.exit(flux_cmd_status())
+    sys.exit(_lazy('flux_cmd_status')())
 
 
 @flux.command('logs')
@@ -363,7 +585,7 @@ def flux_status_cmd(ctx):
 @click.pass_context
 def flux_logs(ctx, follow, tail):
     """Aggregate logs from the Flux controllers."""
-    sys.exit(flux_cmd_logs(follow=follow, tail=tail))
+    sys.exit(_lazy('flux_cmd_logs')(follow=follow, tail=tail))
 
 
 # ──────────────────────────────────────────────────────────────────────
@@ -487,6 +709,7 @@ def garage_admin_set_cloud(ctx, provider, access_key_id, secret_access_key, regi
               help='Skip the compute-node routing play (physical machines, where it is moot)')
 @click.option('--compute-ssh-key', default=None, help='SSH key for the compute node (cluster key, not the Garage one)')
 @click.pass_context
+@needs_secure_env
 def garage_deploy_cmd(ctx, nodes, from_infra, ssh_user, ssh_key, bastion_user,
                       replication_factor, domain, capacity, data_device, zones,
                       tls_enabled, skip_nat, compute_ssh_key):
@@ -497,7 +720,7 @@ def garage_deploy_cmd(ctx, nodes, from_infra, ssh_user, ssh_key, bastion_user,
     click.echo("[VERBOSE] Starting Garage deployment...")
     root = Path.cwd()
     if not domain:
-        domain = get_canonical_store(root).get_cluster_domain() or DEFAULT_DOMAIN
+        domain = get_canonical_store(root).get_cluster_domain() or _default_domain()
 
     sys.exit(run_deploy(
         nodes=nodes, from_infra=from_infra, ssh_user=ssh_user, ssh_key=ssh_key,
@@ -515,6 +738,7 @@ def garage_deploy_cmd(ctx, nodes, from_infra, ssh_user, ssh_key, bastion_user,
 @click.option('--ssh-key', default=None, help='SSH private key (defaults to the domain-3 key)')
 @click.option('--bastion-user', default=None)
 @click.pass_context
+@needs_secure_env
 def garage_provision_cmd(ctx, nodes, from_infra, ssh_user, ssh_key, bastion_user):
     """Create the buckets and import the S3 keys.
 
@@ -552,6 +776,7 @@ def garage_status_cmd(ctx, nodes, from_infra, ssh_user, ssh_key, bastion_user):
 @click.option('--ssh-user', default='ubuntu', show_default=True)
 @click.option('--compute-ssh-key', default=None, help='SSH key for the compute node (the CLUSTER key)')
 @click.pass_context
+@needs_secure_env
 def garage_nat_cmd(ctx, from_infra, ssh_user, compute_ssh_key):
     """Route the Garage nodes' egress through the compute node (G19).
 
@@ -564,7 +789,7 @@ def garage_nat_cmd(ctx, from_infra, ssh_user, compute_ssh_key):
     click.echo("[VERBOSE] Configuring egress routing on the compute node...")
     sys.exit(run_deploy(
         nodes=None, from_infra=from_infra, ssh_user=ssh_user, ssh_key=None,
-        bastion_user=None, replication_factor=None, domain=DEFAULT_DOMAIN,
+        bastion_user=None, replication_factor=None, domain=_default_domain(),
         capacity='20G', data_device=None, zones=None, tls_enabled=True,
         skip_nat=False, compute_ssh_key=compute_ssh_key,
         project_root=root, ansible_dir=root / 'Ansible', nat_only=True,
@@ -689,9 +914,10 @@ def certificates(ctx):
     """Manage TLS certificates"""
 
 @certificates.command()
-@click.option('--domain', default=DEFAULT_DOMAIN, help='Domain for TLS certificates')
+@click.option('--domain', default=_default_domain, help='Domain for TLS certificates')
 @click.option('--force', is_flag=True, help='Force regeneration of existing certificates')
 @click.pass_context
+@needs_secure_env
 def generate_certs(ctx, domain, force):
     """Generate self-signed TLS certificates"""
     certs_dir = Path("Certificates")
@@ -729,7 +955,7 @@ def new(ctx):
     """Generate a new Authentik admin password"""
     click.echo("🔄 Regenerating Authentik admin password...")
 
-    result, error = regenerate_authentik_password()
+    result, error = _lazy('regenerate_authentik_password')()
     if result:
         click.echo("✅ Password regenerated successfully!")
         click.echo("")
@@ -752,13 +978,14 @@ def new(ctx):
         sys.exit(1)
 
 @password.command()
-@click.option('--domain', default=DEFAULT_DOMAIN, help='Domain for service URLs (defaults to the domain recorded by `setup gitops`)')
+@click.option('--domain', default=_default_domain, help='Domain for service URLs (defaults to the domain recorded by `setup gitops`)')
 @click.pass_context
+@needs_secure_env
 def show_password(ctx, domain):
     """Show current admin credentials for NOAH services"""
     click.echo("🔍 Current admin credentials:")
     click.echo("=" * 50)
-    credentials, error = get_admin_credentials(domain=domain)
+    credentials, error = _lazy('get_admin_credentials')(domain=domain)
     if credentials:
         # External IP and resolution are node-level: identical for every service.
         node = credentials[0]
@@ -789,14 +1016,15 @@ def show_password(ctx, domain):
 def setup(ctx):
     """Setup and initialize NOAH environment"""
 
-@cli.group()  # type: ignore
+# `rotate` lives in Scripts/security/rotate_cli.py to keep this file lighter;
+# registered by path so its imports are only paid when it is dispatched.
+@cli.group(cls=LazyGroup, lazy_subcommands={  # type: ignore
+    'rotate': 'Scripts.security.rotate_cli:rotate_canonical',
+})
 @click.pass_context
 def secrets(ctx):
     """Manage and validate service secrets"""
 
-# Dynamically register rotate command (externalized) AFTER group definition
-register_rotate_command(secrets)
-
 @secrets.command()
 @click.pass_context
 def init(ctx):
@@ -816,10 +1044,11 @@ def init(ctx):
 @click.option('--service', required=True, help='Service name')
 @click.option('--namespace', default='default', help='Kubernetes namespace')
 @click.pass_context
+@needs_secure_env
 def generate(ctx, service, namespace):
     """Generate encrypted secrets for a service"""
     # Ensure security is initialized
-    ensure_security_initialized(ctx)
+    _lazy('ensure_security_initialized')(ctx)
 
     click.echo("[VERBOSE] Starting secret generation process...")
     click.echo(f"[VERBOSE] Service: {service}")
@@ -834,9 +1063,10 @@ def generate(ctx, service, namespace):
 @click.option('--namespace', default='authentik', help='Kubernetes namespace')
 @click.option('--fix', is_flag=True, help='Automatically fix inconsistencies')
 @click.pass_context
+@needs_secure_env
 def validate(ctx, service, namespace, fix):
     """Validate service secrets consistency"""
-    ensure_security_initialized(ctx)
+    _lazy('ensure_security_initialized')(ctx)
 
     click.echo(f"🔍 Validating secrets for {service} in namespace {namespace}...")
 
@@ -859,23 +1089,48 @@ def validate(ctx, service, namespace, fix):
         else:
             click.echo("💡 Run with --fix to automatically resolve inconsistencies")
 
+def _canonical_targets(all_clusters):
+    """(message prefix, cluster) pairs a secrets command acts on: the selected
+    cluster, or with --all-clusters every cluster that has a store."""
+    if not all_clusters:
+        return [("", None)]
+    from Scripts.security.canonical_store import list_clusters  # type: ignore
+    clusters = list_clusters(Path.cwd())
+    if not clusters:
+        raise click.ClickException("No canonical store found for any cluster.")
+    return [(f"[{cluster}] ", cluster) for cluster in clusters]
+
+_all_clusters_option = click.option('--all-clusters', is_flag=True,
+                                    help='Act on every cluster with a store, one after the other')
+
 @secrets.command(name='apply')
 @click.option('--domain', help='Cluster domain (defaults to the value stored in the canonical store)')
+@_all_clusters_option
 @click.pass_context
-def apply_secrets(ctx, domain):
+def apply_secrets(ctx, domain, all_clusters):
     """Apply application secrets to the running cluster (out-of-band, no Git commit).
 
     Renders secrets from the canonical store and kubectl-applies them directly.
     Use after `secrets rotate` to propagate new secrets without re-bootstrapping.
+    With --all-clusters, each named cluster is reached through Kube/<name>.yaml;
+    a failure is reported and the other clusters are still applied.
     """
+    if domain and all_clusters:
+        raise click.UsageError("--domain applies to one cluster; omit it with --all-clusters.")
     from Scripts.gitops.gitops_init import apply_app_secrets
-    try:
-        apply_app_secrets(domain=domain, project_root=Path(__file__).parent,
-                          print_status=print_status)
-    except Exception as e:
-        print_status(f"[ERROR] {e}", "ERROR")
+    print_status = _lazy('print_status')
+    failed = False
+    for prefix, cluster in _canonical_targets(all_clusters):
+        try:
+            apply_app_secrets(domain=domain, project_root=Path(__file__).parent,
+                              print_status=print_status, cluster=cluster)
+        except Exception as e:
+            print_status(f"[ERROR] {prefix}{e}", "ERROR")
+            failed = True
+            continue
+        click.echo(f"✅ {prefix}Application secrets applied to the cluster.")
+    if failed:
         sys.exit(1)
-    click.echo("✅ Application secrets applied to the cluster.")
     click.echo("💡 Authentik picks up changes automatically (Flux watches its values Secret).")
     click.echo("   Env-mounted consumers may need a restart, e.g.:")
     click.echo("     kubectl rollout restart deploy -n headlamp")
@@ -884,9 +1139,10 @@ def apply_secrets(ctx, domain):
 @click.option('--service', required=True, help='Service to regenerate secrets for')
 @click.option('--namespace', default='authentik', help='Kubernetes namespace')
 @click.pass_context
+@needs_secure_env
 def regenerate(ctx, service, namespace):
     """Regenerate secrets for a service (preserves existing passwords)"""
-    ensure_security_initialized(ctx)
+    _lazy('ensure_security_initialized')(ctx)
 
     click.echo(f"🔄 Regenerating secrets for {service} in namespace {namespace}...")
     ctx.obj['secrets'].generate_service_secrets(service)
@@ -900,7 +1156,7 @@ def regenerate(ctx, service, namespace):
 def canonical_secrets(ctx, show, service, raw):
     """Interact with canonical secrets store (read-only)."""
     from Scripts.security.canonical_store import get_canonical_store  # type: ignore
-    store = get_canonical_store()
+    store = get_canonical_store(readonly=True)
     data = store.data
     if not show:
         click.echo("Canonical secrets store present.")
@@ -925,6 +1181,91 @@ def canonical_secrets(ctx, show, service, raw):
                 display = v if raw else (v[:4] + '...' if v else '')
                 click.echo(f"  {k}: {display}")
 
+@secrets.command(name='migrate')
+@click.option('--layout', type=click.Choice(['sharded', 'journal']), required=True,
+              help='Target layout: sharded = one encrypted file per service under Secrets/canonical/; '
+                   'journal = snapshot plus one small encrypted record per change')
+@_all_clusters_option
+def migrate_canonical(layout, all_clusters):
+    """Convert the canonical store to another on-disk layout."""
+    from Scripts.security.canonical_store import get_canonical_store  # type: ignore
+    for prefix, cluster in _canonical_targets(all_clusters):
+        store = get_canonical_store(cluster=cluster)
+        if layout == 'journal':
+            if store.journaled:
+                click.echo(f"{prefix}Canonical store already uses the journal layout.")
+                continue
+            try:
+                store.migrate_to_journal()
+            except ValueError as e:
+                raise click.ClickException(f"{prefix}{e}")
+            click.echo(f"✅ {prefix}Canonical store journaled: changes are appended under "
+                       f"{store._journal_dir()} (fold them with `noah secrets compact`)")
+            continue
+        if store.sharded:
+            click.echo(f"{prefix}Canonical store already uses the sharded layout.")
+            continue
+        if not store.migrate_to_sharded():
+            raise click.ClickException(f"{prefix}Migration failed; the single-file store was left in place.")
+        click.echo(f"✅ {prefix}Canonical store migrated: {len(store.data['services'])} services "
+                   f"sharded under {store._shard_dir()}")
+
+@secrets.command(name='compact')
+@_all_clusters_option
+def compact_canonical(all_clusters):
+    """Fold the canonical store's journal into a new snapshot."""
+    from Scripts.security.canonical_store import get_canonical_store  # type: ignore
+    for prefix, cluster in _canonical_targets(all_clusters):
+        store = get_canonical_store(cluster=cluster)
+        if not store.journaled:
+            click.echo(f"{prefix}Canonical store does not use the journal layout; nothing to compact.")
+            continue
+        folded = store.compact()
+        if folded is None:
+            raise click.ClickException(f"{prefix}Compaction failed; the journal was left in place.")
+        click.echo(f"✅ {prefix}{folded} journal record(s) folded into the snapshot")
+
+@secrets.command(name='clusters')
+def canonical_clusters():
+    """List the clusters with a canonical store (nothing is decrypted)."""
+    from Scripts.security.canonical_store import (  # type: ignore
+        DEFAULT_CLUSTER,
+        cluster_secrets_dir,
+        list_clusters,
+        selected_cluster,
+    )
+    root = Path.cwd()
+    current = selected_cluster() or DEFAULT_CLUSTER
+    clusters = list_clusters(root)
+    if not clusters:
+        click.echo("No canonical store found.")
+        return
+    for cluster in clusters:
+        path = cluster_secrets_dir(root, None if cluster == DEFAULT_CLUSTER else cluster)
+        marker = '*' if cluster == current else ' '
+        click.echo(f"{marker} {cluster}  {path.relative_to(root)}")
+
+@secrets.command(name='history')
+@click.option('--service', help='Filter to a specific service')
+def canonical_history(service):
+    """Show who-changed-what-when from the canonical store's journal (no values)."""
+    from Scripts.security.canonical_store import get_canonical_store  # type: ignore
+    store = get_canonical_store(readonly=True)
+    if not store.journaled:
+        click.echo("Canonical store does not use the journal layout; no history is kept.")
+        return
+    for entry in store.history():
+        if service and entry.get('service') != service:
+            continue
+        what = entry.get('setting') or '.'.join(filter(None, (entry.get('service'), entry.get('key'))))
+        if entry.get('removed'):
+            detail = 'removed'
+        elif entry.get('version') is not None:
+            detail = f"v{entry['version']} rotated:{entry.get('rotated_at', '')}"
+        else:
+            detail = 'set'
+        click.echo(f"r{entry.get('revision')}  {entry.get('at', '')}  {what}  {detail}")
+
 ## Rotation command moved to Scripts/security/rotate_cli.py to simplify this file
 
 @setup.command()
@@ -934,7 +1275,7 @@ def canonical_secrets(ctx, show, service, raw):
 @click.pass_context
 def initialize(ctx, skip_deps, skip_tests, skip_dns_wizard):
     """Initialize NOAH environment with all dependencies"""
-    initialize_noah_environment(ctx, skip_deps, skip_tests, print_status, skip_dns_wizard)
+    _lazy('initialize_noah_environment')(ctx, skip_deps, skip_tests, _lazy('print_status'), skip_dns_wizard)
 
 @setup.command()
 @click.option('--force', is_flag=True, help='Skip confirmation prompt')
@@ -961,6 +1302,7 @@ def reset(force):
         click.echo("Aborted.")
         return
 
+    print_status = _lazy('print_status')
     removed, failed = [], []
     for p, desc in existing:
         try:
@@ -1012,6 +1354,7 @@ def gitops(ctx, domain, node_ip, with_stalwart):
     click.echo(f"  Stalwart: {'enabled' if with_stalwart else 'disabled (--with-stalwart to deploy mail)'}")
     click.echo("")
 
+    print_status = _lazy('print_status')
     try:
         setup_gitops(
             domain=domain,
@@ -1061,7 +1404,8 @@ def update_sops():
     click.echo("=" * 25)
     click.echo("")
 
-    if update_sops_version():
+    print_status = _lazy('print_status')
+    if _lazy('update_sops_version')():
         click.echo("")
         print_status("SOPS update completed successfully!", "SUCCESS")
     else:
@@ -1073,10 +1417,11 @@ def update_sops():
 @click.pass_context
 def doctor(ctx):
     """Diagnose NOAH environment and dependencies"""
-    diagnose_noah_environment(ctx)
+    _lazy('diagnose_noah_environment')(ctx)
 
 @cli.group()  # type: ignore
 @click.pass_context
+@needs_secure_env
 def test(ctx):
     """Test deployed services"""
 
@@ -1098,7 +1443,7 @@ def sso(ctx):
         sys.exit(1)
 
 @test.command()
-@click.option('--domain', default=DEFAULT_DOMAIN, help='Domain for services')
+@click.option('--domain', default=_default_domain, help='Domain for services')
 @click.pass_context
 def headlamp(ctx, domain):
     """Test Headlamp Kubernetes Dashboard deployment and SSO integration"""
@@ -1116,7 +1461,7 @@ def headlamp(ctx, domain):
         sys.exit(1)
 
 @test.command()
-@click.option('--domain', default=DEFAULT_DOMAIN, help='Domain for services')
+@click.option('--domain', default=_default_domain, help='Domain for services')
 @click.pass_context
 def hubble(ctx, domain):
     """Test Hubble UI deployment and Authentik forward-auth integration"""
@@ -1133,10 +1478,241 @@ def hubble(ctx, domain):
 @click.pass_context
 def status(ctx):
     """Show status of all deployed services"""
-    show_cluster_status(ctx)
+    _lazy('show_cluster_status')(ctx)
+
+
+@cli.group()  # type: ignore
+@click.pass_context
+def session(ctx):
+    """Cache decrypted configuration and secrets across commands"""
+
+
+@session.command('start')
+@click.option('--ttl', default='15m', show_default=True,
+              help='Session lifetime (e.g. 900, 15m, 2h)')
+def session_start(ttl):
+    """Keep decrypted SOPS payloads in $XDG_RUNTIME_DIR until the TTL expires."""
+    import time
+
+    from Scripts.security import session_cache
+    try:
+        expires_at = session_cache.start_session(session_cache.parse_ttl(ttl))
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--ttl')
+    except session_cache.SessionCacheError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"✅ Session open until {time.strftime('%H:%M:%S', time.localtime(expires_at))}")
+
+
+@session.command('stop')
+def session_stop():
+    """Close the session and drop every cached plaintext."""
+    from Scripts.security import session_cache
+    if session_cache.stop_session():
+        click.echo("✅ Session closed")
+    else:
+        click.echo("No open session")
+
+
+@session.command('status')
+def session_status():
+    """Show whether a session is open, until when, and how many files it holds."""
+    import time
+
+    from Scripts.security import session_cache
+    info = session_cache.session_info()
+    if info is None:
+        click.echo("No open session")
+        return
+    remaining = int(info['expires_at'] - time.time())
+    click.echo(f"Session open: {info['entries']} cached file(s), "
+               f"expires in {remaining // 60}m{remaining % 60:02d}s ({info['path']})")
+
+
+@cli.command()  # type: ignore
+@click.argument('batch_file', type=click.File('r'), default='-')
+@click.option('--keep-going', is_flag=True, default=False,
+              help='Run the remaining steps after one fails')
+@click.pass_context
+def batch(ctx, batch_file, keep_going):
+    """Run the noah subcommands listed in BATCH_FILE (default: stdin) in one process.
+
+    One command per line, as typed after `python3 noah.py`; `#` starts a
+    comment. The canonical store, decrypted configuration and cluster clients
+    are built once for the whole batch. Exits with the first failing status.
+    """
+    from Scripts.utils.batch import (
+        BatchSyntaxError,
+        batch_exit_code,
+        format_report,
+        parse_batch,
+        run_batch,
+    )
+    try:
+        steps = parse_batch(batch_file)
+    except BatchSyntaxError as e:
+        raise click.ClickException(f"{batch_file.name}: {e}")
+
+    def invoke(argv):
+        try:
+            main(argv, obj=ctx.obj)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            click.echo(e.code, err=True)
+            return 1
+        except Exception:  # noqa: BLE001 -- report it and let the batch decide
+            import traceback
+            traceback.print_exc()
+            return 1
+        return 0
+
+    def announce(step):
+        click.echo(click.style(f"\n▶ [{step.line_no}] noah {step.label}", bold=True), err=True)
+
+    run_batch(steps, invoke, keep_going=keep_going, on_step=announce)
+    click.echo("", err=True)
+    click.echo(format_report(steps), err=True)
+    sys.exit(batch_exit_code(steps))
+
 
 @cli.group()  # type: ignore
 @click.pass_context
+def daemon(ctx):
+    """Serve commands from a warm resident process"""
+
+
+def _daemon_warm_up() -> dict[str, str]:
+    """Build the state every forked command inherits.
+
+    Returns the variables decrypted from config.enc.yaml: the daemon lays them
+    over each client's environment, as the on-demand load would have.
+    """
+    from Scripts.security import canonical_store, secure_env_loader
+
+    overlay: dict[str, str] = {}
+    if secure_env_loader.CONFIG_ENC_FILE.exists():
+        loader = secure_env_loader.SecureEnvLoader()
+        overlay = loader.decrypt_env_file(secure_env_loader.CONFIG_ENC_FILE) or {}
+    os.environ.update(overlay)
+    secure_env_loader._secure_env_loaded = True
+
+    # Whatever cannot be warmed is left for each command to build -- and to
+    # report -- itself, as it would without the daemon.
+    _warm_context.clear()
+    try:
+        for name in _LAZY_ATTRIBUTES:
+            _lazy(name)
+        config = _lazy('ConfigLoader')()
+        _warm_context['config'] = config
+        _warm_context['cluster'] = _lazy('ClusterManager')(config)
+    except Exception as e:  # noqa: BLE001
+        click.echo(f"[WARNING] Daemon not fully warmed up: {e}", err=True)
+    canonical_store._store_instance = None
+    try:
+        # load(): the store decrypts lazily, and warm means decrypted.
+        canonical_store.get_canonical_store(Path.cwd()).load()
+    except Exception as e:  # noqa: BLE001 -- commands will report it themselves
+        click.echo(f"[WARNING] Canonical store not preloaded: {e}", err=True)
+    return overlay
+
+
+def _daemon_run(argv) -> None:
+    """Run one forwarded command inside a forked daemon child."""
+    config = _warm_context.get('config')
+    if config is not None:
+        # The warm loader snapshotted the daemon's environment; re-read the
+        # client's, which the child has just installed.
+        config.config.clear()
+        config.load_config()
+    main(argv)
+
+
+@daemon.command('start')
+@click.option('--foreground', is_flag=True, default=False,
+              help='Stay attached to the terminal (systemd units, debugging)')
+def daemon_start(foreground):
+    """Start the daemon for this checkout; later noah.py calls forward to it."""
+    from Scripts.daemon.client import socket_path
+    from Scripts.daemon.server import DaemonError, NoahDaemon
+    from Scripts.security.canonical_journal import JOURNAL_DIRNAME
+    from Scripts.security.canonical_shards import INDEX_STEM, SHARD_DIRNAME
+    from Scripts.security.canonical_store import (
+        CANONICAL_FILENAME_ENCRYPTED,
+        CANONICAL_FILENAME_PLAINTEXT,
+    )
+    from Scripts.security.secure_env_loader import CONFIG_ENC_FILE
+
+    sock = socket_path(Path(__file__).resolve().parent)
+    if sock is None:
+        raise click.ClickException(
+            "XDG_RUNTIME_DIR is not set: no private directory for the daemon socket."
+        )
+    root = Path.cwd()
+    server = NoahDaemon(sock, run=_daemon_run, warm_up=_daemon_warm_up, watch=[
+        root / CONFIG_ENC_FILE,
+        root / 'Secrets' / CANONICAL_FILENAME_ENCRYPTED,
+        root / 'Secrets' / CANONICAL_FILENAME_PLAINTEXT,
+        # Every sharded save rewrites the index.
+        root / 'Secrets' / SHARD_DIRNAME / f'{INDEX_STEM}.enc.yaml',
+        root / 'Secrets' / SHARD_DIRNAME / f'{INDEX_STEM}.yaml',
+        # A directory's mtime moves with every record appended or folded.
+        root / 'Secrets' / JOURNAL_DIRNAME,
+    ])
+    try:
+        listener = server.bind()
+    except DaemonError as e:
+        raise click.ClickException(str(e))
+
+    if not foreground:
+        pid = os.fork()
+        if pid:
+            click.echo(f"✅ noah daemon started (pid {pid}, socket {sock})")
+            return
+        os.setsid()
+        log = os.open(sock.with_suffix('.log'), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(log, 1)
+        os.dup2(log, 2)
+        os.close(devnull)
+        os.close(log)
+    else:
+        click.echo(f"noah daemon listening on {sock} (Ctrl-C to stop)")
+    try:
+        server.serve_forever(listener)
+    except KeyboardInterrupt:
+        pass
+
+
+@daemon.command('stop')
+def daemon_stop():
+    """Stop the daemon; commands already running are left to finish."""
+    from Scripts.daemon.client import request
+    reply = request(Path(__file__).resolve().parent, 'stop')
+    if reply is None:
+        click.echo("No daemon running")
+    else:
+        click.echo(f"✅ noah daemon stopped (pid {reply['stopped']})")
+
+
+@daemon.command('status')
+def daemon_status():
+    """Show whether a daemon serves this checkout."""
+    import time
+
+    from Scripts.daemon.client import request
+    reply = request(Path(__file__).resolve().parent, 'status')
+    if reply is None:
+        click.echo("No daemon running")
+        return
+    uptime = int(time.time() - reply['started_at'])
+    click.echo(f"noah daemon pid {reply['pid']}: up {uptime}s, "
+               f"{reply['served']} command(s) served, {reply['running']} running")
+
+@cli.group()  # type: ignore
+@click.pass_context
+@needs_secure_env
 def config(ctx):
     """Configuration management with dynamic domain support"""
 
@@ -1183,13 +1759,22 @@ def override(ctx, service, domain, subdomain, namespace):
         click.echo(f"  FQDN: {result['fqdn']}")
         click.echo(f"  Namespace: {result['namespace']}")
 
-if __name__ == '__main__':
+def main(args=None, obj=None) -> None:
+    """Run the CLI as `python3 noah.py` does (exits through SystemExit)."""
     try:
-        cli()  # type: ignore
-    except InsecureStoreError as e:
-        # The refusal already names the cause and the remedy it needs; a stack
-        # trace would only bury them. Still a non-zero exit, so callers and
+        cli.main(args=args, prog_name='noah.py', obj=obj)  # type: ignore
+    except Exception as e:
+        # Resolved only once something has actually gone wrong, so the happy
+        # path never imports the canonical store just to name this class.
+        if not isinstance(e, (_lazy('InsecureStoreError'), _lazy('StoreConflictError'))):
+            raise
+        # The refusal (or the conflict) already names the cause and the remedy
+        # it needs; a stack trace would only bury them. Still a non-zero exit, so callers and
         # scripts see the failure exactly as before.
         click.echo("", err=True)
         click.echo(f"❌ {e}", err=True)
         sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()